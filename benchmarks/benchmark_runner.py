@@ -11,14 +11,17 @@ import subprocess
 import sys
 import time
 import tracemalloc
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from pathlib import Path
 
+from suaylang import ast
+from suaylang.arena import AstArena
 from suaylang.bytecode import Code
 from suaylang.compiler import Compiler
 from suaylang.interpreter import Interpreter
 from suaylang.lexer import Lexer
 from suaylang.parser import Parser
+from suaylang.runtime import EMPTY_LAYOUT, Env, Layout
 from suaylang.vm import VM
 
 _REPO_ROOT = Path(__file__).resolve().parents[1]
@@ -116,6 +119,100 @@ def _mem_peak_bytes(fn) -> int:
         tracemalloc.stop()
 
 
+def _mem_retained_bytes(fn) -> tuple[object, int]:
+    # Bytes still allocated once fn returns, i.e. held by its (live) result.
+    tracemalloc.start()
+    try:
+        before, _peak = tracemalloc.get_traced_memory()
+        result = fn()
+        after, _peak = tracemalloc.get_traced_memory()
+        return result, after - before
+    finally:
+        tracemalloc.stop()
+
+
+def _count_ast_nodes(node: object) -> int:
+    if isinstance(node, ast.Node):
+        return 1 + sum(_count_ast_nodes(getattr(node, f.name)) for f in fields(node))
+    if isinstance(node, (list, tuple)):
+        return sum(_count_ast_nodes(x) for x in node)
+    return 0
+
+
+def _code_layouts(code: Code) -> list[Layout]:
+    """Layouts of every env the VM can create for `code` (one per scope)."""
+
+    out: list[Layout] = []
+    seen: set[int] = set()
+
+    def walk(c: Code) -> None:
+        if id(c) in seen:
+            return
+        seen.add(id(c))
+        out.extend(c.param_layouts)
+        for ins in c.instrs:
+            if ins.op == "PUSH_ENV":
+                out.append(ins.arg if ins.arg is not None else EMPTY_LAYOUT)
+            elif ins.op == "MATCH_ARM" and ins.arg[1] is not None:
+                out.append(ins.arg[1])
+            elif ins.op == "MAKE_CLOSURE":
+                walk(ins.arg[0])
+
+    walk(code)
+    return out
+
+
+_ENV_REPEAT = 100
+
+
+@dataclass(frozen=True)
+class MemRow:
+    program: str
+    tokens: int
+    bytes_per_token: float
+    ast_nodes: int
+    bytes_per_ast_node: float
+    bytes_per_arena_node: float
+    env_layouts: int
+    bytes_per_env: float
+
+
+def bench_memory(path: Path) -> MemRow:
+    """Retained memory of the lexer's tokens, the parsed AST and env frames.
+
+    Env frames are allocated outside of a run, `_ENV_REPEAT` times for each scope
+    layout in the compiled program, so the figure is the size of one frame for
+    the scope shapes this program actually has.
+    """
+
+    src = _read(path)
+    tokens, token_bytes = _mem_retained_bytes(lambda: Lexer(src, filename=str(path)).tokenize())
+    # Tokens stay alive, so the AST figure excludes the spans it shares with them.
+    program, ast_bytes = _mem_retained_bytes(
+        lambda: Parser(tokens, src, filename=str(path)).parse_program()
+    )
+    nodes = _count_ast_nodes(program)
+    arena, arena_bytes = _mem_retained_bytes(lambda: AstArena.from_program(program, src))
+    layouts = _code_layouts(Compiler().compile_program(program, name=str(path)))
+    if not layouts:
+        layouts = [EMPTY_LAYOUT]
+    root = Env()
+    envs, env_bytes = _mem_retained_bytes(
+        lambda: [Env(parent=root, layout=lay) for _ in range(_ENV_REPEAT) for lay in layouts]
+    )
+    env_bytes -= sys.getsizeof(envs)
+    return MemRow(
+        program=path.as_posix(),
+        tokens=len(tokens),
+        bytes_per_token=token_bytes / max(1, len(tokens)),
+        ast_nodes=nodes,
+        bytes_per_ast_node=ast_bytes / max(1, nodes),
+        bytes_per_arena_node=arena_bytes / max(1, len(arena)),
+        env_layouts=len(layouts),
+        bytes_per_env=env_bytes / len(envs),
+    )
+
+
 @dataclass(frozen=True)
 class BenchRow:
     program: str
@@ -128,6 +225,7 @@ class BenchRow:
     vm_ms_median: float
     vm_ms_p90: float
     vm_instr_static: int
+    vm_instr_removed: int
     vm_steps_ok: int
     mem_peak_parse_bytes: int
     mem_peak_compile_bytes: int
@@ -139,7 +237,7 @@ class BenchRow:
     raw_vm_s: list[float]
 
 
-def bench_file(path: Path, *, iters: int, warmup: int) -> BenchRow:
+def bench_file(path: Path, *, iters: int, warmup: int, optimize: int = 0) -> BenchRow:
     src = _read(path)
 
     def parse_once() -> object:
@@ -152,7 +250,7 @@ def bench_file(path: Path, *, iters: int, warmup: int) -> BenchRow:
     parse_times = _timeit(parse_once, iters=iters)
     program = parse_once()
 
-    compiler = Compiler()
+    compiler = Compiler(optimize=optimize)
 
     def compile_once() -> Code:
         return compiler.compile_program(program, name=str(path))
@@ -161,7 +259,10 @@ def bench_file(path: Path, *, iters: int, warmup: int) -> BenchRow:
         compile_once()
 
     compile_times = _timeit(compile_once, iters=iters)
+    # Removed-instruction count for one compilation (stats accumulate per call).
+    compiler.stats.removed.clear()
     code = compile_once()
+    instr_removed = compiler.stats.total_removed
 
     instr_static = _count_instrs(code)
 
@@ -214,6 +315,7 @@ def bench_file(path: Path, *, iters: int, warmup: int) -> BenchRow:
         vm_ms_median=_median_ms(vm_times),
         vm_ms_p90=_p90_ms(vm_times),
         vm_instr_static=int(instr_static),
+        vm_instr_removed=int(instr_removed),
         vm_steps_ok=int(steps_ok),
         mem_peak_parse_bytes=int(mem_parse),
         mem_peak_compile_bytes=int(mem_compile),
@@ -243,15 +345,52 @@ def _write_md(path: Path, text: str) -> None:
     path.write_text(text.rstrip() + "\n", encoding="utf-8")
 
 
+def _memory_main(programs: list[Path], out_dir: Path) -> int:
+    rows = [bench_memory(p) for p in programs]
+    raw_path = out_dir / "memory_raw.json"
+    md_path = out_dir / "memory.md"
+    _write_json(
+        raw_path,
+        {
+            "commit": _git_commit(),
+            "python": sys.version.replace("\n", " "),
+            "rows": [row.__dict__ for row in rows],
+        },
+    )
+
+    md: list[str] = []
+    md.append("# Memory (SuayLang)")
+    md.append("")
+    md.append("Retained `tracemalloc` bytes per object, backed by `results/memory_raw.json`.")
+    md.append("")
+    md.append("| Program | Tokens | B/token | AST nodes | B/node | B/node (arena) | Env layouts | B/env |")
+    md.append("|---|---:|---:|---:|---:|---:|---:|---:|")
+    for r in rows:
+        md.append(
+            f"| {Path(r.program).name} | {r.tokens} | {r.bytes_per_token:.1f} | {r.ast_nodes} "
+            f"| {r.bytes_per_ast_node:.1f} | {r.bytes_per_arena_node:.1f} | {r.env_layouts} | {r.bytes_per_env:.1f} |"
+        )
+    _write_md(md_path, "\n".join(md))
+
+    print(f"bench: wrote {raw_path} and {md_path}")
+    return 0
+
+
 def main() -> int:
 
     ap = argparse.ArgumentParser(prog="benchmark-runner", description="Run SuayLang benchmarks with parse/compile/exec timings.")
     ap.add_argument("--profile", choices=["smoke", "full"], default="full")
     ap.add_argument("--iters", type=int, default=20)
     ap.add_argument("--warmup", type=int, default=3)
+    ap.add_argument("--optimize", type=int, default=0, help="Bytecode optimizer level (0 = off)")
     ap.add_argument("--bench-dir", type=str, default=str(_REPO_ROOT / "benchmarks" / "v1"))
     ap.add_argument("--out-dir", type=str, default=str(_REPO_ROOT / "results"))
     ap.add_argument("--baseline", action="store_true", help="Alias for --profile smoke (for Makefile backward compatibility)")
+    ap.add_argument(
+        "--memory",
+        action="store_true",
+        help="Report retained bytes per token, AST node and env frame instead of timings (any number of programs)",
+    )
     args = ap.parse_args()
 
     # Backwards compatibility: --baseline sets profile to smoke
@@ -271,6 +410,8 @@ def main() -> int:
 
     bench_dir = Path(str(args.bench_dir))
     programs = _iter_bench_programs(bench_dir)
+    if args.memory:
+        return _memory_main(programs, Path(str(args.out_dir)))
     if len(programs) != 6:
         print(f"bench: expected 6 benchmark programs in {bench_dir.as_posix()}, found {len(programs)}")
         for p in programs:
@@ -279,7 +420,7 @@ def main() -> int:
 
     rows: list[BenchRow] = []
     for p in programs:
-        rows.append(bench_file(p, iters=iters, warmup=warmup))
+        rows.append(bench_file(p, iters=iters, warmup=warmup, optimize=int(args.optimize)))
 
     out_dir = Path(str(args.out_dir))
     raw_path = out_dir / "bench_raw.json"
@@ -295,6 +436,7 @@ def main() -> int:
         "profile": args.profile,
         "iters": iters,
         "warmup": warmup,
+        "optimize": int(args.optimize),
         "bench_dir": bench_dir.as_posix(),
         "rows": [row.__dict__ for row in rows],
     }
@@ -311,6 +453,7 @@ def main() -> int:
     md.append(f"- profile: `{args.profile}`")
     md.append(f"- iters: {iters} (per phase; per program)")
     md.append(f"- warmup: {warmup}")
+    md.append(f"- optimize: {int(args.optimize)}")
     md.append(f"- bench_dir: `{payload['bench_dir']}`")
     md.append(f"- python: {payload['metadata']['python']}")
     md.append(f"- platform: {payload['metadata']['platform']}")
@@ -321,12 +464,12 @@ def main() -> int:
     md.append("")
     md.append("All timings are median / p90.")
     md.append("")
-    md.append("| Program | Parse | Compile | Interp | VM | interp/vm (median) | VM instr | VM steps |")
-    md.append("|---|---:|---:|---:|---:|---:|---:|---:|")
+    md.append("| Program | Parse | Compile | Interp | VM | interp/vm (median) | VM instr | removed | VM steps |")
+    md.append("|---|---:|---:|---:|---:|---:|---:|---:|---:|")
     for r in rows:
         ratio = (r.interp_ms_median / r.vm_ms_median) if r.vm_ms_median > 0 else float("inf")
         md.append(
-            "| {p} | {pa:.3f}/{pa90:.3f} | {co:.3f}/{co90:.3f} | {ti:.3f}/{ti90:.3f} | {tv:.3f}/{tv90:.3f} | {ra:.2f} | {ni} | {st} |".format(
+            "| {p} | {pa:.3f}/{pa90:.3f} | {co:.3f}/{co90:.3f} | {ti:.3f}/{ti90:.3f} | {tv:.3f}/{tv90:.3f} | {ra:.2f} | {ni} | {rm} | {st} |".format(
                 p=Path(r.program).name,
                 pa=r.parse_ms_median,
                 pa90=r.parse_ms_p90,
@@ -338,6 +481,7 @@ def main() -> int:
                 tv90=r.vm_ms_p90,
                 ra=ratio,
                 ni=r.vm_instr_static,
+                rm=r.vm_instr_removed,
                 st=r.vm_steps_ok,
             )
         )
@@ -0,0 +1,322 @@
+from __future__ import annotations
+
+import math
+from array import array
+from collections import Counter
+from collections.abc import Iterator, Sequence
+from typing import Any
+
+from . import ast
+from .lexer import Lexer
+from .parser import Parser
+from .tokens import Position, Span, line_index
+
+
+# ----------------------------
+# Flat AST
+# ----------------------------
+#
+# An `AstArena` holds a program as parallel arrays with one entry per node,
+# numbered in post-order: a node's children come before it, and a subtree is a
+# contiguous run of ids ending at its root. Spans are kept as two offsets;
+# lines and columns are recovered from the source when asked for. Names,
+# literals, operators and tags go into a shared constant pool.
+#
+# Children per kind, in order:
+#   Program, Block, TupleExpr, ListExpr, PTuple   items
+#   MapExpr                                        key, value, key, value, ...
+#   Lambda                                         params..., body
+#   Dispatch / Cycle                               value or seed, arms...
+#   DispatchArm / CycleArm                         pattern, expr
+#   PList                                          items..., tail (if the constant is True)
+#   Binding, Mutation, VariantExpr, Unary          their one child
+#   Call, Binary                                   func/left, arg/right
+#   PVariant                                       payload
+
+KINDS: tuple[type[ast.Node], ...] = (
+    ast.Program,
+    ast.Name,
+    ast.UnitLit,
+    ast.BoolLit,
+    ast.IntLit,
+    ast.DecLit,
+    ast.TextLit,
+    ast.TupleExpr,
+    ast.ListExpr,
+    ast.MapExpr,
+    ast.VariantExpr,
+    ast.Binding,
+    ast.Mutation,
+    ast.Block,
+    ast.Lambda,
+    ast.Call,
+    ast.Unary,
+    ast.Binary,
+    ast.DispatchArm,
+    ast.Dispatch,
+    ast.CycleArm,
+    ast.Cycle,
+    ast.PWildcard,
+    ast.PName,
+    ast.PUnit,
+    ast.PBool,
+    ast.PInt,
+    ast.PDec,
+    ast.PText,
+    ast.PTuple,
+    ast.PList,
+    ast.PVariant,
+)
+
+_KIND_INDEX = {cls: i for i, cls in enumerate(KINDS)}
+
+
+def _unpack(node: ast.Node) -> tuple[object, Sequence[ast.Node]]:
+    """(constant or None, children) of `node`, as laid out in the arena."""
+
+    match node:
+        case ast.Program(items=items) | ast.Block(items=items):
+            return None, items
+        case ast.TupleExpr(items=items) | ast.ListExpr(items=items) | ast.PTuple(items=items):
+            return None, items
+        case ast.Name(value=v) | ast.PName(name=v):
+            return v, []
+        case (
+            ast.BoolLit(value=v)
+            | ast.IntLit(value=v)
+            | ast.DecLit(value=v)
+            | ast.TextLit(value=v)
+            | ast.PBool(value=v)
+            | ast.PInt(value=v)
+            | ast.PDec(value=v)
+            | ast.PText(value=v)
+        ):
+            return v, []
+        case ast.MapExpr(entries=entries):
+            return None, [x for kv in entries for x in kv]
+        case ast.VariantExpr(tag=tag, payload=payload) | ast.PVariant(tag=tag, payload=payload):
+            return tag, [payload]
+        case ast.Binding(name=name, value=value) | ast.Mutation(name=name, value=value):
+            return name, [value]
+        case ast.Lambda(params=params, body=body):
+            return None, [*params, body]
+        case ast.Call(func=func, arg=arg):
+            return None, [func, arg]
+        case ast.Unary(op=op, expr=expr):
+            return op, [expr]
+        case ast.Binary(op=op, left=left, right=right):
+            return op, [left, right]
+        case ast.DispatchArm(pattern=pattern, expr=expr):
+            return None, [pattern, expr]
+        case ast.CycleArm(pattern=pattern, mode=mode, expr=expr):
+            return mode, [pattern, expr]
+        case ast.Dispatch(value=value, arms=arms) | ast.Cycle(seed=value, arms=arms):
+            return None, [value, *arms]
+        case ast.PList(items=items, tail=tail):
+            return tail is not None, items if tail is None else [*items, tail]
+        case _:
+            return None, []
+
+
+def _build(cls: type[ast.Node], const: Any, kids: list[Any], span: Span) -> ast.Node:
+    # `const` and `kids` have the types `cls` expects: the arena was built from
+    # a node of that class (see `_unpack`).
+    if cls is ast.Program or cls is ast.Block or cls is ast.TupleExpr or cls is ast.ListExpr:
+        return cls(items=kids, span=span)
+    if cls is ast.PTuple:
+        return ast.PTuple(items=kids, span=span)
+    if cls is ast.Name:
+        return ast.Name(value=const, span=span)
+    if cls is ast.PName:
+        return ast.PName(name=const, span=span)
+    if cls is ast.UnitLit or cls is ast.PWildcard or cls is ast.PUnit:
+        return cls(span=span)
+    if cls is ast.MapExpr:
+        return ast.MapExpr(entries=list(zip(kids[::2], kids[1::2])), span=span)
+    if cls is ast.VariantExpr or cls is ast.PVariant:
+        return cls(tag=const, payload=kids[0], span=span)
+    if cls is ast.Binding or cls is ast.Mutation:
+        return cls(name=const, value=kids[0], span=span)
+    if cls is ast.Lambda:
+        return ast.Lambda(params=kids[:-1], body=kids[-1], span=span)
+    if cls is ast.Call:
+        return ast.Call(func=kids[0], arg=kids[1], span=span)
+    if cls is ast.Unary:
+        return ast.Unary(op=const, expr=kids[0], span=span)
+    if cls is ast.Binary:
+        return ast.Binary(op=const, left=kids[0], right=kids[1], span=span)
+    if cls is ast.DispatchArm:
+        return ast.DispatchArm(pattern=kids[0], expr=kids[1], span=span)
+    if cls is ast.CycleArm:
+        return ast.CycleArm(pattern=kids[0], mode=const, expr=kids[1], span=span)
+    if cls is ast.Dispatch:
+        return ast.Dispatch(value=kids[0], arms=kids[1:], span=span)
+    if cls is ast.Cycle:
+        return ast.Cycle(seed=kids[0], arms=kids[1:], span=span)
+    if cls is ast.PList:
+        if const:
+            return ast.PList(items=kids[:-1], tail=kids[-1], span=span)
+        return ast.PList(items=kids, tail=None, span=span)
+    if cls is ast.BoolLit:
+        return ast.BoolLit(value=const, span=span)
+    if cls is ast.IntLit:
+        return ast.IntLit(value=const, span=span)
+    if cls is ast.DecLit:
+        return ast.DecLit(value=const, span=span)
+    if cls is ast.TextLit:
+        return ast.TextLit(value=const, span=span)
+    if cls is ast.PBool:
+        return ast.PBool(value=const, span=span)
+    if cls is ast.PInt:
+        return ast.PInt(value=const, span=span)
+    if cls is ast.PDec:
+        return ast.PDec(value=const, span=span)
+    if cls is ast.PText:
+        return ast.PText(value=const, span=span)
+    raise TypeError(f"Unknown node kind: {cls.__name__}")
+
+
+class AstArena:
+    """A program as parallel arrays (see the section comment above).
+
+    Node `i` has kind `KINDS[kind[i]]`, source offsets `start[i]..end[i]`,
+    constant `consts[const[i]]` (-1: none) and children
+    `kids[kid_start[i] : kid_start[i + 1]]`. The root is the last node.
+    """
+
+    __slots__ = ("source", "kind", "start", "end", "const", "kid_start", "kids", "consts", "_pool")
+
+    def __init__(self, source: str) -> None:
+        self.source = source
+        self.kind: array[int] = array("B")
+        self.start: array[int] = array("i")
+        self.end: array[int] = array("i")
+        self.const: array[int] = array("i")
+        self.kid_start: array[int] = array("i", [0])
+        self.kids: array[int] = array("i")
+        self.consts: list[object] = []
+        self._pool: dict[tuple[object, ...], int] = {}
+
+    @classmethod
+    def from_program(cls, program: ast.Program, source: str) -> AstArena:
+        arena = cls(source)
+        arena.add(program)
+        return arena
+
+    def add(self, tree: ast.Node) -> int:
+        """Append the nodes of `tree` in post-order; returns the id of its root."""
+
+        done: list[int] = []  # ids of finished nodes whose parent is not finished yet
+        stack: list[tuple[ast.Node, bool]] = [(tree, False)]
+        while stack:
+            node, expanded = stack.pop()
+            const, children = _unpack(node)
+            if not expanded:
+                stack.append((node, True))
+                stack.extend((c, False) for c in reversed(children))
+                continue
+            kids = done[-len(children) :] if children else []
+            if children:
+                del done[-len(children) :]
+            done.append(self._append(type(node), const, kids, node.span))
+        return done[-1]
+
+    def _append(self, cls: type[ast.Node], const: object, kids: Sequence[int], span: Span) -> int:
+        self.kids.extend(kids)
+        if const is None:
+            self.const.append(-1)
+        else:
+            # Keyed on type too, so 1, 1.0 and ⊤ stay apart, and on a float's
+            # sign, so 0.0 and -0.0 do.
+            key: tuple[object, ...] = (type(const), const)
+            if isinstance(const, float):
+                key = (float, const, math.copysign(1.0, const))
+            idx = self._pool.get(key)
+            if idx is None:
+                idx = self._pool[key] = len(self.consts)
+                self.consts.append(const)
+            self.const.append(idx)
+        self.kind.append(_KIND_INDEX[cls])
+        self.start.append(span.start.offset)
+        self.end.append(span.end.offset)
+        self.kid_start.append(len(self.kids))
+        return len(self.kind) - 1
+
+    def __len__(self) -> int:
+        return len(self.kind)
+
+    @property
+    def root(self) -> int:
+        return len(self.kind) - 1
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (self.kind, self.start, self.end, self.const, self.kid_start, self.kids)
+        return sum(a.itemsize * len(a) for a in arrays)
+
+    def kind_of(self, i: int) -> type[ast.Node]:
+        return KINDS[self.kind[i]]
+
+    def children(self, i: int) -> array[int]:
+        return self.kids[self.kid_start[i] : self.kid_start[i + 1]]
+
+    def constant(self, i: int) -> object:
+        c = self.const[i]
+        return None if c < 0 else self.consts[c]
+
+    def kind_counts(self) -> dict[str, int]:
+        """Number of nodes of each kind, by class name."""
+
+        return {KINDS[k].__name__: n for k, n in sorted(Counter(self.kind).items())}
+
+    # -------- Positions --------
+
+    def position(self, offset: int) -> Position:
+        return line_index(self.source).position(offset)
+
+    def span(self, i: int) -> Span:
+        return Span(self.position(self.start[i]), self.position(self.end[i]))
+
+    # -------- Back to `ast` --------
+
+    def node(self, i: int | None = None) -> ast.Node:
+        """The `ast` node for id `i` (default: the root), built without recursion."""
+
+        if i is None:
+            i = self.root
+        first = i
+        while self.kid_start[first] != self.kid_start[first + 1]:
+            first = self.kids[self.kid_start[first]]  # the subtree starts at its leftmost leaf
+        built: list[ast.Node] = []
+        for j in range(first, i + 1):
+            kids = [built[k - first] for k in self.kids[self.kid_start[j] : self.kid_start[j + 1]]]
+            built.append(_build(KINDS[self.kind[j]], self.constant(j), kids, self.span(j)))
+        return built[-1]
+
+    def forms(self) -> Iterator[ast.Expr]:
+        """The program's top-level forms, each built as its `ast` tree only when reached."""
+
+        for k in self.children(self.root):
+            form = self.node(k)
+            assert isinstance(form, ast.Expr)
+            yield form
+
+    def to_program(self) -> ast.Program:
+        program = self.node()
+        assert isinstance(program, ast.Program)
+        return program
+
+
+def parse_arena(source: str, *, filename: str | None = None) -> AstArena:
+    """Lex, parse and flatten `source`.
+
+    Each top-level form is flattened as soon as it is parsed and its `ast`
+    tree dropped, so at most one form exists as dataclasses at a time.
+    """
+
+    arena = AstArena(source)
+    roots: list[int] = []
+    parser = Parser(Lexer(source, filename=filename).iter_tokens(), source, filename=filename)
+    span = parser.parse_forms(lambda form: roots.append(arena.add(form)))
+    arena._append(ast.Program, None, roots, span)
+    return arena
@@ -8,17 +8,17 @@ from .tokens import Span
 # ---------- Base Nodes ----------
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Node:
     span: Span
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Expr(Node):
     pass
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Pattern(Node):
     pass
 
@@ -26,7 +26,7 @@ class Pattern(Node):
 # ---------- Program ----------
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Program(Node):
     items: list[Expr]
 
@@ -34,119 +34,119 @@ class Program(Node):
 # ---------- Expressions ----------
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Name(Expr):
     value: str
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class UnitLit(Expr):
     pass
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class BoolLit(Expr):
     value: bool
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class IntLit(Expr):
     value: int
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class DecLit(Expr):
     value: float
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class TextLit(Expr):
     value: str
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class TupleExpr(Expr):
     items: list[Expr]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ListExpr(Expr):
     items: list[Expr]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class MapExpr(Expr):
     entries: list[tuple[Expr, Expr]]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class VariantExpr(Expr):
     tag: str
     payload: Expr
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Binding(Expr):
     name: str
     value: Expr
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Mutation(Expr):
     name: str
     value: Expr
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Block(Expr):
     items: list[Expr]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Lambda(Expr):
     params: list[Pattern]
     body: Expr
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Call(Expr):
     func: Expr
     arg: Expr
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Unary(Expr):
     op: str
     expr: Expr
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Binary(Expr):
     op: str
     left: Expr
     right: Expr
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class DispatchArm(Node):
     pattern: Pattern
     expr: Expr
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Dispatch(Expr):
     value: Expr
     arms: list[DispatchArm]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class CycleArm(Node):
     pattern: Pattern
     mode: str  # "continue" | "finish"
     expr: Expr
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Cycle(Expr):
     seed: Expr
     arms: list[CycleArm]
@@ -155,53 +155,53 @@ class Cycle(Expr):
 # ---------- Patterns ----------
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class PWildcard(Pattern):
     pass
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class PName(Pattern):
     name: str
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class PUnit(Pattern):
     pass
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class PBool(Pattern):
     value: bool
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class PInt(Pattern):
     value: int
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class PDec(Pattern):
     value: float
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class PText(Pattern):
     value: str
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class PTuple(Pattern):
     items: list[Pattern]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class PList(Pattern):
     items: list[Pattern]
     tail: Pattern | None  # must be PName or PWildcard in MVP
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class PVariant(Pattern):
     tag: str
     payload: Pattern
@@ -1,12 +1,178 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import math
+from dataclasses import dataclass, field
 from typing import Any
 
+from .patterns import Matcher
+from .runtime import LIST_TYPES, Layout, Variant
 from .tokens import Span
 
 
+# Bumped whenever instruction arguments change shape (cached `.suayc` files
+# from another version are ignored). Changes to the compiler, optimizer or
+# patterns that keep the shapes need no bump: the cache version also covers
+# their sources (see `bytecode_cache.compiler_version`).
+BYTECODE_VERSION = 3
+
+# Opcode numbering. The VM dispatches on these integers through a handler table;
+# `Instr.op` keeps the readable name for disassembly, tracing and tooling.
+OPCODES: tuple[str, ...] = (
+    "CONST",
+    "LOAD",
+    "DEF",
+    "SET",
+    "POP",
+    "DUP",
+    "PUSH_ENV",
+    "POP_ENV",
+    "PUSH_ENV_BIND",
+    "MAKE_TUPLE",
+    "MAKE_LIST",
+    "MAKE_MAP",
+    "MAKE_VARIANT",
+    "MAKE_CLOSURE",
+    "CALL",
+    "UNARY",
+    "BINARY",
+    "TO_BOOL",
+    "JMP",
+    "JMP_IF_FALSE",
+    "JMP_IF_TRUE",
+    "MATCH",
+    "JMP_IF_NONE",
+    "RAISE",
+    "HALT",
+    # Resolved variable access (see Compiler._emit_load).
+    "LOAD_LOCAL",
+    "LOAD_DEREF",
+    "LOAD_NAME",
+    "LOAD_GLOBAL",
+    "DEF_LOCAL",
+    "SET_LOCAL",
+    "SET_DEREF",
+    "TAIL_CALL",
+    # Precompiled pattern test + bind (see Compiler._emit_arm_match).
+    "MATCH_ARM",
+    # Multi-way branch on the scrutinee's shape (see SwitchTable).
+    "SWITCH",
+    # Specialized binary operators (see BINARY_OPCODES).
+    "ADD",
+    "SUB",
+    "MUL",
+    "DIV",
+    "MOD",
+    "EQ",
+    "NE",
+    "LT",
+    "LE",
+    "GT",
+    "GE",
+    # Saturated call chains `f · a · b` (see Compiler._compile_call).
+    "CALL_N",
+    "TAIL_CALL_N",
+)
+
+OPCODE: dict[str, int] = {name: i for i, name in enumerate(OPCODES)}
+
+# Binary operators with their own opcode. The instruction keeps the operator
+# text as its argument (for errors and disassembly); anything else is `BINARY`.
+BINARY_OPCODES: dict[str, str] = {
+    "+": "ADD",
+    "−": "SUB",
+    "-": "SUB",
+    "×": "MUL",
+    "*": "MUL",
+    "÷": "DIV",
+    "/": "DIV",
+    "%": "MOD",
+    "=": "EQ",
+    "≠": "NE",
+    "<": "LT",
+    "≤": "LE",
+    ">": "GT",
+    "≥": "GE",
+}
+
+# Reserved opcode for instruction names the VM does not know (raises at runtime).
+OP_UNKNOWN = len(OPCODES)
+
+# Opcodes whose operand is a small int stored inline (jump targets, counts).
+# All other operands are indices into the per-Code constant pool.
+INLINE_OPERAND_OPS: frozenset[str] = frozenset(
+    {
+        "JMP",
+        "JMP_IF_FALSE",
+        "JMP_IF_TRUE",
+        "JMP_IF_NONE",
+        "MAKE_TUPLE",
+        "MAKE_LIST",
+        "MAKE_MAP",
+        "CALL_N",
+        "TAIL_CALL_N",
+    }
+)
+
+NO_OPERAND = -1
+
+
 @dataclass(frozen=True)
+class SwitchTable:
+    """Jump targets for `SWITCH`, keyed by the shape of the value on the stack.
+
+    Variants are looked up by tag, tuples by arity, lists all go to `list_target`,
+    and any other hashable value is looked up by itself (so `1` and `⊤` share an
+    entry, as they do for `PInt`). Everything else goes to `default`. With a
+    `path`, the lookup is made on a nested tuple item instead: each
+    `(arity, index)` step descends into a tuple of that arity, and a value of any
+    other shape goes to `default`. A table only narrows the arms to try; every arm
+    still runs its own pattern test.
+
+    Targets are label names while compiling and pcs once finalized.
+    """
+
+    default: Any
+    tags: dict[str, Any] = field(default_factory=dict)
+    arities: dict[int, Any] = field(default_factory=dict)
+    literals: dict[object, Any] = field(default_factory=dict)
+    list_target: Any = None
+    path: tuple[tuple[int, int], ...] = ()
+
+    def lookup(self, value: object) -> Any:
+        for arity, i in self.path:
+            if not isinstance(value, tuple) or len(value) != arity:
+                return self.default
+            value = value[i]
+        if isinstance(value, Variant):
+            return self.tags.get(value.tag, self.default)
+        if isinstance(value, tuple):
+            return self.arities.get(len(value), self.default)
+        if isinstance(value, LIST_TYPES):
+            return self.default if self.list_target is None else self.list_target
+        try:
+            return self.literals.get(value, self.default)
+        except TypeError:  # unhashable (maps, closures)
+            return self.default
+
+    def targets(self) -> list[Any]:
+        out = [self.default, *self.tags.values(), *self.arities.values()]
+        out.extend(self.literals.values())
+        if self.list_target is not None:
+            out.append(self.list_target)
+        return out
+
+    def retarget(self, f: Any) -> "SwitchTable":
+        return SwitchTable(
+            default=f(self.default),
+            tags={k: f(t) for k, t in self.tags.items()},
+            arities={k: f(t) for k, t in self.arities.items()},
+            literals={k: f(t) for k, t in self.literals.items()},
+            list_target=None if self.list_target is None else f(self.list_target),
+            path=self.path,
+        )
+
+
+@dataclass(frozen=True, slots=True)
 class Instr:
     op: str
     arg: Any = None
@@ -17,18 +183,76 @@ class Instr:
 class Code:
     """A minimal bytecode container.
 
-    MVP choices:
-    - Instructions carry their arg inline (no constant pool yet).
-    - Instructions may carry an optional source span for user-friendly runtime errors.
+    `instrs` is the authoritative, readable instruction list. On construction it is
+    also encoded into a compact form that the VM executes:
+
+    - `ops`: integer opcodes (see `OPCODES`)
+    - `operands`: inline ints for jumps/counts, otherwise indices into `consts`
+    - `consts`: the per-Code constant pool (deduplicated)
+    - `spans`: debug side table, pc -> source span (or None)
 
-    Extensible later via:
-    - constant pool + index operands
-    - separate debug table (pc -> span)
-    - locals table
+    `param_layouts` is set on lambda bodies: one slot layout per curried parameter
+    env, in call order. With `flat_params`, all parameters share a single env
+    instead and `param_layouts` holds just its layout.
+
+    Code objects are treated as immutable once built; passes that rewrite
+    instructions produce a new Code.
     """
 
     name: str
     instrs: list[Instr]
+    param_layouts: tuple[Layout, ...] = ()
+    flat_params: bool = False
+    ops: list[int] = field(init=False, repr=False, compare=False)
+    operands: list[int] = field(init=False, repr=False, compare=False)
+    consts: list[Any] = field(init=False, repr=False, compare=False)
+    spans: list[Span | None] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self._encode()
+
+    def _encode(self) -> None:
+        ops: list[int] = []
+        operands: list[int] = []
+        consts: list[Any] = []
+        spans: list[Span | None] = []
+        index: dict[object, int] = {}
+
+        def intern(value: Any) -> int:
+            # Key on the value's type too, so 1, 1.0 and True stay distinct,
+            # and on a float's sign, so 0.0 and -0.0 do.
+            try:
+                key: object = (type(value), value)
+                if isinstance(value, float):
+                    key = (float, value, math.copysign(1.0, value))
+                hash(key)
+            except TypeError:
+                key = ("id", id(value))
+            slot = index.get(key)
+            if slot is None:
+                slot = len(consts)
+                consts.append(value)
+                index[key] = slot
+            return slot
+
+        for ins in self.instrs:
+            opcode = OPCODE.get(ins.op, OP_UNKNOWN)
+            if opcode == OP_UNKNOWN:
+                operand = intern(ins.op)
+            elif ins.op in INLINE_OPERAND_OPS:
+                operand = int(ins.arg)
+            elif ins.arg is None:
+                operand = NO_OPERAND
+            else:
+                operand = intern(ins.arg)
+            ops.append(opcode)
+            operands.append(operand)
+            spans.append(ins.span)
+
+        self.ops = ops
+        self.operands = operands
+        self.consts = consts
+        self.spans = spans
 
     def disassemble(self) -> str:
         lines: list[str] = []
@@ -44,9 +268,22 @@ def _fmt_arg(arg: Any) -> str:
         return f"<{arg.name}>"
     if isinstance(arg, tuple) and len(arg) == 2 and isinstance(arg[0], Code):
         code_obj, params = arg
+        nparams: int | str
         try:
-            nparams = len(params)  # type: ignore[arg-type]
+            nparams = len(params)
         except Exception:
             nparams = "?"
         return f"(<{code_obj.name}>, params={nparams})"
+    if isinstance(arg, SwitchTable):
+        cases = [f"{k}•→{t}" for k, t in arg.tags.items()]
+        cases += [f"({k})→{t}" for k, t in arg.arities.items()]
+        cases += [f"{k!r}→{t}" for k, t in arg.literals.items()]
+        if arg.list_target is not None:
+            cases.append(f"[]→{arg.list_target}")
+        at = "".join(f".{i}" for _n, i in arg.path)
+        return f"{at}{{{', '.join(cases)}}} else→{arg.default}"
+    if isinstance(arg, tuple) and len(arg) == 2 and isinstance(arg[0], Matcher):
+        matcher, layout = arg
+        names = ", ".join(layout.names) if layout is not None else ""
+        return f"({type(matcher.pattern).__name__}, env=[{names}])"
     return repr(arg)
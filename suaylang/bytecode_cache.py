@@ -0,0 +1,341 @@
+"""On-disk cache of compiled bytecode (`.suayc` files).
+
+A cache file holds a small header and a `marshal`-encoded form of the `Code`
+tree (nested closure code, patterns and spans included; compiled matchers
+are stored as their pattern). It is reused only when
+the source hash, the compiler version and the optimizer passes all match and
+the encoded tree matches the digest in the header; anything else is treated
+as a miss and the file is rewritten.
+
+The cache lives in `__suaycache__/` next to the source file, or in
+`$SUAY_CACHE_DIR` if set. `SUAY_NO_CACHE=1` disables it.
+
+In front of it, `load_module` keeps each linked module's source and code in
+memory for the life of the process, so every VM that links a module shares one
+compiled copy until the file changes.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import functools
+import hashlib
+import marshal
+import os
+import time
+from typing import Any
+
+from . import __version__, arena, ast, bytecode, compiler, lexer, optimizer, parser, patterns
+from .bytecode import BYTECODE_VERSION, OPCODES, Code, Instr, SwitchTable
+from .compiler import Compiler
+from .lexer import Lexer
+from .parser import Parser
+from .patterns import Matcher, compile_pattern
+from .runtime import UNIT, Layout, SuayRuntimeError
+from .tokens import Position, Span
+
+
+MAGIC = b"SUAYC\x00"
+CACHE_DIRNAME = "__suaycache__"
+SUFFIX = ".suayc"
+
+
+@functools.cache
+def compiler_version() -> str:
+    """Version stamp of the code this process compiles.
+
+    Any change to opcodes, to the front end, compiler or optimizer, or to the
+    encoding below invalidates existing cache files, so a changed compiler
+    never serves code it would no longer emit. The sources are hashed on the
+    first cache access rather than at import.
+    """
+
+    h = hashlib.sha256(" ".join(OPCODES).encode("utf-8"))
+    for mod in (lexer, parser, arena, compiler, optimizer, patterns, bytecode):
+        h.update(_read_source(mod.__file__))
+    h.update(_read_source(__file__))
+    return f"{__version__}/bc{BYTECODE_VERSION}/{h.hexdigest()[:12]}"
+
+
+def _read_source(path: str | None) -> bytes:
+    try:
+        with open(path or "", "rb") as f:
+            return f.read()
+    except OSError:
+        # Without the source (e.g. a frozen install) the version still covers
+        # the opcodes and BYTECODE_VERSION.
+        return b""
+
+
+_PATTERN_TYPES: dict[str, type] = {
+    cls.__name__: cls
+    for cls in vars(ast).values()
+    if isinstance(cls, type) and issubclass(cls, ast.Pattern) and cls is not ast.Pattern
+}
+
+
+def source_hash(source: str) -> str:
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
+def cache_enabled() -> bool:
+    return os.environ.get("SUAY_NO_CACHE", "") in ("", "0")
+
+
+def cache_path(filename: str, *, cache_dir: str | None = None) -> str:
+    abs_path = os.path.abspath(filename)
+    base = os.path.basename(abs_path)
+    if cache_dir is None:
+        cache_dir = os.environ.get("SUAY_CACHE_DIR") or None
+    if cache_dir is None:
+        stem = os.path.splitext(base)[0]
+        return os.path.join(os.path.dirname(abs_path), CACHE_DIRNAME, stem + SUFFIX)
+    # A shared cache directory needs the full path in the key to avoid collisions.
+    tag = hashlib.sha256(abs_path.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{os.path.splitext(base)[0]}.{tag}{SUFFIX}")
+
+
+# -------- Serialization --------
+
+
+def _enc_span(span: Span | None) -> tuple[int, ...] | None:
+    if span is None:
+        return None
+    s, e = span.start, span.end
+    return (s.offset, s.line, s.column, e.offset, e.line, e.column)
+
+
+def _dec_span(raw: Any) -> Span | None:
+    if raw is None:
+        return None
+    so, sl, sc, eo, el, ec = raw
+    return Span(Position(so, sl, sc), Position(eo, el, ec))
+
+
+def _enc(v: Any) -> Any:
+    # bool/int/float/str/None are native to marshal; everything else is a tagged tuple.
+    if v is None or isinstance(v, (bool, int, float, str)):
+        return v
+    if v is UNIT:
+        return ("u",)
+    if isinstance(v, tuple):
+        return ("t", tuple(_enc(x) for x in v))
+    if isinstance(v, list):
+        return ("l", tuple(_enc(x) for x in v))
+    if isinstance(v, Layout):
+        return ("L", v.names)
+    if isinstance(v, Code):
+        return ("C", _enc_code(v))
+    if isinstance(v, Matcher):
+        # Only the pattern is stored; test/bind closures are rebuilt on load.
+        return ("M", _enc(v.pattern), v.first)
+    if isinstance(v, SwitchTable):
+        return (
+            "S",
+            v.default,
+            tuple(v.tags.items()),
+            tuple(v.arities.items()),
+            tuple((_enc(k), t) for k, t in v.literals.items()),
+            v.list_target,
+            v.path,
+        )
+    if isinstance(v, ast.Pattern):
+        fields = tuple(
+            _enc(getattr(v, f.name)) for f in dataclasses.fields(v) if f.name != "span"
+        )
+        return ("P", type(v).__name__, _enc_span(v.span), fields)
+    raise TypeError(f"Cannot serialize {type(v).__name__} in bytecode")
+
+
+def _dec(raw: Any) -> Any:
+    if not isinstance(raw, tuple):
+        return raw
+    tag = raw[0]
+    if tag == "u":
+        return UNIT
+    if tag == "t":
+        return tuple(_dec(x) for x in raw[1])
+    if tag == "l":
+        return [_dec(x) for x in raw[1]]
+    if tag == "L":
+        return Layout(tuple(raw[1]))
+    if tag == "C":
+        return _dec_code(raw[1])
+    if tag == "M":
+        return compile_pattern(_dec(raw[1]), first=raw[2])
+    if tag == "S":
+        _tag, default, tags, arities, literals, list_target, path = raw
+        return SwitchTable(
+            default=default,
+            tags=dict(tags),
+            arities=dict(arities),
+            literals={_dec(k): t for k, t in literals},
+            list_target=list_target,
+            path=tuple(tuple(step) for step in path),
+        )
+    if tag == "P":
+        _tag, name, span, fields = raw
+        cls = _PATTERN_TYPES[name]
+        return cls(_dec_span(span), *(_dec(x) for x in fields))
+    raise ValueError(f"Corrupt bytecode cache entry (tag {tag!r})")
+
+
+def _enc_code(code: Code) -> tuple[Any, ...]:
+    instrs = tuple((ins.op, _enc(ins.arg), _enc_span(ins.span)) for ins in code.instrs)
+    layouts = tuple(layout.names for layout in code.param_layouts)
+    return (code.name, instrs, layouts, code.flat_params)
+
+
+def _dec_code(raw: tuple[Any, ...]) -> Code:
+    name, instrs, layouts, flat_params = raw
+    return Code(
+        name=name,
+        instrs=[Instr(op, _dec(arg), _dec_span(span)) for op, arg, span in instrs],
+        param_layouts=tuple(Layout(tuple(names)) for names in layouts),
+        flat_params=flat_params,
+    )
+
+
+def dumps(code: Code, *, source_digest: str = "", passes: tuple[str, ...] = ()) -> bytes:
+    body = marshal.dumps(_enc_code(code))
+    header = (compiler_version(), source_digest, passes, hashlib.sha256(body).hexdigest())
+    return MAGIC + marshal.dumps((header, body))
+
+
+def loads(
+    data: bytes, *, source_digest: str | None = None, passes: tuple[str, ...] | None = None
+) -> Code | None:
+    """Decode a cache file; return None if it is stale, foreign or corrupt."""
+
+    if not data.startswith(MAGIC):
+        return None
+    try:
+        header, body = marshal.loads(data[len(MAGIC) :])
+        version, digest, cached_passes, body_digest = header
+        if version != compiler_version():
+            return None
+        if source_digest is not None and digest != source_digest:
+            return None
+        if passes is not None and tuple(cached_passes) != tuple(passes):
+            return None
+        if hashlib.sha256(body).hexdigest() != body_digest:
+            return None
+        return _dec_code(marshal.loads(body))
+    except Exception:
+        # The cache is advisory: any file that does not decode is a miss,
+        # including flipped bytes that make marshal raise IndexError or
+        # MemoryError.
+        return None
+
+
+# -------- Load / store --------
+
+
+def load_or_compile(
+    source: str,
+    filename: str,
+    *,
+    comp: Compiler | None = None,
+    cache_dir: str | None = None,
+    use_cache: bool | None = None,
+) -> Code:
+    """Compile `source` as a program, reusing a matching `.suayc` if present.
+
+    Lex/parse/compile errors propagate exactly as from an uncached compile.
+    Cache I/O failures are ignored.
+    """
+
+    if comp is None:
+        comp = Compiler()
+    if use_cache is None:
+        use_cache = cache_enabled()
+
+    digest = source_hash(source)
+    path = cache_path(filename, cache_dir=cache_dir) if use_cache else None
+    if path is not None:
+        try:
+            with open(path, "rb") as f:
+                cached = loads(f.read(), source_digest=digest, passes=comp.passes)
+        except OSError:
+            cached = None
+        if cached is not None:
+            return cached
+
+    tokens = Lexer(source, filename=filename).tokenize()
+    program = Parser(tokens, source, filename=filename).parse_program()
+    try:
+        code = comp.compile_program(program, name=filename)
+    except SuayRuntimeError as e:
+        raise e.with_location(source=source, filename=filename)
+
+    if path is not None:
+        _write_atomic(path, code, digest, comp.passes)
+    return code
+
+
+def _write_atomic(path: str, code: Code, digest: str, passes: tuple[str, ...]) -> None:
+    try:
+        data = dumps(code, source_digest=digest, passes=passes)
+    except TypeError:
+        return
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+
+
+# ----------------------------
+# In-process module cache
+# ----------------------------
+#
+# A module is re-read only when its (mtime, size) changes, and recompiled only
+# when its content hash does. A file modified within `_RACY_NS` of being read
+# could change again without its mtime moving (coarse timestamps), so until
+# that window has passed its stamp is not trusted and the content is rehashed.
+
+_RACY_NS = 2_000_000_000
+
+
+@dataclasses.dataclass(slots=True)
+class _LoadedModule:
+    stamp: tuple[int, int]  # (st_mtime_ns, st_size)
+    read_ns: int
+    digest: str
+    source: str
+    code: Code
+
+
+_MODULES: dict[str, _LoadedModule] = {}
+
+
+def load_module(abs_path: str) -> tuple[str, Code]:
+    """(source, code) of the module file at `abs_path`, compiled once per version.
+
+    Raises OSError if the file cannot be read; compile errors propagate as from
+    `load_or_compile` and are not cached.
+    """
+
+    try:
+        st = os.stat(abs_path)
+        stamp: tuple[int, int] | None = (st.st_mtime_ns, st.st_size)
+    except OSError:
+        stamp = None
+    hit = _MODULES.get(abs_path)
+    if hit is not None and hit.stamp == stamp and stamp[0] < hit.read_ns - _RACY_NS:
+        return hit.source, hit.code
+
+    read_ns = time.time_ns()
+    with open(abs_path, "r", encoding="utf-8") as f:
+        source = f.read()
+    digest = source_hash(source)
+    code = hit.code if hit is not None and hit.digest == digest else load_or_compile(source, abs_path)
+    if stamp is not None:
+        _MODULES[abs_path] = _LoadedModule(stamp, read_ns, digest, source, code)
+    return source, code
@@ -5,15 +5,19 @@ import os
 import platform
 import subprocess
 import sys
+from collections.abc import Iterator
 from pathlib import Path
 from dataclasses import is_dataclass
 
+from .arena import AstArena, parse_arena
 from .errors import SuayError
 from .contract import lookup_ref, format_error
 from .lexer import Lexer
 from .parser import Parser
+from .closure_compiler import ClosureInterpreter
 from .interpreter import Interpreter
-from .runtime import Env, UNIT
+from .runtime import LIST_TYPES, MAP_TYPES, TEXT_TYPES, Env, UNIT
+from .tokens import Span
 from .formatter import FormatOptions, format_file
 from . import __version__
 
@@ -63,80 +67,81 @@ def _print_err(msg: str) -> None:
     print(msg, file=sys.stderr)
 
 
-def _format_ast(node: object, *, indent: str = "", is_last: bool = True) -> str:
-    branch = "└─ " if is_last else "├─ "
-    next_indent = indent + ("   " if is_last else "│  ")
+def _format_ast(node: object) -> str:
+    if isinstance(node, AstArena):
+        return "\n".join(_arena_ast_lines(node))
+    return "\n".join(_ast_lines(node, indent="", is_last=True))
 
-    # Special-case pair tuples used for map entries.
-    if isinstance(node, tuple) and len(node) == 2:
-        parts: list[str] = [f"{indent}{branch}Entry"]
-        parts.append(_format_ast(node[0], indent=next_indent, is_last=False))
-        parts.append(_format_ast(node[1], indent=next_indent, is_last=True))
-        return "\n".join(parts)
 
-    if not is_dataclass(node):
-        return f"{indent}{branch}{node!r}"
+def _arena_ast_lines(arena: AstArena) -> Iterator[str]:
+    # Laid out as `_ast_lines` lays out a Program, but each top-level form is
+    # rebuilt from the arena only while it is printed.
+    n = len(arena.children(arena.root))
+    yield "└─ Program"
+    yield f"   ├─ items [{n}]"
+    for j, form in enumerate(arena.forms()):
+        yield from _ast_lines(form, indent="   │  ", is_last=j == n - 1)
+    yield f"   └─ {_span_text(arena.span(arena.root))}"
 
-    cls = type(node).__name__
-    parts: list[str] = [f"{indent}{branch}{cls}"]
 
-    # dataclass fields
-    items = list(getattr(node, "__dataclass_fields__").keys())
-    # Hide huge source spans by default; keep the info but don’t spam.
-    if "span" in items:
-        items.remove("span")
-        items.append("span")
+def _span_text(s: Span) -> str:
+    return f"span {s.start.line}:{s.start.column}..{s.end.line}:{s.end.column}"
 
-    for idx, name in enumerate(items):
-        val = getattr(node, name)
-        last_field = idx == len(items) - 1
 
-        if name == "span":
-            s = val
-            parts.append(
-                f"{next_indent}{'└─ ' if last_field else '├─ '}span {s.start.line}:{s.start.column}..{s.end.line}:{s.end.column}"
-            )
+def _ast_lines(root: object, *, indent: str, is_last: bool) -> Iterator[str]:
+    # Walked with an explicit stack: the parser accepts nesting of any depth.
+    # Entries are lines ready to print, or (value, indent, is_last) to expand.
+    stack: list[str | tuple[object, str, bool]] = [(root, indent, is_last)]
+    while stack:
+        top = stack.pop()
+        if isinstance(top, str):
+            yield top
             continue
-
-        if isinstance(val, list):
-            parts.append(
-                f"{next_indent}{'└─ ' if last_field else '├─ '}{name} [{len(val)}]"
-            )
-            for j, child in enumerate(val):
-                parts.append(
-                    _format_ast(
-                        child,
-                        indent=next_indent + ("   " if last_field else "│  "),
-                        is_last=(j == len(val) - 1),
+        node, indent, is_last = top
+        branch = "└─ " if is_last else "├─ "
+        next_indent = indent + ("   " if is_last else "│  ")
+        out: list[str | tuple[object, str, bool]]
+
+        if isinstance(node, tuple) and len(node) == 2:
+            # Special-case pair tuples used for map entries.
+            out = [
+                f"{indent}{branch}Entry",
+                (node[0], next_indent, False),
+                (node[1], next_indent, True),
+            ]
+        elif not is_dataclass(node):
+            out = [f"{indent}{branch}{node!r}"]
+        else:
+            out = [f"{indent}{branch}{type(node).__name__}"]
+
+            # dataclass fields
+            names = list(getattr(node, "__dataclass_fields__").keys())
+            # Hide huge source spans by default; keep the info but don’t spam.
+            if "span" in names:
+                names.remove("span")
+                names.append("span")
+
+            for idx, name in enumerate(names):
+                val = getattr(node, name)
+                last_field = idx == len(names) - 1
+                field = f"{next_indent}{'└─ ' if last_field else '├─ '}"
+                child_indent = next_indent + ("   " if last_field else "│  ")
+
+                if name == "span":
+                    out.append(f"{field}{_span_text(val)}")
+                elif isinstance(val, list):
+                    out.append(f"{field}{name} [{len(val)}]")
+                    out.extend(
+                        (child, child_indent, j == len(val) - 1)
+                        for j, child in enumerate(val)
                     )
-                )
-            continue
+                elif (isinstance(val, tuple) and len(val) == 2) or is_dataclass(val):
+                    out.append(f"{field}{name}")
+                    out.append((val, child_indent, True))
+                else:
+                    out.append(f"{field}{name} = {val!r}")
 
-        if isinstance(val, tuple) and len(val) == 2:
-            parts.append(f"{next_indent}{'└─ ' if last_field else '├─ '}{name}")
-            parts.append(
-                _format_ast(
-                    val,
-                    indent=next_indent + ("   " if last_field else "│  "),
-                    is_last=True,
-                )
-            )
-            continue
-
-        if is_dataclass(val):
-            parts.append(f"{next_indent}{'└─ ' if last_field else '├─ '}{name}")
-            parts.append(
-                _format_ast(
-                    val,
-                    indent=next_indent + ("   " if last_field else "│  "),
-                    is_last=True,
-                )
-            )
-            continue
-
-        parts.append(f"{next_indent}{'└─ ' if last_field else '├─ '}{name} = {val!r}")
-
-    return "\n".join(parts)
+        stack.extend(reversed(out))
 
 
 def cmd_check(path: str) -> int:
@@ -149,13 +154,19 @@ def cmd_check(path: str) -> int:
 
 def cmd_ast(path: str) -> int:
     src = _read_text(path)
-    tokens = Lexer(src, filename=path).tokenize()
-    program = Parser(tokens, src, filename=path).parse_program()
-    print(_format_ast(program))
+    print(_format_ast(parse_arena(src, filename=path)))
     return 0
 
 
-def cmd_run(path: str, *, trace: bool = False) -> int:
+# Engines `suay run --engine` can select. Both report the same results and errors;
+# the closure compiler is faster, the interpreter is the reference.
+_RUN_ENGINES: dict[str, type[Interpreter]] = {
+    "closures": ClosureInterpreter,
+    "interpreter": Interpreter,
+}
+
+
+def cmd_run(path: str, *, trace: bool = False, engine: str = "closures") -> int:
     p = Path(path)
     if p.is_dir():
         candidates = [p / "src" / "main.suay", p / "main.suay"]
@@ -171,15 +182,15 @@ def cmd_run(path: str, *, trace: bool = False) -> int:
     src = _read_text(path)
     tokens = Lexer(src, filename=path).tokenize()
     program = Parser(tokens, src, filename=path).parse_program()
-    Interpreter(source=src, filename=path, trace=trace).eval_program(program)
+    _RUN_ENGINES[engine](source=src, filename=path, trace=trace).eval_program(program)
     return 0
 
 
-def cmd_run_expr(source: str, *, trace: bool = False) -> int:
+def cmd_run_expr(source: str, *, trace: bool = False, engine: str = "closures") -> int:
     # Treat this as a normal program input; caller controls quoting.
     tokens = Lexer(source, filename="<expr>").tokenize()
     program = Parser(tokens, source, filename="<expr>").parse_program()
-    Interpreter(source=source, filename="<expr>", trace=trace).eval_program(program)
+    _RUN_ENGINES[engine](source=source, filename="<expr>", trace=trace).eval_program(program)
     return 0
 
 
@@ -305,13 +316,13 @@ def _repl_to_text(v: object, *, syntax: str) -> str:
         return "⊤" if v else "⊥"
     if isinstance(v, (int, float)):
         return str(v)
-    if isinstance(v, str):
-        return v
+    if isinstance(v, TEXT_TYPES):
+        return str(v)
     if isinstance(v, tuple):
         return "(" + " ".join(_repl_to_text(x, syntax=syntax) for x in v) + ")"
-    if isinstance(v, list):
+    if isinstance(v, LIST_TYPES):
         return "[" + " ".join(_repl_to_text(x, syntax=syntax) for x in v) + "]"
-    if isinstance(v, dict):
+    if isinstance(v, MAP_TYPES):
         arrow = "->" if syntax == "ascii" else "↦"
         left = "[[" if syntax == "ascii" else "⟦"
         right = "]]" if syntax == "ascii" else "⟧"
@@ -344,7 +355,7 @@ def cmd_repl(*, trace: bool = False, syntax: str = "ascii") -> int:
             program = Parser(tokens, src, filename="<repl>").parse_program()
             result: object = UNIT
             for item in program.items:
-                result = interp.eval_expr(item, env)
+                result = interp.eval_form(item, env)
             if result is not UNIT:
                 print(_repl_to_text(result, syntax=syntax))
         except SuayError as e:
@@ -428,6 +439,12 @@ def main(argv: list[str] | None = None) -> int:
     p_run.add_argument(
         "--trace", action="store_true", help="Print step-by-step evaluation trace"
     )
+    p_run.add_argument(
+        "--engine",
+        choices=sorted(_RUN_ENGINES),
+        default="closures",
+        help="Execution engine (default: closures; interpreter is the reference tree walker)",
+    )
     p_run.add_argument(
         "--syntax",
         choices=["ascii", "unicode"],
@@ -518,11 +535,11 @@ def main(argv: list[str] | None = None) -> int:
                 if getattr(args, "file", None):
                     _print_err("suay run: provide either a file or -e/--expr, not both")
                     return 2
-                return cmd_run_expr(str(args.expr), trace=bool(args.trace))
+                return cmd_run_expr(str(args.expr), trace=bool(args.trace), engine=str(args.engine))
             if not getattr(args, "file", None):
                 _print_err("suay run: missing file (or use -e/--expr)")
                 return 2
-            return cmd_run(str(args.file), trace=bool(args.trace))
+            return cmd_run(str(args.file), trace=bool(args.trace), engine=str(args.engine))
         if args.cmd == "check":
             return cmd_check(args.file)
         if args.cmd == "ast":
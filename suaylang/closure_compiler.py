@@ -0,0 +1,582 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable
+
+from . import ast
+from .compiler import scope_bindings
+from .interpreter import Interpreter, _is_number, _is_truthy
+from .lexer import Lexer
+from .parser import Parser
+from .runtime import (
+    EMPTY_LAYOUT,
+    UNBOUND,
+    Closure,
+    Env,
+    Layout,
+    SuayRuntimeError,
+    UNIT,
+    Variant,
+    type_name,
+)
+from .tokens import Span
+
+
+# ----------------------------
+# Closure compilation
+# ----------------------------
+#
+# `ClosureInterpreter` runs the same tree as `Interpreter`, but turns each
+# expression into a Python closure once, before running it: the node kind,
+# operator and pattern matchers are chosen at compile time, and names are
+# resolved against a chain of `_Scope`s that mirrors the runtime env chain.
+# Blocks and the program root give their bindings a slot layout, so most names
+# are read by (hops, slot) instead of by probing a dict at every level.
+#
+# Values, builtins, `_apply` and module loading are inherited, so results,
+# error messages and spans are those of `Interpreter`. Only nodes that can fail
+# with something other than an already-located `SuayRuntimeError` (calls,
+# operators, maps, dispatch and cycles) carry the try/except that
+# `Interpreter.eval_expr` puts around every node; `_relocate` gives them the
+# same outcome.
+
+Code = Callable[[Env], object]
+
+
+@dataclass(frozen=True, slots=True)
+class _Scope:
+    """Compile-time view of one env in the chain that code runs in.
+
+    `extra` are names that bindings may add to the env's dict (bindings in an
+    arm or lambda body whose pattern does not declare them). `filled` scopes
+    (arms, parameters) have every slot set before code runs in them. `env` is
+    an env known at compile time (the builtins), read without walking up; it
+    ends the chain. A chain that ends in None continues with envs unknown at
+    compile time, where names are looked up dynamically.
+    """
+
+    layout: Layout
+    parent: _Scope | None = None
+    extra: frozenset[str] = frozenset()
+    filled: bool = False
+    env: Env | None = None
+
+
+def _layout(names: list[str]) -> Layout:
+    return Layout(tuple(dict.fromkeys(names))) if names else EMPTY_LAYOUT
+
+
+def _up(env: Env, hops: int) -> Env:
+    for _ in range(hops):
+        env = env.parent  # type: ignore[assignment]
+    return env
+
+
+class ClosureInterpreter(Interpreter):
+    """An `Interpreter` that runs expressions as precompiled closures.
+
+    With `trace` on, evaluation falls back to `Interpreter` so that trace
+    output is unchanged.
+    """
+
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        # Compiled code by id() of its expression; the entry keeps the
+        # expression alive, so the key cannot be reused by another node.
+        self._code: dict[int, tuple[ast.Expr, Code]] = {}
+        self._builtins_scope = _Scope(
+            EMPTY_LAYOUT,
+            extra=frozenset(self._builtins_env.keys_local()),
+            env=self._builtins_env,
+        )
+
+    def _program_env(self, program: ast.Program) -> Env:
+        if self.trace:
+            return super()._program_env(program)
+        names: list[str] = []
+        for item in program.items:
+            scope_bindings(item, names)
+        scope = _Scope(_layout(names), parent=self._builtins_scope)
+        for item in program.items:
+            try:
+                self._code[id(item)] = (item, self._compile(item, scope))
+            except RecursionError:
+                raise self._too_deep(item.span) from None
+        return Env(self._builtins_env, scope.layout)
+
+    def eval_expr(self, expr: ast.Expr, env: Env) -> object:
+        if self.trace:
+            return super().eval_expr(expr, env)
+        try:
+            entry = self._code.get(id(expr))
+            if entry is None:
+                # Code reached without a compiled program around it (e.g. the
+                # body of a closure from another module): nothing is known
+                # about `env`.
+                entry = self._code[id(expr)] = (expr, self._compile(expr, None))
+            return entry[1](env)
+        except Exception as e:
+            raise self._relocate(e, expr.span)
+
+    def _relocate(self, e: Exception, span: Span) -> Exception:
+        """What `Interpreter.eval_expr` raises when the node at `span` fails with `e`."""
+
+        if isinstance(e, SuayRuntimeError):
+            if e.span is None or e.source is None or e.filename is None:
+                return e.with_location(span=span, source=self.source, filename=self.filename)
+            return e
+        if isinstance(e, RecursionError):
+            # Left for the enclosing call or top-level form to report.
+            return e
+        return SuayRuntimeError(
+            f"Internal interpreter error: {type(e).__name__}: {e}",
+            span=span,
+            source=self.source,
+            filename=self.filename,
+        )
+
+    def _error(self, message: str, span: Span) -> SuayRuntimeError:
+        return SuayRuntimeError(message, span=span, source=self.source, filename=self.filename)
+
+    # ---------- Compilation ----------
+
+    def _compile(self, expr: ast.Expr, scope: _Scope | None) -> Code:
+        match expr:
+            case ast.UnitLit():
+                return lambda env: UNIT
+            case ast.BoolLit(value=value):
+                b = bool(value)
+                return lambda env: b
+            case ast.IntLit(value=value):
+                i = int(value)
+                return lambda env: i
+            case ast.DecLit(value=value):
+                f = float(value)
+                return lambda env: f
+            case ast.TextLit(value=value):
+                s = str(value)
+                return lambda env: s
+            case ast.Name(value=name):
+                return self._compile_name(name, expr.span, scope)
+            case ast.Binding():
+                return self._compile_binding(expr, scope)
+            case ast.Mutation():
+                return self._compile_mutation(expr, scope)
+            case ast.Block(items=items):
+                return self._compile_block(items, scope)
+            case ast.TupleExpr(items=items):
+                codes = [self._compile(it, scope) for it in items]
+                if len(codes) == 2:
+                    a, b = codes
+                    return lambda env: (a(env), b(env))
+                return lambda env: tuple([c(env) for c in codes])
+            case ast.ListExpr(items=items):
+                codes = [self._compile(it, scope) for it in items]
+                return lambda env: [c(env) for c in codes]
+            case ast.MapExpr(entries=entries):
+                return self._compile_map(expr, entries, scope)
+            case ast.VariantExpr(tag=tag, payload=payload_expr):
+                payload = self._compile(payload_expr, scope)
+                return lambda env: Variant(tag, payload(env))
+            case ast.Lambda():
+                return self._compile_lambda(expr, scope)
+            case ast.Call(func=fn_expr, arg=arg_expr):
+                return self._compile_call(expr, fn_expr, arg_expr, scope)
+            case ast.Unary(op=op, expr=rhs_expr):
+                return self._compile_unary(expr, op, self._compile(rhs_expr, scope))
+            case ast.Binary(op=op, left=left_expr, right=right_expr):
+                return self._compile_binary(
+                    expr, op, self._compile(left_expr, scope), self._compile(right_expr, scope)
+                )
+            case ast.Dispatch(value=value_expr, arms=arms):
+                return self._compile_dispatch(expr, value_expr, arms, scope)
+            case ast.Cycle(seed=seed_expr, arms=arms):
+                return self._compile_cycle(expr, seed_expr, arms, scope)
+            case _:
+                err = self._error(f"Unsupported AST node: {type(expr).__name__}", expr.span)
+
+                def unsupported(env: Env) -> object:
+                    raise err
+
+                return unsupported
+
+    def _arm_scope(self, m_layout: Layout, body: ast.Expr, parent: _Scope | None) -> _Scope:
+        names: list[str] = []
+        scope_bindings(body, names)
+        extra = frozenset(n for n in names if n not in m_layout.index)
+        return _Scope(m_layout, parent=parent, extra=extra, filled=True)
+
+    # ---------- Names ----------
+
+    def _resolve(
+        self, name: str, scope: _Scope | None
+    ) -> tuple[list[tuple[int, int | None, bool]], _Scope | int | None]:
+        """Where `name` may live: ([(hops, slot or None for the dict, final)], tail).
+
+        The tail is the scope holding a known env, the number of hops to the
+        first unknown env (look up dynamically from there), or None (undefined).
+        """
+
+        steps: list[tuple[int, int | None, bool]] = []
+        hops = 0
+        s = scope
+        while s is not None:
+            if s.env is not None:
+                return steps, (s if name in s.extra else None)
+            idx = s.layout.index.get(name)
+            if idx is not None:
+                steps.append((hops, idx, s.filled))
+                if s.filled:
+                    return steps, None
+            if name in s.extra:
+                steps.append((hops, None, False))
+            s = s.parent
+            hops += 1
+        return steps, hops
+
+    def _compile_name(self, name: str, span: Span, scope: _Scope | None) -> Code:
+        steps, tail = self._resolve(name, scope)
+        undefined = f"Undefined name {name!r}"
+
+        rest: Code
+        if isinstance(tail, _Scope):
+            values = tail.env._values  # type: ignore[union-attr]
+
+            def rest(env: Env) -> object:
+                return values[name]  # type: ignore[index]
+
+        elif isinstance(tail, int):
+            hops = tail
+
+            def rest(env: Env) -> object:
+                try:
+                    return _up(env, hops).get(name)
+                except KeyError:
+                    raise self._error(undefined, span)
+
+        else:
+
+            def rest(env: Env) -> object:
+                raise self._error(undefined, span)
+
+        for hops, idx, final in reversed(steps):
+            rest = _lookup_step(name, hops, idx, final, rest)
+        return rest
+
+    def _compile_binding(self, expr: ast.Binding, scope: _Scope | None) -> Code:
+        name = expr.name
+        value = self._compile(expr.value, scope)
+        idx = scope.layout.index.get(name) if scope is not None else None
+        span = expr.span
+        message = f"Name {name!r} is already bound in this scope"
+
+        if idx is not None and not scope.filled:  # type: ignore[union-attr]
+
+            def binding(env: Env) -> object:
+                v = value(env)
+                if type(v) is Closure and v.name is None:
+                    v = Closure(v.params, v.body, v.env, name)
+                slots = env.slots
+                if slots[idx] is not UNBOUND:
+                    raise self._error(message, span)
+                slots[idx] = v
+                return v
+
+            return binding
+
+        def define(env: Env) -> object:
+            v = value(env)
+            if type(v) is Closure and v.name is None:
+                v = Closure(v.params, v.body, v.env, name)
+            try:
+                env.define(name, v)
+            except KeyError:
+                raise self._error(message, span)
+            return v
+
+        return define
+
+    def _compile_mutation(self, expr: ast.Mutation, scope: _Scope | None) -> Code:
+        name = expr.name
+        value = self._compile(expr.value, scope)
+        steps, tail = self._resolve(name, scope)
+        span = expr.span
+        message = f"Cannot mutate {name!r}: name is not bound in any enclosing scope"
+
+        def mutation(env: Env) -> object:
+            v = value(env)
+            for hops, idx, _final in steps:
+                e = _up(env, hops)
+                if idx is None:
+                    if e._assign_local(name, v):
+                        return v
+                elif e.slots[idx] is not UNBOUND:
+                    e.slots[idx] = v
+                    return v
+            if isinstance(tail, _Scope):
+                tail.env._assign_local(name, v)  # type: ignore[union-attr]
+                return v
+            if isinstance(tail, int):
+                try:
+                    _up(env, tail).set_existing(name, v)
+                    return v
+                except KeyError:
+                    pass
+            raise self._error(message, span)
+
+        return mutation
+
+    # ---------- Scopes ----------
+
+    def _compile_block(self, items: list[ast.Expr], scope: _Scope | None) -> Code:
+        names: list[str] = []
+        for item in items:
+            scope_bindings(item, names)
+        inner = _Scope(_layout(names), parent=scope)
+        layout = inner.layout
+        codes = [self._compile(item, inner) for item in items]
+
+        if len(codes) == 1:
+            (only,) = codes
+            return lambda env: only(Env(env, layout))
+
+        def block(env: Env) -> object:
+            child = Env(env, layout)
+            result: object = UNIT
+            for c in codes:
+                result = c(child)
+            return result
+
+        return block
+
+    def _compile_lambda(self, expr: ast.Lambda, scope: _Scope | None) -> Code:
+        params, body = expr.params, expr.body
+        s = scope
+        for p in params[:-1]:
+            s = _Scope(self._matcher(p).layout, parent=s, filled=True)
+        if params:
+            s = self._arm_scope(self._matcher(params[-1]).layout, body, s)
+            # `_apply` evaluates the body through `eval_expr`, which finds it here.
+            self._code[id(body)] = (body, self._compile(body, s))
+        return lambda env: Closure(params, body, env, None)
+
+    # ---------- Operators ----------
+
+    def _compile_call(
+        self, expr: ast.Call, fn_expr: ast.Expr, arg_expr: ast.Expr, scope: _Scope | None
+    ) -> Code:
+        fn = self._compile(fn_expr, scope)
+        arg = self._compile(arg_expr, scope)
+        apply = self._apply
+        relocate = self._relocate
+        span = expr.span
+
+        def call(env: Env) -> object:
+            try:
+                return apply(fn(env), arg(env), span)
+            except Exception as e:
+                raise relocate(e, span)
+
+        return call
+
+    def _compile_unary(self, expr: ast.Unary, op: str, rhs: Code) -> Code:
+        span = expr.span
+        if op in ("¬",):
+            return lambda env: not _is_truthy(rhs(env))
+        if op in ("−", "-"):
+
+            def negate(env: Env) -> object:
+                v = rhs(env)
+                if not _is_number(v):
+                    raise self._error(f"Unary minus expects a number, got {type_name(v)}", span)
+                return -v  # type: ignore[operator]
+
+            return negate
+
+        def unknown(env: Env) -> object:
+            rhs(env)
+            raise self._error(f"Unknown unary operator {op!r}", span)
+
+        return unknown
+
+    def _compile_binary(self, expr: ast.Binary, op: str, left: Code, right: Code) -> Code:
+        # Short-circuit boolean operators.
+        if op == "∧":
+            return lambda env: _is_truthy(left(env)) and _is_truthy(right(env))
+        if op == "∨":
+            return lambda env: _is_truthy(left(env)) or _is_truthy(right(env))
+
+        binary = self._binary
+        relocate = self._relocate
+        span = expr.span
+        fast = _NUMERIC.get(op)
+
+        if fast is None:
+
+            def generic(env: Env) -> object:
+                try:
+                    return binary(op, left(env), right(env), span)
+                except Exception as e:
+                    raise relocate(e, span)
+
+            return generic
+
+        def numeric(env: Env) -> object:
+            try:
+                a = left(env)
+                b = right(env)
+                ta, tb = type(a), type(b)
+                if (ta is int or ta is float) and (tb is int or tb is float):
+                    return fast(a, b)
+                return binary(op, a, b, span)
+            except Exception as e:
+                raise relocate(e, span)
+
+        return numeric
+
+    def _compile_map(
+        self, expr: ast.MapExpr, entries: list[tuple[ast.Expr, ast.Expr]], scope: _Scope | None
+    ) -> Code:
+        codes = [(self._compile(k, scope), self._compile(v, scope), k.span) for k, v in entries]
+        relocate = self._relocate
+        span = expr.span
+
+        def map_expr(env: Env) -> object:
+            try:
+                out: dict[object, object] = {}
+                for k_code, v_code, k_span in codes:
+                    k = k_code(env)
+                    v = v_code(env)
+                    try:
+                        out[k] = v
+                    except TypeError as e:
+                        raise self._error(f"Invalid map key (unhashable): {e}", k_span)
+                return out
+            except Exception as e:
+                raise relocate(e, span)
+
+        return map_expr
+
+    # ---------- Matching ----------
+
+    def _compile_dispatch(
+        self, expr: ast.Dispatch, value_expr: ast.Expr, arms: list[ast.DispatchArm], scope: _Scope | None
+    ) -> Code:
+        value = self._compile(value_expr, scope)
+        compiled = []
+        for arm in arms:
+            m = self._matcher(arm.pattern)
+            body = self._compile(arm.expr, self._arm_scope(m.layout, arm.expr, scope))
+            compiled.append((m.test, m.layout, m.bind, body))
+        relocate = self._relocate
+        span = expr.span
+        no_match = "No dispatch arm matched"
+
+        def dispatch(env: Env) -> object:
+            try:
+                scrut = value(env)
+                for test, layout, bind, body in compiled:
+                    if test is not None and not test(scrut):
+                        continue
+                    arm_env = Env(env, layout)
+                    if bind is not None:
+                        bind(scrut, arm_env.slots)
+                    return body(arm_env)
+                raise self._error(no_match, span)
+            except Exception as e:
+                raise relocate(e, span)
+
+        return dispatch
+
+    def _compile_cycle(
+        self, expr: ast.Cycle, seed_expr: ast.Expr, arms: list[ast.CycleArm], scope: _Scope | None
+    ) -> Code:
+        seed = self._compile(seed_expr, scope)
+        compiled = []
+        for arm in arms:
+            m = self._matcher(arm.pattern)
+            body = self._compile(arm.expr, self._arm_scope(m.layout, arm.expr, scope))
+            compiled.append((m.test, m.layout, m.bind, body, arm.mode, arm.span))
+        relocate = self._relocate
+        span = expr.span
+
+        def cycle(env: Env) -> object:
+            try:
+                state = seed(env)
+                while True:
+                    for test, layout, bind, body, mode, arm_span in compiled:
+                        if test is not None and not test(state):
+                            continue
+                        arm_env = Env(env, layout)
+                        if bind is not None:
+                            bind(state, arm_env.slots)
+                        val = body(arm_env)
+                        if mode == "continue":
+                            state = val
+                            break
+                        if mode == "finish":
+                            return val
+                        raise self._error(f"Invalid cycle arm mode {mode!r}", arm_span)
+                    else:
+                        raise self._error("No cycle arm matched", span)
+            except Exception as e:
+                raise relocate(e, span)
+
+        return cycle
+
+
+# Operators with a direct Python equivalent when both operands are numbers.
+# `÷` and `%` are left to `Interpreter._binary`, which reports division by zero.
+_NUMERIC: dict[str, Callable[[object, object], object]] = {
+    "+": lambda a, b: a + b,  # type: ignore[operator]
+    "−": lambda a, b: a - b,  # type: ignore[operator]
+    "-": lambda a, b: a - b,  # type: ignore[operator]
+    "×": lambda a, b: a * b,  # type: ignore[operator]
+    "*": lambda a, b: a * b,  # type: ignore[operator]
+    "=": lambda a, b: a == b,
+    "≠": lambda a, b: a != b,
+    "<": lambda a, b: a < b,  # type: ignore[operator]
+    "≤": lambda a, b: a <= b,  # type: ignore[operator]
+    ">": lambda a, b: a > b,  # type: ignore[operator]
+    "≥": lambda a, b: a >= b,  # type: ignore[operator]
+}
+
+
+def _lookup_step(name: str, hops: int, idx: int | None, final: bool, rest: Code) -> Code:
+    """Read `name` from the env `hops` up (its slot `idx`, or its dict), else run `rest`."""
+
+    if idx is None:
+
+        def from_dict(env: Env) -> object:
+            values = _up(env, hops)._values
+            if values is not None and name in values:
+                return values[name]
+            return rest(env)
+
+        return from_dict
+    if final:
+        if hops == 0:
+            return lambda env: env.slots[idx]
+        if hops == 1:
+            return lambda env: env.parent.slots[idx]  # type: ignore[union-attr]
+        return lambda env: _up(env, hops).slots[idx]
+    if hops == 0:
+
+        def from_slot(env: Env) -> object:
+            v = env.slots[idx]
+            return rest(env) if v is UNBOUND else v
+
+        return from_slot
+
+    def from_outer_slot(env: Env) -> object:
+        v = _up(env, hops).slots[idx]
+        return rest(env) if v is UNBOUND else v
+
+    return from_outer_slot
+
+
+def run_source(source: str, *, filename: str | None = None) -> object:
+    """Convenience: lex + parse + run a SuayLang source string on `ClosureInterpreter`."""
+    tokens = Lexer(source, filename=filename).tokenize()
+    program = Parser(tokens, source, filename=filename).parse_program()
+    return ClosureInterpreter(source=source, filename=filename).eval_program(program)
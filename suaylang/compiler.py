@@ -1,11 +1,22 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any
+from dataclasses import dataclass, field, fields
+from typing import Any, Callable, Iterable
 
 from . import ast
-from .bytecode import Code, Instr
-from .runtime import UNIT
+from .arena import AstArena
+from .bytecode import BINARY_OPCODES, Code, Instr, SwitchTable
+from .optimizer import OptimizeStats, optimize_code, passes_for_level
+from .patterns import Matcher, binders, compile_pattern, switch_key, switch_path
+from .runtime import BUILTIN_NAMES, EMPTY_LAYOUT, UNIT, Layout, SuayRuntimeError
+from .tokens import Span
+
+
+_BUILTIN_INDEX = {name: i for i, name in enumerate(BUILTIN_NAMES)}
+
+# Dispatch/Cycle arms with a switch key needed before a SWITCH is emitted; below
+# this a linear chain of MATCH_ARMs is as fast.
+_SWITCH_MIN_ARMS = 3
 
 
 @dataclass
@@ -20,6 +31,7 @@ class _Builder:
     instrs: list[Instr]
     labels: dict[str, int]
     patches: list[_Patch]
+    switches: list[int] = field(default_factory=list)
 
     def emit(self, op: str, arg: Any = None, *, span=None) -> int:
         self.instrs.append(Instr(op=op, arg=arg, span=span))
@@ -32,42 +44,202 @@ class _Builder:
         pc = self.emit(op, None, span=span)
         self.patches.append(_Patch(pc=pc, label=label))
 
-    def finalize(self) -> Code:
+    def switch(self, table: SwitchTable, *, span=None) -> None:
+        # `table` holds label names; finalize() turns them into pcs.
+        self.switches.append(self.emit("SWITCH", table, span=span))
+
+    def _target(self, label: str) -> int:
+        if label not in self.labels:
+            raise ValueError(f"Unknown label: {label}")
+        return self.labels[label]
+
+    def finalize(
+        self, *, param_layouts: tuple[Layout, ...] = (), flat_params: bool = False
+    ) -> Code:
         for p in self.patches:
-            if p.label not in self.labels:
-                raise ValueError(f"Unknown label: {p.label}")
-            target = self.labels[p.label]
+            target = self._target(p.label)
             self.instrs[p.pc] = Instr(
                 op=self.instrs[p.pc].op, arg=target, span=self.instrs[p.pc].span
             )
-        return Code(name=self.name, instrs=self.instrs)
+        for pc in self.switches:
+            ins = self.instrs[pc]
+            self.instrs[pc] = Instr(ins.op, ins.arg.retarget(self._target), ins.span)
+        return Code(
+            name=self.name,
+            instrs=self.instrs,
+            param_layouts=param_layouts,
+            flat_params=flat_params,
+        )
 
 
-class Compiler:
-    """Compile SuayLang AST to a small stack-based bytecode."""
+@dataclass
+class _Scope:
+    """Compile-time mirror of one runtime `Env`.
+
+    `slots` maps declared names to slot indices. It is None for the module scope,
+    whose env stays name-keyed: it is supplied by the caller of `VM.run_in_env`
+    and read back by name when a module is linked. `bound` holds the declared
+    names known to be defined at the point being compiled (pattern binders, and
+    block bindings already executed).
+    """
+
+    parent: "_Scope | None"
+    slots: dict[str, int] | None
+    declared: set[str]
+    bound: set[str] = field(default_factory=set)
+
+    def declare(self, name: str) -> None:
+        self.declared.add(name)
+        if self.slots is not None and name not in self.slots:
+            self.slots[name] = len(self.slots)
+
+    def layout(self) -> Layout:
+        if not self.slots:
+            return EMPTY_LAYOUT
+        return Layout(tuple(self.slots))
+
+
+def _flat_params(params: list[ast.Pattern], body: ast.Expr) -> bool:
+    """Whether a lambda's parameters can share one env.
+
+    With separate envs a later parameter (or a binding in the body) may shadow
+    an earlier parameter; sharing is only done when no name is bound twice.
+    """
+
+    if len(params) < 2:
+        return False
+    names = [n for p in params for n in binders(p)]
+    scope_bindings(body, names)
+    return len(names) == len(set(names))
+
+
+def _forms(program: ast.Program | AstArena) -> Iterable[ast.Expr]:
+    """The top-level forms of `program`.
+
+    An arena rebuilds its forms one at a time on each call, so its whole tree
+    never exists as dataclasses at once.
+    """
+
+    return program.forms() if isinstance(program, AstArena) else program.items
+
+
+def _mutated_names(node: object, out: set[str]) -> None:
+    """Collect the target of every `Mutation` anywhere under `node`."""
+
+    # An explicit stack: the parser accepts nesting of any depth.
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, ast.Mutation):
+            out.add(node.name)
+        if isinstance(node, ast.Node):
+            stack.extend(getattr(node, f.name) for f in fields(node))
+        elif isinstance(node, (list, tuple)):
+            stack.extend(node)
+
+
+def scope_bindings(e: ast.Expr, out: list[str]) -> None:
+    """Collect names bound by `Binding`s that execute directly in e's scope.
+
+    Both the compiler and `closure_compiler` lay out a scope's slots from this,
+    in the order the bindings run.
+    """
+
+    # Children are pushed last-first so they are visited in evaluation order;
+    # a binding's name is pushed under its value, so it follows the value's
+    # own bindings.
+    stack: list[ast.Expr | str] = [e]
+    while stack:
+        top = stack.pop()
+        match top:
+            case str():
+                out.append(top)
+            case ast.Binding(name=name, value=value):
+                stack.extend((name, value))
+            case ast.Mutation(value=value):
+                stack.append(value)
+            case ast.TupleExpr(items=items) | ast.ListExpr(items=items):
+                stack.extend(reversed(items))
+            case ast.MapExpr(entries=entries):
+                for k, v in reversed(entries):
+                    stack.extend((v, k))
+            case ast.VariantExpr(payload=payload):
+                stack.append(payload)
+            case ast.Call(func=fn, arg=arg):
+                stack.extend((arg, fn))
+            case ast.Unary(expr=rhs):
+                stack.append(rhs)
+            case ast.Binary(left=lhs, right=rhs):
+                stack.extend((rhs, lhs))
+            case ast.Dispatch(value=value):
+                stack.append(value)
+            case ast.Cycle(seed=seed):
+                stack.append(seed)
+            case _:
+                # Literals and names bind nothing; blocks, lambdas and arms
+                # open their own scopes.
+                pass
 
-    def __init__(self) -> None:
-        self._lambda_counter = 0
 
-    def compile_program(self, program: ast.Program, *, name: str = "<main>") -> Code:
-        b = _Builder(name=name, instrs=[], labels={}, patches=[])
+class Compiler:
+    """Compile SuayLang AST to a small stack-based bytecode.
+
+    Names are resolved at compile time against a chain of `_Scope`s that mirrors
+    the runtime env chain, so the VM reads variables by (depth, slot) instead of
+    probing a dict at every level.
 
-        if not program.items:
-            b.emit("CONST", UNIT, span=program.span)
-            b.emit("HALT", span=program.span)
-            return b.finalize()
+    `optimize` selects an optimizer level (see `optimizer.LEVEL_PASSES`); `passes`
+    names the exact passes to run instead. Instructions removed across all
+    compiled code objects are tallied in `stats`.
+    """
 
-        for i, item in enumerate(program.items):
-            self._compile_expr(b, item)
-            if i != len(program.items) - 1:
+    def __init__(
+        self, optimize: int = 0, *, passes: tuple[str, ...] | None = None
+    ) -> None:
+        self._lambda_counter = 0
+        self._scope: _Scope | None = None
+        self._mutated: set[str] = set()
+        self.optimize = optimize
+        self.passes = passes_for_level(optimize) if passes is None else tuple(passes)
+        self.stats = OptimizeStats()
+
+    def compile_program(self, program: ast.Program | AstArena, *, name: str = "<main>") -> Code:
+        if isinstance(program, AstArena):
+            count = len(program.children(program.root))
+            span = program.span(program.root)
+        else:
+            count = len(program.items)
+            span = program.span
+        b = _Builder(name=name, instrs=[], labels={}, patches=[])
+        self._scope = self._module_scope(_forms(program))
+        self._mutated = set()
+        for item in _forms(program):
+            _mutated_names(item, self._mutated)
+
+        if not count:
+            b.emit("CONST", UNIT, span=span)
+            b.emit("HALT", span=span)
+            return self._finish(b.finalize())
+
+        for i, item in enumerate(_forms(program)):
+            try:
+                self._compile_expr(b, item)
+            except RecursionError:
+                # At the form, as `Interpreter.eval_form` reports it at run time.
+                raise SuayRuntimeError(
+                    "Maximum recursion depth exceeded", span=item.span
+                ) from None
+            if i != count - 1:
                 b.emit("POP", span=item.span)
 
-        b.emit("HALT", span=program.span)
-        return b.finalize()
+        b.emit("HALT", span=span)
+        return self._finish(b.finalize())
 
     # -------- Expressions --------
 
-    def _compile_expr(self, b: _Builder, e: ast.Expr) -> None:
+    def _compile_expr(self, b: _Builder, e: ast.Expr, *, tail: bool = False) -> None:
+        # `tail` is True when e's value is returned from the enclosing lambda body
+        # unchanged; calls compiled there become TAIL_CALL.
         match e:
             case ast.UnitLit():
                 b.emit("CONST", UNIT, span=e.span)
@@ -81,23 +253,34 @@ class Compiler:
                 b.emit("CONST", str(v), span=e.span)
 
             case ast.Name(value=name):
-                b.emit("LOAD", name, span=e.span)
+                self._emit_load(b, name, e.span)
 
             case ast.Binding(name=name, value=value_expr):
                 self._compile_expr(b, value_expr)
-                b.emit("DEF", name, span=e.span)
+                scope = self._scope
+                assert scope is not None
+                if scope.slots is None:
+                    b.emit("DEF", name, span=e.span)
+                else:
+                    b.emit("DEF_LOCAL", (scope.slots[name], name), span=e.span)
 
             case ast.Mutation(name=name, value=value_expr):
                 self._compile_expr(b, value_expr)
-                b.emit("SET", name, span=e.span)
+                self._emit_set(b, name, e.span)
 
             case ast.Block(items=items):
-                b.emit("PUSH_ENV", span=e.span)
+                scope = self._new_scope()
+                for it in items:
+                    self._declare_bindings(scope, it)
+                pushed = self._push_scope(b, "PUSH_ENV", scope, e.span)
                 for idx, it in enumerate(items):
-                    self._compile_expr(b, it)
-                    if idx != len(items) - 1:
+                    last = idx == len(items) - 1
+                    self._compile_expr(b, it, tail=tail and last)
+                    if isinstance(it, ast.Binding):
+                        scope.bound.add(it.name)
+                    if not last:
                         b.emit("POP", span=it.span)
-                b.emit("POP_ENV", span=e.span)
+                self._pop_scope(b, pushed, e.span)
 
             case ast.TupleExpr(items=items):
                 for it in items:
@@ -123,13 +306,28 @@ class Compiler:
             case ast.Lambda(params=params, body=body):
                 self._lambda_counter += 1
                 code_name = f"<lambda:{self._lambda_counter}>"
-                body_code = self.compile_expr(body, name=code_name)
-                b.emit("MAKE_CLOSURE", (body_code, params), span=e.span)
-
-            case ast.Call(func=fn, arg=arg):
+                body_code, matchers = self._compile_lambda(params, body, name=code_name)
+                b.emit("MAKE_CLOSURE", (body_code, matchers), span=e.span)
+
+            case ast.Call():
+                # `f · a · b · c` parses as ((f · a) · b) · c; a chain of two or
+                # more arguments becomes one CALL_N so the VM can bind them all
+                # at once (see VM._call_chain). `f · a` may run code before `b`
+                # is evaluated, so only arguments whose value that code cannot
+                # observe or change are folded into the chain.
+                args: list[ast.Expr] = [e.arg]
+                fn: ast.Expr = e.func
+                while isinstance(fn, ast.Call) and self._is_stable(args[-1]):
+                    args.append(fn.arg)
+                    fn = fn.func
+                args.reverse()
                 self._compile_expr(b, fn)
-                self._compile_expr(b, arg)
-                b.emit("CALL", span=e.span)
+                for arg in args:
+                    self._compile_expr(b, arg)
+                if len(args) == 1:
+                    b.emit("TAIL_CALL" if tail else "CALL", span=e.span)
+                else:
+                    b.emit("TAIL_CALL_N" if tail else "CALL_N", len(args), span=e.span)
 
             case ast.Unary(op=op, expr=rhs):
                 self._compile_expr(b, rhs)
@@ -166,23 +364,20 @@ class Compiler:
 
                 self._compile_expr(b, lhs)
                 self._compile_expr(b, rhs)
-                b.emit("BINARY", op, span=e.span)
+                b.emit(BINARY_OPCODES.get(op, "BINARY"), op, span=e.span)
 
             case ast.Dispatch(value=value_expr, arms=arms):
                 end_lbl = self._fresh("dispatch_end")
+                no_match_lbl = self._fresh("dispatch_no_match")
                 self._compile_expr(b, value_expr)  # scrutinee on stack
-                for arm in arms:
-                    next_lbl = self._fresh("dispatch_next")
-                    b.emit("DUP", span=arm.span)
-                    b.emit("MATCH", arm.pattern, span=arm.span)
-                    b.jmp("JMP_IF_NONE", next_lbl, span=arm.span)
-                    b.emit("PUSH_ENV_BIND", span=arm.span)  # consumes bindings
-                    b.emit("POP", span=arm.span)  # drop scrutinee
-                    self._compile_expr(b, arm.expr)
-                    b.emit("POP_ENV", span=arm.span)
+
+                def dispatch_body(arm: ast.DispatchArm, pushed: bool) -> None:
+                    self._compile_expr(b, arm.expr, tail=tail)
+                    self._pop_scope(b, pushed, arm.span)
                     b.jmp("JMP", end_lbl, span=arm.span)
-                    b.mark(next_lbl)
-                # no match
+
+                self._compile_arms(b, arms, no_match_lbl, dispatch_body, e.span)
+                b.mark(no_match_lbl)
                 b.emit("POP", span=e.span)  # drop scrutinee
                 b.emit("RAISE", "No dispatch arm matched", span=e.span)
                 b.mark(end_lbl)
@@ -191,21 +386,20 @@ class Compiler:
                 loop_lbl = self._fresh("cycle_loop")
                 end_lbl = self._fresh("cycle_end")
                 self._compile_expr(b, seed_expr)  # state
+                no_match_lbl = self._fresh("cycle_no_match")
                 b.mark(loop_lbl)
-                for arm in arms:
-                    next_lbl = self._fresh("cycle_next")
-                    b.emit("DUP", span=arm.span)
-                    b.emit("MATCH", arm.pattern, span=arm.span)
-                    b.jmp("JMP_IF_NONE", next_lbl, span=arm.span)
-                    b.emit("PUSH_ENV_BIND", span=arm.span)
-                    b.emit("POP", span=arm.span)  # drop state
-                    self._compile_expr(b, arm.expr)
-                    b.emit("POP_ENV", span=arm.span)
+
+                def cycle_body(arm: ast.CycleArm, pushed: bool) -> None:
+                    finish = arm.mode != "continue"
+                    self._compile_expr(b, arm.expr, tail=tail and finish)
+                    self._pop_scope(b, pushed, arm.span)
                     if arm.mode == "continue":
                         b.jmp("JMP", loop_lbl, span=arm.span)
                     else:
                         b.jmp("JMP", end_lbl, span=arm.span)
-                    b.mark(next_lbl)
+
+                self._compile_arms(b, arms, no_match_lbl, cycle_body, e.span)
+                b.mark(no_match_lbl)
                 b.emit("POP", span=e.span)  # drop state
                 b.emit("RAISE", "No cycle arm matched", span=e.span)
                 b.mark(end_lbl)
@@ -214,10 +408,272 @@ class Compiler:
                 raise NotImplementedError(f"No compiler support for {type(e).__name__}")
 
     def compile_expr(self, expr: ast.Expr, *, name: str = "<expr>") -> Code:
+        """Compile a standalone expression that runs directly in a module env."""
+
         b = _Builder(name=name, instrs=[], labels={}, patches=[])
-        self._compile_expr(b, expr)
+        saved = self._scope
+        self._scope = self._module_scope([expr])
+        try:
+            self._compile_expr(b, expr)
+        finally:
+            self._scope = saved
         b.emit("HALT", span=expr.span)
-        return b.finalize()
+        return self._finish(b.finalize())
+
+    def _compile_lambda(
+        self, params: list[ast.Pattern], body: ast.Expr, *, name: str
+    ) -> tuple[Code, tuple[Matcher, ...]]:
+        # Each curried parameter gets its own env at call time (see VM._apply); the
+        # body runs in the last one, so body-level bindings live there too. When
+        # no name is bound twice, all parameters share one env instead (see
+        # _flat_params), so a saturated call allocates a single env.
+        saved = self._scope
+        layouts: list[Layout] = []
+        flat = _flat_params(params, body)
+        matchers: list[Matcher] = []
+        try:
+            if not params or flat:
+                scope = self._enter_scope()
+                for p in params:
+                    matchers.append(compile_pattern(p, first=len(scope.slots or ())))
+                    for n in binders(p):
+                        scope.declare(n)
+                        scope.bound.add(n)
+                self._declare_bindings(scope, body)
+                if flat:
+                    layouts.append(scope.layout())
+            else:
+                for i, p in enumerate(params):
+                    scope = self._enter_scope()
+                    # Binders come first so slot i is binder i (see patterns.Matcher).
+                    matchers.append(compile_pattern(p))
+                    for n in binders(p):
+                        scope.declare(n)
+                        scope.bound.add(n)
+                    if i == len(params) - 1:
+                        self._declare_bindings(scope, body)
+                    layouts.append(scope.layout())
+
+            b = _Builder(name=name, instrs=[], labels={}, patches=[])
+            self._compile_expr(b, body, tail=True)
+            b.emit("HALT", span=body.span)
+        finally:
+            self._scope = saved
+        code = b.finalize(param_layouts=tuple(layouts), flat_params=flat)
+        return self._finish(code), tuple(matchers)
+
+    def _finish(self, code: Code) -> Code:
+        if not self.passes:
+            return code
+        return optimize_code(code, self.passes, stats=self.stats)
+
+    # -------- Scopes --------
+
+    def _module_scope(self, items: Iterable[ast.Expr]) -> _Scope:
+        scope = _Scope(parent=None, slots=None, declared=set())
+        for it in items:
+            self._declare_bindings(scope, it)
+        return scope
+
+    def _new_scope(self) -> _Scope:
+        return _Scope(parent=self._scope, slots={}, declared=set())
+
+    def _enter_scope(self) -> _Scope:
+        scope = self._new_scope()
+        self._scope = scope
+        return scope
+
+    def _compile_arms(
+        self,
+        b: _Builder,
+        arms: list[Any],
+        no_match_lbl: str,
+        emit_body: Callable[[Any, bool], None],
+        span: Span | None,
+    ) -> None:
+        # Arms are tried in source order against the value on the stack. When
+        # enough of them have a switch key (variant tag, tuple arity or literal,
+        # of the value or of a nested tuple item; see patterns.switch_path), a
+        # SWITCH jumps straight to the first arm that can match, and a failing
+        # arm continues with the next arm that can match the same key. Arms
+        # without a key (`_`, names) can match anything, so after one of those
+        # fails, another SWITCH picks up from the arm that follows it.
+        path = switch_path([arm.pattern for arm in arms])
+        keys = [switch_key(arm.pattern, path) for arm in arms]
+        use_switch = sum(k is not None for k in keys) >= _SWITCH_MIN_ARMS
+        arm_lbls = [self._fresh("arm") for _ in arms]
+        resync: dict[int, tuple[str, SwitchTable]] = {}
+
+        def first(key: tuple[object, ...] | None, start: int) -> str:
+            for j in range(start, len(arms)):
+                if keys[j] is None or (key is not None and keys[j] == key):
+                    return arm_lbls[j]
+            return no_match_lbl
+
+        def table(start: int) -> SwitchTable:
+            tags: dict[Any, str] = {}
+            arities: dict[Any, str] = {}
+            literals: dict[Any, str] = {}
+            list_target: str | None = None
+            for k in keys[start:]:
+                if k is None:
+                    continue
+                target = first(k, start)
+                if k[0] == "tag":
+                    tags.setdefault(k[1], target)
+                elif k[0] == "arity":
+                    arities.setdefault(k[1], target)
+                elif k[0] == "list":
+                    list_target = list_target or target
+                else:
+                    literals.setdefault(k[1], target)
+            return SwitchTable(
+                default=first(None, start),
+                tags=tags,
+                arities=arities,
+                literals=literals,
+                list_target=list_target,
+                path=path,
+            )
+
+        def redispatch(start: int) -> str:
+            # Where to go after an arm without a key fails: a SWITCH over the
+            # arms from `start`, unless every key leads to the same arm anyway.
+            if start not in resync:
+                sw = table(start)
+                if len(set(sw.targets())) == 1:
+                    return sw.default
+                resync[start] = (self._fresh("arm_switch"), sw)
+            return resync[start][0]
+
+        if use_switch:
+            entry = table(0)
+            if len(set(entry.targets())) > 1:
+                b.switch(entry, span=span)
+        for i, arm in enumerate(arms):
+            b.mark(arm_lbls[i])
+            if not use_switch:
+                fail = arm_lbls[i + 1] if i + 1 < len(arms) else no_match_lbl
+            elif keys[i] is not None:
+                fail = first(keys[i], i + 1)
+            else:
+                fail = redispatch(i + 1)
+            pushed = self._emit_arm_match(b, arm.pattern, arm.expr, fail, arm.span)
+            emit_body(arm, pushed)
+        for lbl, sw in resync.values():
+            b.mark(lbl)
+            b.switch(sw, span=span)
+
+    def _emit_arm_match(
+        self,
+        b: _Builder,
+        pattern: ast.Pattern,
+        expr: ast.Expr,
+        next_lbl: str,
+        span: Span | None,
+    ) -> bool:
+        # MATCH_ARM tests the scrutinee on top of the stack. On success it pops it,
+        # binds into a fresh env if the arm declares names, and skips the JMP that
+        # follows; on failure it continues at that JMP's target.
+        scope = self._new_scope()
+        for n in binders(pattern):
+            scope.declare(n)
+            scope.bound.add(n)
+        self._declare_bindings(scope, expr)
+        layout = scope.layout() if scope.slots else None
+        b.emit("MATCH_ARM", (compile_pattern(pattern), layout), span=span)
+        b.jmp("JMP", next_lbl, span=span)
+        if layout is None:
+            return False
+        self._scope = scope
+        return True
+
+    def _push_scope(self, b: _Builder, op: str, scope: _Scope, span: Span | None) -> bool:
+        # A scope that declares nothing can never hold a binding, so no env is
+        # created for it at runtime (and it does not count towards depths).
+        if not scope.slots:
+            return False
+        self._scope = scope
+        b.emit(op, scope.layout(), span=span)
+        return True
+
+    def _pop_scope(self, b: _Builder, pushed: bool, span: Span | None) -> None:
+        if not pushed:
+            return
+        assert self._scope is not None
+        b.emit("POP_ENV", span=span)
+        self._scope = self._scope.parent
+
+    @staticmethod
+    def _declare_bindings(scope: _Scope, e: ast.Expr) -> None:
+        names: list[str] = []
+        scope_bindings(e, names)
+        for n in names:
+            scope.declare(n)
+
+    def _resolve(self, name: str) -> tuple[int, _Scope] | None:
+        depth = 0
+        scope = self._scope
+        while scope is not None:
+            if name in scope.declared:
+                return depth, scope
+            scope = scope.parent
+            depth += 1
+        return None
+
+    def _is_stable(self, e: ast.Expr) -> bool:
+        """Whether evaluating `e` cannot fail and gives the same value at any point
+        of the enclosing call chain: literals, lambdas, and names bound in this
+        compilation unit that are defined already and never mutated."""
+
+        match e:
+            case ast.UnitLit() | ast.BoolLit() | ast.IntLit() | ast.DecLit() | ast.TextLit():
+                return True
+            case ast.Lambda():
+                return True
+            case ast.TupleExpr(items=items) | ast.ListExpr(items=items):
+                return all(self._is_stable(it) for it in items)
+            case ast.VariantExpr(payload=payload):
+                return self._is_stable(payload)
+            case ast.Name(value=name):
+                found = self._resolve(name)
+                if found is None or name in self._mutated:
+                    return False
+                scope = found[1]
+                # Module-scope envs are name-keyed and shared with other units.
+                return scope.slots is not None and name in scope.bound
+            case _:
+                return False
+
+    def _emit_load(self, b: _Builder, name: str, span: Span | None) -> None:
+        found = self._resolve(name)
+        if found is None:
+            idx = _BUILTIN_INDEX.get(name)
+            if idx is None:
+                # Not declared anywhere the compiler can see: look it up by name
+                # in whatever env the code ends up running in.
+                b.emit("LOAD", name, span=span)
+            else:
+                b.emit("LOAD_GLOBAL", (idx, name), span=span)
+            return
+        depth, scope = found
+        if scope.slots is None:
+            b.emit("LOAD_NAME", (depth, name), span=span)
+        elif depth == 0:
+            b.emit("LOAD_LOCAL", (scope.slots[name], name), span=span)
+        else:
+            b.emit("LOAD_DEREF", (depth, scope.slots[name], name), span=span)
+
+    def _emit_set(self, b: _Builder, name: str, span: Span | None) -> None:
+        found = self._resolve(name)
+        if found is None or found[1].slots is None:
+            b.emit("SET", name, span=span)
+            return
+        depth, scope = found
+        if depth == 0:
+            b.emit("SET_LOCAL", (scope.slots[name], name), span=span)
+        else:
+            b.emit("SET_DEREF", (depth, scope.slots[name], name), span=span)
 
     def _fresh(self, prefix: str) -> str:
         self._lambda_counter += 1
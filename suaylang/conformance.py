@@ -6,6 +6,7 @@ from dataclasses import dataclass
 from typing import Literal
 
 from .errors import Diagnostic, SuayError
+from .closure_compiler import ClosureInterpreter
 from .compiler import Compiler
 from .interpreter import Interpreter
 from .lexer import Lexer
@@ -44,38 +45,7 @@ def observe_interpreter(source: str, *, filename: str = "<conformance>") -> Obse
             program
         )
 
-    out, val, err = _capture(run)
-    if err is None:
-        return Observation(termination="ok", stdout=out, value=val)
-
-    if isinstance(err, Diagnostic):
-        # LexError/ParseError are Diagnostics.
-        term: Termination = "lex" if err.error_type == "lexical" else "parse"
-        return Observation(
-            termination=term,
-            stdout=out,
-            error_type=err.error_type,
-            line=err.line,
-            column=err.column,
-        )
-
-    if isinstance(err, SuayRuntimeError):
-        line = err.span.start.line if err.span else None
-        col = err.span.start.column if err.span else None
-        return Observation(
-            termination="runtime",
-            stdout=out,
-            error_type="runtime",
-            line=line,
-            column=col,
-        )
-
-    if isinstance(err, SuayError):
-        return Observation(termination="internal", stdout=out, error_type="suay")
-
-    return Observation(
-        termination="internal", stdout=out, error_type=type(err).__name__
-    )
+    return _observe(run)
 
 
 def observe_vm(source: str, *, filename: str = "<conformance>") -> Observation:
@@ -85,11 +55,25 @@ def observe_vm(source: str, *, filename: str = "<conformance>") -> Observation:
         code = Compiler().compile_program(program, name=filename)
         return VM(source=source, filename=filename, trace=False).run(code)
 
+    return _observe(run)
+
+
+def observe_closures(source: str, *, filename: str = "<conformance>") -> Observation:
+    def run() -> object:
+        tokens = Lexer(source, filename=filename).tokenize()
+        program = Parser(tokens, source, filename=filename).parse_program()
+        return ClosureInterpreter(source=source, filename=filename).eval_program(program)
+
+    return _observe(run)
+
+
+def _observe(run) -> Observation:
     out, val, err = _capture(run)
     if err is None:
         return Observation(termination="ok", stdout=out, value=val)
 
     if isinstance(err, Diagnostic):
+        # LexError/ParseError are Diagnostics.
         term: Termination = "lex" if err.error_type == "lexical" else "parse"
         return Observation(
             termination=term,
@@ -126,11 +110,15 @@ class ConformanceResult:
     vm: Observation
 
 
-def compare_observations(interp: Observation, vm: Observation) -> ConformanceResult:
+def compare_observations(
+    interp: Observation, vm: Observation, *, engine: str = "vm"
+) -> ConformanceResult:
+    """Compare the interpreter with another engine (`engine` names it in reasons)."""
+
     if interp.termination != vm.termination:
         return ConformanceResult(
             ok=False,
-            reason=f"termination differs: interp={interp.termination} vm={vm.termination}",
+            reason=f"termination differs: interp={interp.termination} {engine}={vm.termination}",
             interp=interp,
             vm=vm,
         )
@@ -149,7 +137,7 @@ def compare_observations(interp: Observation, vm: Observation) -> ConformanceRes
             if interp.value != vm.value:
                 return ConformanceResult(
                     ok=False,
-                    reason=f"result differs: interp={interp.value!r} vm={vm.value!r}",
+                    reason=f"result differs: interp={interp.value!r} {engine}={vm.value!r}",
                     interp=interp,
                     vm=vm,
                 )
@@ -161,7 +149,7 @@ def compare_observations(interp: Observation, vm: Observation) -> ConformanceRes
     if interp.error_type != vm.error_type:
         return ConformanceResult(
             ok=False,
-            reason=f"error type differs: interp={interp.error_type} vm={vm.error_type}",
+            reason=f"error type differs: interp={interp.error_type} {engine}={vm.error_type}",
             interp=interp,
             vm=vm,
         )
@@ -169,7 +157,7 @@ def compare_observations(interp: Observation, vm: Observation) -> ConformanceRes
     if (interp.line, interp.column) != (vm.line, vm.column):
         return ConformanceResult(
             ok=False,
-            reason=f"error location differs: interp={interp.line}:{interp.column} vm={vm.line}:{vm.column}",
+            reason=f"error location differs: interp={interp.line}:{interp.column} {engine}={vm.line}:{vm.column}",
             interp=interp,
             vm=vm,
         )
@@ -5,6 +5,7 @@ from pathlib import Path
 
 from .errors import Diagnostic, SuayError
 from .runtime import SuayRuntimeError
+from .tokens import line_index
 
 
 @dataclass(frozen=True)
@@ -151,10 +152,14 @@ def format_contract_error(e: SuayError, *, include_code: bool) -> str:
             head = f"{code} {head}"
         ctx = None
         if e.source is not None:
-            # Mimic runtime's own context extraction.
-            lines = e.source.splitlines()
-            if 1 <= pos.line <= len(lines):
-                ctx = lines[pos.line - 1]
+            # The line as `splitlines()` gives it: without the "\r" of a CRLF
+            # ending, and no empty line after a final newline.
+            index = line_index(e.source)
+            ctx = index.line_text(pos.line)
+            if ctx is not None and ctx.endswith("\r"):
+                ctx = ctx[:-1]
+            elif ctx == "" and pos.line == index.line_count:
+                ctx = None
         out = head + _format_context_line(ctx, column=pos.column)
         if e.frames:
             out += "\nstack:"
@@ -2,26 +2,15 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 
+from .tokens import line_index
+
 
 class SuayError(Exception):
     """Base class for user-facing SuayLang errors."""
 
 
 def _line_text(source: str, line: int) -> str | None:
-    if line <= 0:
-        return None
-    i = 1
-    start = 0
-    while i < line and start <= len(source):
-        nl = source.find("\n", start)
-        if nl == -1:
-            return None
-        start = nl + 1
-        i += 1
-    end = source.find("\n", start)
-    if end == -1:
-        end = len(source)
-    return source[start:end]
+    return line_index(source).line_text(line)
 
 
 @dataclass(frozen=True)
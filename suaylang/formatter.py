@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import io
 from dataclasses import dataclass
 from pathlib import Path
+from typing import TextIO
 
 from .lexer import Lexer
 from .tokens import Token, TokenType
@@ -94,14 +96,31 @@ def format_source(source: str, *, filename: str = "<fmt>", options: FormatOption
     - Never rewrites comments except via token replacement around them.
     """
 
+    out = io.StringIO()
+    format_to(source, out, filename=filename, options=options)
+    return out.getvalue()
+
+
+def format_to(
+    source: str,
+    out: TextIO,
+    *,
+    filename: str = "<fmt>",
+    options: FormatOptions | None = None,
+) -> None:
+    """Write `format_source(source)` to `out` piece by piece as tokens are lexed.
+
+    No token list or output string is built, so large sources can be formatted
+    straight to a file. If lexing fails, the `LexError` is raised after the
+    output for the tokens before it has been written.
+    """
+
     opts = options or FormatOptions()
     canon = UNICODE_CANON if opts.unicode else ASCII_CANON
+    write = out.write
 
-    tokens = Lexer(source, filename=filename).tokenize()
-
-    out: list[str] = []
     last = 0
-    for tok in tokens:
+    for tok in Lexer(source, filename=filename).iter_tokens():
         if tok.type == TokenType.EOF:
             break
 
@@ -113,18 +132,18 @@ def format_source(source: str, *, filename: str = "<fmt>", options: FormatOption
         # ASCII-first: also canonicalize the comment marker.
         if not opts.unicode and "⍝" in gap:
             gap = gap.replace("⍝", "//")
-        out.append(gap)
+        if gap:
+            write(gap)
 
         replacement = canon.get(tok.type)
         if replacement is None:
             # Preserve the original spelling for tokens without canonical mapping.
             replacement = source[start:end]
 
-        out.append(replacement)
+        write(replacement)
         last = end
 
-    out.append(source[last:])
-    return "".join(out)
+    write(source[last:])
 
 
 def format_file(path: str | Path, *, options: FormatOptions | None = None) -> str:
@@ -7,7 +7,12 @@ from . import ast
 from .errors import SuayError
 from .lexer import Lexer
 from .parser import Parser
+from .patterns import Matcher, compile_pattern
+from .persistent import PMap, concat_text, list_tail, pmap, pvector
 from .runtime import (
+    LIST_TYPES,
+    MAP_TYPES,
+    TEXT_TYPES,
     Builtin,
     Closure,
     Env,
@@ -16,6 +21,7 @@ from .runtime import (
     UNIT,
     Unit,
     Variant,
+    type_name,
 )
 
 
@@ -34,13 +40,13 @@ def _to_text(v: object) -> str:
         return "⊤" if v else "⊥"
     if isinstance(v, (int, float)):
         return str(v)
-    if isinstance(v, str):
-        return v
+    if isinstance(v, TEXT_TYPES):
+        return str(v)
     if isinstance(v, tuple):
         return "(" + " ".join(_to_text(x) for x in v) + ")"
-    if isinstance(v, list):
+    if isinstance(v, LIST_TYPES):
         return "[" + " ".join(_to_text(x) for x in v) + "]"
-    if isinstance(v, dict):
+    if isinstance(v, MAP_TYPES):
         inner = ", ".join(f"{_to_text(k)} ↦ {_to_text(val)}" for k, val in v.items())
         return "⟦" + inner + "⟧"
     if isinstance(v, Variant):
@@ -52,14 +58,6 @@ def _to_text(v: object) -> str:
     return str(v)
 
 
-def _merge_maps(
-    a: dict[object, object], b: dict[object, object]
-) -> dict[object, object]:
-    out = dict(a)
-    out.update(b)
-    return out
-
-
 def _is_number(v: object) -> bool:
     return isinstance(v, (int, float)) and not isinstance(v, bool)
 
@@ -79,18 +77,23 @@ class Interpreter:
 
     def __post_init__(self) -> None:
         self._depth = 0
+        self._matchers: dict[int, Matcher] = {}
         self._builtins_env = Env(parent=None)
         self._install_builtins(self._builtins_env)
         if self.modules is None:
             self.modules = ModuleSystem(cache={}, loading=[])
 
     def eval_program(self, program: ast.Program) -> object:
-        env = Env(parent=self._builtins_env)
+        env = self._program_env(program)
         result: object = UNIT
         for item in program.items:
-            result = self.eval_expr(item, env)
+            result = self.eval_form(item, env)
         return result
 
+    def _program_env(self, program: ast.Program) -> Env:
+        """The top-level scope `program` runs in (a child of the builtins)."""
+        return Env(parent=self._builtins_env)
+
     # ---------- Modules ----------
 
     def _resolve_module_path(self, raw: str) -> str:
@@ -137,15 +140,16 @@ class Interpreter:
             mod_program = Parser(
                 mod_tokens, mod_source, filename=abs_path
             ).parse_program()
-            mod_interp = Interpreter(
+            # Modules run on the same engine as the program that links them.
+            mod_interp = type(self)(
                 source=mod_source,
                 filename=abs_path,
                 trace=self.trace,
                 modules=self.modules,
             )
-            mod_env = Env(parent=mod_interp._builtins_env)
+            mod_env = mod_interp._program_env(mod_program)
             for item in mod_program.items:
-                mod_interp.eval_expr(item, mod_env)
+                mod_interp.eval_form(item, mod_env)
 
             self.modules.cache[abs_path] = mod_env
             return mod_env
@@ -162,6 +166,24 @@ class Interpreter:
         finally:
             self.modules.loading.pop()
 
+    def eval_form(self, item: ast.Expr, env: Env) -> object:
+        """Evaluate one top-level form of a program, module or REPL entry.
+
+        Host recursion that runs out outside of any call is reported at `item`.
+        """
+        try:
+            return self.eval_expr(item, env)
+        except RecursionError:
+            raise self._too_deep(item.span) from None
+
+    def _too_deep(self, span) -> SuayRuntimeError:
+        return SuayRuntimeError(
+            "Maximum recursion depth exceeded",
+            span=span,
+            source=self.source,
+            filename=self.filename,
+        )
+
     def eval_expr(self, expr: ast.Expr, env: Env) -> object:
         if self.trace:
             self._trace_enter(expr)
@@ -177,12 +199,8 @@ class Interpreter:
                 )
             raise
         except RecursionError:
-            raise SuayRuntimeError(
-                "Maximum recursion depth exceeded",
-                span=expr.span,
-                source=self.source,
-                filename=self.filename,
-            )
+            # Reported at the innermost call (see `_apply`) or top-level form.
+            raise
         except Exception as e:  # defensive: wrap unexpected errors
             raise SuayRuntimeError(
                 f"Internal interpreter error: {type(e).__name__}: {e}",
@@ -292,7 +310,7 @@ class Interpreter:
                 if op in ("−", "-"):
                     if not _is_number(rhs):
                         raise SuayRuntimeError(
-                            f"Unary minus expects a number, got {type(rhs).__name__}",
+                            f"Unary minus expects a number, got {type_name(rhs)}",
                             span=expr.span,
                             source=self.source,
                             filename=self.filename,
@@ -327,13 +345,10 @@ class Interpreter:
             case ast.Dispatch(value=value_expr, arms=arms):
                 scrut = self.eval_expr(value_expr, env)
                 for arm in arms:
-                    binds = self._match_pattern(arm.pattern, scrut)
-                    if binds is None:
+                    m = self._matcher(arm.pattern)
+                    if m.test is not None and not m.test(scrut):
                         continue
-                    arm_env = Env(parent=env)
-                    for k, v in binds.items():
-                        arm_env.define(k, v)
-                    return self.eval_expr(arm.expr, arm_env)
+                    return self.eval_expr(arm.expr, self._bind_env(m, scrut, env))
                 raise SuayRuntimeError(
                     "No dispatch arm matched",
                     span=expr.span,
@@ -346,14 +361,11 @@ class Interpreter:
                 while True:
                     matched = False
                     for arm in arms:
-                        binds = self._match_pattern(arm.pattern, state)
-                        if binds is None:
+                        m = self._matcher(arm.pattern)
+                        if m.test is not None and not m.test(state):
                             continue
                         matched = True
-                        arm_env = Env(parent=env)
-                        for k, v in binds.items():
-                            arm_env.define(k, v)
-                        val = self.eval_expr(arm.expr, arm_env)
+                        val = self.eval_expr(arm.expr, self._bind_env(m, state, env))
                         if arm.mode == "continue":
                             state = val
                             break
@@ -386,7 +398,7 @@ class Interpreter:
             if op in ("+",):
                 if not _is_number(left) or not _is_number(right):
                     raise SuayRuntimeError(
-                        f"+ expects numbers, got {type(left).__name__} and {type(right).__name__}",
+                        f"+ expects numbers, got {type_name(left)} and {type_name(right)}",
                         span=span,
                         source=self.source,
                         filename=self.filename,
@@ -395,7 +407,7 @@ class Interpreter:
             if op in ("−", "-"):
                 if not _is_number(left) or not _is_number(right):
                     raise SuayRuntimeError(
-                        f"− expects numbers, got {type(left).__name__} and {type(right).__name__}",
+                        f"− expects numbers, got {type_name(left)} and {type_name(right)}",
                         span=span,
                         source=self.source,
                         filename=self.filename,
@@ -404,7 +416,7 @@ class Interpreter:
             if op in ("×", "*"):
                 if not _is_number(left) or not _is_number(right):
                     raise SuayRuntimeError(
-                        f"× expects numbers, got {type(left).__name__} and {type(right).__name__}",
+                        f"× expects numbers, got {type_name(left)} and {type_name(right)}",
                         span=span,
                         source=self.source,
                         filename=self.filename,
@@ -413,7 +425,7 @@ class Interpreter:
             if op in ("÷", "/"):
                 if not _is_number(left) or not _is_number(right):
                     raise SuayRuntimeError(
-                        f"÷ expects numbers, got {type(left).__name__} and {type(right).__name__}",
+                        f"÷ expects numbers, got {type_name(left)} and {type_name(right)}",
                         span=span,
                         source=self.source,
                         filename=self.filename,
@@ -422,7 +434,7 @@ class Interpreter:
             if op == "%":
                 if not _is_number(left) or not _is_number(right):
                     raise SuayRuntimeError(
-                        f"% expects numbers, got {type(left).__name__} and {type(right).__name__}",
+                        f"% expects numbers, got {type_name(left)} and {type_name(right)}",
                         span=span,
                         source=self.source,
                         filename=self.filename,
@@ -430,14 +442,14 @@ class Interpreter:
                 return left % right  # type: ignore[operator]
 
             if op == "⊞":
-                if isinstance(left, str) and isinstance(right, str):
-                    return left + right
-                if isinstance(left, list) and isinstance(right, list):
-                    return [*left, *right]
-                if isinstance(left, dict) and isinstance(right, dict):
-                    return _merge_maps(left, right)
+                if isinstance(left, TEXT_TYPES) and isinstance(right, TEXT_TYPES):
+                    return concat_text(left, right)
+                if isinstance(left, LIST_TYPES) and isinstance(right, LIST_TYPES):
+                    return pvector(left).extend(right)
+                if isinstance(left, MAP_TYPES) and isinstance(right, MAP_TYPES):
+                    return pmap(left).update(right)
                 raise SuayRuntimeError(
-                    f"⊞ expects (Text,Text), (List,List), or (Map,Map); got {type(left).__name__} and {type(right).__name__}",
+                    f"⊞ expects (Text,Text), (List,List), or (Map,Map); got {type_name(left)} and {type_name(right)}",
                     span=span,
                     source=self.source,
                     filename=self.filename,
@@ -450,10 +462,10 @@ class Interpreter:
             if op == "<":
                 if _is_number(left) and _is_number(right):
                     return left < right  # type: ignore[operator]
-                if isinstance(left, str) and isinstance(right, str):
-                    return left < right
+                if isinstance(left, TEXT_TYPES) and isinstance(right, TEXT_TYPES):
+                    return str(left) < str(right)
                 raise SuayRuntimeError(
-                    f"< expects (Num,Num) or (Text,Text); got {type(left).__name__} and {type(right).__name__}",
+                    f"< expects (Num,Num) or (Text,Text); got {type_name(left)} and {type_name(right)}",
                     span=span,
                     source=self.source,
                     filename=self.filename,
@@ -461,10 +473,10 @@ class Interpreter:
             if op == "≤":
                 if _is_number(left) and _is_number(right):
                     return left <= right  # type: ignore[operator]
-                if isinstance(left, str) and isinstance(right, str):
-                    return left <= right
+                if isinstance(left, TEXT_TYPES) and isinstance(right, TEXT_TYPES):
+                    return str(left) <= str(right)
                 raise SuayRuntimeError(
-                    f"≤ expects (Num,Num) or (Text,Text); got {type(left).__name__} and {type(right).__name__}",
+                    f"≤ expects (Num,Num) or (Text,Text); got {type_name(left)} and {type_name(right)}",
                     span=span,
                     source=self.source,
                     filename=self.filename,
@@ -472,10 +484,10 @@ class Interpreter:
             if op == ">":
                 if _is_number(left) and _is_number(right):
                     return left > right  # type: ignore[operator]
-                if isinstance(left, str) and isinstance(right, str):
-                    return left > right
+                if isinstance(left, TEXT_TYPES) and isinstance(right, TEXT_TYPES):
+                    return str(left) > str(right)
                 raise SuayRuntimeError(
-                    f"> expects (Num,Num) or (Text,Text); got {type(left).__name__} and {type(right).__name__}",
+                    f"> expects (Num,Num) or (Text,Text); got {type_name(left)} and {type_name(right)}",
                     span=span,
                     source=self.source,
                     filename=self.filename,
@@ -483,10 +495,10 @@ class Interpreter:
             if op == "≥":
                 if _is_number(left) and _is_number(right):
                     return left >= right  # type: ignore[operator]
-                if isinstance(left, str) and isinstance(right, str):
-                    return left >= right
+                if isinstance(left, TEXT_TYPES) and isinstance(right, TEXT_TYPES):
+                    return str(left) >= str(right)
                 raise SuayRuntimeError(
-                    f"≥ expects (Num,Num) or (Text,Text); got {type(left).__name__} and {type(right).__name__}",
+                    f"≥ expects (Num,Num) or (Text,Text); got {type_name(left)} and {type_name(right)}",
                     span=span,
                     source=self.source,
                     filename=self.filename,
@@ -529,13 +541,14 @@ class Interpreter:
                         )
 
                     path, name = new_bound
-                    if not isinstance(path, str) or not isinstance(name, str):
+                    if not isinstance(path, TEXT_TYPES) or not isinstance(name, TEXT_TYPES):
                         raise SuayRuntimeError(
-                            f"link expects (Text,Text); got ({type(path).__name__},{type(name).__name__})",
+                            f"link expects (Text,Text); got ({type_name(path)},{type_name(name)})",
                             span=call_span,
                             source=self.source,
                             filename=self.filename,
                         )
+                    path, name = str(path), str(name)
                     if name.startswith("_"):
                         raise SuayRuntimeError(
                             f"Module member {name!r} is private",
@@ -573,17 +586,15 @@ class Interpreter:
                         filename=self.filename,
                     )
                 first, rest = fn_val.params[0], fn_val.params[1:]
-                binds = self._match_pattern(first, arg_val)
-                if binds is None:
+                m = self._matcher(first)
+                if m.test is not None and not m.test(arg_val):
                     raise SuayRuntimeError(
                         "Function argument did not match parameter pattern",
                         span=call_span,
                         source=self.source,
                         filename=self.filename,
                     )
-                call_env = Env(parent=fn_val.env)
-                for k, v in binds.items():
-                    call_env.define(k, v)
+                call_env = self._bind_env(m, arg_val, fn_val.env)
 
                 if rest:
                     return Closure(
@@ -602,7 +613,7 @@ class Interpreter:
                     raise e
 
             raise SuayRuntimeError(
-                f"Value is not callable: {type(fn_val).__name__}",
+                f"Value is not callable: {type_name(fn_val)}",
                 span=call_span,
                 source=self.source,
                 filename=self.filename,
@@ -610,101 +621,25 @@ class Interpreter:
 
         except SuayRuntimeError:
             raise
-
-    def _match_pattern(
-        self, pat: ast.Pattern, value: object
-    ) -> dict[str, object] | None:
-        def merge_into(dst: dict[str, object], src: dict[str, object]) -> bool:
-            # Return False on conflict (duplicate binder).
-            for k, v in src.items():
-                if k in dst:
-                    return False
-                dst[k] = v
-            return True
-
-        match pat:
-            case ast.PWildcard():
-                return {}
-            case ast.PName(name=name):
-                return {name: value}
-            case ast.PUnit():
-                return {} if value is UNIT else None
-            case ast.PBool(value=b):
-                return {} if isinstance(value, bool) and value == b else None
-            case ast.PInt(value=i):
-                return {} if isinstance(value, int) and value == i else None
-            case ast.PDec(value=f):
-                return {} if isinstance(value, float) and value == f else None
-            case ast.PText(value=s):
-                return {} if isinstance(value, str) and value == s else None
-
-            case ast.PTuple(items=items):
-                if not isinstance(value, tuple):
-                    return None
-                if len(value) != len(items):
-                    return None
-                out: dict[str, object] = {}
-                for p, v in zip(items, value, strict=True):
-                    binds = self._match_pattern(p, v)
-                    if binds is None:
-                        return None
-                    if not merge_into(out, binds):
-                        raise SuayRuntimeError(
-                            "Duplicate name binder in pattern",
-                            span=pat.span,
-                            source=self.source,
-                            filename=self.filename,
-                        )
-                return out
-
-            case ast.PList(items=items, tail=tail):
-                if not isinstance(value, list):
-                    return None
-                if tail is None and len(value) != len(items):
-                    return None
-                if tail is not None and len(value) < len(items):
-                    return None
-                out: dict[str, object] = {}
-                for p, v in zip(items, value[: len(items)], strict=True):
-                    binds = self._match_pattern(p, v)
-                    if binds is None:
-                        return None
-                    if not merge_into(out, binds):
-                        raise SuayRuntimeError(
-                            "Duplicate name binder in pattern",
-                            span=pat.span,
-                            source=self.source,
-                            filename=self.filename,
-                        )
-                if tail is None:
-                    return out
-                rest = value[len(items) :]
-                tail_binds = self._match_pattern(tail, rest)
-                if tail_binds is None:
-                    return None
-                if not merge_into(out, tail_binds):
-                    raise SuayRuntimeError(
-                        "Duplicate name binder in pattern",
-                        span=pat.span,
-                        source=self.source,
-                        filename=self.filename,
-                    )
-                return out
-
-            case ast.PVariant(tag=tag, payload=payload_pat):
-                if not isinstance(value, Variant):
-                    return None
-                if value.tag != tag:
-                    return None
-                return self._match_pattern(payload_pat, value.payload)
-
-            case _:
-                raise SuayRuntimeError(
-                    f"Unsupported pattern: {type(pat).__name__}",
-                    span=pat.span,
-                    source=self.source,
-                    filename=self.filename,
-                )
+        except RecursionError:
+            # Report running out of host stack at the call that did, as the VM
+            # reports its own call-depth limit.
+            raise self._too_deep(call_span) from None
+
+    def _matcher(self, pat: ast.Pattern) -> Matcher:
+        # Each pattern is compiled once per interpreter. The matcher keeps its
+        # pattern alive, so an id() key cannot be reused by another pattern.
+        m = self._matchers.get(id(pat))
+        if m is None:
+            m = compile_pattern(pat)
+            self._matchers[id(pat)] = m
+        return m
+
+    def _bind_env(self, m: Matcher, value: object, parent: Env) -> Env:
+        env = Env(parent=parent, layout=m.layout)
+        if m.bind is not None:
+            m.bind(value, env.slots)
+        return env
 
     def _install_builtins(self, env: Env) -> None:
         def say(x: object) -> Unit:
@@ -725,17 +660,17 @@ class Interpreter:
         def abs1(x: object) -> int | float:
             if not _is_number(x):
                 raise SuayRuntimeError(
-                    f"abs expects a number, got {type(x).__name__}",
+                    f"abs expects a number, got {type_name(x)}",
                     source=self.source,
                     filename=self.filename,
                 )
             return -x if x < 0 else x  # type: ignore[operator]
 
         def count1(x: object) -> int:
-            if isinstance(x, (str, list, tuple, dict)):
+            if isinstance(x, (*TEXT_TYPES, tuple, *LIST_TYPES, *MAP_TYPES)):
                 return len(x)
             raise SuayRuntimeError(
-                f"count expects Text, List, Tuple, or Map; got {type(x).__name__}",
+                f"count expects Text, List, Tuple, or Map; got {type_name(x)}",
                 source=self.source,
                 filename=self.filename,
             )
@@ -743,12 +678,13 @@ class Interpreter:
         def at2(xs: object, i: object) -> object:
             if not isinstance(i, int) or isinstance(i, bool):
                 raise SuayRuntimeError(
-                    f"at expects an Int index; got {type(i).__name__}",
+                    f"at expects an Int index; got {type_name(i)}",
                     source=self.source,
                     filename=self.filename,
                 )
 
-            if isinstance(xs, str):
+            if isinstance(xs, TEXT_TYPES):
+                xs = str(xs)
                 n = len(xs)
                 j = i if i >= 0 else n + i
                 if j < 0 or j >= n:
@@ -759,7 +695,7 @@ class Interpreter:
                     )
                 return xs[j]
 
-            if isinstance(xs, (list, tuple)):
+            if isinstance(xs, (tuple, *LIST_TYPES)):
                 n = len(xs)
                 j = i if i >= 0 else n + i
                 if j < 0 or j >= n:
@@ -771,7 +707,7 @@ class Interpreter:
                 return xs[j]
 
             raise SuayRuntimeError(
-                f"at expects Text, List, or Tuple; got {type(xs).__name__}",
+                f"at expects Text, List, or Tuple; got {type_name(xs)}",
                 source=self.source,
                 filename=self.filename,
             )
@@ -779,7 +715,7 @@ class Interpreter:
         def take2(xs: object, n: object) -> object:
             if not isinstance(n, int) or isinstance(n, bool):
                 raise SuayRuntimeError(
-                    f"take expects an Int count; got {type(n).__name__}",
+                    f"take expects an Int count; got {type_name(n)}",
                     source=self.source,
                     filename=self.filename,
                 )
@@ -789,12 +725,12 @@ class Interpreter:
                     source=self.source,
                     filename=self.filename,
                 )
-            if isinstance(xs, str):
-                return xs[:n]
-            if isinstance(xs, list):
+            if isinstance(xs, TEXT_TYPES):
+                return str(xs)[:n]
+            if isinstance(xs, LIST_TYPES):
                 return xs[:n]
             raise SuayRuntimeError(
-                f"take expects Text or List; got {type(xs).__name__}",
+                f"take expects Text or List; got {type_name(xs)}",
                 source=self.source,
                 filename=self.filename,
             )
@@ -802,7 +738,7 @@ class Interpreter:
         def drop2(xs: object, n: object) -> object:
             if not isinstance(n, int) or isinstance(n, bool):
                 raise SuayRuntimeError(
-                    f"drop expects an Int count; got {type(n).__name__}",
+                    f"drop expects an Int count; got {type_name(n)}",
                     source=self.source,
                     filename=self.filename,
                 )
@@ -812,29 +748,29 @@ class Interpreter:
                     source=self.source,
                     filename=self.filename,
                 )
-            if isinstance(xs, str):
-                return xs[n:]
-            if isinstance(xs, list):
-                return xs[n:]
+            if isinstance(xs, TEXT_TYPES):
+                return str(xs)[n:]
+            if isinstance(xs, LIST_TYPES):
+                return list_tail(xs, n)
             raise SuayRuntimeError(
-                f"drop expects Text or List; got {type(xs).__name__}",
+                f"drop expects Text or List; got {type_name(xs)}",
                 source=self.source,
                 filename=self.filename,
             )
 
         def keys1(m: object) -> list[object]:
-            if not isinstance(m, dict):
+            if not isinstance(m, MAP_TYPES):
                 raise SuayRuntimeError(
-                    f"keys expects a Map, got {type(m).__name__}",
+                    f"keys expects a Map, got {type_name(m)}",
                     source=self.source,
                     filename=self.filename,
                 )
             return list(m.keys())
 
         def has2(m: object, k: object) -> bool:
-            if not isinstance(m, dict):
+            if not isinstance(m, MAP_TYPES):
                 raise SuayRuntimeError(
-                    f"has expects a Map, got {type(m).__name__}",
+                    f"has expects a Map, got {type_name(m)}",
                     source=self.source,
                     filename=self.filename,
                 )
@@ -847,16 +783,15 @@ class Interpreter:
                     filename=self.filename,
                 )
 
-        def put3(m: object, k: object, v: object) -> dict[object, object]:
-            if not isinstance(m, dict):
+        def put3(m: object, k: object, v: object) -> PMap:
+            if not isinstance(m, MAP_TYPES):
                 raise SuayRuntimeError(
-                    f"put expects a Map, got {type(m).__name__}",
+                    f"put expects a Map, got {type_name(m)}",
                     source=self.source,
                     filename=self.filename,
                 )
-            out = dict(m)
             try:
-                out[k] = v
+                out = pmap(m).set(k, v)
             except TypeError:
                 raise SuayRuntimeError(
                     "put expects a hashable key",
@@ -866,9 +801,9 @@ class Interpreter:
             return out
 
         def map1(fn: object, xs: object) -> list[object]:
-            if not isinstance(xs, list):
+            if not isinstance(xs, LIST_TYPES):
                 raise SuayRuntimeError(
-                    f"map expects a list, got {type(xs).__name__}",
+                    f"map expects a list, got {type_name(xs)}",
                     source=self.source,
                     filename=self.filename,
                 )
@@ -878,9 +813,9 @@ class Interpreter:
             return out
 
         def fold1(fn: object, init: object, xs: object) -> object:
-            if not isinstance(xs, list):
+            if not isinstance(xs, LIST_TYPES):
                 raise SuayRuntimeError(
-                    f"fold expects a list, got {type(xs).__name__}",
+                    f"fold expects a list, got {type_name(xs)}",
                     source=self.source,
                     filename=self.filename,
                 )
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+import re
 from dataclasses import dataclass
+from typing import Iterator, NoReturn
 
 from .errors import Diagnostic
-from .tokens import Position, Span, Token, TokenType
+from .tokens import Position, Span, Token, TokenType, line_index
 
 
 class LexError(Diagnostic):
@@ -121,6 +123,58 @@ _CANONICAL_LEXEME: dict[TokenType, str] = {
 }
 
 
+# -------- Fast path --------
+#
+# One master regex scans a token (or a run of whitespace/comment) at a time. It
+# only accepts input whose tokens it is sure to lex exactly like the
+# character-by-character scanner below: ASCII identifiers and numbers not
+# followed by further (non-ASCII) letters or digits, well-formed strings, and
+# the symbol tables. Where it does not match, `Lexer.iter_tokens` hands that one
+# token to the scanner and resumes after it, so results and `LexError`
+# positions are unchanged.
+
+_NON_ASCII_WORD = r"[^\W\x00-\x7f]"
+
+_FIXED: dict[str, tuple[TokenType, str]] = {
+    **{sym: (typ, _CANONICAL_LEXEME.get(typ, sym)) for sym, typ in _SYMBOLS.items()},
+    **{sym: (typ, _CANONICAL_LEXEME.get(typ, sym)) for sym, typ in _MULTI_SYMBOLS.items()},
+}
+
+# Alternatives are ordered by frequency; only `skip` must precede `fixed` (for
+# `//` and `#`). Leading blanks are consumed with the token.
+_FAST_TOKEN = re.compile(
+    r"[ \t\r]*(?:"
+    + "|".join(
+        [
+            rf"(?P<ident>(?>[A-Za-z_][A-Za-z0-9_]*))(?!{_NON_ASCII_WORD})",
+            # No backtracking into a shorter number at a non-ASCII digit.
+            rf"(?P<number>(?>[0-9]+(?:\.[0-9]+)?))(?!{_NON_ASCII_WORD}|\.{_NON_ASCII_WORD})",
+            r"(?P<skip>(?:[ \t\r]|(?:⍝|//|\#(?![tfu]))[^\n]*)+)",
+            "(?P<fixed>"
+            + "|".join(re.escape(k) for k in sorted(_MULTI_SYMBOLS, key=len, reverse=True))
+            + "|["
+            + "".join(re.escape(k) for k in _SYMBOLS)
+            + "])",
+            r"(?P<newline>\n)",
+            r'(?P<string>"(?:[^"\\\n]|\\[nt"\\])*")',
+        ]
+    )
+    + ")"
+)
+
+_STRING_ESCAPE = re.compile(r"\\(.)")
+_ESCAPES = {"n": "\n", "t": "\t", '"': '"', "\\": "\\"}
+
+
+_NEWLINE = TokenType.NEWLINE
+_IDENT = TokenType.IDENT
+_UNDERSCORE = TokenType.UNDERSCORE
+_INT = TokenType.INT
+_DEC = TokenType.DEC
+_STRING = TokenType.STRING
+_EOF = TokenType.EOF
+
+
 def _is_ident_start(ch: str) -> bool:
     if ch == "_":
         return True
@@ -134,8 +188,16 @@ def _is_ident_continue(ch: str) -> bool:
 
 @dataclass
 class Lexer:
+    """Turns source text into tokens.
+
+    With `fast` (the default) tokens come from the regex scanner where it
+    applies, which gives identical tokens; `fast=False` always uses the
+    per-character scanner.
+    """
+
     source: str
     filename: str | None = None
+    fast: bool = True
 
     def __post_init__(self) -> None:
         self._i = 0
@@ -144,58 +206,133 @@ class Lexer:
         self._line_start = 0
 
     def tokenize(self) -> list[Token]:
-        tokens: list[Token] = []
-        try:
+        return list(self.iter_tokens())
+
+    def iter_tokens(self) -> Iterator[Token]:
+        """Yield the tokens of `source` one at a time, ending with EOF.
+
+        Tokens are produced on demand, so a consumer (the parser, the formatter)
+        can start before the source is fully lexed, and a `LexError` is raised
+        only once lexing reaches it.
+        """
+
+        if not self.fast:
             while True:
-                self._skip_ws_and_comments(tokens)
-                if self._at_end():
-                    tokens.append(self._make_token(TokenType.EOF, "", None))
-                    return tokens
+                tok = self._scan_token()
+                yield tok
+                if tok.type is _EOF:
+                    return
+
+        source = self.source
+        match = _FAST_TOKEN.match
+        fixed = _FIXED
+        n = len(source)
+        i = 0
+        line = 1
+        line_start = 0
+        # The end of one token is the start of the next when nothing separates them;
+        # the Position is shared then.
+        prev_end = Position(0, 1, 1)
+        while i < n:
+            m = match(source, i)
+            if m is None:
+                # The scanner decides this token; resume from where it stopped.
+                self._i = i
+                self._line = line
+                self._line_start = line_start
+                self._col = i - line_start + 1
+                tok = self._scan_token()
+                yield tok
+                if tok.type is _EOF:
+                    return
+                i = self._i
+                line = self._line
+                line_start = self._line_start
+                prev_end = tok.span.end
+                continue
+            kind = m.lastgroup
+            j = m.end()
+            if kind == "skip":
+                i = j
+                continue
+            i = m.start(m.lastindex)  # type: ignore[arg-type]
+            start = prev_end if prev_end.offset == i else Position(i, line, i - line_start + 1)
+            if kind == "newline":
+                line += 1
+                line_start = j
+                prev_end = Position(j, line, 1)
+                yield Token(_NEWLINE, "\n", Span(start, prev_end))
+                i = j
+                continue
+            text = source[i:j]
+            prev_end = Position(j, line, j - line_start + 1)
+            span = Span(start, prev_end)
+            if kind == "fixed":
+                typ, lexeme = fixed[text]
+                yield Token(typ, lexeme, span)
+            elif kind == "ident":
+                if text == "_":
+                    yield Token(_UNDERSCORE, text, span)
+                else:
+                    yield Token(_IDENT, text, span, text)
+            elif kind == "number":
+                if "." in text:
+                    yield Token(_DEC, text, span, float(text))
+                else:
+                    yield Token(_INT, text, span, int(text))
+            else:
+                body = text[1:-1]
+                if "\\" in body:
+                    body = _STRING_ESCAPE.sub(lambda e: _ESCAPES[e.group(1)], body)
+                yield Token(_STRING, text, span, body)
+            i = j
+        eof = prev_end if prev_end.offset == n else Position(n, line, n - line_start + 1)
+        yield Token(_EOF, "", Span(eof, eof))
 
-                ch = self._peek()
+    def _scan_token(self) -> Token:
+        """Scan one token (skipping blanks and comments) from the current position."""
 
-                if ch == "\n":
-                    start = self._pos()
-                    self._advance()
-                    end = self._pos()
-                    tokens.append(Token(TokenType.NEWLINE, "\n", Span(start, end)))
-                    continue
+        try:
+            self._skip_ws_and_comments()
+            if self._at_end():
+                return self._make_token(TokenType.EOF, "", None)
 
-                if ch == '"':
-                    tokens.append(self._lex_string())
-                    continue
+            ch = self._peek()
 
-                if ch.isdigit():
-                    tokens.append(self._lex_number())
-                    continue
+            if ch == "\n":
+                start = self._pos()
+                self._advance()
+                end = self._pos()
+                return Token(TokenType.NEWLINE, "\n", Span(start, end))
 
-                # Multi-character ASCII aliases must be recognized before single-character
-                # symbol lexing and identifier lexing.
-                multi = self._try_lex_multi_symbol()
-                if multi is not None:
-                    tokens.append(multi)
-                    continue
+            if ch == '"':
+                return self._lex_string()
 
-                # Symbols (including alphabetic-looking glyphs like ø/⊤/⊥) must be recognized
-                # before identifier lexing.
-                if ch in _SYMBOLS:
-                    tokens.append(self._lex_symbol())
-                    continue
+            if ch.isdigit():
+                return self._lex_number()
 
-                if _is_ident_start(ch):
-                    tokens.append(self._lex_ident_or_underscore())
-                    continue
+            # Multi-character ASCII aliases must be recognized before single-character
+            # symbol lexing and identifier lexing.
+            multi = self._try_lex_multi_symbol()
+            if multi is not None:
+                return multi
+
+            # Symbols (including alphabetic-looking glyphs like ø/⊤/⊥) must be recognized
+            # before identifier lexing.
+            if ch in _SYMBOLS:
+                return self._lex_symbol()
 
-                # Two-character (currently none) could be handled here if added later.
+            if _is_ident_start(ch):
+                return self._lex_ident_or_underscore()
 
-                self._error(f"Unexpected character {ch!r}")
+            self._error(f"Unexpected character {ch!r}")
         except LexError:
             raise
         except Exception as e:
             # Defensive: convert internal lexer failures into a user-facing LexError.
             self._error(f"Internal lexer error: {type(e).__name__}: {e}")
 
-    def _skip_ws_and_comments(self, tokens: list[Token]) -> None:
+    def _skip_ws_and_comments(self) -> None:
         while not self._at_end():
             ch = self._peek()
             # Spaces/tabs are insignificant separators.
@@ -320,15 +457,9 @@ class Lexer:
         lexeme = self.source[start.offset : end.offset]
         return Token(TokenType.STRING, lexeme, Span(start, end), value="".join(chars))
 
-    def _error_at(self, pos: Position, message: str) -> None:
+    def _error_at(self, pos: Position, message: str) -> NoReturn:
         # Produce a LexError anchored at a given source position.
-        line_start = pos.offset - (max(pos.column, 1) - 1)
-        if line_start < 0:
-            line_start = 0
-        line_end = self.source.find("\n", line_start)
-        if line_end == -1:
-            line_end = len(self.source)
-        line_text = self.source[line_start:line_end] if self.source else None
+        line_text = line_index(self.source).line_text(pos.line) if self.source else None
         raise LexError(
             error_type="lexical",
             message=message,
@@ -367,7 +498,7 @@ class Lexer:
             self._col += 1
         return ch
 
-    def _error(self, message: str) -> None:
+    def _error(self, message: str) -> NoReturn:
         line_text = self._current_line_text()
         raise LexError(
             error_type="lexical",
@@ -382,8 +513,4 @@ class Lexer:
     def _current_line_text(self) -> str | None:
         if not self.source:
             return None
-        start = self._line_start
-        end = self.source.find("\n", start)
-        if end == -1:
-            end = len(self.source)
-        return self.source[start:end]
+        return line_index(self.source).line_text(self._line)
@@ -2,15 +2,30 @@ from __future__ import annotations
 
 import json
 import os
+import re
 import sys
 import threading
-from dataclasses import dataclass
-from typing import Any
+import time
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, replace
+from itertools import accumulate
+from pathlib import Path
+from typing import Any, Callable
 from urllib.parse import unquote, urlparse
 
 from .lexer import LexError, Lexer
 from .parser import ParseError, Parser
-from .tokens import Token, TokenType
+from .symbols import (
+    Ref,
+    Symbol,
+    SymbolTable,
+    WorkspaceIndex,
+    build_symbols,
+    module_path,
+    pick,
+    token_symbols,
+)
+from .tokens import Position, Span, Token, TokenType, line_index
 
 
 # ----------------------------
@@ -51,11 +66,16 @@ def _read_message() -> dict[str, Any] | None:
     return json.loads(raw.decode("utf-8"))
 
 
+# Responses come from the message loop, diagnostics from the worker thread.
+_write_lock = threading.Lock()
+
+
 def _send(payload: dict[str, Any]) -> None:
     data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
-    sys.stdout.buffer.write(f"Content-Length: {len(data)}\r\n\r\n".encode("ascii"))
-    sys.stdout.buffer.write(data)
-    sys.stdout.buffer.flush()
+    with _write_lock:
+        sys.stdout.buffer.write(f"Content-Length: {len(data)}\r\n\r\n".encode("ascii"))
+        sys.stdout.buffer.write(data)
+        sys.stdout.buffer.flush()
 
 
 def _respond(req_id: Any, result: Any) -> None:
@@ -88,18 +108,8 @@ def _uri_to_path(uri: str) -> str:
     return uri
 
 
-def _lsp_pos_to_offset(text: str, line0: int, ch0: int) -> int:
-    # LSP positions are 0-based. Treat character as Python codepoint index.
-    if line0 < 0:
-        return 0
-    lines = text.splitlines(keepends=True)
-    if line0 >= len(lines):
-        return len(text)
-    line_text = lines[line0]
-    # Clamp within the line (excluding newline)
-    raw_line = line_text.rstrip("\n").rstrip("\r")
-    ch0 = max(0, min(ch0, len(raw_line)))
-    return sum(len(lines[i]) for i in range(line0)) + ch0
+def _path_to_uri(path: str) -> str:
+    return Path(path).as_uri()
 
 
 def _pos_in_span(line1: int, col1: int, tok: Token) -> bool:
@@ -125,157 +135,439 @@ def _span_to_lsp_range(span) -> dict[str, Any]:
 # ----------------------------
 
 
-@dataclass(frozen=True)
-class DefInfo:
-    name: str
-    kind: str  # "function" | "binding"
-    name_span: Any
-    full_span: Any
-    params_text: str | None = None
+_BUILTIN_DOCS = {
+    "say": "builtin: say · x → ø (prints)",
+    "hear": "builtin: hear · prompt → Text (read a line from stdin)",
+    "text": "builtin: text · x → Text (stringify)",
+    "abs": "builtin: abs · n → Num",
+    "count": "builtin: count · x → Int (length of Text/List/Tuple/Map)",
+    "at": "builtin: at · xs · i → value (index Text/List/Tuple)",
+    "take": "builtin: take · xs · n → xs (prefix of Text/List)",
+    "drop": "builtin: drop · xs · n → xs (suffix of Text/List)",
+    "keys": "builtin: keys · map → List (map keys)",
+    "has": "builtin: has · map · key → Bool (map contains key)",
+    "put": "builtin: put · map · key · val → Map (returns new map)",
+    "map": "builtin: map · f · [a] → [b]",
+    "fold": "builtin: fold · f · init · [a] → b",
+    "link": "builtin: link · path · name → value (load module by file path)",
+}
+
+
+def _symbol_kind(sym: Symbol) -> int:
+    return 12 if sym.kind == "function" else 13  # Function or Variable
+
+
+def _find_ident_at(tokens: list[Token], line0: int, ch0: int) -> Token | None:
+    # Tokens are in source order, so the one that may hold the position is
+    # the last one starting at or before it.
+    line1 = line0 + 1
+    col1 = ch0 + 1
+    i = bisect_right(tokens, (line1, col1), key=lambda t: (t.span.start.line, t.span.start.column))
+    if i and tokens[i - 1].type == TokenType.IDENT and _pos_in_span(line1, col1, tokens[i - 1]):
+        return tokens[i - 1]
+    return None
+
+
+# ----------------------------
+# Documents (incremental sync)
+# ----------------------------
+#
+# A document is a list of forms: runs of whole lines holding one or more
+# top-level forms, each lexed and parsed on its own. After an edit only the
+# forms it touched are analyzed again; the forms after them are reused.
+#
+# This gives the same diagnostics as analyzing the whole text at once: tokens
+# never span lines, and a top-level form ends at a newline whatever follows
+# it. The exception is a parse error at the very end of a form's text (an
+# unclosed bracket, say), where the form may continue into the next lines; such
+# a form is merged with the forms after it.
+
+
+# Lines that may start a top-level form: not indented, not blank, and not a
+# closing bracket, dispatch arm or comment. This only chooses where forms are
+# cut; a cut inside a form is undone by merging.
+_FORM_START = re.compile(r"^(?=[^\s)\]}⟧⟫▷⍝])(?!//|\|>|#(?![tfu]))", re.MULTILINE)
 
 
 @dataclass
-class DocState:
-    uri: str
+class _Form:
+    """Whole lines of a document, lexed and parsed on their own.
+
+    Edits leave forms pending (`analyzed` false) until the next analysis. Lines
+    in `tokens`, `error` and `symbols` count from the form's first line; columns
+    are the document's. `open_end` means parsing failed at the end of `text`,
+    so the form may go on into the lines after it.
+    """
+
     text: str
-    version: int | None
+    lines: int
+    analyzed: bool = False
     tokens: list[Token] | None = None
-    defs: dict[str, list[DefInfo]] | None = None
+    error: LexError | ParseError | None = None
+    open_end: bool = False
+    symbols: SymbolTable | None = None
+
 
+def _pending_forms(text: str) -> list[_Form]:
+    cuts = [m.start() for m in _FORM_START.finditer(text)]
+    if not cuts or cuts[0] != 0:
+        cuts.insert(0, 0)
+    cuts.append(len(text))
+    return [_Form(text[a:b], text.count("\n", a, b)) for a, b in zip(cuts, cuts[1:]) if a < b]
 
-def _index_document(
-    uri: str, text: str
-) -> tuple[list[dict[str, Any]], list[Token] | None, dict[str, list[DefInfo]] | None]:
-    # Returns (diagnostics, tokens, defs). On lex/parse error, tokens/defs may be partial.
-    diagnostics: list[dict[str, Any]] = []
 
+def _analyze(text: str, filename: str | None) -> _Form:
+    lines = text.count("\n")
     try:
-        tokens = Lexer(text, filename=_uri_to_path(uri)).tokenize()
+        tokens = Lexer(text, filename=filename).tokenize()
     except LexError as e:
-        prefix = getattr(e, "error_type", "lexical")
-        diagnostics.append(
-            {
-                "range": {
-                    "start": {"line": e.line - 1, "character": e.column - 1},
-                    "end": {"line": e.line - 1, "character": e.column},
-                },
-                "severity": 1,
-                "source": "suay",
-                "message": f"{prefix} error: {e.message}",
-            }
-        )
-        return diagnostics, None, None
-
+        return _Form(text, lines, True, None, e)
     try:
-        Parser(tokens, text, filename=_uri_to_path(uri)).parse_program()
+        program = Parser(tokens, text, filename=filename).parse_program()
     except ParseError as e:
-        prefix = getattr(e, "error_type", "syntax")
-        diagnostics.append(
-            {
-                "range": {
-                    "start": {"line": e.line - 1, "character": e.column - 1},
-                    "end": {"line": e.line - 1, "character": e.column},
-                },
-                "severity": 1,
-                "source": "suay",
-                "message": f"{prefix} error: {e.message}",
-            }
-        )
-        # Still return tokens; defs can still be built best-effort.
-
-    defs = _extract_defs(text, tokens)
-    return diagnostics, tokens, defs
-
-
-def _extract_defs(text: str, tokens: list[Token]) -> dict[str, list[DefInfo]]:
-    defs: dict[str, list[DefInfo]] = {}
-
-    def add(di: DefInfo) -> None:
-        defs.setdefault(di.name, []).append(di)
-
-    i = 0
-    while i < len(tokens) - 2:
-        t0 = tokens[i]
-        t1 = tokens[i + 1]
-        # IDENT ← ...
-        if t0.type == TokenType.IDENT and t1.type == TokenType.ARROW_BIND:
-            name = str(t0.value)
-            kind = "binding"
-            params_text: str | None = None
-
-            # function if next non-newline token is ⌁
-            j = i + 2
-            while j < len(tokens) and tokens[j].type == TokenType.NEWLINE:
-                j += 1
-            if j < len(tokens) and tokens[j].type == TokenType.LAMBDA:
-                kind = "function"
-                params_text = _extract_lambda_params(text, tokens, j)
-
-            full_span = tokens[j].span if j < len(tokens) else t0.span
-            add(
-                DefInfo(
-                    name=name,
-                    kind=kind,
-                    name_span=t0.span,
-                    full_span=full_span,
-                    params_text=params_text,
+        eof = tokens[-1].span.start
+        open_end = (e.line, e.column) == (eof.line, eof.column)
+        return _Form(text, lines, True, tokens, e, open_end, token_symbols(text, tokens))
+    return _Form(text, lines, True, tokens, symbols=build_symbols(program, text))
+
+
+def _analyze_forms(
+    forms: list[_Form], pending: list[int], filename: str | None, cancelled: Callable[[], bool]
+) -> list[tuple[int, int, _Form]] | None:
+    """Analyze the pending forms, merging each form left open with what follows.
+
+    `pending` holds the indices of the forms to analyze, ascending; the others
+    are not looked at. An open form absorbs the forms after it, twice as many
+    each time, until it closes or reaches the end. Returns (i, j, form) for each
+    run `forms[i:j]` that `form` replaces, or None as soon as `cancelled()` is
+    true.
+    """
+
+    out: list[tuple[int, int, _Form]] = []
+    n = len(forms)
+    end = 0
+    for k in pending:
+        if k < end:
+            continue  # absorbed by the open form before it
+        if cancelled():
+            return None
+        text = forms[k].text
+        form = _analyze(text, filename)
+        end = k + 1
+        step = 1
+        while form.open_end and end < n:
+            more = forms[end : end + step]
+            end += len(more)
+            text += "".join(f.text for f in more)
+            if cancelled():
+                return None
+            form = _analyze(text, filename)
+            step *= 2
+        out.append((k, end, form))
+    return out
+
+
+def _rebase(bases: list[int], i: int, j: int, new: list[int]) -> None:
+    """Replace `bases[i : j + 1]` by `new`; the entries after it move along with its end."""
+
+    delta = new[-1] - bases[j]
+    if delta:
+        bases[j + 1 :] = [b + delta for b in bases[j + 1 :]]
+    bases[i : j + 1] = new
+
+
+def _renumber(indices: list[int], i: int, j: int, delta: int, new: list[int]) -> None:
+    """Replace the form indices in [i, j) of ascending `indices` by `new`; later ones move by `delta`."""
+
+    a = bisect_left(indices, i)
+    b = bisect_left(indices, j)
+    indices[a:] = new + [k + delta for k in indices[b:]]
+
+
+class _Forms:
+    """The forms of a document, where each starts, and which have errors.
+
+    Entry i of `line_base` is the line where form i starts; the last entry is
+    the line count. `sizes` holds the length of each form's text and `errors`
+    the indices of the forms with an error, ascending. `splice` keeps them in
+    step with work proportional to the forms replaced, plus a shift of the
+    line bases after them when the line count changes. Offsets move on every
+    keystroke, so they are only summed up from `sizes` when a query needs them.
+    """
+
+    __slots__ = ("items", "line_base", "sizes", "errors")
+
+    def __init__(self, items: list[_Form]) -> None:
+        self.items = items
+        self.line_base = list(accumulate((f.lines for f in items), initial=0))
+        self.sizes = [len(f.text) for f in items]
+        self.errors = [i for i, f in enumerate(items) if f.error is not None]
+
+    def copy(self) -> _Forms:
+        out = object.__new__(_Forms)
+        out.items = list(self.items)
+        out.line_base = list(self.line_base)
+        out.sizes = list(self.sizes)
+        out.errors = list(self.errors)
+        return out
+
+    def splice(self, i: int, j: int, new: list[_Form]) -> None:
+        """Replace forms `i` up to (not including) `j` by `new`."""
+
+        self.items[i:j] = new
+        self.sizes[i:j] = [len(f.text) for f in new]
+        _rebase(self.line_base, i, j, list(accumulate((f.lines for f in new), initial=self.line_base[i])))
+        errors = [i + t for t, f in enumerate(new) if f.error is not None]
+        _renumber(self.errors, i, j, len(new) - (j - i), errors)
+
+
+def _locate(forms: list[_Form], line_base: list[int], line0: int, ch0: int) -> tuple[int, int]:
+    """(form index, offset in its text) of an LSP position, clamped to the text."""
+
+    if line0 < 0:
+        return 0, 0
+    i = min(bisect_right(line_base, line0) - 1, len(forms) - 1)
+    text = forms[i].text
+    lines = line_index(text)
+    rel = line0 - line_base[i]
+    if rel >= lines.line_count:
+        return i, len(text)
+    start = lines.starts[rel]
+    # LSP positions are 0-based. Treat character as Python codepoint index.
+    raw_line = lines.line_text(rel + 1).rstrip("\r")
+    return i, start + max(0, min(ch0, len(raw_line)))
+
+
+def _shift_span(span: Span, lines: int, offset: int) -> Span:
+    s = span.start
+    e = span.end
+    return Span(
+        Position(s.offset + offset, s.line + lines, s.column),
+        Position(e.offset + offset, e.line + lines, e.column),
+    )
+
+
+class DocIndex:
+    """The analysis of one version of a document. Not changed once built."""
+
+    def __init__(self, forms: _Forms, edits: int) -> None:
+        self.forms = forms.items
+        self.edits = edits
+        # Entry i is the line where form i starts; the last entry is the line count.
+        self.line_base = forms.line_base
+        self._sizes = forms.sizes
+        self._errors = forms.errors
+        self._offset_base: list[int] | None = None
+        self._module: dict[str, tuple[list[int], list[tuple[int, int]]]] = {}
+
+    def _offsets(self) -> list[int]:
+        # Entry i is the offset where form i starts; the last entry is the length.
+        if self._offset_base is None:
+            self._offset_base = list(accumulate(self._sizes, initial=0))
+        return self._offset_base
+
+    def ident_at(self, line0: int, ch0: int) -> Token | None:
+        if not self.forms or line0 < 0:
+            return None
+        i = min(bisect_right(self.line_base, line0) - 1, len(self.forms) - 1)
+        tokens = self.forms[i].tokens
+        if tokens is None:
+            return None
+        return _find_ident_at(tokens, line0 - self.line_base[i], ch0)
+
+    def diagnostics(self) -> list[dict[str, Any]]:
+        # As for the whole text: the first lexical error wins over any syntax error.
+        first: tuple[LexError | ParseError, int] | None = None
+        for i in self._errors:
+            error = self.forms[i].error
+            assert error is not None
+            if isinstance(error, LexError):
+                return [_diagnostic(error, self.line_base[i])]
+            if first is None:
+                first = (error, self.line_base[i])
+        return [_diagnostic(*first)] if first else []
+
+    # -------- Symbols --------
+    #
+    # Each form has its own symbol table with form-relative spans. References
+    # a form leaves to the module scope are resolved against the module-scope
+    # definitions of all forms; symbols handed out have document spans.
+
+    def definition_at(self, line0: int, ch0: int) -> Symbol | None:
+        """The definition that the name at the position reads (or is)."""
+
+        if not self.forms or line0 < 0:
+            return None
+        i, off = _locate(self.forms, self.line_base, line0, ch0)
+        table = self.forms[i].symbols
+        ref = table.ref_at(off) if table is not None else None
+        key = self._resolve(i, ref) if ref is not None else None
+        return self._symbol(*key) if key is not None else None
+
+    def references_to(self, symbol: Symbol) -> list[Span]:
+        """Spans of every reference to `symbol` (from `definition_at`), its definition included."""
+
+        offsets = self._offsets()
+        i = bisect_right(offsets, symbol.span.start.offset) - 1
+        table = self.forms[i].symbols if 0 <= i < len(self.forms) else None
+        ref = table.ref_at(symbol.span.start.offset - offsets[i]) if table is not None else None
+        if ref is None or not ref.decl:
+            return []
+        if symbol.scope != 0:
+            return [self._shift(i, r.span) for r in table.uses(ref.symbol)]
+        key = (i, ref.symbol)
+        out = [self._shift(i, r.span) for r in table.uses(ref.symbol) if r.decl]
+        for k, form in enumerate(self.forms):
+            if form.symbols is not None:
+                out.extend(
+                    self._shift(k, r.span)
+                    for r in form.symbols.named(symbol.name)
+                    if self._resolve(k, r) == key
                 )
-            )
-        i += 1
-
-    # Sort by occurrence.
-    for name, lst in defs.items():
-        defs[name] = sorted(lst, key=lambda d: d.name_span.start.offset)
-    return defs
-
-
-def _extract_lambda_params(
-    text: str, tokens: list[Token], lambda_index: int
-) -> str | None:
-    # lambda token is at lambda_index. Find next LPAREN .. matching RPAREN.
-    i = lambda_index + 1
-    while i < len(tokens) and tokens[i].type == TokenType.NEWLINE:
-        i += 1
-    if i >= len(tokens) or tokens[i].type != TokenType.LPAREN:
-        return None
-    start = tokens[i].span.start.offset
-
-    depth = 0
-    while i < len(tokens):
-        if tokens[i].type == TokenType.LPAREN:
-            depth += 1
-        elif tokens[i].type == TokenType.RPAREN:
-            depth -= 1
-            if depth == 0:
-                end = tokens[i].span.end.offset
-                return text[start:end]
-        i += 1
-    return None
+        out.sort(key=lambda span: span.start.offset)
+        return out
 
+    def top_symbols(self) -> list[Symbol]:
+        """Module-scope definitions in source order."""
+
+        return [
+            self._symbol(i, k)
+            for i, form in enumerate(self.forms)
+            if form.symbols is not None
+            for k, sym in enumerate(form.symbols.symbols)
+            if sym.scope == 0
+        ]
+
+    def _resolve(self, i: int, ref: Ref) -> tuple[int, int] | None:
+        if ref.symbol is not None:
+            return i, ref.symbol
+        visible, keys = self._module_defs(ref.name)
+        if not keys:
+            return None
+        k = pick(visible, self._offsets()[i] + ref.span.start.offset, ref.late)
+        return None if k is None else keys[k]
+
+    def _module_defs(self, name: str) -> tuple[list[int], list[tuple[int, int]]]:
+        # (document offsets where the definitions of `name` become visible, (form, symbol) keys).
+        # Gathered per name on first use: a new index comes with every edit, and
+        # most are only asked about a few names, if any.
+        found = self._module.get(name)
+        if found is None:
+            visible: list[int] = []
+            keys: list[tuple[int, int]] = []
+            offsets = self._offsets()
+            for i, form in enumerate(self.forms):
+                table = form.symbols
+                if table is None or name not in table.module:
+                    continue
+                for k in table.module[name]:
+                    visible.append(offsets[i] + table.symbols[k].visible)
+                    keys.append((i, k))
+            found = self._module[name] = (visible, keys)
+        return found
+
+    def _symbol(self, i: int, k: int) -> Symbol:
+        sym = self.forms[i].symbols.symbols[k]
+        return replace(
+            sym,
+            span=self._shift(i, sym.span),
+            full_span=self._shift(i, sym.full_span),
+            visible=self._offsets()[i] + sym.visible,
+        )
 
-def _find_ident_at(tokens: list[Token], line0: int, ch0: int) -> Token | None:
-    line1 = line0 + 1
-    col1 = ch0 + 1
-    for t in tokens:
-        if t.type == TokenType.IDENT and _pos_in_span(line1, col1, t):
-            return t
-    return None
+    def _shift(self, i: int, span: Span) -> Span:
+        return _shift_span(span, self.line_base[i], self._offsets()[i])
 
 
-def _pick_def(
-    defs: dict[str, list[DefInfo]], name: str, before_offset: int
-) -> DefInfo | None:
-    lst = defs.get(name)
-    if not lst:
-        return None
-    # Pick the nearest definition occurring before the cursor.
-    best = None
-    for d in lst:
-        if d.name_span.start.offset <= before_offset:
-            best = d
-        else:
-            break
-    return best or lst[0]
+class DocState:
+    """An open document.
+
+    `apply_change` only edits the text, leaving the edited lines as pending
+    forms, so it is cheap enough for the message loop. `analyze` lexes and
+    parses what is pending and installs the result as `index`. Readers use
+    `index`, which trails the text by the edits made since it was built.
+    """
+
+    def __init__(self, uri: str, text: str, version: int | None) -> None:
+        self.uri = uri
+        self.version = version
+        self._filename = _uri_to_path(uri)
+        self._lock = threading.Lock()
+        self._edits = 0
+        self._forms = _Forms(_pending_forms(text))
+        # Indices of the forms left pending by edits, ascending.
+        self._pending = list(range(len(self._forms.items)))
+        self.index: DocIndex | None = None
+
+    @property
+    def forms(self) -> list[_Form]:
+        return self._forms.items
+
+    @property
+    def text(self) -> str:
+        return "".join(f.text for f in self._forms.items)
+
+    def apply_change(self, change: dict[str, Any]) -> None:
+        """Apply one `TextDocumentContentChangeEvent` (ranged, or full text)."""
+
+        rng = change.get("range")
+        new_text = change.get("text", "")
+        with self._lock:
+            self._edits += 1
+            forms = self._forms
+            if rng is None or not forms.items:
+                self._forms = _Forms(_pending_forms(new_text))
+                self._pending = list(range(len(self._forms.items)))
+                return
+            start = rng.get("start", {})
+            end = rng.get("end", {})
+            i, a = _locate(forms.items, forms.line_base, start.get("line", 0), start.get("character", 0))
+            j, b = _locate(forms.items, forms.line_base, end.get("line", 0), end.get("character", 0))
+            if (j, b) < (i, a):
+                i, a, j, b = j, b, i, a
+            new = _pending_forms(forms.items[i].text[:a] + new_text + forms.items[j].text[b:])
+            forms.splice(i, j + 1, new)
+            _renumber(self._pending, i, j + 1, len(new) - (j + 1 - i), list(range(i, i + len(new))))
+            if i and forms.items[i - 1].open_end:
+                # A form left open at the end takes in what now follows it.
+                k = bisect_left(self._pending, i - 1)
+                if self._pending[k : k + 1] != [i - 1]:
+                    self._pending.insert(k, i - 1)
+
+    def analyze(self) -> DocIndex | None:
+        """Bring `index` up to date with the text; None if an edit arrives meanwhile."""
+
+        with self._lock:
+            edits = self._edits
+            if self.index is not None and self.index.edits == edits:
+                return self.index
+            forms = list(self._forms.items)
+            pending = list(self._pending)
+        analyzed = _analyze_forms(forms, pending, self._filename, lambda: self._edits != edits)
+        if analyzed is None:
+            return None
+        with self._lock:
+            if self._edits != edits:
+                return None
+            # Later runs first, so that the indices of earlier ones still hold.
+            for i, j, form in reversed(analyzed):
+                self._forms.splice(i, j, [form])
+            self._pending = []
+            self.index = DocIndex(self._forms.copy(), edits)
+            return self.index
+
+
+def _diagnostic(e: LexError | ParseError, line_base: int = 0) -> dict[str, Any]:
+    line0 = line_base + e.line - 1
+    return {
+        "range": {
+            "start": {"line": line0, "character": e.column - 1},
+            "end": {"line": line0, "character": e.column},
+        },
+        "severity": 1,
+        "source": "suay",
+        "message": f"{e.error_type} error: {e.message}",
+    }
 
 
 # ----------------------------
@@ -283,13 +575,62 @@ def _pick_def(
 # ----------------------------
 
 
+class _DiagnosticsWorker(threading.Thread):
+    """Analyzes edited documents off the message loop and publishes diagnostics.
+
+    `schedule` restarts a document's delay, so a burst of edits is analyzed
+    once, after the last of them. An analysis overtaken by an edit is dropped;
+    that edit has scheduled the next one.
+    """
+
+    def __init__(self, server: SuayLspServer, delay: float) -> None:
+        super().__init__(name="suay-diagnostics", daemon=True)
+        self._server = server
+        self._delay = delay
+        self._cond = threading.Condition()
+        self._due: dict[str, float] = {}
+
+    def schedule(self, uri: str, *, now: bool = False) -> None:
+        with self._cond:
+            self._due[uri] = time.monotonic() + (0.0 if now else self._delay)
+            self._cond.notify()
+
+    def cancel(self, uri: str) -> None:
+        with self._cond:
+            self._due.pop(uri, None)
+
+    def _take(self) -> str:
+        with self._cond:
+            while True:
+                if not self._due:
+                    self._cond.wait()
+                    continue
+                uri, due = min(self._due.items(), key=lambda item: item[1])
+                wait = due - time.monotonic()
+                if wait <= 0:
+                    del self._due[uri]
+                    return uri
+                self._cond.wait(wait)
+
+    def run(self) -> None:
+        while True:
+            uri = self._take()
+            try:
+                self._server._publish_diagnostics(uri)
+            except Exception as e:
+                _notify("window/logMessage", {"type": 1, "message": f"diagnostics failed: {e}"})
+
+
 class SuayLspServer:
-    def __init__(self) -> None:
+    def __init__(self, *, debounce: float = 0.15) -> None:
         self._docs: dict[str, DocState] = {}
         self._lock = threading.Lock()
         self._shutdown = False
+        self._worker = _DiagnosticsWorker(self, debounce)
+        self._workspace = WorkspaceIndex(None)
 
     def run(self) -> None:
+        self._worker.start()
         while True:
             msg = _read_message()
             if msg is None:
@@ -302,12 +643,20 @@ class SuayLspServer:
         params = msg.get("params") or {}
 
         if method == "initialize":
+            root = params.get("rootUri") or params.get("rootPath")
+            folders = params.get("workspaceFolders") or []
+            if not root and folders:
+                root = folders[0].get("uri")
+            if root:
+                self._workspace = WorkspaceIndex(_uri_to_path(root))
             result = {
                 "capabilities": {
-                    "textDocumentSync": 1,  # Full sync
+                    "textDocumentSync": 2,  # Incremental sync
                     "definitionProvider": True,
                     "documentSymbolProvider": True,
                     "hoverProvider": True,
+                    "referencesProvider": True,
+                    "workspaceSymbolProvider": True,
                 }
             }
             _respond(req_id, result)
@@ -330,7 +679,10 @@ class SuayLspServer:
             text = td.get("text", "")
             version = td.get("version")
             if uri:
-                self._update_doc(uri, text, version)
+                doc = DocState(uri, text, version)
+                with self._lock:
+                    self._docs[uri] = doc
+                self._worker.schedule(uri, now=True)
             return
 
         if method == "textDocument/didChange":
@@ -339,9 +691,14 @@ class SuayLspServer:
             version = td.get("version")
             changes = params.get("contentChanges") or []
             if uri and changes:
-                # Full sync: take the full text.
-                text = changes[0].get("text", "")
-                self._update_doc(uri, text, version)
+                with self._lock:
+                    doc = self._docs.get(uri)
+                    if doc is None:
+                        doc = self._docs[uri] = DocState(uri, "", version)
+                    for change in changes:
+                        doc.apply_change(change)
+                    doc.version = version
+                self._worker.schedule(uri)
             return
 
         if method == "textDocument/didClose":
@@ -350,11 +707,21 @@ class SuayLspServer:
             if uri:
                 with self._lock:
                     self._docs.pop(uri, None)
+                self._worker.cancel(uri)
                 _notify(
                     "textDocument/publishDiagnostics", {"uri": uri, "diagnostics": []}
                 )
             return
 
+        if method == "workspace/didChangeWatchedFiles":
+            for ev in params.get("changes") or []:
+                path = _uri_to_path(ev.get("uri", ""))
+                if ev.get("type") == 1:  # Created
+                    self._workspace.add(path)
+                elif ev.get("type") == 3:  # Deleted
+                    self._workspace.discard(path)
+            return
+
         if method == "textDocument/definition":
             try:
                 _respond(req_id, self._on_definition(params))
@@ -376,24 +743,90 @@ class SuayLspServer:
                 _respond_error(req_id, -32603, f"internal error: {e}")
             return
 
+        if method == "textDocument/references":
+            try:
+                _respond(req_id, self._on_references(params))
+            except Exception as e:
+                _respond_error(req_id, -32603, f"internal error: {e}")
+            return
+
+        if method == "workspace/symbol":
+            try:
+                _respond(req_id, self._on_workspace_symbols(params))
+            except Exception as e:
+                _respond_error(req_id, -32603, f"internal error: {e}")
+            return
+
         # Unknown request with id
         if req_id is not None:
             _respond_error(req_id, -32601, f"Method not found: {method}")
 
-    def _update_doc(self, uri: str, text: str, version: int | None) -> None:
-        diagnostics, tokens, defs = _index_document(uri, text)
+    def _publish_diagnostics(self, uri: str) -> None:
+        doc = self._get_doc(uri)
+        if doc is None:
+            return
+        index = doc.analyze()
+        if index is None:
+            return
         with self._lock:
-            self._docs[uri] = DocState(
-                uri=uri, text=text, version=version, tokens=tokens, defs=defs
+            if self._docs.get(uri) is not doc:
+                return  # closed meanwhile
+            _notify(
+                "textDocument/publishDiagnostics",
+                {"uri": uri, "diagnostics": index.diagnostics()},
             )
-        _notify(
-            "textDocument/publishDiagnostics", {"uri": uri, "diagnostics": diagnostics}
-        )
 
     def _get_doc(self, uri: str) -> DocState | None:
         with self._lock:
             return self._docs.get(uri)
 
+    def _get_index(self, uri: str) -> DocIndex | None:
+        # Queries answer from the last analysis, even if edits have come in
+        # since; only a document never analyzed yet is analyzed here.
+        doc = self._get_doc(uri)
+        if doc is None:
+            return None
+        return doc.index or doc.analyze()
+
+    # -------- Workspace --------
+    #
+    # Open documents are seen through their last analysis, other files through
+    # the workspace index.
+
+    def _open_paths(self) -> dict[str, DocState]:
+        with self._lock:
+            docs = list(self._docs.values())
+        return {os.path.abspath(_uri_to_path(d.uri)): d for d in docs}
+
+    def _module_symbols(self, path: str, open_docs: dict[str, DocState]) -> list[Symbol]:
+        doc = open_docs.get(path)
+        if doc is not None:
+            index = doc.index or doc.analyze()
+            return index.top_symbols() if index is not None else []
+        table = self._workspace.table(path)
+        return [s for s in table.symbols if s.scope == 0] if table is not None else []
+
+    def _references(self, path: str, symbol: Symbol, open_docs: dict[str, DocState]) -> list[Span]:
+        doc = open_docs.get(path)
+        if doc is not None:
+            index = doc.index or doc.analyze()
+            return index.references_to(symbol) if index is not None else []
+        table = self._workspace.table(path)
+        ref = table.ref_at(symbol.span.start.offset) if table is not None else None
+        if ref is None or not ref.decl:
+            return []
+        return [r.span for r in table.references(ref.symbol)]
+
+    def _linked(self, path: str, symbol: Symbol, open_docs: dict[str, DocState]) -> tuple[str, Symbol] | None:
+        # The module-scope definition that `x ← link · path · name` binds
+        # (the last one: a module exports its final bindings).
+        assert symbol.link is not None
+        target = module_path(path, symbol.link[0])
+        defs = [s for s in self._module_symbols(target, open_docs) if s.name == symbol.link[1]]
+        return (target, defs[-1]) if defs else None
+
+    # -------- Requests --------
+
     def _on_definition(self, params: dict[str, Any]) -> Any:
         td = params.get("textDocument", {})
         uri = td.get("uri")
@@ -401,94 +834,144 @@ class SuayLspServer:
         if not uri:
             return None
 
-        doc = self._get_doc(uri)
-        if not doc or not doc.tokens or not doc.defs:
-            return None
-
-        tok = _find_ident_at(doc.tokens, pos.get("line", 0), pos.get("character", 0))
-        if tok is None:
+        index = self._get_index(uri)
+        if not index:
             return None
-
-        name = str(tok.value)
-        before = _lsp_pos_to_offset(
-            doc.text, pos.get("line", 0), pos.get("character", 0)
-        )
-        di = _pick_def(doc.defs, name, before)
-        if di is None:
+        sym = index.definition_at(pos.get("line", 0), pos.get("character", 0))
+        if sym is None:
             return None
 
+        if sym.link is not None:
+            path = os.path.abspath(_uri_to_path(uri))
+            linked = self._linked(path, sym, self._open_paths())
+            if linked is not None:
+                return {"uri": _path_to_uri(linked[0]), "range": _span_to_lsp_range(linked[1].span)}
         return {
             "uri": uri,
-            "range": _span_to_lsp_range(di.name_span),
+            "range": _span_to_lsp_range(sym.span),
         }
 
+    def _on_references(self, params: dict[str, Any]) -> Any:
+        td = params.get("textDocument", {})
+        uri = td.get("uri")
+        pos = params.get("position", {})
+        include_decl = (params.get("context") or {}).get("includeDeclaration", True)
+        if not uri:
+            return []
+        index = self._get_index(uri)
+        if not index:
+            return []
+        sym = index.definition_at(pos.get("line", 0), pos.get("character", 0))
+        if sym is None:
+            return []
+        if sym.scope != 0:
+            spans = index.references_to(sym)
+            return [
+                {"uri": uri, "range": _span_to_lsp_range(span)}
+                for span in spans
+                if include_decl or span != sym.span
+            ]
+
+        # A module-scope name is also referenced from the modules that link it;
+        # an imported name stands for the definition it links to.
+        open_docs = self._open_paths()
+        home = os.path.abspath(_uri_to_path(uri))
+        if sym.link is not None:
+            linked = self._linked(home, sym, open_docs)
+            if linked is not None:
+                home, sym = linked
+        out = [
+            {"uri": _path_to_uri(home), "range": _span_to_lsp_range(span)}
+            for span in self._references(home, sym, open_docs)
+            if include_decl or span != sym.span
+        ]
+        for path in sorted(set(self._workspace.files()) | set(open_docs)):
+            if path == home:
+                continue
+            for imp in self._module_symbols(path, open_docs):
+                if (
+                    imp.link is not None
+                    and imp.link[1] == sym.name
+                    and module_path(path, imp.link[0]) == home
+                ):
+                    out.extend(
+                        {"uri": _path_to_uri(path), "range": _span_to_lsp_range(span)}
+                        for span in self._references(path, imp, open_docs)
+                    )
+        return out
+
     def _on_document_symbols(self, params: dict[str, Any]) -> Any:
         td = params.get("textDocument", {})
         uri = td.get("uri")
         if not uri:
             return []
-        doc = self._get_doc(uri)
-        if not doc or not doc.defs:
+        index = self._get_index(uri)
+        if not index:
             return []
 
         out: list[dict[str, Any]] = []
-        for name, defs_list in doc.defs.items():
+        seen: set[str] = set()
+        for d in index.top_symbols():
             # Prefer first occurrence for symbol list.
-            d = defs_list[0]
-            kind = 12 if d.kind == "function" else 13  # Function or Variable
+            if d.name in seen:
+                continue
+            seen.add(d.name)
             out.append(
                 {
-                    "name": name,
-                    "kind": kind,
+                    "name": d.name,
+                    "kind": _symbol_kind(d),
                     "range": _span_to_lsp_range(d.full_span),
-                    "selectionRange": _span_to_lsp_range(d.name_span),
+                    "selectionRange": _span_to_lsp_range(d.span),
                 }
             )
         # Sort for stable UI
         out.sort(key=lambda s: s["name"])
         return out
 
+    def _on_workspace_symbols(self, params: dict[str, Any]) -> Any:
+        query = str(params.get("query") or "").lower()
+        open_docs = self._open_paths()
+        out: list[dict[str, Any]] = []
+        for path in sorted(set(self._workspace.files()) | set(open_docs)):
+            for d in self._module_symbols(path, open_docs):
+                if query in d.name.lower():
+                    out.append(
+                        {
+                            "name": d.name,
+                            "kind": _symbol_kind(d),
+                            "location": {"uri": _path_to_uri(path), "range": _span_to_lsp_range(d.span)},
+                        }
+                    )
+        return out
+
     def _on_hover(self, params: dict[str, Any]) -> Any:
         td = params.get("textDocument", {})
         uri = td.get("uri")
         pos = params.get("position", {})
         if not uri:
             return None
-        doc = self._get_doc(uri)
-        if not doc or not doc.tokens:
+        index = self._get_index(uri)
+        if not index:
             return None
 
-        tok = _find_ident_at(doc.tokens, pos.get("line", 0), pos.get("character", 0))
+        line0, ch0 = pos.get("line", 0), pos.get("character", 0)
+        tok = index.ident_at(line0, ch0)
         if tok is None:
             return None
         name = str(tok.value)
-
-        builtins = {
-            "say": "builtin: say · x → ø (prints)",
-            "hear": "builtin: hear · prompt → Text (read a line from stdin)",
-            "text": "builtin: text · x → Text (stringify)",
-            "abs": "builtin: abs · n → Num",
-            "count": "builtin: count · x → Int (length of Text/List/Tuple/Map)",
-            "at": "builtin: at · xs · i → value (index Text/List/Tuple)",
-            "take": "builtin: take · xs · n → xs (prefix of Text/List)",
-            "drop": "builtin: drop · xs · n → xs (suffix of Text/List)",
-            "keys": "builtin: keys · map → List (map keys)",
-            "has": "builtin: has · map · key → Bool (map contains key)",
-            "put": "builtin: put · map · key · val → Map (returns new map)",
-            "map": "builtin: map · f · [a] → [b]",
-            "fold": "builtin: fold · f · init · [a] → b",
-            "link": "builtin: link · path · name → value (load module by file path)",
-        }
-
-        if name in builtins:
-            contents = builtins[name]
-        elif doc.defs and name in doc.defs:
-            d = doc.defs[name][0]
-            if d.kind == "function":
-                sig = d.params_text or "(?)"
-                contents = f"function {name}{sig}"
+        sym = index.definition_at(line0, ch0)
+
+        if sym is not None:
+            if sym.kind == "function":
+                contents = f"function {name}{sym.detail or '(?)'}"
+            elif sym.link is not None:
+                contents = f'binding {name} ← link · "{sym.link[0]}" · "{sym.link[1]}"'
+            elif sym.kind == "parameter":
+                contents = f"parameter {name}"
             else:
                 contents = f"binding {name}"
+        elif name in _BUILTIN_DOCS:
+            contents = _BUILTIN_DOCS[name]
         else:
             contents = f"name {name}"
 
@@ -0,0 +1,398 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Iterable
+
+from . import ast
+from .bytecode import BINARY_OPCODES, Code, Instr, SwitchTable
+from .runtime import UNIT
+
+
+# Pass names, in the order they run on each round.
+PASSES: tuple[str, ...] = ("fold", "match", "scopes", "jumps", "dead")
+
+# What `Compiler(optimize=level)` enables. Level 1 only rewrites control flow and
+# scopes; level 2 also evaluates constant expressions and simplifies matches.
+LEVEL_PASSES: dict[int, tuple[str, ...]] = {
+    0: (),
+    1: ("scopes", "jumps", "dead"),
+    2: PASSES,
+}
+
+_JUMPS = frozenset({"JMP", "JMP_IF_FALSE", "JMP_IF_TRUE", "JMP_IF_NONE"})
+
+_BINARY = frozenset({"BINARY", *BINARY_OPCODES.values()})
+
+# Ops that address envs by depth or define names; a region containing any of them
+# cannot have an env removed around it.
+_ENV_SENSITIVE = frozenset(
+    {
+        "DEF",
+        "DEF_LOCAL",
+        "LOAD_LOCAL",
+        "LOAD_DEREF",
+        "LOAD_NAME",
+        "SET_LOCAL",
+        "SET_DEREF",
+        "MAKE_CLOSURE",
+        "PUSH_ENV",
+        "PUSH_ENV_BIND",
+        "MATCH_ARM",
+    }
+)
+
+_MAX_ROUNDS = 16
+
+
+@dataclass
+class OptimizeStats:
+    """Instructions removed per pass, summed over every optimized `Code`."""
+
+    removed: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def total_removed(self) -> int:
+        return sum(self.removed.values())
+
+    def add(self, pass_name: str, n: int) -> None:
+        if n:
+            self.removed[pass_name] = self.removed.get(pass_name, 0) + n
+
+
+def passes_for_level(level: int) -> tuple[str, ...]:
+    if level <= 0:
+        return ()
+    return LEVEL_PASSES.get(level, PASSES)
+
+
+def optimize_code(
+    code: Code, passes: Iterable[str], *, stats: OptimizeStats | None = None
+) -> Code:
+    """Return an optimized copy of `code` (nested closure bodies are not visited).
+
+    Passes run in `PASSES` order, repeatedly, until a round removes nothing.
+    """
+
+    enabled = set(passes)
+    unknown = enabled - set(PASSES)
+    if unknown:
+        raise ValueError(f"Unknown optimizer pass: {sorted(unknown)[0]}")
+    if stats is None:
+        stats = OptimizeStats()
+
+    instrs = list(code.instrs)
+    for _ in range(_MAX_ROUNDS):
+        changed = False
+        for name in PASSES:
+            if name not in enabled:
+                continue
+            before = len(instrs)
+            instrs, did = _PASS_FUNCS[name](instrs)
+            stats.add(name, before - len(instrs))
+            changed = changed or did
+        if not changed:
+            break
+
+    if instrs == code.instrs:
+        return code
+    return Code(
+        name=code.name,
+        instrs=instrs,
+        param_layouts=code.param_layouts,
+        flat_params=code.flat_params,
+    )
+
+
+# -------- Helpers --------
+
+
+def _jump_targets(instrs: list[Instr]) -> set[int]:
+    out = {int(ins.arg) for ins in instrs if ins.op in _JUMPS}
+    for ins in instrs:
+        if ins.op == "SWITCH":
+            out.update(ins.arg.targets())
+    return out
+
+
+def _remap(ins: Instr, remap: list[int]) -> Instr:
+    if ins.op in _JUMPS:
+        return Instr(ins.op, remap[int(ins.arg)], ins.span)
+    if ins.op == "SWITCH":
+        table: SwitchTable = ins.arg
+        return Instr(ins.op, table.retarget(lambda t: remap[t]), ins.span)
+    return ins
+
+
+def _rewrite(instrs: list[Instr], edits: dict[int, list[Instr]]) -> list[Instr]:
+    """Replace instruction i by `edits[i]` (possibly empty) and remap jumps.
+
+    A jump to a removed instruction lands on whatever replaced it, or on the next
+    surviving instruction.
+    """
+
+    remap = [0] * (len(instrs) + 1)
+    out: list[Instr] = []
+    for i, ins in enumerate(instrs):
+        remap[i] = len(out)
+        out.extend(edits.get(i, (ins,)))
+    remap[len(instrs)] = len(out)
+    return [_remap(ins, remap) for ins in out]
+
+
+def _is_number(v: object) -> bool:
+    return isinstance(v, (int, float)) and not isinstance(v, bool)
+
+
+def _truthy(v: object) -> bool:
+    if v is UNIT:
+        return False
+    if isinstance(v, bool):
+        return v
+    return True
+
+
+_NO_FOLD = object()
+
+
+def _fold_binary(op: str, a: object, b: object) -> object:
+    # Only cases where the VM cannot raise; everything else is left to runtime so
+    # errors keep their messages and spans. That includes arithmetic Python
+    # itself rejects, such as a huge int ÷ 3 or a huge int + 0.5 (OverflowError).
+    if _is_number(a) and _is_number(b):
+        try:
+            if op == "+":
+                return a + b  # type: ignore[operator]
+            if op in ("−", "-"):
+                return a - b  # type: ignore[operator]
+            if op in ("×", "*"):
+                return a * b  # type: ignore[operator]
+            if op in ("÷", "/") and b != 0:
+                return a / b  # type: ignore[operator]
+            if op == "%" and b != 0:
+                return a % b  # type: ignore[operator]
+        except ArithmeticError:
+            return _NO_FOLD
+    if (_is_number(a) and _is_number(b)) or (isinstance(a, str) and isinstance(b, str)):
+        if op == "<":
+            return a < b  # type: ignore[operator]
+        if op == "≤":
+            return a <= b  # type: ignore[operator]
+        if op == ">":
+            return a > b  # type: ignore[operator]
+        if op == "≥":
+            return a >= b  # type: ignore[operator]
+    if isinstance(a, str) and isinstance(b, str) and op == "⊞":
+        return a + b
+    if op == "=":
+        return a == b
+    if op == "≠":
+        return a != b
+    return _NO_FOLD
+
+
+def _fold_unary(op: str, v: object) -> object:
+    if op == "¬":
+        return not _truthy(v)
+    if op in ("−", "-") and _is_number(v):
+        return -v  # type: ignore[operator]
+    return _NO_FOLD
+
+
+# -------- Passes --------
+#
+# Each pass takes the instruction list and returns (new list, changed). Rewrites
+# never start in the middle of a sequence that something jumps into.
+
+
+def _pass_fold(instrs: list[Instr]) -> tuple[list[Instr], bool]:
+    targets = _jump_targets(instrs)
+    edits: dict[int, list[Instr]] = {}
+    i = 0
+    n = len(instrs)
+    while i < n:
+        a = instrs[i]
+        if a.op != "CONST":
+            i += 1
+            continue
+        b = instrs[i + 1] if i + 1 < n else None
+        c = instrs[i + 2] if i + 2 < n else None
+        if (
+            b is not None
+            and c is not None
+            and b.op == "CONST"
+            and c.op in _BINARY
+            and i + 1 not in targets
+            and i + 2 not in targets
+        ):
+            v = _fold_binary(str(c.arg), a.arg, b.arg)
+            if v is not _NO_FOLD:
+                edits[i] = [Instr("CONST", v, c.span)]
+                edits[i + 1] = []
+                edits[i + 2] = []
+                i += 3
+                continue
+        if b is not None and i + 1 not in targets:
+            if b.op == "UNARY":
+                v = _fold_unary(str(b.arg), a.arg)
+                if v is not _NO_FOLD:
+                    edits[i] = [Instr("CONST", v, b.span)]
+                    edits[i + 1] = []
+                    i += 2
+                    continue
+            elif b.op == "TO_BOOL":
+                edits[i] = [Instr("CONST", _truthy(a.arg), b.span)]
+                edits[i + 1] = []
+                i += 2
+                continue
+            elif b.op in ("JMP_IF_FALSE", "JMP_IF_TRUE"):
+                taken = _truthy(a.arg) == (b.op == "JMP_IF_TRUE")
+                edits[i] = [Instr("JMP", b.arg, b.span)] if taken else []
+                edits[i + 1] = []
+                i += 2
+                continue
+        i += 1
+    if not edits:
+        return instrs, False
+    return _rewrite(instrs, edits), True
+
+
+def _pass_match(instrs: list[Instr]) -> tuple[list[Instr], bool]:
+    # Arms whose pattern always matches:
+    #   MATCH_ARM _ (no env); JMP -> POP
+    #   MATCH_ARM x (env);    JMP -> PUSH_ENV; DEF_LOCAL x; POP
+    targets = _jump_targets(instrs)
+    edits: dict[int, list[Instr]] = {}
+    i = 0
+    n = len(instrs)
+    while i + 1 < n:
+        arm = instrs[i]
+        if arm.op != "MATCH_ARM" or i + 1 in targets:
+            i += 1
+            continue
+        matcher, layout = arm.arg
+        if not matcher.irrefutable:
+            i += 1
+            continue
+        pat = matcher.pattern
+        if layout is None:
+            edits[i] = [Instr("POP", None, arm.span)]
+        elif isinstance(pat, ast.PName) and pat.name in layout.index:
+            edits[i] = [
+                Instr("PUSH_ENV", layout, arm.span),
+                Instr("DEF_LOCAL", (layout.index[pat.name], pat.name), arm.span),
+                Instr("POP", None, arm.span),
+            ]
+        else:
+            i += 1
+            continue
+        edits[i + 1] = []
+        i += 2
+    if not edits:
+        return instrs, False
+    return _rewrite(instrs, edits), True
+
+
+def _pass_scopes(instrs: list[Instr]) -> tuple[list[Instr], bool]:
+    # PUSH_ENV with nothing declared, around straight-line code that neither
+    # defines names nor addresses envs by depth, is unobservable.
+    targets = _jump_targets(instrs)
+    edits: dict[int, list[Instr]] = {}
+    for i, ins in enumerate(instrs):
+        if ins.op != "PUSH_ENV" or (ins.arg is not None and ins.arg.names):
+            continue
+        for j in range(i + 1, len(instrs)):
+            op = instrs[j].op
+            if j in targets:
+                break
+            if op == "POP_ENV":
+                edits[i] = []
+                edits[j] = []
+                break
+            if op in _ENV_SENSITIVE or op in _JUMPS or op in ("HALT", "RAISE", "SWITCH"):
+                break
+        if edits:
+            # One pair per round keeps nested pairs simple; the driver iterates.
+            break
+    if not edits:
+        return instrs, False
+    return _rewrite(instrs, edits), True
+
+
+def _pass_jumps(instrs: list[Instr]) -> tuple[list[Instr], bool]:
+    edits: dict[int, list[Instr]] = {}
+    n = len(instrs)
+
+    def final_target(t: int) -> int:
+        seen: set[int] = set()
+        while t < n and instrs[t].op == "JMP" and t not in seen:
+            seen.add(t)
+            t = int(instrs[t].arg)
+        return t
+
+    for i, ins in enumerate(instrs):
+        if ins.op not in _JUMPS:
+            continue
+        t = final_target(int(ins.arg))
+        if i > 0 and instrs[i - 1].op == "MATCH_ARM":
+            # MATCH_ARM reads its failure target from this JMP; it is never
+            # executed, so it may be retargeted but must stay a JMP.
+            if t != int(ins.arg):
+                edits[i] = [Instr(ins.op, t, ins.span)]
+            continue
+        if ins.op == "JMP":
+            if t == i + 1:
+                edits[i] = []
+                continue
+            if t < n and instrs[t].op in ("HALT", "RAISE"):
+                # Jumping to an exit is the exit itself.
+                edits[i] = [Instr(instrs[t].op, instrs[t].arg, instrs[t].span)]
+                continue
+        elif t == i + 1 and ins.op in ("JMP_IF_FALSE", "JMP_IF_TRUE"):
+            edits[i] = [Instr("POP", None, ins.span)]
+            continue
+        if t != int(ins.arg):
+            edits[i] = [Instr(ins.op, t, ins.span)]
+    if not edits:
+        return instrs, False
+    # A retargeted jump has the same length; only report a change if it matters.
+    return _rewrite(instrs, edits), True
+
+
+def _pass_dead(instrs: list[Instr]) -> tuple[list[Instr], bool]:
+    n = len(instrs)
+    reachable = [False] * n
+    work = [0] if n else []
+    while work:
+        pc = work.pop()
+        if pc >= n or reachable[pc]:
+            continue
+        reachable[pc] = True
+        ins = instrs[pc]
+        if ins.op in ("HALT", "RAISE"):
+            continue
+        if ins.op == "MATCH_ARM":
+            # Fails via the JMP at pc + 1, succeeds at pc + 2.
+            work.append(pc + 1)
+            work.append(pc + 2)
+            continue
+        if ins.op == "SWITCH":
+            work.extend(ins.arg.targets())
+            continue
+        if ins.op in _JUMPS:
+            work.append(int(ins.arg))
+            if ins.op == "JMP":
+                continue
+        work.append(pc + 1)
+    edits: dict[int, list[Instr]] = {i: [] for i in range(n) if not reachable[i]}
+    if not edits:
+        return instrs, False
+    return _rewrite(instrs, edits), True
+
+
+_PASS_FUNCS = {
+    "fold": _pass_fold,
+    "match": _pass_match,
+    "scopes": _pass_scopes,
+    "jumps": _pass_jumps,
+    "dead": _pass_dead,
+}
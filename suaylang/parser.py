@@ -1,37 +1,88 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from typing import Any, Callable, Generator, Iterable, NoReturn
 
 from . import ast
 from .errors import Diagnostic
-from .tokens import Span, Token, TokenType
+from .lexer import LexError
+from .patterns import duplicate_binder
+from .tokens import Span, Token, TokenType, line_index
 
 
 class ParseError(Diagnostic):
     pass
 
 
+# A parse step: yields the sub-parses it needs and returns its node (see `Parser._run`).
+_Parse = Generator["_Parse", Any, Any]
+
+# Binding power of the binary operators; all are left-associative.
+_BINARY_PREC: dict[TokenType, int] = {
+    TokenType.OR: 1,
+    TokenType.AND: 2,
+    TokenType.EQ: 3,
+    TokenType.NEQ: 3,
+    TokenType.LT: 3,
+    TokenType.LTE: 3,
+    TokenType.GT: 3,
+    TokenType.GTE: 3,
+    TokenType.PLUS: 4,
+    TokenType.MINUS: 4,
+    TokenType.CONCAT: 4,
+    TokenType.MUL: 5,
+    TokenType.DIV: 5,
+    TokenType.MOD: 5,
+}
+
+
 @dataclass
 class Parser:
-    tokens: list[Token]
+    """Parser for programs, expressions and patterns.
+
+    Expressions are parsed without Python recursion: each nesting construct is
+    a generator driven from an explicit stack by `_run`, and binary operators
+    are one precedence-climbing loop. Patterns are still recursive descent.
+
+    `tokens` may be a list or any iterable of tokens ending with EOF, such as
+    `Lexer.iter_tokens()`. It is read once, front to back, and only the current
+    token plus one token of lookahead are held, so lexing and parsing overlap
+    and neither keeps the whole token stream. With a lazy stream a `LexError`
+    surfaces when the parser reaches it, after any earlier `ParseError`.
+    """
+
+    tokens: Iterable[Token]
     source: str
     filename: str | None = None
 
     def __post_init__(self) -> None:
-        self._i = 0
-        self._line_starts = self._compute_line_starts(self.source)
+        self._stream = iter(self.tokens)
+        self._tok: Token | None = None
+        self._ahead: Token | None = None
+        self._prev: Token | None = None
 
     # ---------- Public API ----------
 
     def parse_program(self) -> ast.Program:
+        items: list[ast.Expr] = []
+        span = self.parse_forms(items.append)
+        return ast.Program(items=items, span=span)
+
+    def parse_forms(self, emit: Callable[[ast.Expr], object]) -> Span:
+        """Parse a program, handing each top-level form to `emit` once it is parsed.
+
+        Returns the program's span. Nothing is kept of a form after `emit`, so a
+        caller that stores forms in another shape (see `arena.parse_arena`)
+        never holds the whole tree.
+        """
+
+        self._tok = next(self._stream)
         try:
             self._skip_newlines()
-            items: list[ast.Expr] = []
             start = self._peek().span.start
 
             while not self._check(TokenType.EOF):
-                expr = self._parse_expr()
-                items.append(expr)
+                emit(self._parse_expr())
 
                 # Top-level requires line breaks between expressions.
                 if not (self._check(TokenType.NEWLINE) or self._check(TokenType.EOF)):
@@ -41,8 +92,8 @@ class Parser:
                 self._skip_newlines()
 
             end = self._peek().span.end
-            return ast.Program(items=items, span=Span(start, end))
-        except ParseError:
+            return Span(start, end)
+        except (ParseError, LexError):
             raise
         except RecursionError:
             # Provide a clean, user-facing error when Python recursion is exhausted.
@@ -73,13 +124,81 @@ class Parser:
                 context_line=ctx,
             )
 
-    # ---------- Expressions (precedence climbing) ----------
+    # ---------- Expressions ----------
+    #
+    # Nesting does not use Python recursion. A construct that contains
+    # sub-expressions is a generator: it yields the generator for each
+    # sub-expression, `_run` keeps those on an explicit stack, and the parsed
+    # node is sent back. Literals and names are parsed directly, and the binary
+    # operator levels are a single precedence-climbing loop in `_expr`.
 
     def _parse_expr(self) -> ast.Expr:
-        return self._parse_dispatch()
+        return self._run(self._expr(True))
 
-    def _parse_dispatch(self) -> ast.Expr:
-        expr = self._parse_or()
+    @staticmethod
+    def _run(gen: _Parse) -> ast.Expr:
+        stack = [gen]
+        value: ast.Expr | None = None
+        while True:
+            try:
+                sub = stack[-1].send(value)
+            except StopIteration as stop:
+                stack.pop()
+                if not stack:
+                    return stop.value
+                value = stop.value
+            else:
+                stack.append(sub)
+                value = None
+
+    def _expr(self, dispatch: bool) -> _Parse:
+        """operand (binop operand)*, then `▷ ⟪ arms ⟫` suffixes when `dispatch`.
+
+        An operand is `[¬|-] variant (· [¬|-] variant)*`: calls bind tighter than
+        prefix operators. Cycle seeds are parsed with `dispatch=False` because
+        the ▷ after the seed belongs to the cycle.
+        """
+
+        operands: list[ast.Expr] = []
+        ops: list[tuple[int, str]] = []
+        while True:
+            unary = self._previous() if self._match(TokenType.NOT, TokenType.MINUS) else None
+            expr = self._atom(True)
+            if expr is None:
+                expr = yield self._compound(True)
+            while self._match(TokenType.CALL):
+                # Allow prefix operators in call arguments (e.g. f · -7) without
+                # making call-chains right-associative.
+                arg_op = self._previous() if self._match(TokenType.NOT, TokenType.MINUS) else None
+                arg = self._atom(True)
+                if arg is None:
+                    arg = yield self._compound(True)
+                if arg_op is not None:
+                    arg = ast.Unary(
+                        op=arg_op.lexeme, expr=arg, span=Span(arg_op.span.start, arg.span.end)
+                    )
+                expr = ast.Call(func=expr, arg=arg, span=Span(expr.span.start, arg.span.end))
+            if unary is not None:
+                expr = ast.Unary(
+                    op=unary.lexeme, expr=expr, span=Span(unary.span.start, expr.span.end)
+                )
+
+            # All binary operators are left-associative: reduce while the pending
+            # operator binds at least as tightly as the next one.
+            prec = _BINARY_PREC.get(self._peek().type)
+            while ops and (prec is None or ops[-1][0] >= prec):
+                op = ops.pop()[1]
+                left = operands.pop()
+                expr = ast.Binary(
+                    op=op, left=left, right=expr, span=Span(left.span.start, expr.span.end)
+                )
+            if prec is None:
+                break
+            operands.append(expr)
+            ops.append((prec, self._advance().lexeme))
+
+        if not dispatch:
+            return expr
         while self._match(TokenType.DISPATCH):
             # value ▷ ⟪ ... ⟫
             self._consume(
@@ -94,7 +213,7 @@ class Parser:
                     TokenType.FAT_ARROW, "Expected => after dispatch arm pattern"
                 )
                 self._skip_newlines()
-                arm_expr = self._parse_expr()
+                arm_expr = yield self._expr(True)
                 arms.append(
                     ast.DispatchArm(
                         pattern=pat,
@@ -111,139 +230,59 @@ class Parser:
             )
         return expr
 
-    def _parse_or(self) -> ast.Expr:
-        expr = self._parse_and()
-        while self._match(TokenType.OR):
-            op = self._previous().lexeme
-            right = self._parse_and()
-            expr = ast.Binary(
-                op=op,
-                left=expr,
-                right=right,
-                span=Span(expr.span.start, right.span.end),
-            )
-        return expr
+    def _atom(self, variant: bool) -> ast.Expr | None:
+        """Parse a literal or a plain name; None if the current token starts anything else.
 
-    def _parse_and(self) -> ast.Expr:
-        expr = self._parse_compare()
-        while self._match(TokenType.AND):
-            op = self._previous().lexeme
-            right = self._parse_compare()
-            expr = ast.Binary(
-                op=op,
-                left=expr,
-                right=right,
-                span=Span(expr.span.start, right.span.end),
-            )
-        return expr
-
-    def _parse_compare(self) -> ast.Expr:
-        expr = self._parse_add()
-        while self._match(
-            TokenType.EQ,
-            TokenType.NEQ,
-            TokenType.LT,
-            TokenType.LTE,
-            TokenType.GT,
-            TokenType.GTE,
-        ):
-            op = self._previous().lexeme
-            right = self._parse_add()
-            expr = ast.Binary(
-                op=op,
-                left=expr,
-                right=right,
-                span=Span(expr.span.start, right.span.end),
-            )
-        return expr
-
-    def _parse_add(self) -> ast.Expr:
-        expr = self._parse_mul()
-        while self._match(TokenType.PLUS, TokenType.MINUS, TokenType.CONCAT):
-            op = self._previous().lexeme
-            right = self._parse_mul()
-            expr = ast.Binary(
-                op=op,
-                left=expr,
-                right=right,
-                span=Span(expr.span.start, right.span.end),
-            )
-        return expr
+        With `variant`, `tag•payload` is left to `_compound`; a variant payload
+        is parsed with `variant=False`, so `A•B•x` still reads `B` as a name.
+        """
 
-    def _parse_mul(self) -> ast.Expr:
-        expr = self._parse_prefix()
-        while self._match(TokenType.MUL, TokenType.DIV, TokenType.MOD):
-            op = self._previous().lexeme
-            right = self._parse_prefix()
-            expr = ast.Binary(
-                op=op,
-                left=expr,
-                right=right,
-                span=Span(expr.span.start, right.span.end),
-            )
-        return expr
-
-    def _parse_prefix(self) -> ast.Expr:
-        if self._match(TokenType.NOT, TokenType.MINUS):
-            op_tok = self._previous()
-            rhs = self._parse_call()  # call binds tighter than prefix in SuayLang spec
-            return ast.Unary(
-                op=op_tok.lexeme, expr=rhs, span=Span(op_tok.span.start, rhs.span.end)
-            )
-        return self._parse_call()
-
-    def _parse_call(self) -> ast.Expr:
-        expr = self._parse_variant()
-        while self._match(TokenType.CALL):
-            rhs = self._parse_call_arg()
-            expr = ast.Call(
-                func=expr, arg=rhs, span=Span(expr.span.start, rhs.span.end)
-            )
-        return expr
+        tok = self._peek()
+        typ = tok.type
+        if typ is TokenType.IDENT:
+            if (
+                self._check_next(TokenType.ARROW_BIND)
+                or self._check_next(TokenType.ARROW_SET)
+                or (variant and self._check_next(TokenType.BULLET))
+            ):
+                return None
+            self._advance()
+            return ast.Name(value=str(tok.value), span=tok.span)
+        if typ is TokenType.INT:
+            self._advance()
+            return ast.IntLit(value=int(tok.value), span=tok.span)
+        if typ is TokenType.DEC:
+            self._advance()
+            return ast.DecLit(value=float(tok.value), span=tok.span)
+        if typ is TokenType.STRING:
+            self._advance()
+            return ast.TextLit(value=str(tok.value), span=tok.span)
+        if typ is TokenType.UNIT:
+            self._advance()
+            return ast.UnitLit(span=tok.span)
+        if typ is TokenType.TRUE:
+            self._advance()
+            return ast.BoolLit(value=True, span=tok.span)
+        if typ is TokenType.FALSE:
+            self._advance()
+            return ast.BoolLit(value=False, span=tok.span)
+        return None
 
-    def _parse_call_arg(self) -> ast.Expr:
-        # Allow prefix operators in call arguments (e.g. f · -7) without
-        # making call-chains right-associative.
-        if self._match(TokenType.NOT, TokenType.MINUS):
-            op_tok = self._previous()
-            rhs = self._parse_variant()
-            return ast.Unary(
-                op=op_tok.lexeme, expr=rhs, span=Span(op_tok.span.start, rhs.span.end)
-            )
-        return self._parse_variant()
+    def _compound(self, variant: bool) -> _Parse:
+        """Constructs with sub-expressions, at a token `_atom` did not take."""
 
-    def _parse_variant(self) -> ast.Expr:
         # Variant constructor: tag•payload, where tag is IDENT.
-        if self._check(TokenType.IDENT) and self._check_next(TokenType.BULLET):
+        if variant and self._check(TokenType.IDENT) and self._check_next(TokenType.BULLET):
             tag_tok = self._advance()
             self._advance()  # •
-            payload = self._parse_primary()
+            payload = self._atom(False)
+            if payload is None:
+                payload = yield self._compound(False)
             return ast.VariantExpr(
                 tag=tag_tok.value if isinstance(tag_tok.value, str) else tag_tok.lexeme,
                 payload=payload,
                 span=Span(tag_tok.span.start, payload.span.end),
             )
-        return self._parse_primary()
-
-    def _parse_primary(self) -> ast.Expr:
-        if self._match(TokenType.INT):
-            t = self._previous()
-            return ast.IntLit(value=int(t.value), span=t.span)
-        if self._match(TokenType.DEC):
-            t = self._previous()
-            return ast.DecLit(value=float(t.value), span=t.span)
-        if self._match(TokenType.STRING):
-            t = self._previous()
-            return ast.TextLit(value=str(t.value), span=t.span)
-        if self._match(TokenType.UNIT):
-            t = self._previous()
-            return ast.UnitLit(span=t.span)
-        if self._match(TokenType.TRUE):
-            t = self._previous()
-            return ast.BoolLit(value=True, span=t.span)
-        if self._match(TokenType.FALSE):
-            t = self._previous()
-            return ast.BoolLit(value=False, span=t.span)
 
         # Cycle: ⟲ seed ▷ ⟪ ... ⟫
         if self._match(TokenType.CYCLE):
@@ -251,7 +290,7 @@ class Parser:
             self._skip_newlines()
             # Important: the ▷ after the seed belongs to the cycle syntax,
             # so we must parse the seed *without* consuming dispatch.
-            seed = self._parse_or()
+            seed = yield self._expr(False)
             self._consume(TokenType.DISPATCH, "Expected |> after ~~ seed")
             self._consume(TokenType.LDBLOCK, "Expected { to start cycle arms")
             arms: list[ast.CycleArm] = []
@@ -267,7 +306,7 @@ class Parser:
                 else:
                     self._error_here("Expected >> or << after => in cycle arm")
                 self._skip_newlines()
-                arm_expr = self._parse_expr()
+                arm_expr = yield self._expr(True)
                 arms.append(
                     ast.CycleArm(
                         pattern=pat,
@@ -297,7 +336,7 @@ class Parser:
                     break
             self._consume(TokenType.RPAREN, "Expected ) to close parameter list")
             self._skip_newlines()
-            body = self._parse_expr()
+            body = yield self._expr(True)
             return ast.Lambda(
                 params=params, body=body, span=Span(start_tok.span.start, body.span.end)
             )
@@ -305,10 +344,10 @@ class Parser:
         # Block: ⟪ ... ⟫
         if self._match(TokenType.LDBLOCK):
             start_tok = self._previous()
-            items: list[ast.Expr] = []
+            forms: list[ast.Expr] = []
             self._skip_newlines()
             while not (self._check(TokenType.RDBLOCK) or self._check(TokenType.EOF)):
-                items.append(self._parse_expr())
+                forms.append((yield self._expr(True)))
                 # Inside blocks, require line breaks between forms.
                 if not (
                     self._check(TokenType.NEWLINE) or self._check(TokenType.RDBLOCK)
@@ -318,23 +357,23 @@ class Parser:
             if self._check(TokenType.EOF):
                 self._error_here("Expected } to close block")
             end_tok = self._consume(TokenType.RDBLOCK, "Expected } to close block")
-            if not items:
+            if not forms:
                 self._raise_at_span(
                     Span(start_tok.span.start, end_tok.span.end),
                     "Empty block { } is not allowed",
                 )
             return ast.Block(
-                items=items, span=Span(start_tok.span.start, end_tok.span.end)
+                items=forms, span=Span(start_tok.span.start, end_tok.span.end)
             )
 
         # Tuple: (e1 e2 ...)
         if self._match(TokenType.LPAREN):
             start_tok = self._previous()
-            items: list[ast.Expr] = []
+            elements: list[ast.Expr] = []
             saw_comma = False
             self._skip_newlines()
             while not self._check(TokenType.RPAREN):
-                items.append(self._parse_expr())
+                elements.append((yield self._expr(True)))
                 # Track commas so we can distinguish grouping: (expr) vs 1-tuple: (expr,)
                 if self._match(TokenType.COMMA):
                     saw_comma = True
@@ -348,10 +387,10 @@ class Parser:
                     break
             end_tok = self._consume(TokenType.RPAREN, "Expected ) to close tuple")
             # Grouping: (expr) is just expr. A 1-tuple must be written as (expr,).
-            if len(items) == 1 and not saw_comma:
-                return items[0]
+            if len(elements) == 1 and not saw_comma:
+                return elements[0]
             return ast.TupleExpr(
-                items=items, span=Span(start_tok.span.start, end_tok.span.end)
+                items=elements, span=Span(start_tok.span.start, end_tok.span.end)
             )
 
         # List: [e1 e2 ...]
@@ -364,7 +403,7 @@ class Parser:
                     self._error_here(
                         "... (ellipsis) is only allowed in list patterns, not list expressions"
                     )
-                items.append(self._parse_expr())
+                items.append((yield self._expr(True)))
                 self._skip_separators_in_listlike()
                 if self._check(TokenType.RBRACK):
                     break
@@ -379,9 +418,9 @@ class Parser:
             entries: list[tuple[ast.Expr, ast.Expr]] = []
             self._skip_newlines()
             while not self._check(TokenType.RDBRACK):
-                key = self._parse_expr()
+                key = yield self._expr(True)
                 self._consume(TokenType.ARROW_MAP, "Expected -> after map key")
-                val = self._parse_expr()
+                val = yield self._expr(True)
                 entries.append((key, val))
                 self._skip_separators_in_listlike()
                 if self._check(TokenType.RDBRACK):
@@ -396,7 +435,7 @@ class Parser:
             name_tok = self._advance()
             self._advance()  # ←
             self._skip_newlines()
-            val = self._parse_expr()
+            val = yield self._expr(True)
             return ast.Binding(
                 name=str(name_tok.value),
                 value=val,
@@ -408,17 +447,13 @@ class Parser:
             name_tok = self._advance()
             self._advance()  # ⇐
             self._skip_newlines()
-            val = self._parse_expr()
+            val = yield self._expr(True)
             return ast.Mutation(
                 name=str(name_tok.value),
                 value=val,
                 span=Span(name_tok.span.start, val.span.end),
             )
 
-        if self._match(TokenType.IDENT):
-            t = self._previous()
-            return ast.Name(value=str(t.value), span=t.span)
-
         self._error_here("Expected an expression")
 
     # ---------- Patterns ----------
@@ -465,11 +500,11 @@ class Parser:
 
         if self._match(TokenType.LPAREN):
             start = self._previous()
-            items: list[ast.Pattern] = []
+            elements: list[ast.Pattern] = []
             saw_comma = False
             self._skip_newlines()
             while not self._check(TokenType.RPAREN):
-                items.append(self._parse_pattern())
+                elements.append(self._parse_pattern())
                 if self._match(TokenType.COMMA):
                     saw_comma = True
                     self._skip_newlines()
@@ -481,9 +516,11 @@ class Parser:
                     break
             end = self._consume(TokenType.RPAREN, "Expected ) to close tuple pattern")
             # Grouping in patterns: (p) is just p. A 1-tuple pattern is (p,).
-            if len(items) == 1 and not saw_comma:
-                return items[0]
-            return ast.PTuple(items=items, span=Span(start.span.start, end.span.end))
+            if len(elements) == 1 and not saw_comma:
+                return elements[0]
+            return self._check_binders(
+                ast.PTuple(items=elements, span=Span(start.span.start, end.span.end))
+            )
 
         if self._match(TokenType.LBRACK):
             start = self._previous()
@@ -504,8 +541,8 @@ class Parser:
                 if self._check(TokenType.RBRACK):
                     break
             end = self._consume(TokenType.RBRACK, "Expected ] to close list pattern")
-            return ast.PList(
-                items=items, tail=tail, span=Span(start.span.start, end.span.end)
+            return self._check_binders(
+                ast.PList(items=items, tail=tail, span=Span(start.span.start, end.span.end))
             )
 
         if self._match(TokenType.IDENT):
@@ -514,6 +551,12 @@ class Parser:
 
         self._error_here("Expected a pattern")
 
+    def _check_binders(self, pat: ast.Pattern) -> ast.Pattern:
+        # Compound patterns are where binders can collide; matchers rely on this.
+        if duplicate_binder(pat) is not None:
+            self._raise_at_span(pat.span, "Duplicate name binder in pattern")
+        return pat
+
     # ---------- Helpers ----------
 
     def _skip_newlines(self) -> None:
@@ -546,25 +589,31 @@ class Parser:
         return self._peek().type in types
 
     def _check_next(self, typ: TokenType) -> bool:
-        if self._i + 1 >= len(self.tokens):
+        if self._is_at_end():
             return False
-        return self.tokens[self._i + 1].type == typ
+        if self._ahead is None:
+            self._ahead = next(self._stream)
+        return self._ahead.type == typ
 
     def _advance(self) -> Token:
         if not self._is_at_end():
-            self._i += 1
+            self._prev = self._tok
+            if self._ahead is None:
+                self._tok = next(self._stream)
+            else:
+                self._tok, self._ahead = self._ahead, None
         return self._previous()
 
     def _peek(self) -> Token:
-        return self.tokens[self._i]
+        return self._tok  # type: ignore[return-value]
 
     def _previous(self) -> Token:
-        return self.tokens[self._i - 1]
+        return self._prev  # type: ignore[return-value]
 
     def _is_at_end(self) -> bool:
         return self._peek().type == TokenType.EOF
 
-    def _error_here(self, message: str) -> None:
+    def _error_here(self, message: str) -> NoReturn:
         tok = self._peek()
         pos = tok.span.start
         ctx = self._line_text(pos.line)
@@ -580,7 +629,7 @@ class Parser:
             context_line=ctx,
         )
 
-    def _raise_at_span(self, span: Span, message: str) -> None:
+    def _raise_at_span(self, span: Span, message: str) -> NoReturn:
         pos = span.start
         ctx = self._line_text(pos.line)
         raise ParseError(
@@ -593,19 +642,6 @@ class Parser:
             context_line=ctx,
         )
 
-    @staticmethod
-    def _compute_line_starts(s: str) -> list[int]:
-        starts = [0]
-        for i, ch in enumerate(s):
-            if ch == "\n":
-                starts.append(i + 1)
-        return starts
-
     def _line_text(self, line: int) -> str | None:
-        if line <= 0 or line > len(self._line_starts):
-            return None
-        start = self._line_starts[line - 1]
-        end = self.source.find("\n", start)
-        if end == -1:
-            end = len(self.source)
-        return self.source[start:end]
+        # Only needed for error messages.
+        return line_index(self.source).line_text(line)
@@ -0,0 +1,293 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from . import ast
+from .persistent import list_tail
+from .runtime import LIST_TYPES, TEXT_TYPES, UNIT, Layout, Variant
+
+
+# A test returns whether a value has the pattern's shape; None means "always".
+Test = Callable[[object], bool]
+# A binder writes the pattern's bound values into slots[0 .. len(names)-1].
+Bind = Callable[[object, list], None]
+
+
+def binders(p: ast.Pattern) -> list[str]:
+    """Names bound by `p`, in the order a `Matcher` assigns them to slots."""
+
+    out: list[str] = []
+    _collect_binders(p, out)
+    return out
+
+
+def _collect_binders(p: ast.Pattern, out: list[str]) -> None:
+    match p:
+        case ast.PName(name=name):
+            out.append(name)
+        case ast.PTuple(items=items):
+            for it in items:
+                _collect_binders(it, out)
+        case ast.PList(items=items, tail=tail):
+            for it in items:
+                _collect_binders(it, out)
+            if tail is not None:
+                _collect_binders(tail, out)
+        case ast.PVariant(payload=payload):
+            _collect_binders(payload, out)
+        case _:
+            pass
+
+
+def duplicate_binder(p: ast.Pattern) -> str | None:
+    names = binders(p)
+    seen: set[str] = set()
+    for n in names:
+        if n in seen:
+            return n
+        seen.add(n)
+    return None
+
+
+# A step into a tuple pattern/value: (arity, item index).
+SwitchPath = tuple[tuple[int, int], ...]
+
+_MAX_SWITCH_DEPTH = 3
+
+
+def switch_key(p: ast.Pattern, path: SwitchPath = ()) -> tuple[object, ...] | None:
+    """The `SwitchTable` entry that every value matching `p` is looked up under.
+
+    `path` selects a nested tuple item to switch on (see `switch_path`). None
+    means `p` can match values under any entry (`_`, a name). Literal keys
+    compare like the values they stand for, so `1` and `⊤` share a key.
+    """
+
+    for _arity, i in path:
+        if not isinstance(p, ast.PTuple):
+            return None  # `_` or a name at this level
+        p = p.items[i]
+    match p:
+        case ast.PVariant(tag=tag):
+            return ("tag", tag)
+        case ast.PTuple(items=items):
+            return ("arity", len(items))
+        case ast.PList():
+            return ("list",)
+        case ast.PUnit():
+            return ("lit", UNIT)
+        case ast.PBool(value=v) | ast.PInt(value=v) | ast.PDec(value=v) | ast.PText(value=v):
+            return ("lit", v)
+        case _:
+            return None
+
+
+def switch_path(patterns: list[ast.Pattern]) -> SwitchPath:
+    """Pick the position that best tells `patterns` apart.
+
+    The top level is the default. When every pattern that is not `_`/a name is a
+    tuple of the same arity, items of those tuples (recursively) are candidates
+    too, so `(State•x, n)` arms can be switched on `State`.
+    """
+
+    def distinct(path: SwitchPath) -> int:
+        return len({k for k in (switch_key(p, path) for p in patterns) if k is not None})
+
+    best: SwitchPath = ()
+    best_score = distinct(best)
+
+    def visit(subs: list[ast.Pattern | None], path: SwitchPath) -> None:
+        nonlocal best, best_score
+        if len(path) >= _MAX_SWITCH_DEPTH:
+            return
+        live = [p for p in subs if p is not None]
+        tuples = [p for p in live if isinstance(p, ast.PTuple)]
+        if not live or len(tuples) != len(live):
+            return
+        arities = {len(p.items) for p in tuples}
+        if len(arities) != 1:
+            return
+        (n,) = arities
+        for i in range(n):
+            step = path + ((n, i),)
+            score = distinct(step)
+            if score > best_score:
+                best, best_score = step, score
+            visit([_refutable(p.items[i]) if isinstance(p, ast.PTuple) else None for p in subs], step)
+
+    visit([_refutable(p) for p in patterns], ())
+    return best
+
+
+def _refutable(p: ast.Pattern) -> ast.Pattern | None:
+    return None if isinstance(p, (ast.PWildcard, ast.PName)) else p
+
+
+@dataclass(frozen=True, slots=True)
+class Matcher:
+    """A pattern compiled once into a shape test and a slot binder.
+
+    Matching does not build a bindings dict: `test` checks the value without
+    allocating, and `bind` (only called after a successful test) writes binder i
+    to `slots[first + i]`, where binders are numbered as in `binders(pattern)`.
+    Patterns must be free of duplicate binders (the parser rejects them).
+    """
+
+    pattern: ast.Pattern
+    first: int
+    names: tuple[str, ...] = field(compare=False)
+    layout: Layout = field(compare=False, repr=False)
+    test: Test | None = field(compare=False, repr=False)
+    bind: Bind | None = field(compare=False, repr=False)
+
+    @property
+    def irrefutable(self) -> bool:
+        return self.test is None
+
+    def match(self, value: object) -> dict[str, object] | None:
+        """Dict-returning form for callers that need one (allocates)."""
+
+        if self.test is not None and not self.test(value):
+            return None
+        if not self.names:
+            return {}
+        slots: list[object] = [None] * (self.first + len(self.names))
+        if self.bind is not None:
+            self.bind(value, slots)
+        return dict(zip(self.names, slots[self.first :]))
+
+
+def compile_pattern(p: ast.Pattern, *, first: int = 0) -> Matcher:
+    """Compile `p`; its binders go to slots `first`, `first + 1`, ..."""
+
+    names = tuple(binders(p))
+    bind, _next = _compile_bind(p, first)
+    return Matcher(
+        pattern=p,
+        first=first,
+        names=names,
+        layout=Layout(names),
+        test=_compile_test(p),
+        bind=bind,
+    )
+
+
+# -------- Tests --------
+#
+# Literal tests mirror the old structural matcher exactly, including that an
+# Int pattern accepts a Bool equal to it (isinstance(True, int)).
+
+
+def _compile_test(p: ast.Pattern) -> Test | None:
+    match p:
+        case ast.PWildcard() | ast.PName():
+            return None
+        case ast.PUnit():
+            return lambda v: v is UNIT
+        case ast.PBool(value=b):
+            return lambda v: isinstance(v, bool) and v == b
+        case ast.PInt(value=i):
+            return lambda v: isinstance(v, int) and v == i
+        case ast.PDec(value=f):
+            return lambda v: isinstance(v, float) and v == f
+        case ast.PText(value=s):
+            return lambda v: isinstance(v, TEXT_TYPES) and v == s
+        case ast.PTuple(items=items):
+            return _sequence_test(tuple, items, exact=True)
+        case ast.PList(items=items, tail=tail):
+            return _sequence_test(LIST_TYPES, items, exact=tail is None)
+        case ast.PVariant(tag=tag, payload=payload):
+            inner = _compile_test(payload)
+            if inner is None:
+                return lambda v: isinstance(v, Variant) and v.tag == tag
+            return lambda v: isinstance(v, Variant) and v.tag == tag and inner(v.payload)
+        case _:
+            raise TypeError(f"Unsupported pattern: {type(p).__name__}")
+
+
+def _sequence_test(kind: type[Any] | tuple[type[Any], ...], items: list[ast.Pattern], *, exact: bool) -> Test:
+    n = len(items)
+    checks = tuple(
+        (i, t) for i, t in ((i, _compile_test(it)) for i, it in enumerate(items)) if t
+    )
+
+    if exact:
+
+        def test(v: object) -> bool:
+            if not isinstance(v, kind) or len(v) != n:
+                return False
+            for i, t in checks:
+                if not t(v[i]):
+                    return False
+            return True
+
+    else:
+
+        def test(v: object) -> bool:
+            if not isinstance(v, kind) or len(v) < n:
+                return False
+            for i, t in checks:
+                if not t(v[i]):
+                    return False
+            return True
+
+    return test
+
+
+# -------- Binders --------
+
+
+def _compile_bind(p: ast.Pattern, first: int) -> tuple[Bind | None, int]:
+    """Return (binder for p writing from slot `first`, next free slot)."""
+
+    match p:
+        case ast.PName():
+
+            def bind_name(v: object, slots: list) -> None:
+                slots[first] = v
+
+            return bind_name, first + 1
+        case ast.PTuple(items=items):
+            return _sequence_bind(items, None, first)
+        case ast.PList(items=items, tail=tail):
+            return _sequence_bind(items, tail, first)
+        case ast.PVariant(payload=payload):
+            inner, nxt = _compile_bind(payload, first)
+            if inner is None:
+                return None, nxt
+
+            def bind_payload(v: object, slots: list) -> None:
+                inner(v.payload, slots)  # type: ignore[attr-defined]
+
+            return bind_payload, nxt
+        case _:
+            return None, first
+
+
+def _sequence_bind(
+    items: list[ast.Pattern], tail: ast.Pattern | None, first: int
+) -> tuple[Bind | None, int]:
+    parts: list[tuple[int, Bind]] = []
+    nxt = first
+    for i, it in enumerate(items):
+        b, nxt = _compile_bind(it, nxt)
+        if b is not None:
+            parts.append((i, b))
+    tail_slot = None
+    if isinstance(tail, ast.PName):
+        tail_slot = nxt
+        nxt += 1
+    if not parts and tail_slot is None:
+        return None, nxt
+
+    n = len(items)
+    steps = tuple(parts)
+
+    def bind_seq(v: object, slots: list) -> None:
+        for i, b in steps:
+            b(v[i], slots)  # type: ignore[index]
+        if tail_slot is not None:
+            slots[tail_slot] = list_tail(v, n)  # type: ignore[arg-type]
+
+    return bind_seq, nxt
@@ -0,0 +1,455 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+from itertools import islice
+
+
+# ----------------------------
+# Persistent lists and maps
+# ----------------------------
+#
+# Suay lists and maps are immutable, so `put`, `⊞` and `drop` can share
+# structure with their inputs instead of copying them. `PVector` is a 32-way
+# trie plus a tail (an append copies one path), seen through a [start, stop)
+# window so that slicing is O(1). `PMap` is a hash array mapped trie plus the
+# insertion order of its keys, which iteration follows, as it does for dicts.
+# `ListView` is a suffix of a plain list (base plus offset), which is what a
+# `[x ⋯ rest]` tail or `drop` of a plain list gives, so walking a list by its
+# tail is linear. `Rope` is Text built by `⊞`: a concatenation joined only
+# when something reads its characters, so accumulating text is linear too.
+#
+# At the language level both are the List and Map they stand for: they compare
+# equal to lists/dicts with the same contents, are unhashable with the same
+# error, and have the same repr. Nodes are never mutated once shared.
+
+_BITS = 5
+_WIDTH = 1 << _BITS
+_MASK = _WIDTH - 1
+
+
+def _tailoff(cnt: int) -> int:
+    return 0 if cnt < _WIDTH else ((cnt - 1) >> _BITS) << _BITS
+
+
+def _new_path(level: int, node: list) -> list:
+    while level > 0:
+        node = [node]
+        level -= _BITS
+    return node
+
+
+def _push_leaf(cnt: int, level: int, parent: list, leaf: list) -> list:
+    """A copy of `parent` with `leaf` (elements cnt-32 .. cnt-1) added."""
+
+    sub = ((cnt - 1) >> level) & _MASK
+    out = list(parent)
+    if level == _BITS:
+        node = leaf
+    elif sub < len(parent):
+        node = _push_leaf(cnt, level - _BITS, parent[sub], leaf)
+    else:
+        node = _new_path(level - _BITS, leaf)
+    if sub < len(out):
+        out[sub] = node
+    else:
+        out.append(node)
+    return out
+
+
+class PVector:
+    """A persistent List: a trie of 32-element leaves and a window onto it."""
+
+    __slots__ = ("_cnt", "_shift", "_root", "_tail", "_start", "_stop")
+
+    def __init__(self, items: Iterable[object] = ()) -> None:
+        items = list(items)
+        n = len(items)
+        off = _tailoff(n)
+        nodes: list = [items[i : i + _WIDTH] for i in range(0, off, _WIDTH)]
+        shift = _BITS
+        while len(nodes) > _WIDTH:
+            nodes = [nodes[i : i + _WIDTH] for i in range(0, len(nodes), _WIDTH)]
+            shift += _BITS
+        self._cnt = n
+        self._shift = shift
+        self._root = nodes
+        self._tail = items[off:]
+        self._start = 0
+        self._stop = n
+
+    @classmethod
+    def _make(cls, cnt: int, shift: int, root: list, tail: list, start: int, stop: int) -> PVector:
+        v = object.__new__(cls)
+        v._cnt, v._shift, v._root, v._tail, v._start, v._stop = cnt, shift, root, tail, start, stop
+        return v
+
+    def _leaf(self, i: int) -> list:
+        """The leaf holding trie element `i` (its index there is `i & 31`)."""
+
+        if i >= _tailoff(self._cnt):
+            return self._tail
+        node = self._root
+        level = self._shift
+        while level > 0:
+            node = node[(i >> level) & _MASK]
+            level -= _BITS
+        return node
+
+    def __len__(self) -> int:
+        return self._stop - self._start
+
+    def __getitem__(self, index):
+        n = self._stop - self._start
+        if isinstance(index, slice):
+            a, b, step = index.indices(n)
+            if step != 1:
+                return PVector(list(self)[index])
+            b = max(a, b)
+            return PVector._make(self._cnt, self._shift, self._root, self._tail, self._start + a, self._start + b)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("list index out of range")
+        i = self._start + index
+        return self._leaf(i)[i & _MASK]
+
+    def __iter__(self) -> Iterator[object]:
+        i, stop = self._start, self._stop
+        while i < stop:
+            lo = i & _MASK
+            end = min(stop, i - lo + _WIDTH)
+            yield from self._leaf(i)[lo : lo + end - i]
+            i = end
+
+    def extend(self, items: Iterable[object]) -> PVector:
+        """This list followed by `items`."""
+
+        if self._stop != self._cnt:
+            # A window that ends early (from `take`) cannot grow in place.
+            return PVector([*self, *items])
+        xs = items if isinstance(items, list) else list(items)
+        cnt, shift, root = self._cnt, self._shift, self._root
+        tail = list(self._tail)
+        pos, n = 0, len(xs)
+        while pos < n:
+            if len(tail) == _WIDTH:
+                if (cnt >> _BITS) > (1 << shift):
+                    root = [root, _new_path(shift, tail)]
+                    shift += _BITS
+                else:
+                    root = _push_leaf(cnt, shift, root, tail)
+                tail = []
+            k = min(_WIDTH - len(tail), n - pos)
+            tail += xs[pos : pos + k]
+            pos += k
+            cnt += k
+        return PVector._make(cnt, shift, root, tail, self._start, cnt)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (list, PVector, ListView)):
+            return len(self) == len(other) and list(self) == list(other)
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        raise TypeError("unhashable type: 'list'")
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+class ListView:
+    """A read-only suffix of a plain list: `base[start:]` without the copy."""
+
+    __slots__ = ("_base", "_start")
+
+    def __init__(self, base: list, start: int) -> None:
+        self._base = base
+        self._start = start
+
+    def __len__(self) -> int:
+        return len(self._base) - self._start
+
+    def __getitem__(self, index):
+        n = len(self._base) - self._start
+        if isinstance(index, slice):
+            a, b, step = index.indices(n)
+            if step == 1 and b == n:
+                return ListView(self._base, self._start + a)
+            return list(self)[index]
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("list index out of range")
+        return self._base[self._start + index]
+
+    def __iter__(self) -> Iterator[object]:
+        return islice(self._base, self._start, None)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (list, PVector, ListView)):
+            return len(self) == len(other) and list(self) == list(other)
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        raise TypeError("unhashable type: 'list'")
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+def list_tail(xs: list | PVector | ListView, n: int) -> PVector | ListView:
+    """`xs` without its first `n` elements, in O(1)."""
+
+    if isinstance(xs, list):
+        return ListView(xs, min(n, len(xs)))
+    return xs[n:]
+
+
+def pvector(xs: list | PVector | ListView) -> PVector:
+    return xs if isinstance(xs, PVector) else PVector(xs)
+
+
+# ---------- Maps ----------
+
+_HASH_MASK = (1 << 64) - 1
+_HASH_BITS = 64
+
+
+class _Node:
+    """A trie node: `entries` holds (key, value) pairs and child nodes, in bit order."""
+
+    __slots__ = ("bitmap", "entries")
+
+    def __init__(self, bitmap: int, entries: tuple) -> None:
+        self.bitmap = bitmap
+        self.entries = entries
+
+
+class _Collision:
+    """Keys whose hashes are equal in all 64 bits."""
+
+    __slots__ = ("hash", "entries")
+
+    def __init__(self, h: int, entries: tuple) -> None:
+        self.hash = h
+        self.entries = entries
+
+
+_MISSING = object()
+_EMPTY = _Node(0, ())
+
+
+def _hash(key: object) -> int:
+    return hash(key) & _HASH_MASK
+
+
+def _find(node: _Node | _Collision, h: int, key: object) -> object:
+    shift = 0
+    while True:
+        if isinstance(node, _Collision):
+            for k, v in node.entries:
+                if k is key or k == key:
+                    return v
+            return _MISSING
+        bit = 1 << ((h >> shift) & _MASK)
+        if not node.bitmap & bit:
+            return _MISSING
+        e = node.entries[(node.bitmap & (bit - 1)).bit_count()]
+        if type(e) is tuple:
+            return e[1] if e[0] is key or e[0] == key else _MISSING
+        node = e
+        shift += _BITS
+
+
+def _pair(shift: int, h1: int, e1: tuple, h2: int, e2: tuple) -> _Node | _Collision:
+    if shift >= _HASH_BITS:
+        return _Collision(h1, (e1, e2))
+    b1, b2 = (h1 >> shift) & _MASK, (h2 >> shift) & _MASK
+    if b1 == b2:
+        return _Node(1 << b1, (_pair(shift + _BITS, h1, e1, h2, e2),))
+    return _Node((1 << b1) | (1 << b2), (e1, e2) if b1 < b2 else (e2, e1))
+
+
+def _assoc(node: _Node | _Collision, shift: int, h: int, key: object, value: object) -> tuple[_Node | _Collision, bool]:
+    """(node with key set to value, whether the key is new). An existing key keeps its object."""
+
+    if isinstance(node, _Collision):
+        for i, (k, v) in enumerate(node.entries):
+            if k is key or k == key:
+                if v is value:
+                    return node, False
+                return _Collision(h, (*node.entries[:i], (k, value), *node.entries[i + 1 :])), False
+        return _Collision(h, (*node.entries, (key, value))), True
+    bit = 1 << ((h >> shift) & _MASK)
+    idx = (node.bitmap & (bit - 1)).bit_count()
+    entries = node.entries
+    if not node.bitmap & bit:
+        return _Node(node.bitmap | bit, (*entries[:idx], (key, value), *entries[idx:])), True
+    e = entries[idx]
+    new: tuple[object, object] | _Node | _Collision
+    if type(e) is tuple:
+        k, v = e
+        if k is key or k == key:
+            if v is value:
+                return node, False
+            new, added = (k, value), False
+        else:
+            new, added = _pair(shift + _BITS, _hash(k), e, h, (key, value)), True
+    else:
+        new, added = _assoc(e, shift + _BITS, h, key, value)
+        if new is e:
+            return node, False
+    return _Node(node.bitmap, (*entries[:idx], new, *entries[idx + 1 :])), added
+
+
+class PMap:
+    """A persistent Map: a hash trie, and the keys in insertion order."""
+
+    __slots__ = ("_root", "_order")
+
+    def __init__(self, items: Iterable[tuple[object, object]] | dict | PMap = ()) -> None:
+        self._root: _Node | _Collision = _EMPTY
+        self._order = PVector()
+        if isinstance(items, (dict, PMap)):
+            items = items.items()
+        new = self.update(items)
+        self._root, self._order = new._root, new._order
+
+    @classmethod
+    def _make(cls, root: _Node | _Collision, order: PVector) -> PMap:
+        m = object.__new__(cls)
+        m._root, m._order = root, order
+        return m
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __iter__(self) -> Iterator[object]:
+        return iter(self._order)
+
+    def __contains__(self, key: object) -> bool:
+        return _find(self._root, _hash(key), key) is not _MISSING
+
+    def __getitem__(self, key: object) -> object:
+        v = _find(self._root, _hash(key), key)
+        if v is _MISSING:
+            raise KeyError(key)
+        return v
+
+    def get(self, key: object, default: object = None) -> object:
+        v = _find(self._root, _hash(key), key)
+        return default if v is _MISSING else v
+
+    def keys(self) -> Iterator[object]:
+        return iter(self._order)
+
+    def values(self) -> Iterator[object]:
+        return (v for _k, v in self.items())
+
+    def items(self) -> Iterator[tuple[object, object]]:
+        root = self._root
+        for k in self._order:
+            yield k, _find(root, _hash(k), k)
+
+    def set(self, key: object, value: object) -> PMap:
+        """This map with `key` bound to `value` (raises TypeError if `key` is unhashable)."""
+
+        root, added = _assoc(self._root, 0, _hash(key), key, value)
+        if root is self._root:
+            return self
+        return PMap._make(root, self._order.extend((key,)) if added else self._order)
+
+    def update(self, items: Iterable[tuple[object, object]] | dict | PMap) -> PMap:
+        """This map with each of `items` set in turn, like `dict.update`."""
+
+        if isinstance(items, (dict, PMap)):
+            items = items.items()
+        root, new_keys = self._root, []
+        for k, v in items:
+            root, added = _assoc(root, 0, _hash(k), k, v)
+            if added:
+                new_keys.append(k)
+        return PMap._make(root, self._order.extend(new_keys) if new_keys else self._order)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, (dict, PMap)):
+            return NotImplemented
+        if len(self) != len(other):
+            return False
+        for k, v in self.items():
+            w = other.get(k, _MISSING)
+            if w is _MISSING or not (w is v or w == v):
+                return False
+        return True
+
+    def __hash__(self) -> int:
+        raise TypeError("unhashable type: 'dict'")
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
+
+
+def pmap(m: dict | PMap) -> PMap:
+    return m if isinstance(m, PMap) else PMap(m)
+
+
+# ---------- Text ----------
+
+# Below this length `⊞` joins Text at once: short strings cost less to copy
+# than to track, and most Text in a program stays a plain str.
+ROPE_MIN = 256
+
+
+class Rope:
+    """Text built by `⊞`: two Texts, joined the first time it is read.
+
+    `str(rope)` is the joined text; the length is known without joining.
+    """
+
+    __slots__ = ("_left", "_right", "_len", "_flat")
+
+    def __init__(self, left: str | Rope, right: str | Rope) -> None:
+        self._left = left
+        self._right = right
+        self._len = len(left) + len(right)
+        self._flat: str | None = None
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __str__(self) -> str:
+        if self._flat is None:
+            # Iteratively: a rope built in a loop is as deep as the loop ran.
+            parts: list[str] = []
+            stack: list[str | Rope] = [self]
+            while stack:
+                node = stack.pop()
+                if isinstance(node, str):
+                    parts.append(node)
+                elif node._flat is not None:
+                    parts.append(node._flat)
+                else:
+                    stack.append(node._right)
+                    stack.append(node._left)
+            self._flat = "".join(parts)
+            self._left = self._right = ""
+        return self._flat
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (str, Rope)):
+            return len(self) == len(other) and str(self) == str(other)
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(str(self))
+
+    def __repr__(self) -> str:
+        return repr(str(self))
+
+
+def concat_text(a: str | Rope, b: str | Rope) -> str | Rope:
+    """`a ⊞ b` for Text."""
+
+    if len(a) + len(b) < ROPE_MIN:
+        return str(a) + str(b)
+    return Rope(a, b)
@@ -1,15 +1,16 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from .errors import SuayError
-from .tokens import Span
+from .persistent import ListView, PMap, PVector, Rope
+from .tokens import Span, line_index
 
 
 # -------- Values --------
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Unit:
     pass
 
@@ -17,13 +18,18 @@ class Unit:
 UNIT = Unit()
 
 
-@dataclass(frozen=True)
+# Variants and builtin partials are created while programs run; like the VM's
+# closures they are slotted but not frozen, which keeps construction cheap.
+# Nothing mutates them.
+
+
+@dataclass(slots=True, unsafe_hash=True)
 class Variant:
     tag: str
     payload: object
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Closure:
     params: list[object]  # ast.Pattern
     body: object  # ast.Expr
@@ -31,7 +37,7 @@ class Closure:
     name: str | None = None
 
 
-@dataclass(frozen=True)
+@dataclass(slots=True, unsafe_hash=True)
 class Builtin:
     name: str
     arity: int
@@ -49,54 +55,176 @@ class Builtin:
         return self.impl(*new_bound)
 
 
+# `put`, `⊞` and `drop` return persistent lists and maps (persistent.py), which
+# share structure with their inputs, list tail patterns bind read-only views,
+# and long Text from `⊞` is a `Rope`; literals, `map` and `keys` build plain
+# lists and dicts. Everything that takes a Text, List or Map accepts any of
+# them (`str(t)` gives a Text's characters), and error messages name them all
+# by their language-level type.
+
+TEXT_TYPES = (str, Rope)
+LIST_TYPES = (list, PVector, ListView)
+MAP_TYPES = (dict, PMap)
+
+
+def type_name(v: object) -> str:
+    if isinstance(v, Rope):
+        return "str"
+    if isinstance(v, (PVector, ListView)):
+        return "list"
+    if isinstance(v, PMap):
+        return "dict"
+    return type(v).__name__
+
+
 # -------- Environment --------
 
 
-@dataclass
-class Env:
-    parent: "Env | None" = None
+@dataclass(frozen=True, slots=True)
+class _Unbound:
+    """Marker for a declared slot that has not been defined yet."""
+
+
+UNBOUND = _Unbound()
+
+
+# Builtin names in slot order. Shared by both engines and by the compiler, which
+# resolves unshadowed builtins to `LOAD_GLOBAL index`.
+BUILTIN_NAMES: tuple[str, ...] = (
+    "say",
+    "hear",
+    "text",
+    "abs",
+    "count",
+    "at",
+    "take",
+    "drop",
+    "keys",
+    "has",
+    "put",
+    "map",
+    "fold",
+    "link",
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Layout:
+    """Static slot layout of one scope: the names it declares, in slot order."""
+
+    names: tuple[str, ...]
+    index: dict[str, int] = field(init=False, repr=False, compare=False)
 
     def __post_init__(self) -> None:
-        self._values: dict[str, object] = {}
+        object.__setattr__(self, "index", {n: i for i, n in enumerate(self.names)})
+
+
+EMPTY_LAYOUT = Layout(())
+BUILTINS_LAYOUT = Layout(BUILTIN_NAMES)
+
+
+@dataclass(slots=True, init=False)
+class Env:
+    """A lexical environment.
+
+    Names declared in `layout` live in the `slots` array (the VM addresses them by
+    index); any other name is kept in a per-env dict, created on first use. The
+    name-based API below sees both, so callers never need to know which storage a
+    name uses.
+    """
+
+    parent: "Env | None"
+    layout: Layout
+    slots: list[object] = field(repr=False, compare=False)
+    _values: dict[str, object] | None = field(repr=False, compare=False)
+
+    def __init__(self, parent: "Env | None" = None, layout: Layout = EMPTY_LAYOUT) -> None:
+        self.parent = parent
+        self.layout = layout
+        self.slots = [UNBOUND] * len(layout.names)
+        self._values = None
 
     def define(self, name: str, value: object) -> None:
-        if name in self._values:
+        idx = self.layout.index.get(name)
+        if idx is not None:
+            if self.slots[idx] is not UNBOUND:
+                raise KeyError(name)
+            self.slots[idx] = value
+            return
+        if self._values is None:
+            self._values = {}
+        elif name in self._values:
             raise KeyError(name)
         self._values[name] = value
 
+    def copy(self) -> "Env":
+        """A sibling env: same parent and layout, its own copy of the bindings."""
+
+        env = Env(parent=self.parent, layout=self.layout)
+        env.slots[:] = self.slots
+        if self._values is not None:
+            env._values = dict(self._values)
+        return env
+
     def set_existing(self, name: str, value: object) -> None:
-        env = self._find_env_containing(name)
-        if env is None:
-            raise KeyError(name)
-        env._values[name] = value
+        env: Env | None = self
+        while env is not None:
+            if env._assign_local(name, value):
+                return
+            env = env.parent
+        raise KeyError(name)
 
     def get(self, name: str) -> object:
-        if name in self._values:
-            return self._values[name]
-        if self.parent is not None:
-            return self.parent.get(name)
+        env: Env | None = self
+        while env is not None:
+            values = env._values
+            if values is not None and name in values:
+                return values[name]
+            if env.slots:
+                idx = env.layout.index.get(name)
+                if idx is not None and env.slots[idx] is not UNBOUND:
+                    return env.slots[idx]
+            env = env.parent
         raise KeyError(name)
 
     def get_local(self, name: str) -> object:
-        if name in self._values:
+        if self._values is not None and name in self._values:
             return self._values[name]
+        idx = self.layout.index.get(name)
+        if idx is not None and self.slots[idx] is not UNBOUND:
+            return self.slots[idx]
         raise KeyError(name)
 
     def keys_local(self) -> list[str]:
-        return list(self._values.keys())
+        bound = [n for n, v in zip(self.layout.names, self.slots) if v is not UNBOUND]
+        return [*bound, *(self._values or ())]
+
+    def _assign_local(self, name: str, value: object) -> bool:
+        if self._values is not None and name in self._values:
+            self._values[name] = value
+            return True
+        idx = self.layout.index.get(name)
+        if idx is not None and self.slots[idx] is not UNBOUND:
+            self.slots[idx] = value
+            return True
+        return False
 
     def _find_env_containing(self, name: str) -> "Env | None":
-        if name in self._values:
-            return self
-        if self.parent is not None:
-            return self.parent._find_env_containing(name)
+        env: Env | None = self
+        while env is not None:
+            if env._values is not None and name in env._values:
+                return env
+            idx = env.layout.index.get(name)
+            if idx is not None and env.slots[idx] is not UNBOUND:
+                return env
+            env = env.parent
         return None
 
 
 # -------- Runtime Errors --------
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class StackFrame:
     label: str
     span: Span
@@ -175,17 +303,4 @@ class SuayRuntimeError(SuayError):
     def _line_text(self, line: int) -> str | None:
         if self.source is None:
             return None
-        if line <= 0:
-            return None
-        i = 1
-        start = 0
-        while i < line and start < len(self.source):
-            nl = self.source.find("\n", start)
-            if nl == -1:
-                return None
-            start = nl + 1
-            i += 1
-        end = self.source.find("\n", start)
-        if end == -1:
-            end = len(self.source)
-        return self.source[start:end]
+        return line_index(self.source).line_text(line)
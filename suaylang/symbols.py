@@ -0,0 +1,390 @@
+from __future__ import annotations
+
+import os
+from bisect import bisect_right
+from dataclasses import dataclass, field
+
+from . import ast
+from .lexer import LexError, Lexer
+from .parser import ParseError, Parser
+from .tokens import Position, Span, Token, TokenType
+
+
+# ----------------------------
+# Symbol tables
+# ----------------------------
+#
+# A table lists a program's definitions (`Symbol`) and its name occurrences
+# (`Ref`), each reference resolved to the definition it reads. Scopes follow
+# the compiler's: the module, every block and lambda, and each dispatch/cycle
+# arm. A reference sees the latest definition in the nearest scope made before
+# it; from inside a lambda, which runs later, it also sees definitions made
+# after it. References that reach the module scope are left unresolved
+# (`Ref.symbol` is None) and looked up with `pick` against the module's
+# definitions, which a document may spread over several tables.
+
+
+@dataclass(frozen=True, slots=True)
+class Symbol:
+    name: str
+    kind: str  # "function" | "binding" | "import" | "parameter" | "binder"
+    span: Span  # the name where it is defined
+    full_span: Span
+    scope: int  # 0 is the module scope
+    visible: int  # offset from which later code sees the definition
+    detail: str | None = None  # a function's parameter list, e.g. "(a b)"
+    link: tuple[str, str] | None = None  # (path, name) of `link · path · name`
+
+
+@dataclass(frozen=True, slots=True)
+class Ref:
+    name: str
+    span: Span
+    symbol: int | None  # index into SymbolTable.symbols; None: look up in the module
+    late: bool = False  # read from inside a lambda
+    decl: bool = False  # the defining occurrence itself
+
+
+def pick(visible: list[int], offset: int, late: bool) -> int | None:
+    """Which of a scope's definitions of a name (by `visible`, ascending) a read at `offset` sees."""
+
+    i = bisect_right(visible, offset) - 1
+    if i >= 0:
+        return i
+    return 0 if late and visible else None
+
+
+class SymbolTable:
+    """Definitions and references of one program; `refs` are in source order."""
+
+    __slots__ = ("symbols", "refs", "module", "_starts", "_by_name", "_uses")
+
+    def __init__(self, symbols: list[Symbol], refs: list[Ref]) -> None:
+        self.symbols = symbols
+        self.refs = sorted(refs, key=lambda r: r.span.start.offset)
+        self._starts = [r.span.start.offset for r in self.refs]
+        # Module-scope definitions of each name, ordered by `visible`.
+        self.module: dict[str, list[int]] = {}
+        for i, s in enumerate(symbols):
+            if s.scope == 0:
+                self.module.setdefault(s.name, []).append(i)
+        for lst in self.module.values():
+            lst.sort(key=lambda i: symbols[i].visible)
+        self._by_name: dict[str, list[Ref]] | None = None
+        self._uses: dict[int, list[Ref]] | None = None
+
+    def ref_at(self, offset: int) -> Ref | None:
+        i = bisect_right(self._starts, offset) - 1
+        if i >= 0 and offset < self.refs[i].span.end.offset:
+            return self.refs[i]
+        return None
+
+    def named(self, name: str) -> list[Ref]:
+        """References to `name` that are left to the module scope."""
+
+        if self._by_name is None:
+            by_name: dict[str, list[Ref]] = {}
+            for r in self.refs:
+                if r.symbol is None:
+                    by_name.setdefault(r.name, []).append(r)
+            self._by_name = by_name
+        return self._by_name.get(name, [])
+
+    def uses(self, symbol: int) -> list[Ref]:
+        """References resolved to `symbols[symbol]` within this table."""
+
+        if self._uses is None:
+            uses: dict[int, list[Ref]] = {}
+            for r in self.refs:
+                if r.symbol is not None:
+                    uses.setdefault(r.symbol, []).append(r)
+            self._uses = uses
+        return self._uses.get(symbol, [])
+
+    def resolve(self, ref: Ref) -> int | None:
+        """The index of the definition `ref` reads, taking this table as the whole module."""
+
+        if ref.symbol is not None:
+            return ref.symbol
+        defs = self.module.get(ref.name)
+        if not defs:
+            return None
+        i = pick([self.symbols[k].visible for k in defs], ref.span.start.offset, ref.late)
+        return None if i is None else defs[i]
+
+    def references(self, symbol: int) -> list[Ref]:
+        """Every reference to `symbols[symbol]`, its definition included."""
+
+        if self.symbols[symbol].scope != 0:
+            return self.uses(symbol)
+        out = [r for r in self.uses(symbol) if r.decl]
+        out.extend(r for r in self.named(self.symbols[symbol].name) if self.resolve(r) == symbol)
+        out.sort(key=lambda r: r.span.start.offset)
+        return out
+
+
+@dataclass
+class _Scope:
+    parent: int | None
+    is_lambda: bool
+    names: dict[str, list[int]] = field(default_factory=dict)
+
+
+def build_symbols(program: ast.Program, source: str) -> SymbolTable:
+    """The symbol table of a parsed program (`source` is its text)."""
+
+    symbols: list[Symbol] = []
+    decls: list[Ref] = []
+    scopes = [_Scope(None, False)]
+    reads: list[tuple[str, Span, int]] = []
+
+    def define(name: str, kind: str, span: Span, full_span: Span, scope: int, **extra) -> None:
+        idx = len(symbols)
+        sym = Symbol(name, kind, span, full_span, scope, full_span.end.offset, **extra)
+        symbols.append(sym)
+        scopes[scope].names.setdefault(name, []).append(idx)
+        decls.append(Ref(name, span, idx, decl=True))
+
+    def new_scope(parent: int, is_lambda: bool = False) -> int:
+        scopes.append(_Scope(parent, is_lambda))
+        return len(scopes) - 1
+
+    def bind(p: ast.Pattern, kind: str, scope: int) -> None:
+        todo = [p]
+        while todo:
+            match todo.pop():
+                case ast.PName(name=name, span=span):
+                    define(name, kind, span, span, scope)
+                case ast.PTuple(items=items):
+                    todo.extend(reversed(items))
+                case ast.PList(items=items, tail=tail):
+                    if tail is not None:
+                        todo.append(tail)
+                    todo.extend(reversed(items))
+                case ast.PVariant(payload=payload):
+                    todo.append(payload)
+
+    # Iterative pre-order walk: definitions are found in source order, and deep
+    # nesting (which the parser accepts) does not exhaust the Python stack.
+    stack: list[tuple[ast.Node, int]] = [(it, 0) for it in reversed(program.items)]
+    while stack:
+        node, scope = stack.pop()
+        match node:
+            case ast.Name(value=name, span=span):
+                reads.append((name, span, scope))
+            case ast.Binding(name=name, value=value, span=span):
+                kind, extra = _describe(value, source)
+                define(name, kind, _name_span(span, name), span, scope, **extra)
+                stack.append((value, scope))
+            case ast.Mutation(name=name, value=value, span=span):
+                reads.append((name, _name_span(span, name), scope))
+                stack.append((value, scope))
+            case ast.Block(items=items):
+                inner = new_scope(scope)
+                stack.extend((it, inner) for it in reversed(items))
+            case ast.Lambda(params=params, body=body):
+                inner = new_scope(scope, True)
+                for p in params:
+                    bind(p, "parameter", inner)
+                stack.append((body, inner))
+            case ast.DispatchArm(pattern=pattern, expr=expr) | ast.CycleArm(
+                pattern=pattern, expr=expr
+            ):
+                inner = new_scope(scope)
+                bind(pattern, "binder", inner)
+                stack.append((expr, inner))
+            case ast.Dispatch(value=value, arms=arms) | ast.Cycle(seed=value, arms=arms):
+                stack.extend((arm, scope) for arm in reversed(arms))
+                stack.append((value, scope))
+            case ast.TupleExpr(items=items) | ast.ListExpr(items=items):
+                stack.extend((it, scope) for it in reversed(items))
+            case ast.MapExpr(entries=entries):
+                for k, v in reversed(entries):
+                    stack.append((v, scope))
+                    stack.append((k, scope))
+            case ast.VariantExpr(payload=payload):
+                stack.append((payload, scope))
+            case ast.Call(func=func, arg=arg):
+                stack.append((arg, scope))
+                stack.append((func, scope))
+            case ast.Unary(expr=expr):
+                stack.append((expr, scope))
+            case ast.Binary(left=left, right=right):
+                stack.append((right, scope))
+                stack.append((left, scope))
+
+    refs = decls
+    for name, span, scope in reads:
+        target, late = _lookup(scopes, symbols, scope, name, span.start.offset)
+        refs.append(Ref(name, span, target, late))
+    return SymbolTable(symbols, refs)
+
+
+def _lookup(
+    scopes: list[_Scope], symbols: list[Symbol], scope: int, name: str, offset: int
+) -> tuple[int | None, bool]:
+    late = False
+    s: int | None = scope
+    while s:  # the module scope (0) is resolved by the caller
+        sc = scopes[s]
+        defs = sc.names.get(name)
+        if defs:
+            i = pick([symbols[k].visible for k in defs], offset, late)
+            if i is not None:
+                return defs[i], late
+        late = late or sc.is_lambda
+        s = sc.parent
+    return None, late
+
+
+def _name_span(span: Span, name: str) -> Span:
+    # Bindings and mutations start with the name.
+    s = span.start
+    return Span(s, Position(s.offset + len(name), s.line, s.column + len(name)))
+
+
+def _describe(value: ast.Expr, source: str) -> tuple[str, dict]:
+    match value:
+        case ast.Lambda(params=params):
+            text = " ".join(source[p.span.start.offset : p.span.end.offset] for p in params)
+            return "function", {"detail": f"({text})"}
+        case ast.Call(
+            func=ast.Call(func=ast.Name(value="link"), arg=ast.TextLit(value=path)),
+            arg=ast.TextLit(value=member),
+        ):
+            return "import", {"link": (path, member)}
+    return "binding", {}
+
+
+def token_symbols(source: str, tokens: list[Token]) -> SymbolTable:
+    """A best-effort table for text that does not parse.
+
+    Every `name ←` is taken as a module-scope definition and every other name
+    as a read from the module scope.
+    """
+
+    symbols: list[Symbol] = []
+    refs: list[Ref] = []
+    n = len(tokens)
+    for i, t in enumerate(tokens):
+        if t.type != TokenType.IDENT:
+            continue
+        name = str(t.value)
+        if i + 1 < n and tokens[i + 1].type == TokenType.ARROW_BIND:
+            j = i + 2
+            while j < n and tokens[j].type == TokenType.NEWLINE:
+                j += 1
+            kind, extra = "binding", {}
+            if j < n and tokens[j].type == TokenType.LAMBDA:
+                kind, extra = "function", {"detail": _lambda_params(source, tokens, j)}
+            full_span = tokens[j].span if j < n else t.span
+            refs.append(Ref(name, t.span, len(symbols), decl=True))
+            symbols.append(Symbol(name, kind, t.span, full_span, 0, t.span.end.offset, **extra))
+        else:
+            refs.append(Ref(name, t.span, None, late=True))
+    return SymbolTable(symbols, refs)
+
+
+def _lambda_params(source: str, tokens: list[Token], lambda_index: int) -> str | None:
+    # The text from the ( after the lambda token to its matching ).
+    i = lambda_index + 1
+    while i < len(tokens) and tokens[i].type == TokenType.NEWLINE:
+        i += 1
+    if i >= len(tokens) or tokens[i].type != TokenType.LPAREN:
+        return None
+    start = tokens[i].span.start.offset
+    depth = 0
+    while i < len(tokens):
+        if tokens[i].type == TokenType.LPAREN:
+            depth += 1
+        elif tokens[i].type == TokenType.RPAREN:
+            depth -= 1
+            if depth == 0:
+                return source[start : tokens[i].span.end.offset]
+        i += 1
+    return None
+
+
+def analyze_symbols(source: str, filename: str | None = None) -> SymbolTable | None:
+    """The symbol table of `source`; token-based if it does not parse, None if it does not lex."""
+
+    try:
+        tokens = Lexer(source, filename=filename).tokenize()
+    except LexError:
+        return None
+    try:
+        program = Parser(tokens, source, filename=filename).parse_program()
+    except ParseError:
+        return token_symbols(source, tokens)
+    return build_symbols(program, source)
+
+
+# ----------------------------
+# Workspace index
+# ----------------------------
+
+
+def module_path(importer: str, raw: str) -> str:
+    """The file `link · raw · …` loads from a module at `importer`, as the VM resolves it."""
+
+    p = raw if os.path.splitext(raw)[1] else raw + ".suay"
+    return os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(importer)), p))
+
+
+class WorkspaceIndex:
+    """Symbol tables of the `.suay` files under a root directory.
+
+    Each file's table is cached against its modification time and size, so a
+    query re-reads only files changed since the last one. The file list is
+    gathered once and kept up to date with `add` and `discard`. Without a root
+    there are no files to list, but `table` still reads any file it is given.
+    """
+
+    def __init__(self, root: str | None) -> None:
+        self.root = os.path.abspath(root) if root else None
+        self._files: set[str] | None = None
+        self._tables: dict[str, tuple[tuple[int, int], SymbolTable | None]] = {}
+
+    def files(self) -> list[str]:
+        if self.root is None:
+            return []
+        if self._files is None:
+            found: set[str] = set()
+            for dirpath, dirnames, filenames in os.walk(self.root):
+                dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+                found.update(os.path.join(dirpath, f) for f in filenames if f.endswith(".suay"))
+            self._files = found
+        return sorted(self._files)
+
+    def add(self, path: str) -> None:
+        if self._files is not None and path.endswith(".suay"):
+            self._files.add(os.path.abspath(path))
+
+    def discard(self, path: str) -> None:
+        path = os.path.abspath(path)
+        if self._files is not None:
+            self._files.discard(path)
+        self._tables.pop(path, None)
+
+    def table(self, path: str) -> SymbolTable | None:
+        """The table of the file at `path`, or None if it cannot be read or lexed."""
+
+        path = os.path.abspath(path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            self._tables.pop(path, None)
+            return None
+        key = (st.st_mtime_ns, st.st_size)
+        cached = self._tables.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                source = f.read()
+        except (OSError, UnicodeDecodeError):
+            table = None
+        else:
+            table = analyze_symbols(source, path)
+        self._tables[path] = (key, table)
+        return table
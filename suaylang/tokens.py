@@ -1,22 +1,84 @@
 from __future__ import annotations
 
+import re
+from bisect import bisect_right
 from dataclasses import dataclass
 from enum import Enum
+from functools import lru_cache
 
 
-@dataclass(frozen=True)
+# Positions, spans and tokens are built for every token the lexer emits, so they
+# are slotted and not frozen (a frozen dataclass assigns each field through
+# object.__setattr__). They are never mutated after construction.
+
+
+@dataclass(slots=True, unsafe_hash=True)
 class Position:
     offset: int
     line: int
     column: int
 
 
-@dataclass(frozen=True)
+@dataclass(slots=True, unsafe_hash=True)
 class Span:
     start: Position
     end: Position
 
 
+_NEWLINE = re.compile("\n")
+
+
+class LineIndex:
+    """Where each line of a source text starts, for offset <-> position conversion.
+
+    Lines are split at "\n" only, and columns count code points from 1, as the
+    lexer counts them. The line starts are found on first use, so an index
+    that is never queried costs nothing; `line_index` shares one per text.
+    """
+
+    __slots__ = ("source", "_starts")
+
+    def __init__(self, source: str) -> None:
+        self.source = source
+        self._starts: list[int] | None = None
+
+    @property
+    def starts(self) -> list[int]:
+        if self._starts is None:
+            self._starts = [0, *(m.end() for m in _NEWLINE.finditer(self.source))]
+        return self._starts
+
+    @property
+    def line_count(self) -> int:
+        return len(self.starts)
+
+    def line_of(self, offset: int) -> int:
+        return bisect_right(self.starts, offset)
+
+    def position(self, offset: int) -> Position:
+        line = bisect_right(self.starts, offset)
+        return Position(offset, line, offset - self.starts[line - 1] + 1)
+
+    def offset(self, line: int, column: int) -> int:
+        return self.starts[line - 1] + column - 1
+
+    def line_text(self, line: int) -> str | None:
+        """Text of 1-based `line` without its newline; None if there is no such line."""
+
+        starts = self.starts
+        if line <= 0 or line > len(starts):
+            return None
+        end = starts[line] - 1 if line < len(starts) else len(self.source)
+        return self.source[starts[line - 1] : end]
+
+
+@lru_cache(maxsize=16)
+def line_index(source: str) -> LineIndex:
+    """The shared `LineIndex` of `source` (the parser, lexer and errors of one text use one)."""
+
+    return LineIndex(source)
+
+
 class TokenType(str, Enum):
     EOF = "EOF"
     NEWLINE = "NEWLINE"
@@ -84,7 +146,7 @@ class TokenType(str, Enum):
     CALL = "CALL"  # ·
 
 
-@dataclass(frozen=True)
+@dataclass(slots=True, unsafe_hash=True)
 class Token:
     type: TokenType
     lexeme: str
@@ -1,14 +1,19 @@
 from __future__ import annotations
 
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
-from . import ast
-from .bytecode import Code, Instr
-from .compiler import Compiler
-from .lexer import Lexer
-from .parser import Parser
+from .bytecode import NO_OPERAND, OPCODE, OPCODES, Code, Instr
+from .bytecode_cache import load_module
+from .patterns import Matcher, compile_pattern
+from .persistent import PMap, concat_text, list_tail, pmap, pvector
 from .runtime import (
+    BUILTINS_LAYOUT,
+    EMPTY_LAYOUT,
+    LIST_TYPES,
+    MAP_TYPES,
+    TEXT_TYPES,
+    UNBOUND,
     Builtin,
     Closure,
     Env,
@@ -17,7 +22,9 @@ from .runtime import (
     UNIT,
     Unit,
     Variant,
+    type_name,
 )
+from .tokens import Span
 
 
 def _is_truthy(v: object) -> bool:
@@ -32,6 +39,11 @@ def _is_number(v: object) -> bool:
     return isinstance(v, (int, float)) and not isinstance(v, bool)
 
 
+# Exact operand types for the ADD/SUB/... fast paths. bool is an int subclass
+# but not a Num, so it is absent here and takes the checked path in _binary.
+_NUM_TYPES = frozenset({int, float})
+
+
 def _to_text(v: object) -> str:
     if v is UNIT:
         return "ø"
@@ -39,13 +51,13 @@ def _to_text(v: object) -> str:
         return "⊤" if v else "⊥"
     if isinstance(v, (int, float)):
         return str(v)
-    if isinstance(v, str):
-        return v
+    if isinstance(v, TEXT_TYPES):
+        return str(v)
     if isinstance(v, tuple):
         return "(" + " ".join(_to_text(x) for x in v) + ")"
-    if isinstance(v, list):
+    if isinstance(v, LIST_TYPES):
         return "[" + " ".join(_to_text(x) for x in v) + "]"
-    if isinstance(v, dict):
+    if isinstance(v, MAP_TYPES):
         inner = ", ".join(f"{_to_text(k)} ↦ {_to_text(val)}" for k, val in v.items())
         return "⟦" + inner + "⟧"
     if isinstance(v, Variant):
@@ -59,18 +71,203 @@ def _to_text(v: object) -> str:
     return str(v)
 
 
-@dataclass(frozen=True)
+@dataclass(slots=True, unsafe_hash=True)
 class ClosureBC:
-    params: list[ast.Pattern]
+    params: list[Matcher]
     code: Code
     env: Env
     name: str | None = None
+    # For `code.flat_params`: the shared parameter env holding the arguments
+    # bound so far by partial application (copied before each further binding).
+    partial: Env | None = None
+
+
+# Bytecode calls run on an explicit frame stack, so this bounds memory rather
+# than the host recursion limit.
+DEFAULT_MAX_CALL_DEPTH = 100_000
+
+_OP_HALT = OPCODE["HALT"]
+_OP_CALL = OPCODE["CALL"]
+_OP_TAIL_CALL = OPCODE["TAIL_CALL"]
+_OP_CALL_N = OPCODE["CALL_N"]
+_OP_TAIL_CALL_N = OPCODE["TAIL_CALL_N"]
+# Opcodes that switch frames; the dispatch loop handles these itself.
+_FRAME_OPS = frozenset({_OP_HALT, _OP_CALL, _OP_TAIL_CALL, _OP_CALL_N, _OP_TAIL_CALL_N})
+
+
+class _Frame:
+    """Mutable execution state of one `Code` activation.
+
+    `call_span`/`label` describe the call that created the frame (both None for
+    the entry frame) and become a `StackFrame` if an error unwinds through it.
+    `pc` is only meaningful while the frame is suspended under a callee.
+    `pending` holds arguments of the call chain that created the frame, which
+    the caller applies the frame's result to (see CALL_N). `tail_pending` holds
+    (arguments, span) of chains called in tail position from this frame, which
+    the frame itself applies its result to, innermost first.
+    """
+
+    __slots__ = ("code", "env", "stack", "pc", "call_span", "label", "pending", "tail_pending")
+
+    def __init__(
+        self,
+        code: Code,
+        env: Env,
+        call_span: Span | None = None,
+        label: str = "",
+        pending: list[object] | None = None,
+        tail_pending: list[tuple[list[object], Span | None]] | None = None,
+    ) -> None:
+        self.code = code
+        self.env = env
+        self.stack: list[object] = []
+        self.pc = 0
+        self.call_span = call_span
+        self.label = label
+        self.pending = pending
+        self.tail_pending = tail_pending
+
+
+# ----------------------------
+# Shared builtins
+# ----------------------------
+#
+# Builtins other than `map` and `fold` do not depend on the VM that calls them:
+# their errors carry only a message, and the caller (`_apply`/`_call_builtin`)
+# fills in its span, source and filename. They are created once per process in
+# a template env; each VM, including the one per loaded module, copies it
+# (programs may rebind builtin names with `⇐`) and adds its own `map` and
+# `fold`.
+
+_SHARED_BUILTINS: Env | None = None
+
+
+def _shared_builtins() -> Env:
+    global _SHARED_BUILTINS
+    if _SHARED_BUILTINS is None:
+        _SHARED_BUILTINS = _make_shared_builtins()
+    return _SHARED_BUILTINS
+
+
+def _make_shared_builtins() -> Env:
+    env = Env(parent=None, layout=BUILTINS_LAYOUT)
+
+    def say(x: object) -> Unit:
+        print(_to_text(x))
+        return UNIT
+
+    def hear(prompt: object) -> str:
+        try:
+            p = _to_text(prompt)
+            return input(p)
+        except EOFError:
+            return ""
+
+    def text(x: object) -> str:
+        return _to_text(x)
+
+    def abs1(x: object) -> int | float:
+        if not _is_number(x):
+            raise SuayRuntimeError(f"abs expects a number, got {type_name(x)}")
+        return -x if x < 0 else x  # type: ignore[operator]
+
+    def count1(x: object) -> int:
+        if isinstance(x, (*TEXT_TYPES, tuple, *LIST_TYPES, *MAP_TYPES)):
+            return len(x)
+        raise SuayRuntimeError(f"count expects Text, List, Tuple, or Map; got {type_name(x)}")
+
+    def at2(xs: object, i: object) -> object:
+        if not isinstance(i, int) or isinstance(i, bool):
+            raise SuayRuntimeError(f"at expects an Int index; got {type_name(i)}")
+
+        if isinstance(xs, TEXT_TYPES):
+            xs = str(xs)
+            n = len(xs)
+            j = i if i >= 0 else n + i
+            if j < 0 or j >= n:
+                raise SuayRuntimeError(f"Index {i} out of range for Text of length {n}")
+            return xs[j]
+
+        if isinstance(xs, (tuple, *LIST_TYPES)):
+            n = len(xs)
+            j = i if i >= 0 else n + i
+            if j < 0 or j >= n:
+                raise SuayRuntimeError(f"Index {i} out of range for sequence of length {n}")
+            return xs[j]
+
+        raise SuayRuntimeError(f"at expects Text, List, or Tuple; got {type_name(xs)}")
+
+    def take2(xs: object, n: object) -> object:
+        if not isinstance(n, int) or isinstance(n, bool):
+            raise SuayRuntimeError(f"take expects an Int count; got {type_name(n)}")
+        if n < 0:
+            raise SuayRuntimeError("take expects a non-negative count")
+        if isinstance(xs, TEXT_TYPES):
+            return str(xs)[:n]
+        if isinstance(xs, LIST_TYPES):
+            return xs[:n]
+        raise SuayRuntimeError(f"take expects Text or List; got {type_name(xs)}")
+
+    def drop2(xs: object, n: object) -> object:
+        if not isinstance(n, int) or isinstance(n, bool):
+            raise SuayRuntimeError(f"drop expects an Int count; got {type_name(n)}")
+        if n < 0:
+            raise SuayRuntimeError("drop expects a non-negative count")
+        if isinstance(xs, TEXT_TYPES):
+            return str(xs)[n:]
+        if isinstance(xs, LIST_TYPES):
+            return list_tail(xs, n)
+        raise SuayRuntimeError(f"drop expects Text or List; got {type_name(xs)}")
+
+    def keys1(m: object) -> list[object]:
+        if not isinstance(m, MAP_TYPES):
+            raise SuayRuntimeError(f"keys expects a Map, got {type_name(m)}")
+        return list(m.keys())
+
+    def has2(m: object, k: object) -> bool:
+        if not isinstance(m, MAP_TYPES):
+            raise SuayRuntimeError(f"has expects a Map, got {type_name(m)}")
+        try:
+            return k in m
+        except TypeError:
+            raise SuayRuntimeError("has expects a hashable key")
+
+    def put3(m: object, k: object, v: object) -> PMap:
+        if not isinstance(m, MAP_TYPES):
+            raise SuayRuntimeError(f"put expects a Map, got {type_name(m)}")
+        try:
+            out = pmap(m).set(k, v)
+        except TypeError:
+            raise SuayRuntimeError("put expects a hashable key")
+        return out
+
+    env.define("hear", Builtin(name="hear", arity=1, impl=hear))
+    env.define("say", Builtin(name="say", arity=1, impl=say))
+    env.define("text", Builtin(name="text", arity=1, impl=text))
+    env.define("abs", Builtin(name="abs", arity=1, impl=abs1))
+    env.define("count", Builtin(name="count", arity=1, impl=count1))
+    env.define("at", Builtin(name="at", arity=2, impl=at2))
+    env.define("take", Builtin(name="take", arity=2, impl=take2))
+    env.define("drop", Builtin(name="drop", arity=2, impl=drop2))
+    env.define("keys", Builtin(name="keys", arity=1, impl=keys1))
+    env.define("has", Builtin(name="has", arity=2, impl=has2))
+    env.define("put", Builtin(name="put", arity=3, impl=put3))
+    # `link` is special-cased in _apply to perform module loading.
+    env.define("link", Builtin(name="link", arity=2, impl=lambda _path, _name: UNIT))
+    return env
 
 
 @dataclass
 class ModuleSystem:
+    """Module state of one program run, shared by the VMs of the modules it loads."""
+
     cache: dict[str, Env]
     loading: list[str]
+    # (importer filename, raw path) -> absolute module path.
+    paths: dict[tuple[str | None, str], str] = field(default_factory=dict)
+    # (importer filename, raw path, member) -> the module env of a `link` that
+    # succeeded, so repeating it is one lookup.
+    links: dict[tuple[str | None, str, str], Env] = field(default_factory=dict)
 
 
 class VM:
@@ -87,11 +284,13 @@ class VM:
         self.trace = trace
         self._depth = 0
         self.modules = modules
+        self.max_call_depth = DEFAULT_MAX_CALL_DEPTH
 
-        self._builtins_env = Env(parent=None)
+        self._builtins_env = _shared_builtins().copy()
         self._install_builtins(self._builtins_env)
         if self.modules is None:
             self.modules = ModuleSystem(cache={}, loading=[])
+        self._handlers = self._build_handlers()
 
     def run(self, code: Code) -> object:
         env = Env(parent=self._builtins_env)
@@ -106,212 +305,606 @@ class VM:
         return val
 
     def run_in_env_with_stats(self, code: Code, env: Env) -> tuple[object, int]:
-        stack: list[object] = []
+        # Calls to bytecode closures do not recurse into this method: the caller's
+        # frame is suspended on `frames` and the callee runs in the same loop.
+        # A call in tail position (TAIL_CALL) replaces the current frame instead.
+        frame = _Frame(code, env)
+        frames: list[_Frame] = []
+        stack = frame.stack
+        ops = code.ops
+        handlers = self._handlers
+        trace = self.trace
+        max_depth = self.max_call_depth
         pc = 0
         steps = 0
 
-        while pc < len(code.instrs):
-            ins = code.instrs[pc]
-            steps += 1
-            if self.trace:
-                self._trace_step(code, pc, ins, stack)
+        try:
+            while True:
+                op = ops[pc]
+                steps += 1
+                if trace:
+                    self._depth = len(frames)
+                    self._trace_step(code, pc, code.instrs[pc], stack)
+
+                if op not in _FRAME_OPS:
+                    target = handlers[op](frame, code, pc)
+                    pc = pc + 1 if target is None else target
+                    continue
 
-            try:
-                op = ins.op
-                if op == "CONST":
-                    stack.append(ins.arg)
-                elif op == "LOAD":
-                    try:
-                        stack.append(env.get(str(ins.arg)))
-                    except KeyError:
-                        raise SuayRuntimeError(
-                            f"Undefined name {ins.arg!r}",
-                            span=ins.span,
-                            source=self.source,
-                            filename=self.filename,
-                        )
-                elif op == "DEF":
-                    val = stack.pop()
-                    try:
-                        env.define(str(ins.arg), val)
-                    except KeyError:
-                        raise SuayRuntimeError(
-                            f"Name {ins.arg!r} is already bound in this scope",
-                            span=ins.span,
-                            source=self.source,
-                            filename=self.filename,
-                        )
-                    stack.append(val)
-                elif op == "SET":
-                    val = stack.pop()
-                    try:
-                        env.set_existing(str(ins.arg), val)
-                    except KeyError:
-                        raise SuayRuntimeError(
-                            f"Cannot mutate {ins.arg!r}: name is not bound in any enclosing scope",
-                            span=ins.span,
-                            source=self.source,
-                            filename=self.filename,
-                        )
-                    stack.append(val)
-                elif op == "POP":
-                    stack.pop()
-                elif op == "DUP":
-                    stack.append(stack[-1])
-                elif op == "PUSH_ENV":
-                    env = Env(parent=env)
-                elif op == "POP_ENV":
-                    assert env.parent is not None
-                    env = env.parent
-                elif op == "PUSH_ENV_BIND":
-                    binds = stack.pop()
-                    if not isinstance(binds, dict):
-                        raise SuayRuntimeError(
-                            "Internal VM error: PUSH_ENV_BIND expects dict",
-                            span=ins.span,
-                            source=self.source,
-                            filename=self.filename,
+                if op == _OP_CALL or op == _OP_TAIL_CALL:
+                    arg_val = stack.pop()
+                    fn_val = stack.pop()
+                    call_span = code.spans[pc]
+                    if type(fn_val) is not ClosureBC or len(fn_val.params) != 1:
+                        stack.append(self._apply(fn_val, arg_val, call_span=call_span))
+                        pc += 1
+                        continue
+
+                    call_env = self._bind_call(fn_val, arg_val, call_span=call_span)
+                    if op == _OP_TAIL_CALL:
+                        # The caller has nothing left to do; its trace frame is elided.
+                        frame = _Frame(
+                            fn_val.code,
+                            call_env,
+                            frame.call_span,
+                            frame.label,
+                            frame.pending,
+                            frame.tail_pending,
                         )
-                    child = Env(parent=env)
-                    for k, v in binds.items():
-                        child.define(str(k), v)
-                    env = child
-                elif op == "MAKE_TUPLE":
-                    n = int(ins.arg)
-                    items = [stack.pop() for _ in range(n)][::-1]
-                    stack.append(tuple(items))
-                elif op == "MAKE_LIST":
-                    n = int(ins.arg)
-                    items = [stack.pop() for _ in range(n)][::-1]
-                    stack.append(items)
-                elif op == "MAKE_MAP":
-                    n = int(ins.arg)
-                    out: dict[object, object] = {}
-                    for _ in range(n):
-                        v = stack.pop()
-                        k = stack.pop()
-                        try:
-                            out[k] = v
-                        except TypeError as e:
+                    else:
+                        if len(frames) >= max_depth:
                             raise SuayRuntimeError(
-                                f"Invalid map key (unhashable): {e}",
-                                span=ins.span,
+                                "Maximum recursion depth exceeded",
+                                span=call_span,
                                 source=self.source,
                                 filename=self.filename,
                             )
-                    stack.append(out)
-                elif op == "MAKE_VARIANT":
-                    payload = stack.pop()
-                    stack.append(Variant(tag=str(ins.arg), payload=payload))
-                elif op == "MAKE_CLOSURE":
-                    code_obj, params = ins.arg
-                    stack.append(
-                        ClosureBC(
-                            params=list(params), code=code_obj, env=env, name=None
+                        frame.pc = pc + 1
+                        frames.append(frame)
+                        frame = _Frame(
+                            fn_val.code, call_env, call_span, fn_val.name or "<lambda>"
                         )
-                    )
-                elif op == "CALL":
-                    arg = stack.pop()
-                    fn = stack.pop()
-                    stack.append(self._apply(fn, arg, call_span=ins.span))
-                elif op == "UNARY":
-                    rhs = stack.pop()
-                    opx = str(ins.arg)
-                    if opx == "¬":
-                        stack.append(not _is_truthy(rhs))
-                    elif opx in ("−", "-"):
-                        if not _is_number(rhs):
-                            raise SuayRuntimeError(
-                                f"Unary minus expects a number, got {type(rhs).__name__}",
-                                span=ins.span,
-                                source=self.source,
-                                filename=self.filename,
-                            )
-                        stack.append(-rhs)  # type: ignore[operator]
+                    code = fn_val.code
+                    ops = code.ops
+                    stack = frame.stack
+                    pc = 0
+                    continue
+
+                if op == _OP_CALL_N or op == _OP_TAIL_CALL_N:
+                    n = code.operands[pc]
+                    args = stack[-n:]
+                    del stack[-n:]
+                    fn_val = stack.pop()
+                    call_span = code.spans[pc]
+                    tail = op == _OP_TAIL_CALL_N
+                else:
+                    result = stack[-1] if stack else UNIT
+                    if frame.tail_pending is not None:
+                        # Left-over arguments of a chain called in tail position:
+                        # apply the result to them in place of this frame.
+                        (args, call_span), *more = frame.tail_pending
+                        frame.tail_pending = more or None
+                        fn_val = result
+                        tail = True
+                    elif frame.pending is not None:
+                        # Left-over arguments of the chain that created this frame:
+                        # the caller applies the result to them.
+                        fn_val, args, call_span = result, frame.pending, frame.call_span
+                        frame = frames.pop()
+                        code = frame.code
+                        ops = code.ops
+                        stack = frame.stack
+                        pc = frame.pc
+                        tail = False
+                    elif not frames:
+                        return result, steps
                     else:
+                        frame = frames.pop()
+                        code = frame.code
+                        ops = code.ops
+                        stack = frame.stack
+                        pc = frame.pc
+                        stack.append(result)
+                        continue
+
+                fn_val, call_env, rest = self._call_chain(fn_val, args, call_span=call_span)
+                if call_env is None:
+                    # After HALT, `pc` is where the frame now running resumes.
+                    stack.append(fn_val)
+                    if op != _OP_HALT:
+                        pc += 1
+                    continue
+                if tail:
+                    tail_pending = frame.tail_pending
+                    if rest:
+                        tail_pending = [(rest, call_span), *(tail_pending or ())]
+                    frame = _Frame(
+                        fn_val.code,
+                        call_env,
+                        frame.call_span,
+                        frame.label,
+                        frame.pending,
+                        tail_pending,
+                    )
+                else:
+                    if len(frames) >= max_depth:
                         raise SuayRuntimeError(
-                            f"Unknown unary operator {opx!r}",
-                            span=ins.span,
+                            "Maximum recursion depth exceeded",
+                            span=call_span,
                             source=self.source,
                             filename=self.filename,
                         )
-                elif op == "BINARY":
-                    right = stack.pop()
-                    left = stack.pop()
-                    stack.append(self._binary(str(ins.arg), left, right, span=ins.span))
-                elif op == "TO_BOOL":
-                    stack.append(_is_truthy(stack.pop()))
-                elif op == "JMP":
-                    pc = int(ins.arg)
-                    continue
-                elif op == "JMP_IF_FALSE":
-                    v = stack.pop()
-                    if not _is_truthy(v):
-                        pc = int(ins.arg)
-                        continue
-                elif op == "JMP_IF_TRUE":
-                    v = stack.pop()
-                    if _is_truthy(v):
-                        pc = int(ins.arg)
-                        continue
-                elif op == "MATCH":
-                    v = stack.pop()
-                    binds = self._match_pattern(ins.arg, v, span=ins.span)
-                    stack.append(binds)
-                elif op == "JMP_IF_NONE":
-                    top = stack.pop()
-                    if top is None:
-                        pc = int(ins.arg)
-                        continue
-                    stack.append(top)
-                elif op == "RAISE":
-                    raise SuayRuntimeError(
-                        str(ins.arg),
-                        span=ins.span,
-                        source=self.source,
-                        filename=self.filename,
-                    )
-                elif op == "HALT":
-                    return (stack[-1] if stack else UNIT), steps
-                else:
-                    raise SuayRuntimeError(
-                        f"Unknown opcode {op}",
-                        span=ins.span,
-                        source=self.source,
-                        filename=self.filename,
+                    if op != _OP_HALT:
+                        frame.pc = pc + 1
+                    frames.append(frame)
+                    frame = _Frame(
+                        fn_val.code,
+                        call_env,
+                        call_span,
+                        fn_val.name or "<lambda>",
+                        rest or None,
                     )
+                code = fn_val.code
+                ops = code.ops
+                stack = frame.stack
+                pc = 0
 
-            except SuayRuntimeError:
-                raise
-            except RecursionError:
-                raise SuayRuntimeError(
-                    "Maximum recursion depth exceeded",
-                    span=ins.span,
-                    source=self.source,
-                    filename=self.filename,
-                )
-            except Exception as e:
-                raise SuayRuntimeError(
-                    f"Internal VM error: {type(e).__name__}: {e}",
-                    span=ins.span,
-                    source=self.source,
-                    filename=self.filename,
+        except SuayRuntimeError as e:
+            err = e
+            if err.span is None:
+                err = err.with_location(
+                    span=code.spans[pc], source=self.source, filename=self.filename
                 )
+        except RecursionError:
+            err = SuayRuntimeError(
+                "Maximum recursion depth exceeded",
+                span=code.spans[pc],
+                source=self.source,
+                filename=self.filename,
+            )
+        except Exception as e:
+            err = SuayRuntimeError(
+                f"Internal VM error: {type(e).__name__}: {e}",
+                span=code.spans[pc],
+                source=self.source,
+                filename=self.filename,
+            )
 
-            pc += 1
+        # Rebuild the call trace from the frames that were active, outermost
+        # first, in one pass: `with_frame` per frame would copy the trace each time.
+        frames.append(frame)
+        trace_frames = [
+            StackFrame(label=f"call {active.label}", span=active.call_span)
+            for active in frames
+            if active.call_span is not None
+        ]
+        raise SuayRuntimeError(
+            err.message,
+            span=err.span,
+            frames=[*trace_frames, *err.frames],
+            source=err.source,
+            filename=err.filename,
+        )
+
+    # -------- Opcode handlers --------
+    #
+    # Each handler receives (frame, code, pc) and returns None to fall through to
+    # the next instruction, or a jump target pc. Errors are raised without a span;
+    # the dispatch loop attaches the span of the failing instruction. CALL,
+    # TAIL_CALL and HALT switch frames and are handled by the loop itself.
+
+    def _build_handlers(self) -> list:
+        table = [self._op_unknown] * (len(OPCODES) + 1)
+        for name, handler in (
+            ("CONST", self._op_const),
+            ("LOAD", self._op_load),
+            ("DEF", self._op_def),
+            ("SET", self._op_set),
+            ("POP", self._op_pop),
+            ("DUP", self._op_dup),
+            ("PUSH_ENV", self._op_push_env),
+            ("POP_ENV", self._op_pop_env),
+            ("PUSH_ENV_BIND", self._op_push_env_bind),
+            ("MAKE_TUPLE", self._op_make_tuple),
+            ("MAKE_LIST", self._op_make_list),
+            ("MAKE_MAP", self._op_make_map),
+            ("MAKE_VARIANT", self._op_make_variant),
+            ("MAKE_CLOSURE", self._op_make_closure),
+            ("UNARY", self._op_unary),
+            ("BINARY", self._op_binary),
+            ("TO_BOOL", self._op_to_bool),
+            ("JMP", self._op_jmp),
+            ("JMP_IF_FALSE", self._op_jmp_if_false),
+            ("JMP_IF_TRUE", self._op_jmp_if_true),
+            ("MATCH", self._op_match),
+            ("JMP_IF_NONE", self._op_jmp_if_none),
+            ("RAISE", self._op_raise),
+            ("LOAD_LOCAL", self._op_load_local),
+            ("LOAD_DEREF", self._op_load_deref),
+            ("LOAD_NAME", self._op_load_name),
+            ("LOAD_GLOBAL", self._op_load_global),
+            ("DEF_LOCAL", self._op_def_local),
+            ("SET_LOCAL", self._op_set_local),
+            ("SET_DEREF", self._op_set_deref),
+            ("MATCH_ARM", self._op_match_arm),
+            ("SWITCH", self._op_switch),
+            ("ADD", self._op_add),
+            ("SUB", self._op_sub),
+            ("MUL", self._op_mul),
+            ("DIV", self._op_div),
+            ("MOD", self._op_mod),
+            ("EQ", self._op_eq),
+            ("NE", self._op_ne),
+            ("LT", self._op_lt),
+            ("LE", self._op_le),
+            ("GT", self._op_gt),
+            ("GE", self._op_ge),
+        ):
+            table[OPCODE[name]] = handler
+        return table
+
+    def _error(self, message: str) -> SuayRuntimeError:
+        return SuayRuntimeError(message, source=self.source, filename=self.filename)
+
+    def _op_const(self, f: _Frame, code: Code, pc: int) -> None:
+        f.stack.append(code.consts[code.operands[pc]])
+
+    def _op_load(self, f: _Frame, code: Code, pc: int) -> None:
+        name = code.consts[code.operands[pc]]
+        try:
+            f.stack.append(f.env.get(str(name)))
+        except KeyError:
+            raise self._error(f"Undefined name {name!r}")
+
+    def _op_def(self, f: _Frame, code: Code, pc: int) -> None:
+        name = code.consts[code.operands[pc]]
+        stack = f.stack
+        val = stack[-1]
+        try:
+            f.env.define(str(name), val)
+        except KeyError:
+            raise self._error(f"Name {name!r} is already bound in this scope")
+
+    def _op_set(self, f: _Frame, code: Code, pc: int) -> None:
+        name = code.consts[code.operands[pc]]
+        try:
+            f.env.set_existing(str(name), f.stack[-1])
+        except KeyError:
+            raise self._error(
+                f"Cannot mutate {name!r}: name is not bound in any enclosing scope"
+            )
 
-        return (stack[-1] if stack else UNIT), steps
+    # Resolved variable access. Operands carry the name for fallbacks and error
+    # messages. A slot is UNBOUND until its binding executes; until then lookups
+    # continue in the enclosing envs, exactly as a dict miss would.
+
+    def _lookup_outer(self, env: Env, name: str) -> object:
+        parent = env.parent
+        try:
+            if parent is None:
+                raise KeyError(name)
+            return parent.get(name)
+        except KeyError:
+            raise self._error(f"Undefined name {name!r}")
+
+    def _op_load_local(self, f: _Frame, code: Code, pc: int) -> None:
+        slot, name = code.consts[code.operands[pc]]
+        v = f.env.slots[slot]
+        if v is UNBOUND:
+            v = self._lookup_outer(f.env, name)
+        f.stack.append(v)
+
+    def _op_load_deref(self, f: _Frame, code: Code, pc: int) -> None:
+        depth, slot, name = code.consts[code.operands[pc]]
+        env = f.env
+        for _ in range(depth):
+            env = env.parent  # type: ignore[assignment]
+        v = env.slots[slot]
+        if v is UNBOUND:
+            v = self._lookup_outer(env, name)
+        f.stack.append(v)
+
+    def _op_load_name(self, f: _Frame, code: Code, pc: int) -> None:
+        depth, name = code.consts[code.operands[pc]]
+        env = f.env
+        for _ in range(depth):
+            env = env.parent  # type: ignore[assignment]
+        try:
+            f.stack.append(env.get(name))
+        except KeyError:
+            raise self._error(f"Undefined name {name!r}")
+
+    def _op_load_global(self, f: _Frame, code: Code, pc: int) -> None:
+        slot, _name = code.consts[code.operands[pc]]
+        f.stack.append(self._builtins_env.slots[slot])
+
+    def _op_def_local(self, f: _Frame, code: Code, pc: int) -> None:
+        slot, name = code.consts[code.operands[pc]]
+        slots = f.env.slots
+        if slots[slot] is not UNBOUND:
+            raise self._error(f"Name {name!r} is already bound in this scope")
+        slots[slot] = f.stack[-1]
+
+    def _store_slot(self, env: Env, slot: int, name: str, value: object) -> None:
+        if env.slots[slot] is not UNBOUND:
+            env.slots[slot] = value
+            return
+        try:
+            if env.parent is None:
+                raise KeyError(name)
+            env.parent.set_existing(name, value)
+        except KeyError:
+            raise self._error(
+                f"Cannot mutate {name!r}: name is not bound in any enclosing scope"
+            )
+
+    def _op_set_local(self, f: _Frame, code: Code, pc: int) -> None:
+        slot, name = code.consts[code.operands[pc]]
+        self._store_slot(f.env, slot, name, f.stack[-1])
+
+    def _op_set_deref(self, f: _Frame, code: Code, pc: int) -> None:
+        depth, slot, name = code.consts[code.operands[pc]]
+        env = f.env
+        for _ in range(depth):
+            env = env.parent  # type: ignore[assignment]
+        self._store_slot(env, slot, name, f.stack[-1])
+
+    def _op_pop(self, f: _Frame, code: Code, pc: int) -> None:
+        f.stack.pop()
+
+    def _op_dup(self, f: _Frame, code: Code, pc: int) -> None:
+        f.stack.append(f.stack[-1])
+
+    def _op_push_env(self, f: _Frame, code: Code, pc: int) -> None:
+        operand = code.operands[pc]
+        layout = EMPTY_LAYOUT if operand == NO_OPERAND else code.consts[operand]
+        f.env = Env(parent=f.env, layout=layout)
+
+    def _op_pop_env(self, f: _Frame, code: Code, pc: int) -> None:
+        assert f.env.parent is not None
+        f.env = f.env.parent
+
+    def _op_push_env_bind(self, f: _Frame, code: Code, pc: int) -> None:
+        binds = f.stack.pop()
+        if not isinstance(binds, dict):
+            raise self._error("Internal VM error: PUSH_ENV_BIND expects dict")
+        operand = code.operands[pc]
+        layout = EMPTY_LAYOUT if operand == NO_OPERAND else code.consts[operand]
+        child = Env(parent=f.env, layout=layout)
+        for k, v in binds.items():
+            child.define(str(k), v)
+        f.env = child
+
+    def _op_make_tuple(self, f: _Frame, code: Code, pc: int) -> None:
+        n = code.operands[pc]
+        stack = f.stack
+        if n:
+            items = tuple(stack[-n:])
+            del stack[-n:]
+        else:
+            items = ()
+        stack.append(items)
+
+    def _op_make_list(self, f: _Frame, code: Code, pc: int) -> None:
+        n = code.operands[pc]
+        stack = f.stack
+        if n:
+            items = stack[-n:]
+            del stack[-n:]
+        else:
+            items = []
+        stack.append(items)
+
+    def _op_make_map(self, f: _Frame, code: Code, pc: int) -> None:
+        stack = f.stack
+        out: dict[object, object] = {}
+        for _ in range(code.operands[pc]):
+            v = stack.pop()
+            k = stack.pop()
+            try:
+                out[k] = v
+            except TypeError as e:
+                raise self._error(f"Invalid map key (unhashable): {e}")
+        stack.append(out)
+
+    def _op_make_variant(self, f: _Frame, code: Code, pc: int) -> None:
+        stack = f.stack
+        tag = code.consts[code.operands[pc]]
+        stack.append(Variant(tag=str(tag), payload=stack.pop()))
+
+    def _op_make_closure(self, f: _Frame, code: Code, pc: int) -> None:
+        code_obj, params = code.consts[code.operands[pc]]
+        f.stack.append(
+            ClosureBC(params=list(params), code=code_obj, env=f.env, name=None)
+        )
+
+    def _op_unary(self, f: _Frame, code: Code, pc: int) -> None:
+        stack = f.stack
+        rhs = stack.pop()
+        opx = str(code.consts[code.operands[pc]])
+        if opx == "¬":
+            stack.append(not _is_truthy(rhs))
+        elif opx in ("−", "-"):
+            if not _is_number(rhs):
+                raise self._error(
+                    f"Unary minus expects a number, got {type_name(rhs)}"
+                )
+            stack.append(-rhs)  # type: ignore[operator]
+        else:
+            raise self._error(f"Unknown unary operator {opx!r}")
+
+    def _op_binary(self, f: _Frame, code: Code, pc: int) -> None:
+        stack = f.stack
+        right = stack.pop()
+        left = stack.pop()
+        opx = str(code.consts[code.operands[pc]])
+        stack.append(self._binary(opx, left, right, span=None))
+
+    # Specialized binary operators: plain int/float operands are handled inline;
+    # anything else (including division by zero) goes through _binary, which
+    # performs the same checks and raises the same errors as BINARY.
+
+    def _op_add(self, f: _Frame, code: Code, pc: int) -> None:
+        stack = f.stack
+        right = stack.pop()
+        left = stack[-1]
+        if type(left) in _NUM_TYPES and type(right) in _NUM_TYPES:
+            stack[-1] = left + right  # type: ignore[operator]
+        else:
+            stack[-1] = self._binary(code.consts[code.operands[pc]], left, right, span=None)
+
+    def _op_sub(self, f: _Frame, code: Code, pc: int) -> None:
+        stack = f.stack
+        right = stack.pop()
+        left = stack[-1]
+        if type(left) in _NUM_TYPES and type(right) in _NUM_TYPES:
+            stack[-1] = left - right  # type: ignore[operator]
+        else:
+            stack[-1] = self._binary(code.consts[code.operands[pc]], left, right, span=None)
+
+    def _op_mul(self, f: _Frame, code: Code, pc: int) -> None:
+        stack = f.stack
+        right = stack.pop()
+        left = stack[-1]
+        if type(left) in _NUM_TYPES and type(right) in _NUM_TYPES:
+            stack[-1] = left * right  # type: ignore[operator]
+        else:
+            stack[-1] = self._binary(code.consts[code.operands[pc]], left, right, span=None)
+
+    def _op_div(self, f: _Frame, code: Code, pc: int) -> None:
+        stack = f.stack
+        right = stack.pop()
+        left = stack[-1]
+        if type(left) in _NUM_TYPES and type(right) in _NUM_TYPES and right:
+            stack[-1] = left / right  # type: ignore[operator]
+        else:
+            stack[-1] = self._binary(code.consts[code.operands[pc]], left, right, span=None)
+
+    def _op_mod(self, f: _Frame, code: Code, pc: int) -> None:
+        stack = f.stack
+        right = stack.pop()
+        left = stack[-1]
+        if type(left) in _NUM_TYPES and type(right) in _NUM_TYPES and right:
+            stack[-1] = left % right  # type: ignore[operator]
+        else:
+            stack[-1] = self._binary(code.consts[code.operands[pc]], left, right, span=None)
+
+    def _op_eq(self, f: _Frame, code: Code, pc: int) -> None:
+        stack = f.stack
+        right = stack.pop()
+        stack[-1] = stack[-1] == right
+
+    def _op_ne(self, f: _Frame, code: Code, pc: int) -> None:
+        stack = f.stack
+        right = stack.pop()
+        stack[-1] = stack[-1] != right
+
+    def _op_lt(self, f: _Frame, code: Code, pc: int) -> None:
+        stack = f.stack
+        right = stack.pop()
+        left = stack[-1]
+        if type(left) in _NUM_TYPES and type(right) in _NUM_TYPES:
+            stack[-1] = left < right  # type: ignore[operator]
+        else:
+            stack[-1] = self._binary(code.consts[code.operands[pc]], left, right, span=None)
+
+    def _op_le(self, f: _Frame, code: Code, pc: int) -> None:
+        stack = f.stack
+        right = stack.pop()
+        left = stack[-1]
+        if type(left) in _NUM_TYPES and type(right) in _NUM_TYPES:
+            stack[-1] = left <= right  # type: ignore[operator]
+        else:
+            stack[-1] = self._binary(code.consts[code.operands[pc]], left, right, span=None)
+
+    def _op_gt(self, f: _Frame, code: Code, pc: int) -> None:
+        stack = f.stack
+        right = stack.pop()
+        left = stack[-1]
+        if type(left) in _NUM_TYPES and type(right) in _NUM_TYPES:
+            stack[-1] = left > right  # type: ignore[operator]
+        else:
+            stack[-1] = self._binary(code.consts[code.operands[pc]], left, right, span=None)
+
+    def _op_ge(self, f: _Frame, code: Code, pc: int) -> None:
+        stack = f.stack
+        right = stack.pop()
+        left = stack[-1]
+        if type(left) in _NUM_TYPES and type(right) in _NUM_TYPES:
+            stack[-1] = left >= right  # type: ignore[operator]
+        else:
+            stack[-1] = self._binary(code.consts[code.operands[pc]], left, right, span=None)
+
+    def _op_to_bool(self, f: _Frame, code: Code, pc: int) -> None:
+        f.stack.append(_is_truthy(f.stack.pop()))
+
+    def _op_jmp(self, f: _Frame, code: Code, pc: int) -> int:
+        return code.operands[pc]
+
+    def _op_jmp_if_false(self, f: _Frame, code: Code, pc: int) -> int | None:
+        if not _is_truthy(f.stack.pop()):
+            return code.operands[pc]
+        return None
+
+    def _op_jmp_if_true(self, f: _Frame, code: Code, pc: int) -> int | None:
+        if _is_truthy(f.stack.pop()):
+            return code.operands[pc]
+        return None
+
+    def _op_match(self, f: _Frame, code: Code, pc: int) -> None:
+        # Generic form: pushes a bindings dict or None (see MATCH_ARM for arms).
+        stack = f.stack
+        arg = code.consts[code.operands[pc]]
+        matcher = arg if isinstance(arg, Matcher) else compile_pattern(arg)
+        stack.append(matcher.match(stack.pop()))
+
+    def _op_match_arm(self, f: _Frame, code: Code, pc: int) -> int:
+        # On failure, continue at the target of the JMP that follows; on success,
+        # drop the scrutinee, bind into a fresh env if the arm has one, and skip it.
+        matcher, layout = code.consts[code.operands[pc]]
+        stack = f.stack
+        value = stack[-1]
+        test = matcher.test
+        if test is not None and not test(value):
+            return code.operands[pc + 1]
+        stack.pop()
+        if layout is not None:
+            env = Env(parent=f.env, layout=layout)
+            if matcher.bind is not None:
+                matcher.bind(value, env.slots)
+            f.env = env
+        return pc + 2
+
+    def _op_switch(self, f: _Frame, code: Code, pc: int) -> int:
+        return code.consts[code.operands[pc]].lookup(f.stack[-1])
+
+    def _op_jmp_if_none(self, f: _Frame, code: Code, pc: int) -> int | None:
+        if f.stack[-1] is None:
+            f.stack.pop()
+            return code.operands[pc]
+        return None
+
+    def _op_raise(self, f: _Frame, code: Code, pc: int) -> None:
+        raise self._error(str(code.consts[code.operands[pc]]))
+
+    def _op_unknown(self, f: _Frame, code: Code, pc: int) -> None:
+        raise self._error(f"Unknown opcode {code.consts[code.operands[pc]]}")
 
     # ---------- Modules (v0.1: `link`) ----------
 
     def _resolve_module_path(self, raw: str) -> str:
-        p = raw
-        if not os.path.splitext(p)[1]:
-            p = p + ".suay"
-        base = (
-            os.path.dirname(os.path.abspath(self.filename)) if self.filename else os.getcwd()
-        )
-        return os.path.abspath(os.path.join(base, p))
+        assert self.modules is not None
+        key = (self.filename, raw)
+        abs_path = self.modules.paths.get(key)
+        if abs_path is None:
+            p = raw
+            if not os.path.splitext(p)[1]:
+                p = p + ".suay"
+            base = (
+                os.path.dirname(os.path.abspath(self.filename)) if self.filename else os.getcwd()
+            )
+            abs_path = self.modules.paths[key] = os.path.abspath(os.path.join(base, p))
+        return abs_path
 
     def _load_module_env(self, abs_path: str, *, call_span) -> Env:
         assert self.modules is not None
@@ -330,8 +923,7 @@ class VM:
         self.modules.loading.append(abs_path)
         try:
             try:
-                with open(abs_path, "r", encoding="utf-8") as f:
-                    mod_source = f.read()
+                mod_source, mod_code = load_module(abs_path)
             except OSError as e:
                 raise SuayRuntimeError(
                     f"Cannot load module {abs_path!r}: {e}",
@@ -340,10 +932,6 @@ class VM:
                     filename=self.filename,
                 )
 
-            mod_tokens = Lexer(mod_source, filename=abs_path).tokenize()
-            mod_program = Parser(mod_tokens, mod_source, filename=abs_path).parse_program()
-            mod_code = Compiler().compile_program(mod_program, name=abs_path)
-
             mod_vm = VM(
                 source=mod_source,
                 filename=abs_path,
@@ -365,167 +953,12 @@ class VM:
     # -------- Builtins --------
 
     def _install_builtins(self, env: Env) -> None:
-        def say(x: object) -> Unit:
-            print(_to_text(x))
-            return UNIT
-
-        def hear(prompt: object) -> str:
-            try:
-                p = _to_text(prompt)
-                return input(p)
-            except EOFError:
-                return ""
-
-        def text(x: object) -> str:
-            return _to_text(x)
-
-        def abs1(x: object) -> int | float:
-            if not _is_number(x):
-                raise SuayRuntimeError(
-                    f"abs expects a number, got {type(x).__name__}",
-                    source=self.source,
-                    filename=self.filename,
-                )
-            return -x if x < 0 else x  # type: ignore[operator]
-
-        def count1(x: object) -> int:
-            if isinstance(x, (str, list, tuple, dict)):
-                return len(x)
-            raise SuayRuntimeError(
-                f"count expects Text, List, Tuple, or Map; got {type(x).__name__}",
-                source=self.source,
-                filename=self.filename,
-            )
-
-        def at2(xs: object, i: object) -> object:
-            if not isinstance(i, int) or isinstance(i, bool):
-                raise SuayRuntimeError(
-                    f"at expects an Int index; got {type(i).__name__}",
-                    source=self.source,
-                    filename=self.filename,
-                )
-
-            if isinstance(xs, str):
-                n = len(xs)
-                j = i if i >= 0 else n + i
-                if j < 0 or j >= n:
-                    raise SuayRuntimeError(
-                        f"Index {i} out of range for Text of length {n}",
-                        source=self.source,
-                        filename=self.filename,
-                    )
-                return xs[j]
-
-            if isinstance(xs, (list, tuple)):
-                n = len(xs)
-                j = i if i >= 0 else n + i
-                if j < 0 or j >= n:
-                    raise SuayRuntimeError(
-                        f"Index {i} out of range for sequence of length {n}",
-                        source=self.source,
-                        filename=self.filename,
-                    )
-                return xs[j]
-
-            raise SuayRuntimeError(
-                f"at expects Text, List, or Tuple; got {type(xs).__name__}",
-                source=self.source,
-                filename=self.filename,
-            )
-
-        def take2(xs: object, n: object) -> object:
-            if not isinstance(n, int) or isinstance(n, bool):
-                raise SuayRuntimeError(
-                    f"take expects an Int count; got {type(n).__name__}",
-                    source=self.source,
-                    filename=self.filename,
-                )
-            if n < 0:
-                raise SuayRuntimeError(
-                    "take expects a non-negative count",
-                    source=self.source,
-                    filename=self.filename,
-                )
-            if isinstance(xs, str):
-                return xs[:n]
-            if isinstance(xs, list):
-                return xs[:n]
-            raise SuayRuntimeError(
-                f"take expects Text or List; got {type(xs).__name__}",
-                source=self.source,
-                filename=self.filename,
-            )
-
-        def drop2(xs: object, n: object) -> object:
-            if not isinstance(n, int) or isinstance(n, bool):
-                raise SuayRuntimeError(
-                    f"drop expects an Int count; got {type(n).__name__}",
-                    source=self.source,
-                    filename=self.filename,
-                )
-            if n < 0:
-                raise SuayRuntimeError(
-                    "drop expects a non-negative count",
-                    source=self.source,
-                    filename=self.filename,
-                )
-            if isinstance(xs, str):
-                return xs[n:]
-            if isinstance(xs, list):
-                return xs[n:]
-            raise SuayRuntimeError(
-                f"drop expects Text or List; got {type(xs).__name__}",
-                source=self.source,
-                filename=self.filename,
-            )
-
-        def keys1(m: object) -> list[object]:
-            if not isinstance(m, dict):
-                raise SuayRuntimeError(
-                    f"keys expects a Map, got {type(m).__name__}",
-                    source=self.source,
-                    filename=self.filename,
-                )
-            return list(m.keys())
-
-        def has2(m: object, k: object) -> bool:
-            if not isinstance(m, dict):
-                raise SuayRuntimeError(
-                    f"has expects a Map, got {type(m).__name__}",
-                    source=self.source,
-                    filename=self.filename,
-                )
-            try:
-                return k in m
-            except TypeError:
-                raise SuayRuntimeError(
-                    "has expects a hashable key",
-                    source=self.source,
-                    filename=self.filename,
-                )
-
-        def put3(m: object, k: object, v: object) -> dict[object, object]:
-            if not isinstance(m, dict):
-                raise SuayRuntimeError(
-                    f"put expects a Map, got {type(m).__name__}",
-                    source=self.source,
-                    filename=self.filename,
-                )
-            out = dict(m)
-            try:
-                out[k] = v
-            except TypeError:
-                raise SuayRuntimeError(
-                    "put expects a hashable key",
-                    source=self.source,
-                    filename=self.filename,
-                )
-            return out
+        """Define the builtins that call back into this VM (`map`, `fold`)."""
 
         def map1(fn: object, xs: object) -> list[object]:
-            if not isinstance(xs, list):
+            if not isinstance(xs, LIST_TYPES):
                 raise SuayRuntimeError(
-                    f"map expects a list, got {type(xs).__name__}",
+                    f"map expects a list, got {type_name(xs)}",
                     source=self.source,
                     filename=self.filename,
                 )
@@ -535,34 +968,19 @@ class VM:
             return out
 
         def fold1(fn: object, init: object, xs: object) -> object:
-            if not isinstance(xs, list):
+            if not isinstance(xs, LIST_TYPES):
                 raise SuayRuntimeError(
-                    f"fold expects a list, got {type(xs).__name__}",
+                    f"fold expects a list, got {type_name(xs)}",
                     source=self.source,
                     filename=self.filename,
                 )
             acc = init
             for x in xs:
-                acc = self._apply(
-                    self._apply(fn, acc, call_span=None), x, call_span=None
-                )
+                acc = self._apply_n(fn, [acc, x], call_span=None)
             return acc
 
-        env.define("hear", Builtin(name="hear", arity=1, impl=hear))
-        env.define("say", Builtin(name="say", arity=1, impl=say))
-        env.define("text", Builtin(name="text", arity=1, impl=text))
-        env.define("abs", Builtin(name="abs", arity=1, impl=abs1))
-        env.define("count", Builtin(name="count", arity=1, impl=count1))
-        env.define("at", Builtin(name="at", arity=2, impl=at2))
-        env.define("take", Builtin(name="take", arity=2, impl=take2))
-        env.define("drop", Builtin(name="drop", arity=2, impl=drop2))
-        env.define("keys", Builtin(name="keys", arity=1, impl=keys1))
-        env.define("has", Builtin(name="has", arity=2, impl=has2))
-        env.define("put", Builtin(name="put", arity=3, impl=put3))
         env.define("map", Builtin(name="map", arity=2, impl=map1))
         env.define("fold", Builtin(name="fold", arity=3, impl=fold1))
-        # `link` is special-cased in _apply to perform module loading.
-        env.define("link", Builtin(name="link", arity=2, impl=lambda _path, _name: UNIT))
 
     # -------- Call / operators --------
 
@@ -587,13 +1005,19 @@ class VM:
                     )
 
                 path, name = new_bound
-                if not isinstance(path, str) or not isinstance(name, str):
+                if not isinstance(path, TEXT_TYPES) or not isinstance(name, TEXT_TYPES):
                     raise SuayRuntimeError(
-                        f"link expects (Text,Text); got ({type(path).__name__},{type(name).__name__})",
+                        f"link expects (Text,Text); got ({type_name(path)},{type_name(name)})",
                         span=call_span,
                         source=self.source,
                         filename=self.filename,
                     )
+                path, name = str(path), str(name)
+                assert self.modules is not None
+                link_key = (self.filename, path, name)
+                linked = self.modules.links.get(link_key)
+                if linked is not None:
+                    return linked.get_local(name)
                 if name.startswith("_"):
                     raise SuayRuntimeError(
                         f"Module member {name!r} is private",
@@ -605,7 +1029,7 @@ class VM:
                 abs_path = self._resolve_module_path(path)
                 mod_env = self._load_module_env(abs_path, call_span=call_span)
                 try:
-                    return mod_env.get_local(name)
+                    value = mod_env.get_local(name)
                 except KeyError:
                     raise SuayRuntimeError(
                         f"Module {abs_path!r} has no exported name {name!r}",
@@ -613,6 +1037,8 @@ class VM:
                         source=self.source,
                         filename=self.filename,
                     )
+                self.modules.links[link_key] = mod_env
+                return value
 
             try:
                 return fn_val.apply(arg_val)
@@ -628,27 +1054,17 @@ class VM:
                 )
 
         if isinstance(fn_val, ClosureBC):
-            if not fn_val.params:
-                raise SuayRuntimeError(
-                    "Cannot call a function with no remaining parameters",
-                    span=call_span,
-                    source=self.source,
-                    filename=self.filename,
-                )
-            first, rest = fn_val.params[0], fn_val.params[1:]
-            binds = self._match_pattern(first, arg_val, span=call_span)
-            if binds is None:
-                raise SuayRuntimeError(
-                    "Function argument did not match parameter pattern",
-                    span=call_span,
-                    source=self.source,
-                    filename=self.filename,
-                )
-            call_env = Env(parent=fn_val.env)
-            for k, v in binds.items():
-                call_env.define(k, v)
-
+            call_env = self._bind_call(fn_val, arg_val, call_span=call_span)
+            rest = fn_val.params[1:]
             if rest:
+                if fn_val.code.flat_params:
+                    return ClosureBC(
+                        params=rest,
+                        code=fn_val.code,
+                        env=fn_val.env,
+                        name=fn_val.name,
+                        partial=call_env,
+                    )
                 return ClosureBC(
                     params=rest, code=fn_val.code, env=call_env, name=fn_val.name
                 )
@@ -673,18 +1089,148 @@ class VM:
             )
 
         raise SuayRuntimeError(
-            f"Value is not callable: {type(fn_val).__name__}",
+            f"Value is not callable: {type_name(fn_val)}",
+            span=call_span,
+            source=self.source,
+            filename=self.filename,
+        )
+
+    def _bind_call(self, fn_val: ClosureBC, arg_val: object, *, call_span) -> Env:
+        """Match the next parameter of `fn_val` against `arg_val`; return the new env."""
+
+        if not fn_val.params:
+            raise SuayRuntimeError(
+                "Cannot call a function with no remaining parameters",
+                span=call_span,
+                source=self.source,
+                filename=self.filename,
+            )
+        matcher = fn_val.params[0]
+        if matcher.test is not None and not matcher.test(arg_val):
+            raise self._param_mismatch(call_span)
+        code = fn_val.code
+        if code.flat_params:
+            # All parameters share one env; a partial application's env is copied
+            # so the partial can be applied again.
+            if fn_val.partial is not None:
+                call_env = fn_val.partial.copy()
+            else:
+                call_env = Env(parent=fn_val.env, layout=code.param_layouts[0])
+        else:
+            layouts = code.param_layouts
+            if layouts:
+                layout = layouts[len(layouts) - len(fn_val.params)]
+            else:
+                layout = matcher.layout
+            call_env = Env(parent=fn_val.env, layout=layout)
+        if matcher.bind is not None:
+            matcher.bind(arg_val, call_env.slots)
+        return call_env
+
+    def _bind_args(self, fn_val: ClosureBC, args: list[object], *, call_span) -> Env:
+        """Bind all remaining parameters of `fn_val` to `args` (same length)."""
+
+        code = fn_val.code
+        if code.flat_params:
+            if fn_val.partial is not None:
+                call_env = fn_val.partial.copy()
+            else:
+                call_env = Env(parent=fn_val.env, layout=code.param_layouts[0])
+            slots = call_env.slots
+            for matcher, arg_val in zip(fn_val.params, args):
+                if matcher.test is not None and not matcher.test(arg_val):
+                    raise self._param_mismatch(call_span)
+                if matcher.bind is not None:
+                    matcher.bind(arg_val, slots)
+            return call_env
+
+        call_env = fn_val.env
+        layouts = code.param_layouts
+        base = len(layouts) - len(fn_val.params)
+        for i, (matcher, arg_val) in enumerate(zip(fn_val.params, args)):
+            if matcher.test is not None and not matcher.test(arg_val):
+                raise self._param_mismatch(call_span)
+            layout = layouts[base + i] if layouts else matcher.layout
+            call_env = Env(parent=call_env, layout=layout)
+            if matcher.bind is not None:
+                matcher.bind(arg_val, call_env.slots)
+        return call_env
+
+    def _param_mismatch(self, call_span) -> SuayRuntimeError:
+        return SuayRuntimeError(
+            "Function argument did not match parameter pattern",
             span=call_span,
             source=self.source,
             filename=self.filename,
         )
 
+    def _call_chain(
+        self, fn_val: object, args: list[object], *, call_span
+    ) -> tuple[object, Env | None, list[object]]:
+        """Apply `fn_val` to `args` left to right, as `fn_val · a1 · a2 ...` would.
+
+        Saturated builtins are invoked directly, without building partials. When
+        a closure becomes saturated its body must run: the result is then
+        `(closure, call_env, leftover_args)` and the caller enters the body and
+        applies its result to the leftovers. Otherwise it is `(value, None, [])`.
+        """
+
+        i = 0
+        n = len(args)
+        while i < n:
+            if type(fn_val) is ClosureBC:
+                k = len(fn_val.params)
+                if 0 < k <= n - i:
+                    call_env = self._bind_args(fn_val, args[i : i + k], call_span=call_span)
+                    return fn_val, call_env, args[i + k :]
+            elif type(fn_val) is Builtin and fn_val.name != "link":
+                k = fn_val.arity - len(fn_val.bound)
+                if 0 < k <= n - i:
+                    fn_val = self._call_builtin(fn_val, args[i : i + k], call_span=call_span)
+                    i += k
+                    continue
+            fn_val = self._apply(fn_val, args[i], call_span=call_span)
+            i += 1
+        return fn_val, None, []
+
+    def _call_builtin(self, fn_val: Builtin, args: list[object], *, call_span) -> object:
+        try:
+            return fn_val.impl(*fn_val.bound, *args)
+        except SuayRuntimeError as e:
+            raise e.with_location(span=call_span, source=self.source, filename=self.filename)
+        except ValueError:
+            raise SuayRuntimeError(
+                "Builtin over-applied",
+                span=call_span,
+                source=self.source,
+                filename=self.filename,
+            )
+
+    def _apply_n(self, fn_val: object, args: list[object], *, call_span) -> object:
+        """`_call_chain` for host callers (builtins): runs closure bodies to completion."""
+
+        while True:
+            fn_val, call_env, rest = self._call_chain(fn_val, args, call_span=call_span)
+            if call_env is None:
+                return fn_val
+            assert isinstance(fn_val, ClosureBC)
+            try:
+                result = self.run_in_env(fn_val.code, call_env)
+            except SuayRuntimeError as e:
+                if call_span is not None:
+                    label = fn_val.name or "<lambda>"
+                    raise e.with_frame(StackFrame(label=f"call {label}", span=call_span))
+                raise
+            if not rest:
+                return result
+            fn_val, args = result, rest
+
     def _binary(self, op: str, left: object, right: object, *, span) -> object:
         try:
             if op in ("+",):
                 if not _is_number(left) or not _is_number(right):
                     raise SuayRuntimeError(
-                        f"+ expects numbers, got {type(left).__name__} and {type(right).__name__}",
+                        f"+ expects numbers, got {type_name(left)} and {type_name(right)}",
                         span=span,
                         source=self.source,
                         filename=self.filename,
@@ -694,7 +1240,7 @@ class VM:
             if op in ("−", "-"):
                 if not _is_number(left) or not _is_number(right):
                     raise SuayRuntimeError(
-                        f"− expects numbers, got {type(left).__name__} and {type(right).__name__}",
+                        f"− expects numbers, got {type_name(left)} and {type_name(right)}",
                         span=span,
                         source=self.source,
                         filename=self.filename,
@@ -704,7 +1250,7 @@ class VM:
             if op in ("×", "*"):
                 if not _is_number(left) or not _is_number(right):
                     raise SuayRuntimeError(
-                        f"× expects numbers, got {type(left).__name__} and {type(right).__name__}",
+                        f"× expects numbers, got {type_name(left)} and {type_name(right)}",
                         span=span,
                         source=self.source,
                         filename=self.filename,
@@ -714,7 +1260,7 @@ class VM:
             if op in ("÷", "/"):
                 if not _is_number(left) or not _is_number(right):
                     raise SuayRuntimeError(
-                        f"÷ expects numbers, got {type(left).__name__} and {type(right).__name__}",
+                        f"÷ expects numbers, got {type_name(left)} and {type_name(right)}",
                         span=span,
                         source=self.source,
                         filename=self.filename,
@@ -724,7 +1270,7 @@ class VM:
             if op == "%":
                 if not _is_number(left) or not _is_number(right):
                     raise SuayRuntimeError(
-                        f"% expects numbers, got {type(left).__name__} and {type(right).__name__}",
+                        f"% expects numbers, got {type_name(left)} and {type_name(right)}",
                         span=span,
                         source=self.source,
                         filename=self.filename,
@@ -732,16 +1278,14 @@ class VM:
                 return left % right  # type: ignore[operator]
 
             if op == "⊞":
-                if isinstance(left, str) and isinstance(right, str):
-                    return left + right
-                if isinstance(left, list) and isinstance(right, list):
-                    return [*left, *right]
-                if isinstance(left, dict) and isinstance(right, dict):
-                    out = dict(left)
-                    out.update(right)
-                    return out
+                if isinstance(left, TEXT_TYPES) and isinstance(right, TEXT_TYPES):
+                    return concat_text(left, right)
+                if isinstance(left, LIST_TYPES) and isinstance(right, LIST_TYPES):
+                    return pvector(left).extend(right)
+                if isinstance(left, MAP_TYPES) and isinstance(right, MAP_TYPES):
+                    return pmap(left).update(right)
                 raise SuayRuntimeError(
-                    f"⊞ expects (Text,Text), (List,List), or (Map,Map); got {type(left).__name__} and {type(right).__name__}",
+                    f"⊞ expects (Text,Text), (List,List), or (Map,Map); got {type_name(left)} and {type_name(right)}",
                     span=span,
                     source=self.source,
                     filename=self.filename,
@@ -755,10 +1299,10 @@ class VM:
             if op == "<":
                 if _is_number(left) and _is_number(right):
                     return left < right  # type: ignore[operator]
-                if isinstance(left, str) and isinstance(right, str):
-                    return left < right
+                if isinstance(left, TEXT_TYPES) and isinstance(right, TEXT_TYPES):
+                    return str(left) < str(right)
                 raise SuayRuntimeError(
-                    f"< expects (Num,Num) or (Text,Text); got {type(left).__name__} and {type(right).__name__}",
+                    f"< expects (Num,Num) or (Text,Text); got {type_name(left)} and {type_name(right)}",
                     span=span,
                     source=self.source,
                     filename=self.filename,
@@ -767,10 +1311,10 @@ class VM:
             if op == "≤":
                 if _is_number(left) and _is_number(right):
                     return left <= right  # type: ignore[operator]
-                if isinstance(left, str) and isinstance(right, str):
-                    return left <= right
+                if isinstance(left, TEXT_TYPES) and isinstance(right, TEXT_TYPES):
+                    return str(left) <= str(right)
                 raise SuayRuntimeError(
-                    f"≤ expects (Num,Num) or (Text,Text); got {type(left).__name__} and {type(right).__name__}",
+                    f"≤ expects (Num,Num) or (Text,Text); got {type_name(left)} and {type_name(right)}",
                     span=span,
                     source=self.source,
                     filename=self.filename,
@@ -779,10 +1323,10 @@ class VM:
             if op == ">":
                 if _is_number(left) and _is_number(right):
                     return left > right  # type: ignore[operator]
-                if isinstance(left, str) and isinstance(right, str):
-                    return left > right
+                if isinstance(left, TEXT_TYPES) and isinstance(right, TEXT_TYPES):
+                    return str(left) > str(right)
                 raise SuayRuntimeError(
-                    f"> expects (Num,Num) or (Text,Text); got {type(left).__name__} and {type(right).__name__}",
+                    f"> expects (Num,Num) or (Text,Text); got {type_name(left)} and {type_name(right)}",
                     span=span,
                     source=self.source,
                     filename=self.filename,
@@ -791,10 +1335,10 @@ class VM:
             if op == "≥":
                 if _is_number(left) and _is_number(right):
                     return left >= right  # type: ignore[operator]
-                if isinstance(left, str) and isinstance(right, str):
-                    return left >= right
+                if isinstance(left, TEXT_TYPES) and isinstance(right, TEXT_TYPES):
+                    return str(left) >= str(right)
                 raise SuayRuntimeError(
-                    f"≥ expects (Num,Num) or (Text,Text); got {type(left).__name__} and {type(right).__name__}",
+                    f"≥ expects (Num,Num) or (Text,Text); got {type_name(left)} and {type_name(right)}",
                     span=span,
                     source=self.source,
                     filename=self.filename,
@@ -815,102 +1359,6 @@ class VM:
             filename=self.filename,
         )
 
-    # -------- Patterns --------
-
-    def _match_pattern(
-        self, pat: ast.Pattern, value: object, *, span
-    ) -> dict[str, object] | None:
-        def merge_into(dst: dict[str, object], src: dict[str, object]) -> bool:
-            for k, v in src.items():
-                if k in dst:
-                    return False
-                dst[k] = v
-            return True
-
-        match pat:
-            case ast.PWildcard():
-                return {}
-            case ast.PName(name=name):
-                return {name: value}
-            case ast.PUnit():
-                return {} if value is UNIT else None
-            case ast.PBool(value=b):
-                return {} if isinstance(value, bool) and value == b else None
-            case ast.PInt(value=i):
-                return {} if isinstance(value, int) and value == i else None
-            case ast.PDec(value=f):
-                return {} if isinstance(value, float) and value == f else None
-            case ast.PText(value=s):
-                return {} if isinstance(value, str) and value == s else None
-
-            case ast.PTuple(items=items):
-                if not isinstance(value, tuple):
-                    return None
-                if len(value) != len(items):
-                    return None
-                out: dict[str, object] = {}
-                for p, v in zip(items, value, strict=True):
-                    binds = self._match_pattern(p, v, span=span)
-                    if binds is None:
-                        return None
-                    if not merge_into(out, binds):
-                        raise SuayRuntimeError(
-                            "Duplicate name binder in pattern",
-                            span=pat.span,
-                            source=self.source,
-                            filename=self.filename,
-                        )
-                return out
-
-            case ast.PList(items=items, tail=tail):
-                if not isinstance(value, list):
-                    return None
-                if tail is None and len(value) != len(items):
-                    return None
-                if tail is not None and len(value) < len(items):
-                    return None
-                out: dict[str, object] = {}
-                for p, v in zip(items, value[: len(items)], strict=True):
-                    binds = self._match_pattern(p, v, span=span)
-                    if binds is None:
-                        return None
-                    if not merge_into(out, binds):
-                        raise SuayRuntimeError(
-                            "Duplicate name binder in pattern",
-                            span=pat.span,
-                            source=self.source,
-                            filename=self.filename,
-                        )
-                if tail is None:
-                    return out
-                rest = value[len(items) :]
-                tail_binds = self._match_pattern(tail, rest, span=span)
-                if tail_binds is None:
-                    return None
-                if not merge_into(out, tail_binds):
-                    raise SuayRuntimeError(
-                        "Duplicate name binder in pattern",
-                        span=pat.span,
-                        source=self.source,
-                        filename=self.filename,
-                    )
-                return out
-
-            case ast.PVariant(tag=tag, payload=payload_pat):
-                if not isinstance(value, Variant):
-                    return None
-                if value.tag != tag:
-                    return None
-                return self._match_pattern(payload_pat, value.payload, span=span)
-
-            case _:
-                raise SuayRuntimeError(
-                    f"Unsupported pattern: {type(pat).__name__}",
-                    span=pat.span,
-                    source=self.source,
-                    filename=self.filename,
-                )
-
     def _trace_step(self, code: Code, pc: int, ins: Instr, stack: list[object]) -> None:
         pad = "  " * self._depth
         top = "" if not stack else _to_text(stack[-1])
@@ -1,22 +1,29 @@
 import sys
-from suaylang.lexer import Lexer
-from suaylang.parser import Parser
-from suaylang.compiler import Compiler
+from suaylang.bytecode_cache import load_or_compile
+from suaylang.errors import SuayError
 from suaylang.vm import VM
 
-def main():
+def main(argv: list[str] | None = None) -> int:
     import argparse
     parser = argparse.ArgumentParser(description="SuayLang VM CLI")
     parser.add_argument("file", help=".suay file to run")
-    args = parser.parse_args()
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not read or write the __suaycache__ bytecode cache",
+    )
+    args = parser.parse_args(argv)
     with open(args.file, "r", encoding="utf-8") as f:
         src = f.read()
-    tokens = Lexer(src, filename=args.file).tokenize()
-    program = Parser(tokens, src, filename=args.file).parse_program()
-    code = Compiler().compile_program(program, name=args.file)
-    vm = VM(source=src, filename=args.file)
-    result, _ = vm.run_with_stats(code)
+    try:
+        code = load_or_compile(src, args.file, use_cache=False if args.no_cache else None)
+        vm = VM(source=src, filename=args.file)
+        result, _ = vm.run_with_stats(code)
+    except SuayError as e:
+        print(e, file=sys.stderr)
+        return 1
     print(result)
+    return 0
 
 if __name__ == "__main__":
-    main()
+    raise SystemExit(main())
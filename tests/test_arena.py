@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import math
+from pathlib import Path
+
+import pytest
+
+from suaylang import ast
+from suaylang.arena import AstArena, parse_arena
+from suaylang.cli import _format_ast
+from suaylang.compiler import Compiler
+from suaylang.lexer import LexError, Lexer
+from suaylang.parser import ParseError, Parser
+from tools.diff_test.coverage import ast_node_counts
+
+ROOT = Path(__file__).resolve().parents[1]
+CORPORA = ["tests/corpus", "conformance/corpus", "tools/diff_test/corpus", "examples"]
+
+
+def parsed_files() -> list[Path]:
+    out: list[Path] = []
+    for rel in CORPORA:
+        for path in sorted((ROOT / rel).rglob("*.suay")):
+            src = path.read_text(encoding="utf-8")
+            try:
+                Parser(Lexer(src).tokenize(), src).parse_program()
+            except (LexError, ParseError):
+                continue
+            out.append(path)
+    return out
+
+
+def parse(src: str) -> ast.Program:
+    return Parser(Lexer(src, filename="<test>").tokenize(), src, filename="<test>").parse_program()
+
+
+@pytest.mark.parametrize("path", parsed_files(), ids=lambda p: p.relative_to(ROOT).as_posix())
+def test_arena_round_trips_corpus(path: Path) -> None:
+    src = path.read_text(encoding="utf-8")
+    program = parse(src)
+    arena = AstArena.from_program(program, src)
+    assert arena.to_program() == program
+    assert Compiler().compile_program(arena, name="<test>") == Compiler().compile_program(program, name="<test>")
+
+
+def test_layout_is_post_order() -> None:
+    src = "f ← ⌁(a [h ⋯ t]) ⟦ a ↦ h ⟧\nf · 1 · [2]\n"
+    arena = parse_arena(src)
+    assert arena.kind_of(arena.root) is ast.Program
+    assert all(k < i for i in range(len(arena)) for k in arena.children(i))
+    binding = arena.children(arena.root)[0]
+    assert arena.kind_of(binding) is ast.Binding and arena.constant(binding) == "f"
+    lam = arena.children(binding)[0]
+    assert [arena.kind_of(k).__name__ for k in arena.children(lam)] == ["PName", "PList", "MapExpr"]
+    assert arena.node(lam) == parse(src).items[0].value
+
+
+def test_constants_keep_types_apart() -> None:
+    arena = parse_arena("(1, 1.0, ⊤, \"1\")\n")
+    items = arena.node().items[0].items
+    assert [type(it.value) for it in items] == [int, float, bool, str]
+
+
+def test_constants_keep_signed_zeros_apart() -> None:
+    span = parse("0.0\n").items[0].span
+    program = ast.Program(items=[ast.DecLit(value=v, span=span) for v in (0.0, -0.0, 0.0)], span=span)
+    arena = AstArena.from_program(program, "0.0\n")
+    signs = [math.copysign(1.0, item.value) for item in arena.to_program().items]
+    assert signs == [1.0, -1.0, 1.0] and len(arena.consts) == 2
+
+
+def test_spans_are_recovered_from_offsets() -> None:
+    src = "x ← 1\n\ty ← ⟪\n  x + 2 ⟫\n"
+    program = parse(src)
+    arena = AstArena.from_program(program, src)
+    y = arena.children(arena.root)[1]
+    assert arena.span(y) == program.items[1].span
+    assert (arena.span(y).start.line, arena.span(y).start.column) == (2, 2)
+
+
+def test_deep_nesting_round_trips_without_recursion() -> None:
+    src = "x ← " + "[ " * 3000 + "1" + " ]" * 3000 + "\n"
+    program = parse(src)
+    arena = AstArena.from_program(program, src)
+    assert len(arena) == 3003
+    again = AstArena.from_program(arena.to_program(), src)  # `==` on the trees would recurse
+    assert (again.kind, again.start, again.end, again.kids) == (arena.kind, arena.start, arena.end, arena.kids)
+
+
+def test_adapters_match_dataclass_tree() -> None:
+    src = (ROOT / "examples").rglob("*.suay").__next__().read_text(encoding="utf-8")
+    arena = parse_arena(src)
+    assert _format_ast(arena) == _format_ast(parse(src))
+    assert ast_node_counts(src, filename="<test>") == arena.kind_counts()
+    assert sum(arena.kind_counts().values()) == len(arena)
+
+
+def test_adapters_build_one_form_at_a_time(monkeypatch: pytest.MonkeyPatch) -> None:
+    head = "x ← 1\nf ← ⌁(a) a + x\nx ⇐ f · 2\n"
+    arena = parse_arena(head + "x ← " + "[ " * 3000 + "1" + " ]" * 3000 + "\n")
+    expected = Compiler().compile_program(parse(head), name="<test>")
+    built: list[int] = []
+    node = AstArena.node
+
+    def spy(self: AstArena, i: int | None = None) -> ast.Node:
+        assert i is not None and i != self.root, "the whole tree was rebuilt"
+        built.append(i)
+        return node(self, i)
+
+    monkeypatch.setattr(AstArena, "node", spy)
+    lines = _format_ast(arena).splitlines()
+    assert lines[:2] == ["└─ Program", "   ├─ items [4]"] and lines[-1] == "   └─ span 1:1..5:1"
+    assert sorted(set(built)) == list(arena.children(arena.root))
+    assert Compiler().compile_program(parse_arena(head), name="<test>") == expected
+
+
+def test_arena_is_compact() -> None:
+    src = "\n".join(f"v{i} ← ⌁(a b) ⟪ t ← a × b\n t + {i} ⟫" for i in range(500)) + "\n"
+    arena = parse_arena(src)
+    assert arena.nbytes / len(arena) < 32
+    assert arena.consts.count("t") == 1  # 1000 uses of `t`, one pooled name
+
+
+def test_streamed_arena_matches_flattened_tree() -> None:
+    src = "x ← 1\nf ← ⌁(a) ⟪ t ← a + x\n t × 2 ⟫\n# note\nf · [x, \"x\"]\n"
+    streamed = parse_arena(src)
+    whole = AstArena.from_program(parse(src), src)
+    assert (streamed.kind, streamed.start, streamed.end, streamed.kids) == (whole.kind, whole.start, whole.end, whole.kids)
+    assert streamed.consts == whole.consts and streamed.to_program() == parse(src)
+    with pytest.raises(ParseError):
+        parse_arena("x ← 1\ny ← (\n")
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import pytest
+
+from suaylang.compiler import Compiler
+from suaylang.interpreter import run_source
+from suaylang.lexer import Lexer
+from suaylang.parser import Parser
+from suaylang.runtime import SuayRuntimeError
+from suaylang.vm import VM
+
+
+def compile_src(src: str):
+    tokens = Lexer(src, filename="<test>").tokenize()
+    program = Parser(tokens, src, filename="<test>").parse_program()
+    return Compiler().compile_program(program, name="<test>")
+
+
+def outcome(fn) -> tuple[str, object]:
+    try:
+        return ("ok", fn())
+    except SuayRuntimeError as e:
+        return ("err", e.message)
+
+
+def test_operators_compile_to_specialized_opcodes() -> None:
+    src = "a ← 1\nb ← 2\n[a + b, a − b, a × b, a ÷ b, a % b, a = b, a ≠ b, a < b, a ≤ b, a > b, a ≥ b, \"x\" ⊞ \"y\"]\n"
+    ops = [ins.op for ins in compile_src(src).instrs]
+    for op in ("ADD", "SUB", "MUL", "DIV", "MOD", "EQ", "NE", "LT", "LE", "GT", "GE"):
+        assert op in ops
+    assert ops.count("BINARY") == 1  # ⊞ keeps the generic opcode
+
+
+OPERANDS = ["7", "2.5", "0", "0.0", "⊤", '"a"', "[1]", "ø"]
+OPERATORS = ["+", "−", "×", "÷", "%", "=", "≠", "<", "≤", ">", "≥"]
+
+
+@pytest.mark.parametrize("op", OPERATORS)
+def test_results_and_errors_match_interpreter(op: str) -> None:
+    # Operands are bound to names so the optimizer-free VM sees them at runtime.
+    for left in OPERANDS:
+        for right in OPERANDS:
+            src = f"a ← {left}\nb ← {right}\na {op} b\n"
+            expected = outcome(lambda: run_source(src, filename="<test>"))
+            got = outcome(lambda: VM(source=src, filename="<test>").run(compile_src(src)))
+            assert got == expected, src
+
+
+def test_fallback_error_keeps_span() -> None:
+    src = "a ← ⊤\na + 1\n"
+    with pytest.raises(SuayRuntimeError) as ei:
+        VM(source=src, filename="<test>").run(compile_src(src))
+    assert ei.value.message == "+ expects numbers, got bool and int"
+    assert ei.value.span is not None and ei.value.span.start.line == 2
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from suaylang.bytecode import NO_OPERAND, OPCODE, Code, Instr
+from suaylang.compiler import Compiler
+from suaylang.lexer import Lexer
+from suaylang.parser import Parser
+from suaylang.runtime import SuayRuntimeError
+from suaylang.vm import VM
+
+
+def compile_src(src: str) -> Code:
+    tokens = Lexer(src, filename="<test>").tokenize()
+    program = Parser(tokens, src, filename="<test>").parse_program()
+    return Compiler().compile_program(program)
+
+
+def test_code_encodes_integer_opcodes_and_span_table() -> None:
+    code = compile_src("x ← 1 + 2\nx\n")
+    assert code.ops == [OPCODE[ins.op] for ins in code.instrs]
+    assert code.spans == [ins.span for ins in code.instrs]
+    assert len(code.operands) == len(code.instrs)
+
+
+def test_constant_pool_is_deduplicated_and_type_aware() -> None:
+    code = Code(
+        name="<t>",
+        instrs=[
+            Instr("CONST", 1),
+            Instr("CONST", 1),
+            Instr("CONST", True),
+            Instr("CONST", 1.0),
+            Instr("POP"),
+            Instr("JMP", 7),
+            Instr("HALT"),
+        ],
+    )
+    assert code.consts == [1, True, 1.0]
+    assert code.operands[:4] == [0, 0, 1, 2]
+    assert code.operands[4] == NO_OPERAND
+    # Jump targets stay inline rather than going through the pool.
+    assert code.operands[5] == 7
+
+
+def test_constant_pool_keeps_signed_zeros_apart() -> None:
+    code = Code(name="<t>", instrs=[Instr("CONST", 0.0), Instr("CONST", -0.0), Instr("HALT")])
+    assert [str(c) for c in code.consts] == ["0.0", "-0.0"]
+    src = "(0.0, (−0.0), 0.0 × −1.0)\n"
+    program = Parser(Lexer(src, filename="<test>").tokenize(), src, filename="<test>").parse_program()
+    for optimize in (0, 2):
+        value = VM(source=src, filename="<test>").run(Compiler(optimize=optimize).compile_program(program))
+        assert [str(v) for v in value] == ["0.0", "-0.0", "-0.0"]
+
+
+def test_vm_reports_unknown_opcode_at_runtime() -> None:
+    code = Code(name="<t>", instrs=[Instr("NOPE"), Instr("HALT")])
+    try:
+        VM(source="", filename="<t>").run(code)
+    except SuayRuntimeError as e:
+        assert "Unknown opcode NOPE" in str(e)
+    else:
+        raise AssertionError("expected SuayRuntimeError")
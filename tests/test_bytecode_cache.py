@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import os
+import time
+
+import pytest
+
+from suaylang import bytecode_cache
+from suaylang.bytecode_cache import cache_path, dumps, load_module, load_or_compile, loads
+from suaylang.bytecode import Code
+from suaylang.compiler import Compiler
+from suaylang.lexer import Lexer
+from suaylang.parser import Parser
+from suaylang.runtime import SuayRuntimeError
+from suaylang.vm import VM
+
+
+SRC = (
+    "f ← ⌁(x (a, b)) (x, a) ▷ ⟪\n"
+    "▷ (0, _) ⇒ ø\n"
+    "▷ (n, [h ⋯ t]) ⇒ Pair•(n, h, t, 1.5, ⊤, \"s\")\n"
+    "⟫\n"
+    "f · 1 · ([1 2], 3)\n"
+)
+
+
+def compile_src(src: str):
+    tokens = Lexer(src, filename="<test>").tokenize()
+    program = Parser(tokens, src, filename="<test>").parse_program()
+    return Compiler().compile_program(program, name="<test>")
+
+
+def test_roundtrip_preserves_nested_code_patterns_and_spans() -> None:
+    code = compile_src(SRC)
+    back = loads(dumps(code, source_digest="x"), source_digest="x", passes=())
+    assert back == code
+    assert back.spans == code.spans
+    assert VM(source=SRC, filename="<test>").run(back) == VM(
+        source=SRC, filename="<test>"
+    ).run(code)
+
+
+def test_stale_or_foreign_data_is_a_miss() -> None:
+    data = dumps(compile_src("1\n"), source_digest="a")
+    assert loads(data, source_digest="b") is None
+    assert loads(data, passes=("dead",)) is None
+    assert loads(b"garbage") is None
+    assert loads(data[:-3]) is None
+
+
+def test_compiler_version_hashes_sources_once_on_first_use(monkeypatch: pytest.MonkeyPatch) -> None:
+    reads: list[str | None] = []
+    monkeypatch.setattr(bytecode_cache, "_read_source", lambda path: reads.append(path) or b"")
+    bytecode_cache.compiler_version.cache_clear()
+    try:
+        assert bytecode_cache.compiler_version() == bytecode_cache.compiler_version()
+        assert len(reads) == 8
+    finally:
+        bytecode_cache.compiler_version.cache_clear()
+
+
+def test_corrupt_data_is_a_miss_not_an_error() -> None:
+    data = dumps(compile_src(SRC), source_digest="x")
+    for pos in range(len(bytecode_cache.MAGIC), len(data)):
+        for byte in (0, 3, 91, 255):
+            flipped = data[:pos] + bytes([byte]) + data[pos + 1 :]
+            back = loads(flipped, source_digest="x", passes=())
+            assert back is None or isinstance(back, Code)
+
+
+def test_corrupt_cache_file_is_recompiled(tmp_path) -> None:
+    src_path = tmp_path / "prog.suay"
+    src_path.write_text(SRC, encoding="utf-8")
+    first = load_or_compile(SRC, str(src_path), use_cache=True)
+    path = cache_path(str(src_path))
+    with open(path, "rb") as f:
+        data = bytearray(f.read())
+    data[len(data) // 2] ^= 0xFF
+    with open(path, "wb") as f:
+        f.write(bytes(data))
+    assert load_or_compile(SRC, str(src_path), use_cache=True) == first
+
+
+def test_load_or_compile_reuses_cache(tmp_path, monkeypatch: pytest.MonkeyPatch) -> None:
+    src_path = tmp_path / "prog.suay"
+    src_path.write_text(SRC, encoding="utf-8")
+    first = load_or_compile(SRC, str(src_path), use_cache=True)
+    assert os.path.exists(cache_path(str(src_path)))
+
+    def boom(*_a, **_k):
+        raise AssertionError("source was re-parsed")
+
+    monkeypatch.setattr(bytecode_cache, "Parser", boom)
+    assert load_or_compile(SRC, str(src_path), use_cache=True) == first
+
+    # A changed source must not hit the old entry.
+    monkeypatch.undo()
+    changed = load_or_compile("2\n", str(src_path), use_cache=True)
+    assert VM(source="2\n", filename=str(src_path)).run(changed) == 2
+
+
+def test_too_deep_to_compile_is_a_located_error() -> None:
+    src = "x ← 0\n" + "(1 + " * 3000 + "1" + ")" * 3000 + "\n"
+    with pytest.raises(SuayRuntimeError) as ei:
+        load_or_compile(src, "deep.suay", use_cache=False)
+    assert str(ei.value).startswith("deep.suay:2:2: runtime error: Maximum recursion depth exceeded")
+
+
+def test_modules_are_loaded_through_the_cache(tmp_path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("SUAY_CACHE_DIR", str(tmp_path / "cache"))
+    (tmp_path / "m.suay").write_text("double ← ⌁(x) x × 2\n", encoding="utf-8")
+    main = tmp_path / "main.suay"
+    src = "d ← link · \"m\" · \"double\"\nd · 21\n"
+    main.write_text(src, encoding="utf-8")
+    for _ in range(2):
+        assert VM(source=src, filename=str(main)).run(compile_src(src)) == 42
+    assert os.listdir(tmp_path / "cache")
+
+
+def test_load_module_compiles_each_version_once(tmp_path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("SUAY_NO_CACHE", "1")
+    compiled: list[str] = []
+    real = bytecode_cache.load_or_compile
+
+    def counting(source: str, filename: str, **kw):
+        compiled.append(source)
+        return real(source, filename, **kw)
+
+    monkeypatch.setattr(bytecode_cache, "load_or_compile", counting)
+    m = tmp_path / "m.suay"
+    m.write_text("x ← 1\n", encoding="utf-8")
+    old = time.time_ns() - 10 * 10**9
+    os.utime(m, ns=(old, old))
+
+    src, code = load_module(str(m))
+    assert src == "x ← 1\n" and load_module(str(m))[1] is code
+    os.utime(m, ns=(old + 10**9, old + 10**9))  # touched, same content
+    assert load_module(str(m))[1] is code and compiled == ["x ← 1\n"]
+
+    m.write_text("x ← 2\n", encoding="utf-8")  # same size, fresh mtime
+    assert load_module(str(m))[0] == "x ← 2\n"
+    stamp = os.stat(m).st_mtime_ns
+    m.write_text("x ← 3\n", encoding="utf-8")
+    os.utime(m, ns=(stamp, stamp))  # same (mtime, size) as the cached entry
+    assert load_module(str(m))[0] == "x ← 3\n"
+    assert compiled == ["x ← 1\n", "x ← 2\n", "x ← 3\n"]
+
+    with pytest.raises(OSError):
+        load_module(str(tmp_path / "missing.suay"))
+
+
+def test_vm_links_resolve_once_per_site(tmp_path) -> None:
+    (tmp_path / "m.suay").write_text("n ← 0\nbump ← ⌁(u) n ⇐ n + 1\nsq ← ⌁(x) x × x\n", encoding="utf-8")
+    src = (
+        'f ← ⌁(i) (link · "m" · "sq") · i\n'
+        'g ← ⌁(u) link · "m" · "n"\n'
+        'a ← g · ø\n'
+        '(link · "m" · "bump") · ø\n'
+        '(f · 3) + (f · 4) + (g · ø) + a\n'
+    )
+    vm = VM(source=src, filename=str(tmp_path / "main.suay"))
+    assert vm.run(compile_src(src)) == 9 + 16 + 1 + 0
+    assert vm.modules is not None and list(vm.modules.paths.values()) == [str(tmp_path / "m.suay")]
+    assert sorted(name for _f, _p, name in vm.modules.links) == ["bump", "n", "sq"]
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import pytest
+
+from suaylang.bytecode_cache import dumps, loads
+from suaylang.compiler import Compiler
+from suaylang.interpreter import run_source
+from suaylang.lexer import Lexer
+from suaylang.parser import Parser
+from suaylang.runtime import SuayRuntimeError
+from suaylang.vm import VM
+
+
+def compile_src(src: str, **opts):
+    tokens = Lexer(src, filename="<test>").tokenize()
+    program = Parser(tokens, src, filename="<test>").parse_program()
+    return Compiler(**opts).compile_program(program, name="<test>")
+
+
+def outcome(fn) -> tuple[str, object]:
+    try:
+        return ("ok", fn())
+    except SuayRuntimeError as e:
+        return ("err", e.message, e.span.start if e.span else None)
+
+
+def run_vm(src: str, **opts) -> object:
+    return VM(source=src, filename="<test>").run(compile_src(src, **opts))
+
+
+def lambda_code(code):
+    return [ins.arg[0] for ins in code.instrs if ins.op == "MAKE_CLOSURE"]
+
+
+def test_stable_argument_chain_compiles_to_call_n() -> None:
+    code = compile_src("f ← ⌁(a b c) a + b + c\ng ← ⌁(x) f · x · x · 1\ng · 2\n")
+    (f_code, g_code) = lambda_code(code)
+    assert f_code.flat_params and len(f_code.param_layouts) == 1
+    assert [(i.op, i.arg) for i in g_code.instrs if "CALL" in i.op] == [("TAIL_CALL_N", 3)]
+
+
+def test_unstable_later_argument_splits_the_chain() -> None:
+    # `g · 1` may run code before `h · 2` is evaluated, so it must be called first.
+    code = compile_src("g ← ⌁(a) ⌁(b) a\nh ← ⌁(a) a\nk ← ⌁(x) g · x · (h · 2)\nø\n")
+    k_code = lambda_code(code)[2]
+    assert [i.op for i in k_code.instrs if "CALL" in i.op] == ["CALL", "CALL", "TAIL_CALL"]
+
+
+def test_shadowing_params_keep_separate_envs() -> None:
+    code = compile_src("f ← ⌁(a a) a\nf · 1 · 2\n")
+    (f_code,) = lambda_code(code)
+    assert not f_code.flat_params and len(f_code.param_layouts) == 2
+
+
+PROGRAMS = [
+    # saturated, partial and over-saturated closures
+    "f ← ⌁(a b c) (a, b, c)\ng ← ⌁(x) f · x · 2 · 3\ng · 1\n",
+    "f ← ⌁(a b c) (a, b, c)\np ← f · 1\nq ← ⌁(x) (p · x · 3, p · 9 · x)\nq · 5\n",
+    "f ← ⌁(a) ⌁(b) a − b\ng ← ⌁(x) f · x · 1\ng · 10\n",
+    "f ← ⌁(a b) ⌁(c) a + b + c\ng ← ⌁(x) f · x · 2 · 3\ng · 1\n",
+    "f ← ⌁(a) ⌁(b c) a × b × c\ng ← ⌁(x) f · x · 2 · 3\ng · 4\n",
+    "f ← ⌁(a a) a\ng ← ⌁(x) f · x · 2\ng · 1\n",
+    "f ← ⌁((a, b) [h ⋯ t]) a + b + h\ng ← ⌁(x) f · x · [3, 4]\ng · (1, 2)\n",
+    "f ← ⌁((a, b) c) a\ng ← ⌁(x) f · 1 · x\ng · 2\n",
+    # builtins
+    "g ← ⌁(xs) fold · (⌁(a x) a + x) · 0 · xs\ng · [1, 2, 3]\n",
+    "g ← ⌁(m) put · m · \"k\" · 1\ng · ⟦ \"a\" ↦ 2 ⟧\n",
+    "g ← ⌁(xs) at · xs · 1\ng · [1, 2]\n",
+    "g ← ⌁(xs) at · xs · 1 · 2\ng · [1, 2]\n",
+    "g ← ⌁(xs) count · xs · 1\ng · [1, 2]\n",
+    "g ← ⌁(x) x · 1 · 2\ng · 3\n",
+    "f ← ⌁() 1\ng ← ⌁(x) f · x · 1\ng · 3\n",
+    # evaluation order stays left to right
+    "f ← ⌁(a) ⟪\n  say · \"F\"\n  ⌁(b) b\n⟫\ng ← ⌁(x) f · x · ⟪ say · \"B\"\n 2 ⟫\ng · 1\n",
+]
+
+
+@pytest.mark.parametrize("src", PROGRAMS)
+@pytest.mark.parametrize("optimize", [0, 2])
+def test_vm_matches_interpreter(src: str, optimize: int, capsys) -> None:
+    expected = outcome(lambda: run_source(src, filename="<test>"))
+    expected_out = capsys.readouterr().out
+    assert outcome(lambda: run_vm(src, optimize=optimize)) == expected
+    assert capsys.readouterr().out == expected_out
+
+
+def test_partial_application_is_reusable() -> None:
+    src = "f ← ⌁(a b c) [a, b, c]\np ← f · 1\ng ← ⌁(x) (p · x · 1, p · x · 2, (p · 3) · 4)\ng · 0\n"
+    assert run_vm(src) == ([1, 0, 1], [1, 0, 2], [1, 3, 4])
+
+
+def test_tail_call_chain_runs_in_constant_frames() -> None:
+    src = "loop ← ⌁(n acc) n ▷ ⟪\n▷ 0 ⇒ acc\n▷ _ ⇒ loop · (n − 1) · (acc + 1)\n⟫\nloop · 50000 · 0\n"
+    vm = VM(source=src, filename="<test>")
+    vm.max_call_depth = 100
+    assert vm.run(compile_src(src)) == 50000
+
+
+def test_over_saturated_call_applies_result_in_place() -> None:
+    # `twice · f` returns a closure; the chain applies it to 5 without a host call.
+    src = "twice ← ⌁(f) ⌁(x) f · (f · x)\ninc ← ⌁(x) x + 1\ng ← ⌁(y) twice · inc · y\ng · 5\n"
+    assert run_vm(src) == 7
+    g_code = lambda_code(compile_src(src))[2]
+    assert [i.op for i in g_code.instrs if "CALL" in i.op] == ["TAIL_CALL_N"]
+
+
+def test_mismatch_error_points_at_call() -> None:
+    src = "f ← ⌁(0 b) b\ng ← ⌁(x) f · x · 2\ng · 1\n"
+    with pytest.raises(SuayRuntimeError) as ei:
+        run_vm(src)
+    assert ei.value.message == "Function argument did not match parameter pattern"
+    assert ei.value.span is not None and ei.value.span.start.line == 2
+    assert [f.label for f in ei.value.frames] == ["call <lambda>"]
+
+
+def test_call_n_survives_cache_roundtrip() -> None:
+    code = compile_src(PROGRAMS[1], optimize=2)
+    back = loads(dumps(code))
+    assert back == code
+    assert lambda_code(back)[0].flat_params
+    assert VM(source="", filename="<test>").run(back) == ((1, 5, 3), (1, 9, 5))
+
+
+@pytest.mark.parametrize(
+    "src, line, frames",
+    [
+        ("f ← ⌁(x) x\nf · 1 · 2\n", 2, []),
+        ("f ← ⌁(x) x\nh ← ⌁(z) f · z · 2\nk ← ⌁(w) (h · w) + 1\nk · 1\n", 2, [4, 3]),
+        ("g ← ⌁(x) ⌁(y) y\nh ← ⌁(z) g · z · 2 · 3\nk ← ⌁(w) (h · w) + 1\nk · 1\n", 2, [4, 3]),
+        ("g ← ⌁(x) ⌁(y) y + \"a\"\nk ← ⌁(w) (g · w · 2) + 1\nk · 1\n", 1, [3, 2]),
+    ],
+)
+def test_over_applied_chain_error_trace(src: str, line: int, frames: list[int]) -> None:
+    # The finished callee is not on the stack while its result is applied further.
+    with pytest.raises(SuayRuntimeError) as vm_err:
+        run_vm(src)
+    with pytest.raises(SuayRuntimeError) as ref_err:
+        run_source(src, filename="<test>")
+    for ei in (vm_err, ref_err):
+        assert ei.value.span is not None and ei.value.span.start.line == line
+        assert [f.span.start.line for f in ei.value.frames] == frames
+    assert vm_err.value.message == ref_err.value.message
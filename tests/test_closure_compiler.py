@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import contextlib
+import io
+from pathlib import Path
+
+import pytest
+
+from suaylang import cli
+from suaylang.closure_compiler import ClosureInterpreter, run_source
+from suaylang.compiler import scope_bindings
+from suaylang.interpreter import Interpreter
+from suaylang.lexer import Lexer
+from suaylang.parser import Parser
+from suaylang.runtime import Closure, Env, SuayRuntimeError
+from tools.diff_test.program_generator import generate_invalid_program, generate_valid_program
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def outcome(engine: type[Interpreter], source: str, filename: str = "<test>") -> tuple[str, str, str]:
+    """(termination, stdout, value or full error text) of running `source` on `engine`."""
+
+    buf = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(buf):
+            program = Parser(Lexer(source, filename=filename).tokenize(), source, filename=filename).parse_program()
+            value = engine(source=source, filename=filename).eval_program(program)
+    except Exception as e:
+        text = str(e)
+        if isinstance(e, SuayRuntimeError) and e.message == "Maximum recursion depth exceeded":
+            # How many frames fit on the host stack differs between engines.
+            text = text.split("\nstack:\n")[0]
+        return type(e).__name__, buf.getvalue(), text
+    return "ok", buf.getvalue(), "<closure>" if isinstance(value, Closure) else repr(value)
+
+
+def corpus() -> list[Path]:
+    roots = ["conformance/corpus", "tests/corpus", "tools/diff_test/corpus/fixed", "examples", "benchmarks"]
+    files = sorted(p for r in roots for p in (ROOT / r).rglob("*.suay"))
+    return [p for p in files if "hear" not in p.read_text(encoding="utf-8")]
+
+
+@pytest.mark.parametrize("path", corpus(), ids=lambda p: p.relative_to(ROOT).as_posix())
+def test_corpus_matches_interpreter(path: Path) -> None:
+    src = path.read_text(encoding="utf-8")
+    assert outcome(ClosureInterpreter, src, str(path)) == outcome(Interpreter, src, str(path))
+
+
+def test_generated_programs_match_interpreter() -> None:
+    for seed in range(2):
+        for bucket in ("small", "medium", "large"):
+            for i in range(25):
+                valid = generate_valid_program(seed=seed, index=i, size_bucket=bucket)
+                _cat, invalid = generate_invalid_program(seed=seed, index=i, size_bucket=bucket)
+                for src in (valid, invalid):
+                    assert outcome(ClosureInterpreter, src) == outcome(Interpreter, src), src
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "say · nope\n",
+        "x ← 1\nx ← 2\n",
+        "⟪ y ⇐ 3 ⟫\n",
+        "1 ▷ ⟪\n▷ 2 ⇒ ø\n⟫\n",
+        "⟲ 0 ▷ ⟪\n▷ 1 ⇒ ↩ 1\n⟫\n",
+        "f ← ⌁(x) x ÷ 0\nf · 1\n",
+        "f ← ⌁(1) ø\nf · 2\n",
+        "3 · 4\n",
+        "−\"a\"\n",
+        "⟦[1] ↦ 2⟧\n",
+        "at · [1] · 5\n",
+        "map · (⌁(1) ø) · [2]\n",
+        "text · (10 × 1.5 ÷ (2 − 2))\n",
+        "\"a\" < 1\n",
+        "g ← ⌁(n) ⟪ m ← n + q\n m ⟫\nh ← ⌁(n) g · n\nh · 1\n",
+    ],
+)
+def test_errors_match_interpreter(source: str) -> None:
+    got = outcome(ClosureInterpreter, source)
+    assert got[0] == "SuayRuntimeError"
+    assert got == outcome(Interpreter, source)
+
+
+@pytest.mark.parametrize(
+    ("source", "expected"),
+    [
+        ("x ← 1\n⟪ x ← 2\n x ⟫ + x\n", 3),
+        ("x ← 1\n⟪ y ← x\n x ← 5\n y + x ⟫\n", 6),
+        ("x ← 1\n⟪ ⊥ ∧ (x ← 9)\n x ⟫\n", 1),
+        ("c ← ⟪ n ← 0\n inc ← ⌁(u) n ⇐ n + 1\n inc · ø\n inc · ø\n n ⟫\nc\n", 2),
+        ("f ← ⌁(n) (n ≤ 0) ▷ ⟪\n▷ ⊤ ⇒ 0\n▷ ⊥ ⇒ n + (f · (n − 1))\n⟫\nf · 4\n", 10),
+        ("⟪ text ← ⌁(v) 7\n text · 1 ⟫\n", 7),
+        # Forward reference to a later binding in the same block.
+        ("⟪ f ← ⌁(n) g · n\n g ← ⌁(n) n + 1\n f · 1 ⟫\n", 2),
+        # A binding in an arm body lands in the arm env, next to the pattern's slots.
+        ("(1 2) ▷ ⟪\n▷ (a b) ⇒ ⟪ s ← a + b\n s ⟫ + (t ← 3) + t\n⟫\n", 9),
+        # Mutating a builtin and an arm-local name.
+        ("say ⇐ text\nsay · 1\n", "1"),
+        ("2 ▷ ⟪\n▷ k ⇒ ⟪ k ⇐ k × 10\n k ⟫\n⟫\n", 20),
+        ("f ← ⌁(a b) a − b\ng ← f · 10\ng · 3\n", 7),
+    ],
+)
+def test_scopes_match_interpreter(source: str, expected: object) -> None:
+    assert run_source(source, filename="<test>") == expected
+    assert outcome(ClosureInterpreter, source) == outcome(Interpreter, source)
+
+
+def test_block_bindings_are_slots() -> None:
+    f = run_source("⟪ x ← 1\n y ← 2\n ⌁(u) x + y ⟫\n")
+    assert isinstance(f, Closure)
+    assert f.env.layout.names == ("x", "y") and f.env.slots == [1, 2]
+
+
+def test_modules_run_on_the_same_engine(tmp_path: Path, monkeypatch) -> None:
+    (tmp_path / "m.suay").write_text("sq ← ⌁(x) x × x\nbad ← ⌁(x) x + ⊤\n", encoding="utf-8")
+    main = tmp_path / "main.suay"
+    src = 'sq ← link · "./m" · "sq"\nbad ← link · "./m" · "bad"\nsay · (sq · 7)\nbad · 1\n'
+    main.write_text(src, encoding="utf-8")
+
+    engines: list[type] = []
+    init = Interpreter.__post_init__
+
+    def record(self) -> None:
+        engines.append(type(self))
+        init(self)
+
+    monkeypatch.setattr(Interpreter, "__post_init__", record)
+    got = outcome(ClosureInterpreter, src, str(main))
+    assert engines == [ClosureInterpreter, ClosureInterpreter]
+    assert got[:2] == ("SuayRuntimeError", "49\n")
+    assert got == outcome(Interpreter, src, str(main))
+
+
+def test_trace_falls_back_to_the_interpreter(capsys) -> None:
+    src = "x ← 1 + 2\nx\n"
+    program = Parser(Lexer(src).tokenize(), src).parse_program()
+    Interpreter(source=src, trace=True).eval_program(program)
+    expected = capsys.readouterr().out
+    ClosureInterpreter(source=src, trace=True).eval_program(program)
+    assert capsys.readouterr().out == expected != ""
+
+
+@pytest.mark.parametrize("engine", ["closures", "interpreter"])
+def test_run_selects_engine(engine: str, capsys) -> None:
+    assert cli.main(["run", "--engine", engine, "-e", "say · (text · ((⌁(x) x × 6) · 7))"]) == 0
+    assert capsys.readouterr().out == "42\n"
+    assert cli.main(["run", "--engine", engine, "-e", "say · nope"]) == 1
+    assert "Undefined name 'nope'" in capsys.readouterr().err
+
+
+
+def test_scope_bindings_skip_nested_scopes() -> None:
+    src = "a ← (b ← 1) + ⟪ c ← 2\n c ⟫\nf ← ⌁(x) ⟪ d ← x\n d ⟫\n[e ← 3]\n"
+    names: list[str] = []
+    for item in Parser(Lexer(src).tokenize(), src).parse_program().items:
+        scope_bindings(item, names)
+    assert names == ["b", "a", "f", "e"]
+
+
+@pytest.mark.parametrize("engine", [Interpreter, ClosureInterpreter])
+def test_recursion_limit_is_reported_at_the_call_site(engine: type[Interpreter]) -> None:
+    src = "f ← ⌁(n) n ▷ ⟪\n▷ 0 ⇒ 0\n▷ _ ⇒ 1 + (f · (n − 1))\n⟫\nf · 5000\n"
+    program = Parser(Lexer(src).tokenize(), src).parse_program()
+    with pytest.raises(SuayRuntimeError) as ei:
+        engine(source=src).eval_program(program)
+    assert ei.value.message == "Maximum recursion depth exceeded"
+    assert ei.value.span is not None
+    assert (ei.value.span.start.line, ei.value.span.start.column) == (3, 12)
+
+
+def test_recursion_while_compiling_a_form_is_located() -> None:
+    src = "x ← " + "(0, " * 3000 + "1" + ")" * 3000 + "\n"
+    item = Parser(Lexer(src).tokenize(), src).parse_program().items[0]
+    interp = ClosureInterpreter(source=src)
+    # The form is compiled on first use, not as part of a program.
+    with pytest.raises(SuayRuntimeError) as ei:
+        interp.eval_form(item, Env(parent=interp._builtins_env))
+    assert ei.value.message == "Maximum recursion depth exceeded"
+    assert ei.value.span == item.span
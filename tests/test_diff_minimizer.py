@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import dataclasses
+
+import pytest
+
+from tools.diff_test import minimizer
+from tools.diff_test.minimizer import _ast_edits, _ddmin, _Oracle, minimize
+
+
+@pytest.fixture
+def vm_misprints_13(monkeypatch) -> None:
+    """A VM that prints 31 wherever it should print 13."""
+
+    real = minimizer.observe_vm
+
+    def observe_vm(source: str, *, filename: str, timeout_s: float):
+        obs = real(source, filename=filename, timeout_s=timeout_s)
+        return dataclasses.replace(obs, stdout=obs.stdout.replace("13", "31"))
+
+    monkeypatch.setattr(minimizer, "observe_vm", observe_vm)
+
+
+def program(n: int) -> str:
+    lines = [f"v{i} ← ⟪ t ← [1 2 {i}]\n  t ▷ ⟪\n  ▷ [a ⋯ r] ⇒ a + {i}\n  ▷ _ ⇒ 0\n  ⟫ ⟫" for i in range(n)]
+    lines.insert(n // 2, "say · (text · (v12 + 0))")
+    return "\n".join(lines) + "\nv3\n"
+
+
+def test_minimizes_through_ast_reductions(vm_misprints_13) -> None:
+    res = minimize(source=program(40), filename="<t>", timeout_s=1.0)
+    assert res.minimized_source == "v12 ← ⟪ t ← [1]▷ ⟪▷ [a ] ⇒ a + 12⟫ ⟫\nsay · ((v12))"
+    assert res.removed_lines == 202 - 2
+    assert res.cache_hits > 0
+
+
+def test_parallel_candidates_give_the_same_result(vm_misprints_13) -> None:
+    serial = minimize(source=program(15), filename="<t>", timeout_s=1.0)
+    parallel = minimize(source=program(15), filename="<t>", timeout_s=1.0, jobs=2)
+    assert parallel.minimized_source == serial.minimized_source
+
+
+def test_agreeing_engines_leave_the_source_alone() -> None:
+    src = "x ← 1\nx + 1\n"
+    assert minimize(source=src, filename="<t>", timeout_s=1.0).minimized_source == src
+
+
+def test_ddmin_finds_a_minimal_subset_and_memoizes() -> None:
+    calls: list[str] = []
+
+    def test(src: str) -> bool:
+        calls.append(src)
+        return "c" in src and "f" in src
+
+    oracle = _Oracle(test, jobs=1)
+    assert _ddmin(list("abcdefgh"), oracle) == ["c", "f"]
+    assert len(calls) == len(set(calls)) == oracle.tested
+    assert oracle.first(["cf", "abc"]) == 0 and oracle.tested == len(calls)
+
+
+def test_ast_edits_cover_arms_items_and_subexpressions() -> None:
+    src = "x ← [1 2] ▷ ⟪\n▷ [a ⋯ t] ⇒ a + 1\n▷ _ ⇒ 0\n⟫\n"
+    results = {src[:a] + r + src[b:] for a, b, r in _ast_edits(src)}
+    assert "x ← [1 2] ▷ ⟪\n▷ _ ⇒ 0\n⟫\n" in results  # first arm dropped
+    assert "x ← [1] ▷ ⟪\n▷ [a ⋯ t] ⇒ a + 1\n▷ _ ⇒ 0\n⟫\n" in results  # list shrunk
+    assert "x ← [1 2] ▷ ⟪\n▷ [a ⋯ t] ⇒ ø\n▷ _ ⇒ 0\n⟫\n" in results
+    assert "x ← [1 2] ▷ ⟪\n▷ [a ⋯ t] ⇒ a\n▷ _ ⇒ 0\n⟫\n" in results  # operand hoisted
+    assert "x ← ø\n" in results
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+from tools.conformance.fuzz_runner import run_fuzz
+from tools.diff_test.program_generator import generate_valid_program
+from tools.diff_test.runner import observe_interpreter
+from tools.diff_test.shards import Tally, plan_cases, run_sharded
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def tally(jobs: int) -> Tally:
+    cases = plan_cases(
+        fixed=sorted((ROOT / "tools" / "diff_test" / "corpus" / "fixed").rglob("*.suay")),
+        regressions=[],
+        seeds=[0, 1],
+        valid_by_bucket={"small": 40, "medium": 20},
+        invalid_by_bucket={"small": 10, "medium": 10},
+        save_budget=1,
+    )
+    out = Tally()
+    for shard in run_sharded(cases, timeout_s=2.0, jobs=jobs):
+        out.merge(shard)
+    return out
+
+
+def test_sharded_run_matches_serial_run() -> None:
+    serial, parallel = tally(1), tally(3)
+    assert serial.total > 100
+    assert parallel == serial
+    assert len(serial.samples) == 8 and serial.samples[0][0] == "seed0_small_valid_0.suay"
+
+
+def test_fuzz_results_do_not_depend_on_jobs(tmp_path: Path) -> None:
+    runs = [
+        run_fuzz(
+            n=250,
+            seed=5,
+            save_dir=tmp_path / str(jobs),
+            fail_fast=False,
+            save_non_ok=True,
+            save_non_ok_limit=2,
+            jobs=jobs,
+        )
+        for jobs in (1, 2)
+    ]
+    (stats1, saved1), (stats2, saved2) = runs
+    assert stats1 == stats2
+    assert [p.relative_to(tmp_path / "1") for p in saved1] == [p.relative_to(tmp_path / "2") for p in saved2]
+
+
+def test_generated_programs_are_stable_across_processes() -> None:
+    code = (
+        "from tools.diff_test.program_generator import generate_valid_program as g; "
+        "print(g(seed=3, index=7, size_bucket='large'), end='')"
+    )
+    outs = {
+        subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=ROOT,
+            env={"PYTHONHASHSEED": seed},
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        for seed in ("1", "2")
+    }
+    assert outs == {generate_valid_program(seed=3, index=7, size_bucket="large")}
+
+
+def test_timeout_works_off_the_main_thread() -> None:
+    src = "⟲ (Go•0) ▷ ⟪\n▷ Go•n ⇒ ↩ (Go•(n + 1))\n⟫\n"
+    seen = []
+    worker = threading.Thread(target=lambda: seen.append(observe_interpreter(src, filename="<t>", timeout_s=0.2)))
+    worker.start()
+    worker.join(10)
+    assert not worker.is_alive()
+    on_main = observe_interpreter(src, filename="<t>", timeout_s=0.2)
+    assert seen[0].termination == on_main.termination
+    assert "TimeoutError" in seen[0].message  # the interpreter reports it as an internal error
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import string
+from pathlib import Path
+
+import pytest
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from suaylang.lexer import LexError, Lexer
+
+ROOT = Path(__file__).resolve().parents[1]
+CORPORA = ["tests/corpus", "conformance/corpus", "tools/diff_test/corpus", "tests/stress", "examples"]
+
+
+def lex(source: str, *, fast: bool) -> object:
+    try:
+        return Lexer(source, filename="<test>", fast=fast).tokenize()
+    except LexError as e:
+        return ("error", e.message, e.line, e.column, e.context_line)
+
+
+def scanner_calls(src: str, monkeypatch) -> int:
+    calls = 0
+    scan = Lexer._scan_token
+
+    def counting(self: Lexer):
+        nonlocal calls
+        calls += 1
+        return scan(self)
+
+    monkeypatch.setattr(Lexer, "_scan_token", counting)
+    try:
+        Lexer(src, filename="<test>").tokenize()
+    except LexError:
+        pass
+    monkeypatch.undo()
+    return calls
+
+
+def corpus_files() -> list[Path]:
+    out: list[Path] = []
+    for rel in CORPORA:
+        out.extend(sorted((ROOT / rel).rglob("*.suay")))
+    return out
+
+
+@pytest.mark.parametrize("path", corpus_files(), ids=lambda p: p.relative_to(ROOT).as_posix())
+def test_fast_path_matches_scanner_on_corpus(path: Path) -> None:
+    src = path.read_text(encoding="utf-8")
+    assert lex(src, fast=True) == lex(src, fast=False)
+
+
+@pytest.mark.parametrize(
+    "src",
+    [
+        "x ← 1 ⍝ note\n// more\n# hash comment\n#t #f #u\n",
+        '"a\\n\\t\\"\\\\" "" "x"',
+        "1 1.5 1. 1..2 1...2 12.x",
+        "a_b _ __ a1 Tag•x [h ⋯ t] [[ ]] <- <~ -> => |> ~~ >> << :: ... <= >= != == && || ++",
+        "{ } ⟪ ⟫ \\(x) x . y * / - −",
+        "\r\n\t\n",
+    ],
+)
+def test_fast_path_handles_common_input(src: str, monkeypatch) -> None:
+    assert scanner_calls(src, monkeypatch) == 0
+    assert lex(src, fast=True) == lex(src, fast=False)
+
+
+@pytest.mark.parametrize(
+    "src",
+    [
+        "aø",  # ø continues a name
+        "x² + 1",  # isdigit but not ASCII
+        "12٣",
+        "1.٣",
+        "é ← 1",
+        '"open',
+        '"bad \\q"',
+        '"line\nbreak"',
+        "@",
+    ],
+)
+def test_scanner_decides_unusual_input(src: str, monkeypatch) -> None:
+    assert scanner_calls(src, monkeypatch) > 0
+    assert lex(src, fast=True) == lex(src, fast=False)
+
+
+@settings(max_examples=300, deadline=None)
+@given(
+    st.text(
+        alphabet=st.sampled_from(
+            list(
+                string.ascii_letters[:6]
+                + string.digits[:4]
+                + " _\n\t\r()[]{}.,\"<>!=+-*/%&|\\#~:"
+                + "⟪⟫⟦⟧←⇐↦⇒▷⟲↩↯•⋯⌁ø⊤⊥¬⊞×÷−≤≥≠∧∨·⍝é²٣@"
+            )
+        ),
+        max_size=80,
+    )
+)
+def test_fast_path_matches_scanner_on_random_input(src: str) -> None:
+    assert lex(src, fast=True) == lex(src, fast=False)
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import pytest
+
+from suaylang.contract import format_contract_error
+from suaylang.interpreter import run_source
+from suaylang.lexer import Lexer
+from suaylang.parser import ParseError, Parser
+from suaylang.runtime import SuayRuntimeError
+from suaylang.tokens import LineIndex, Position, Span, line_index
+
+
+def test_positions_match_the_lexer() -> None:
+    src = "x ← 1\n\ty ← \"a·b\"\r\n\nz ← x + y\n"
+    index = LineIndex(src)
+    for tok in Lexer(src).tokenize():
+        for pos in (tok.span.start, tok.span.end):
+            assert index.position(pos.offset) == pos
+            assert index.offset(pos.line, pos.column) == pos.offset
+
+
+@pytest.mark.parametrize(
+    "src, line, expected",
+    [
+        ("a\nbbb\nccc\n", 2, "bbb"),
+        ("a\nbbb\nccc\n", 4, ""),
+        ("a\nbbb\nccc\n", 5, None),
+        ("one", 1, "one"),
+        ("one", 2, None),
+        ("", 1, ""),
+        ("one\r\n", 1, "one\r"),
+        ("one\n", 0, None),
+    ],
+)
+def test_line_text(src: str, line: int, expected: str | None) -> None:
+    assert LineIndex(src).line_text(line) == expected
+
+
+def test_index_is_lazy_and_shared() -> None:
+    src = "x ← 1\ny ← 2\n"
+    Parser(Lexer(src).tokenize(), src).parse_program()
+    index = line_index(src)
+    assert index is line_index(src)
+    assert index._starts is None  # parsing without errors never scans lines
+    assert index.line_count == 3 and index.line_of(6) == 2
+
+
+def test_errors_take_context_from_the_index() -> None:
+    src = "x ← 1\ny ← ⟪\n"
+    with pytest.raises(ParseError) as parse_err:
+        Parser(Lexer(src).tokenize(), src).parse_program()
+    assert parse_err.value.context_line == line_index(src).line_text(parse_err.value.line)
+
+    src = "x ← 1\ny ← x + ⊤\n"
+    with pytest.raises(SuayRuntimeError) as run_err:
+        run_source(src, filename="<test>")
+    assert "y ← x + ⊤" in str(run_err.value)
+
+
+@pytest.mark.parametrize("line_end", ["\n", "\r\n"])
+def test_contract_context_matches_splitlines(line_end: str) -> None:
+    src = line_end.join(["x ← 1", 'y ← x + "a"', "say · y", ""])
+    with pytest.raises(SuayRuntimeError) as run_err:
+        run_source(src, filename="<test>")
+    out = format_contract_error(run_err.value, include_code=True)
+    assert out == 'E-TYPE <test>:2:5: runtime error: + expects numbers, got int and str\ny ← x + "a"\n    ^'
+
+    at_end = Position(len(src), 4, 1)
+    err = SuayRuntimeError("boom", span=Span(at_end, at_end), source=src)
+    assert format_contract_error(err, include_code=False) == "4:1: runtime error: boom"
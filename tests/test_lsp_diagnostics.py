@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import threading
+import time
+
+from suaylang import lsp_server
+from suaylang.lsp_server import DocState, SuayLspServer
+
+URI = "file:///tmp/doc.suay"
+
+
+def change(line: int, character: int, text: str) -> dict:
+    pos = {"line": line, "character": character}
+    return {"range": {"start": pos, "end": pos}, "text": text}
+
+
+def capture(monkeypatch) -> list[dict]:
+    sent: list[dict] = []
+    monkeypatch.setattr(lsp_server, "_send", sent.append)
+    return sent
+
+
+def published(sent: list[dict]) -> list[list[dict]]:
+    return [m["params"]["diagnostics"] for m in sent if m.get("method") == "textDocument/publishDiagnostics"]
+
+
+def test_edits_leave_the_index_until_analyzed() -> None:
+    doc = DocState(URI, "x ← 1\ny ← 2\n", 1)
+    index = doc.analyze()
+    assert index is not None and index.diagnostics() == []
+    doc.apply_change(change(1, 4, "⟪"))
+    assert doc.index is index
+    assert doc.analyze().diagnostics()[0]["range"]["start"]["line"] == 2
+
+
+def test_edit_during_analysis_cancels_it(monkeypatch) -> None:
+    doc = DocState(URI, "x ← 1\ny ← 2\nz ← 3\n", 1)
+    analyze = lsp_server._analyze
+    calls = 0
+
+    def editing(text: str, filename):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            doc.apply_change(change(2, 4, "@"))
+        return analyze(text, filename)
+
+    monkeypatch.setattr(lsp_server, "_analyze", editing)
+    assert doc.analyze() is None
+    assert calls == 1 and doc.index is None
+    index = doc.analyze()
+    assert index is not None
+    assert "Unexpected character" in index.diagnostics()[0]["message"]
+
+
+def wait_for(sent: list[dict], n: int) -> None:
+    deadline = time.monotonic() + 5
+    while len(published(sent)) < n and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_burst_of_edits_is_analyzed_once(monkeypatch) -> None:
+    sent = capture(monkeypatch)
+    server = SuayLspServer(debounce=0.2)
+    server._worker.start()
+    server._handle(
+        {
+            "method": "textDocument/didOpen",
+            "params": {"textDocument": {"uri": URI, "text": "", "version": 0}},
+        }
+    )
+    wait_for(sent, 1)
+    text = "x ← ⟪ 1 ⟫\n"  # every prefix but the whole text is an error
+    for i, ch in enumerate(text):
+        line = text.count("\n", 0, i)
+        server._handle(
+            {
+                "method": "textDocument/didChange",
+                "params": {
+                    "textDocument": {"uri": URI, "version": i + 1},
+                    "contentChanges": [change(line, i - (text.rfind("\n", 0, i) + 1), ch)],
+                },
+            }
+        )
+    wait_for(sent, 2)
+    time.sleep(0.3)
+    assert published(sent) == [[], []]
+    assert server._get_doc(URI).text == text
+
+
+def test_queries_answer_from_last_analysis(monkeypatch) -> None:
+    sent = capture(monkeypatch)
+    server = SuayLspServer()  # worker not started: nothing is analyzed behind our back
+    server._handle(
+        {
+            "method": "textDocument/didOpen",
+            "params": {"textDocument": {"uri": URI, "text": "inc ← ⌁(x) x + 1\ninc · 2\n", "version": 1}},
+        }
+    )
+    hover = {"textDocument": {"uri": URI}, "position": {"line": 1, "character": 1}}
+    assert "function inc(x)" in server._on_hover(hover)["contents"]["value"]
+    server._handle(
+        {
+            "method": "textDocument/didChange",
+            "params": {"textDocument": {"uri": URI, "version": 2}, "contentChanges": [change(0, 0, "⟪")]},
+        }
+    )
+    monkeypatch.setattr(lsp_server, "_analyze", None)  # any analysis would fail
+    assert "function inc(x)" in server._on_hover(hover)["contents"]["value"]
+    assert published(sent) == []
+
+
+def test_close_drops_pending_analysis(monkeypatch) -> None:
+    sent = capture(monkeypatch)
+    server = SuayLspServer(debounce=0.05)
+    ready = threading.Event()
+    monkeypatch.setattr(server, "_publish_diagnostics", lambda uri: ready.set())
+    server._handle(
+        {
+            "method": "textDocument/didOpen",
+            "params": {"textDocument": {"uri": URI, "text": "x ← @\n", "version": 1}},
+        }
+    )
+    server._handle({"method": "textDocument/didClose", "params": {"textDocument": {"uri": URI}}})
+    server._worker.start()
+    assert not ready.wait(0.2)
+    assert published(sent) == [[]]
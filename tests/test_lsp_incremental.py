@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import random
+from pathlib import Path
+
+import pytest
+
+from suaylang import lsp_server
+from suaylang.lexer import LexError, Lexer
+from suaylang.lsp_server import DocIndex, DocState, _diagnostic
+from suaylang.parser import ParseError, Parser
+from suaylang.symbols import SymbolTable, build_symbols
+
+ROOT = Path(__file__).resolve().parents[1]
+URI = "file:///tmp/doc.suay"
+
+
+def full_index(text: str) -> tuple[list[dict], SymbolTable | None]:
+    try:
+        tokens = Lexer(text).tokenize()
+    except LexError as e:
+        return [_diagnostic(e)], None
+    try:
+        program = Parser(tokens, text).parse_program()
+    except ParseError as e:
+        return [_diagnostic(e)], None
+    return [], build_symbols(program, text)
+
+
+def position(text: str, offset: int) -> dict[str, int]:
+    line = text.count("\n", 0, offset)
+    return {"line": line, "character": offset - (text.rfind("\n", 0, offset) + 1)}
+
+
+def edit(doc: DocState, text: str, start: int, end: int, new: str) -> str:
+    doc.apply_change(
+        {"range": {"start": position(text, start), "end": position(text, end)}, "text": new}
+    )
+    return text[:start] + new + text[end:]
+
+
+def check(doc: DocState, text: str) -> DocIndex:
+    assert doc.text == text
+    index = doc.analyze()
+    assert index is not None and index is doc.index
+    diagnostics, table = full_index(text)
+    assert index.diagnostics() == diagnostics
+    if table is not None:
+        assert index.top_symbols() == [s for s in table.symbols if s.scope == 0]
+        for ref in table.refs:
+            k = table.resolve(ref)
+            start = ref.span.start
+            found = index.definition_at(start.line - 1, start.column - 1)
+            assert (found.span if found else None) == (table.symbols[k].span if k is not None else None)
+            if ref.decl:
+                assert index.references_to(found) == [r.span for r in table.references(k)]
+    return index
+
+
+SOURCE = """\
+inc ← ⌁(x) x + 1
+⍝ a comment
+
+f ← ⌁(a b) ⟪
+  t ← a × b
+  t + 1
+⟫
+xs ← [1, 2,
+3]
+r ← xs ▷ ⟪
+▷ [h ⋯ _] ⇒ f · h · 2
+▷ _ ⇒ 0
+⟫
+say · (inc · r)
+"""
+
+SNIPPETS = ["⟪", "⟫", "(", ")", "[", "]", "\n", "x ← ", " + 1", "@", '"', "▷ _ ⇒ 1\n", "⟲ 0 ▷ ⟪\n", ""]
+
+
+def test_forms_follow_top_level_forms() -> None:
+    doc = DocState(URI, SOURCE, 1)
+    check(doc, SOURCE)
+    assert [f.text.split("\n")[0] for f in doc.forms] == [
+        "inc ← ⌁(x) x + 1",
+        "f ← ⌁(a b) ⟪",
+        "xs ← [1, 2,",
+        "r ← xs ▷ ⟪",
+        "say · (inc · r)",
+    ]
+
+
+def test_unclosed_bracket_merges_with_following_forms() -> None:
+    text = SOURCE
+    doc = DocState(URI, text, 1)
+    text = edit(doc, text, text.index("⟫"), text.index("⟫") + 1, "")
+    index = check(doc, text)
+    assert index.diagnostics()[0]["range"]["start"]["line"] == text.count("\n")
+    text = edit(doc, text, text.index("  t + 1\n") + 8, text.index("  t + 1\n") + 8, "⟫\n")
+    assert check(doc, text).diagnostics() == []
+    assert len(doc.forms) == 5
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_random_edits_match_full_reindex(seed: int) -> None:
+    rng = random.Random(seed)
+    files = sorted((ROOT / "conformance" / "corpus").glob("*.suay"))
+    text = rng.choice(files).read_text(encoding="utf-8") if seed % 2 else SOURCE
+    doc = DocState(URI, text, 1)
+    check(doc, text)
+    for _ in range(25):
+        start = rng.randrange(len(text) + 1)
+        end = min(len(text), start + rng.choice([0, 0, 1, 2, 10]))
+        text = edit(doc, text, start, end, rng.choice(SNIPPETS))
+        check(doc, text)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_edits_batched_between_analyses_match_full_reindex(seed: int) -> None:
+    rng = random.Random(seed)
+    text = "".join(SOURCE for _ in range(3))
+    doc = DocState(URI, text, 1)
+    check(doc, text)
+    for _ in range(10):
+        for _ in range(rng.randint(1, 4)):
+            start = rng.randrange(len(text) + 1)
+            end = min(len(text), start + rng.choice([0, 1, 5]))
+            text = edit(doc, text, start, end, rng.choice(SNIPPETS))
+        check(doc, text)
+
+
+def test_keystroke_reanalyzes_only_the_edited_form(monkeypatch) -> None:
+    text = "".join(f"v{i} ← ⌁(a) ⟪\n  t ← a × {i}\n  t + 1\n⟫\n" for i in range(5000))
+    doc = DocState(URI, text, 1)
+    doc.analyze()
+    analyzed: list[str] = []
+    analyze = lsp_server._analyze
+
+    def spy(form_text: str, filename):
+        analyzed.append(form_text)
+        return analyze(form_text, filename)
+
+    monkeypatch.setattr(lsp_server, "_analyze", spy)
+    at = text.index("t ← a × 2500")
+    text = edit(doc, text, at, at + 1, "u")
+    assert analyzed == []
+    assert doc.analyze().diagnostics() == []
+    assert analyzed == ["v2500 ← ⌁(a) ⟪\n  u ← a × 2500\n  t + 1\n⟫\n"]
+    assert doc.text == text
+
+
+def test_positions_and_definitions_are_document_relative() -> None:
+    doc = DocState(URI, SOURCE, 1).analyze()
+    line = SOURCE.split("\n").index("say · (inc · r)")
+    tok = doc.ident_at(line, 8)
+    assert tok is not None and tok.value == "inc"
+    d = doc.definition_at(line, 13)
+    assert d is not None and d.name == "r" and d.kind == "binding"
+    assert (d.span.start.line, d.span.start.column) == (10, 1)
+    assert d.span.start.offset == SOURCE.index("r ←")
+    assert [s.start.line for s in doc.references_to(d)] == [10, 14]
+
+
+def test_module_names_are_gathered_per_name_on_demand() -> None:
+    doc = DocState(URI, SOURCE, 1)
+    index = doc.analyze()
+    assert index._module == {}
+    line = SOURCE.split("\n").index("say · (inc · r)")
+    assert index.definition_at(line, 8).name == "inc"
+    assert list(index._module) == ["inc"]
+    edit(doc, SOURCE, 0, 0, " ")
+    assert doc.analyze()._module == {}
+
+
+def test_full_text_change_replaces_document() -> None:
+    doc = DocState(URI, SOURCE, 1)
+    doc.apply_change({"text": "x ← ⟪\n"})
+    check(doc, "x ← ⟪\n")
+    doc.apply_change({"range": {"start": {"line": 1, "character": 0}, "end": {"line": 1, "character": 0}}, "text": "1 ⟫"})
+    check(doc, "x ← ⟪\n1 ⟫")
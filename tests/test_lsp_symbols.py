@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from suaylang import lsp_server
+from suaylang.lsp_server import SuayLspServer
+from suaylang.symbols import WorkspaceIndex, analyze_symbols
+
+
+def resolved(src: str) -> list[tuple[str, int, int, tuple[int, int] | None]]:
+    table = analyze_symbols(src)
+    assert table is not None
+    out = []
+    for ref in table.refs:
+        if ref.decl:
+            continue
+        k = table.resolve(ref)
+        target = None if k is None else (table.symbols[k].span.start.line, table.symbols[k].span.start.column)
+        out.append((ref.name, ref.span.start.line, ref.span.start.column, target))
+    return out
+
+
+def test_parameters_and_pattern_binders_are_scoped() -> None:
+    src = "f ← ⌁(x) x ▷ ⟪\n▷ [x ⋯ t] ⇒ x\n▷ _ ⇒ t\n⟫\nx\n"
+    assert resolved(src) == [
+        ("x", 1, 10, (1, 7)),
+        ("x", 2, 13, (2, 4)),
+        ("t", 3, 7, None),
+        ("x", 5, 1, None),
+    ]
+
+
+def test_binding_is_visible_after_its_value() -> None:
+    # The inner `x + 1` reads the outer x; the block's last line reads the inner one.
+    src = "x ← 1\n⟪ x ← x + 1\n x ⟫\n"
+    assert resolved(src) == [("x", 2, 7, (1, 1)), ("x", 3, 2, (2, 3))]
+
+
+def test_lambdas_see_later_definitions() -> None:
+    src = "f ← ⌁(n) g · n\ng ← ⌁(n) f · n\ng\n"
+    assert [(name, target) for name, _, _, target in resolved(src)] == [
+        ("g", (2, 1)),
+        ("n", (1, 7)),
+        ("f", (1, 1)),
+        ("n", (2, 7)),
+        ("g", (2, 1)),
+    ]
+
+
+def test_link_binding_is_an_import() -> None:
+    table = analyze_symbols('add1 ← link · "lib" · "add1"\ninc ← ⌁(a b) a\n')
+    assert [(s.name, s.kind, s.link, s.detail) for s in table.symbols] == [
+        ("add1", "import", ("lib", "add1"), None),
+        ("inc", "function", None, "(a b)"),
+        ("a", "parameter", None, None),
+        ("b", "parameter", None, None),
+    ]
+
+
+def test_deep_nesting_is_walked_without_recursion() -> None:
+    src = "x ← " + "[ " * 3000 + "x" + " ]" * 3000 + "\n"
+    (ref,) = resolved(src)
+    assert ref[0] == "x" and ref[3] is None
+
+
+def test_workspace_index_rereads_only_changed_files(tmp_path: Path) -> None:
+    (tmp_path / "a.suay").write_text("x ← 1\n", encoding="utf-8")
+    (tmp_path / ".hidden").mkdir()
+    (tmp_path / ".hidden" / "b.suay").write_text("y ← 1\n", encoding="utf-8")
+    ws = WorkspaceIndex(str(tmp_path))
+    assert ws.files() == [str(tmp_path / "a.suay")]
+    first = ws.table(str(tmp_path / "a.suay"))
+    assert ws.table(str(tmp_path / "a.suay")) is first
+    (tmp_path / "a.suay").write_text("x ← 1\nz ← 2\n", encoding="utf-8")
+    os.utime(tmp_path / "a.suay", ns=(1, 1))
+    second = ws.table(str(tmp_path / "a.suay"))
+    assert second is not first and [s.name for s in second.symbols] == ["x", "z"]
+
+
+def open_workspace(tmp_path: Path, monkeypatch) -> tuple[SuayLspServer, str, str]:
+    monkeypatch.setattr(lsp_server, "_send", lambda payload: None)
+    lib = tmp_path / "lib.suay"
+    lib.write_text("add1 ← ⌁(n) n + 1\nadd2 ← ⌁(n) add1 · (add1 · n)\n", encoding="utf-8")
+    main = tmp_path / "app" / "main.suay"
+    main.parent.mkdir()
+    main.write_text("", encoding="utf-8")
+    server = SuayLspServer()
+    server._handle({"id": 1, "method": "initialize", "params": {"rootUri": tmp_path.as_uri()}})
+    text = 'inc ← link · "../lib" · "add1"\ninc · 2\n'
+    server._handle(
+        {
+            "method": "textDocument/didOpen",
+            "params": {"textDocument": {"uri": main.as_uri(), "text": text, "version": 1}},
+        }
+    )
+    return server, lib.as_uri(), main.as_uri()
+
+
+def test_definition_follows_link_into_other_file(tmp_path: Path, monkeypatch) -> None:
+    server, lib, main = open_workspace(tmp_path, monkeypatch)
+    loc = server._on_definition({"textDocument": {"uri": main}, "position": {"line": 1, "character": 1}})
+    assert loc == {"uri": lib, "range": {"start": {"line": 0, "character": 0}, "end": {"line": 0, "character": 4}}}
+
+
+def test_references_span_linking_modules(tmp_path: Path, monkeypatch) -> None:
+    server, lib, main = open_workspace(tmp_path, monkeypatch)
+    locs = server._on_references(
+        {
+            "textDocument": {"uri": main},
+            "position": {"line": 1, "character": 0},
+            "context": {"includeDeclaration": True},
+        }
+    )
+    assert [(loc["uri"], loc["range"]["start"]["line"], loc["range"]["start"]["character"]) for loc in locs] == [
+        (lib, 0, 0),
+        (lib, 1, 12),
+        (lib, 1, 20),
+        (main, 0, 0),
+        (main, 1, 0),
+    ]
+
+
+def test_workspace_symbols_cover_unopened_files(tmp_path: Path, monkeypatch) -> None:
+    server, lib, main = open_workspace(tmp_path, monkeypatch)
+    found = server._on_workspace_symbols({"query": "ADD"})
+    assert [(s["name"], s["location"]["uri"], s["kind"]) for s in found] == [
+        ("add1", lib, 12),
+        ("add2", lib, 12),
+    ]
+    assert [s["name"] for s in server._on_workspace_symbols({"query": ""})] == ["inc", "add1", "add2"]
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import pytest
+
+from suaylang.bytecode import Code, Instr
+from suaylang.compiler import Compiler
+from suaylang.lexer import Lexer
+from suaylang.optimizer import PASSES, OptimizeStats, optimize_code
+from suaylang.parser import Parser
+from suaylang.runtime import EMPTY_LAYOUT, SuayRuntimeError
+from suaylang.vm import VM
+
+
+def parse(src: str):
+    tokens = Lexer(src, filename="<test>").tokenize()
+    return Parser(tokens, src, filename="<test>").parse_program()
+
+
+def run(src: str, **opts) -> tuple[object, Compiler]:
+    compiler = Compiler(**opts)
+    code = compiler.compile_program(parse(src), name="<test>")
+    return VM(source=src, filename="<test>").run(code), compiler
+
+
+def ops(code: Code) -> list[str]:
+    return [ins.op for ins in code.instrs]
+
+
+def test_constant_folding() -> None:
+    code = Compiler(passes=("fold",)).compile_program(parse("1 + 2 × 3\n"))
+    assert ops(code) == ["CONST", "HALT"]
+    assert code.instrs[0].arg == 7
+
+
+def test_folding_leaves_runtime_errors_alone() -> None:
+    src = "1 ÷ 0\n"
+    code = Compiler(optimize=2).compile_program(parse(src))
+    assert "DIV" in ops(code)
+    with pytest.raises(SuayRuntimeError):
+        VM(source=src, filename="<test>").run(code)
+
+
+@pytest.mark.parametrize("op", ["÷", "+"])
+def test_folding_leaves_overflow_to_runtime(op: str) -> None:
+    src = f"{'9' * 400} {op} 0.5\n"
+    errors = []
+    for level in (0, 2):
+        code = Compiler(optimize=level).compile_program(parse(src))
+        with pytest.raises(SuayRuntimeError) as ei:
+            VM(source=src, filename="<test>").run(code)
+        errors.append(str(ei.value))
+    assert errors[0] == errors[1]
+
+
+def test_irrefutable_arm_drops_match_and_later_arms() -> None:
+    src = "5 ▷ ⟪\n▷ n ⇒ n + 1\n▷ 0 ⇒ 0\n⟫\n"
+    plain = Compiler().compile_program(parse(src))
+    opt = Compiler(optimize=2).compile_program(parse(src))
+    assert "MATCH" not in ops(opt)
+    assert "RAISE" not in ops(opt)
+    assert len(opt.instrs) < len(plain.instrs)
+    assert VM(source=src, filename="<test>").run(opt) == 6
+
+
+def test_jump_threading_and_dead_code() -> None:
+    code = Code(
+        name="<t>",
+        instrs=[
+            Instr("CONST", 1),
+            Instr("JMP", 3),
+            Instr("CONST", 2),  # unreachable
+            Instr("JMP", 4),
+            Instr("HALT"),
+        ],
+    )
+    stats = OptimizeStats()
+    out = optimize_code(code, ("jumps", "dead"), stats=stats)
+    assert ops(out) == ["CONST", "HALT"]
+    assert stats.total_removed == 3
+
+
+def test_empty_scope_is_dropped() -> None:
+    code = Code(
+        name="<t>",
+        instrs=[
+            Instr("PUSH_ENV", EMPTY_LAYOUT),
+            Instr("CONST", 1),
+            Instr("POP_ENV"),
+            Instr("HALT"),
+        ],
+    )
+    assert ops(optimize_code(code, ("scopes",))) == ["CONST", "HALT"]
+
+
+@pytest.mark.parametrize(
+    "src",
+    [
+        "f ← ⌁(n) (n ≤ 1) ▷ ⟪\n▷ ⊤ ⇒ n\n▷ ⊥ ⇒ (f · (n − 1)) + (f · (n − 2))\n⟫\nf · 10\n",
+        "⟲ 0 ▷ ⟪\n▷ 5 ⇒ ↯ 5\n▷ i ⇒ ↩ i + 1\n⟫\n",
+        "x ← ⟪ y ← 2 × 3\n y + 1 ⟫\nx ⊞ 1\n",
+    ],
+)
+def test_every_pass_preserves_results(src: str) -> None:
+    try:
+        expected, _ = run(src)
+    except SuayRuntimeError as e:
+        expected = e.message
+    for name in PASSES:
+        try:
+            got, _ = run(src, passes=(name,))
+        except SuayRuntimeError as e:
+            got = e.message
+        assert got == expected, name
+
+
+def test_compiler_reports_removed_instructions() -> None:
+    _, compiler = run("f ← ⌁(x) x ▷ ⟪\n▷ _ ⇒ 1 + 1\n⟫\nf · 0\n", optimize=2)
+    assert compiler.stats.total_removed > 0
+    assert set(compiler.stats.removed) <= set(PASSES)
+    _, plain = run("1\n")
+    assert plain.stats.total_removed == 0
@@ -1,12 +1,31 @@
 from __future__ import annotations
 
+import pytest
+
+from suaylang import ast
 from suaylang.lexer import Lexer
-from suaylang.parser import Parser
+from suaylang.parser import ParseError, Parser
 
 
-def parse_ok(source: str) -> None:
+def parse_ok(source: str) -> ast.Program:
     tokens = Lexer(source, filename="<test>").tokenize()
-    Parser(tokens, source, filename="<test>").parse_program()
+    return Parser(tokens, source, filename="<test>").parse_program()
+
+
+def shape(e: ast.Expr) -> object:
+    match e:
+        case ast.Binary(op=op, left=left, right=right):
+            return (op, shape(left), shape(right))
+        case ast.Unary(op=op, expr=inner):
+            return (op, shape(inner))
+        case ast.Call(func=func, arg=arg):
+            return ("·", shape(func), shape(arg))
+        case ast.VariantExpr(tag=tag, payload=payload):
+            return ("•", tag, shape(payload))
+        case ast.Name(value=v) | ast.IntLit(value=v):
+            return v
+        case _:
+            return type(e).__name__
 
 
 def test_parse_allows_negative_call_argument() -> None:
@@ -44,3 +63,47 @@ def test_parse_map_literal() -> None:
 
 def test_parse_variant_payload_tuple() -> None:
     parse_ok("v ← Tag•(1 2 3)\nv\n")
+
+
+@pytest.mark.parametrize(
+    ("src", "expected"),
+    [
+        ("a + b × c − d", ("−", ("+", "a", ("×", "b", "c")), "d")),
+        ("a < b < c", ("<", ("<", "a", "b"), "c")),
+        ("a ∨ b ∧ c = d + 1", ("∨", "a", ("∧", "b", ("=", "c", ("+", "d", 1))))),
+        ("a ∧ b ∨ c", ("∨", ("∧", "a", "b"), "c")),
+        ("−f · x + 1", ("+", ("−", ("·", "f", "x")), 1)),
+        ("f · −x · y", ("·", ("·", "f", ("−", "x")), "y")),
+        ("¬A•x ∧ b", ("∧", ("¬", ("•", "A", "x")), "b")),
+        ("1 − −2", ("−", 1, ("−", 2))),
+    ],
+)
+def test_parse_operator_precedence(src: str, expected: object) -> None:
+    (expr,) = parse_ok(src + "\n").items
+    assert shape(expr) == expected
+
+
+def test_parse_variant_payload_is_not_a_variant() -> None:
+    with pytest.raises(ParseError) as ei:
+        parse_ok("A•B•1\n")
+    assert ei.value.message.startswith("Expected end of line after expression")
+
+
+@pytest.mark.parametrize(
+    ("open_", "close"),
+    [("(", ")"), ("[ ", " ]"), ("⟪ ", " ⟫"), ("−(", ")"), ("f · (", ")"), ("⌁(x) ", ""), ("y ← ", "")],
+)
+def test_parse_deep_nesting_has_no_depth_limit(open_: str, close: str) -> None:
+    depth = 5000
+    program = parse_ok(open_ * depth + "1" + close * depth + "\n")
+    assert len(program.items) == 1
+
+
+def test_parse_deep_dispatch_nesting() -> None:
+    depth = 2000
+    src = "x ▷ ⟪\n▷ _ ⇒ " * depth + "1" + "\n⟫" * depth + "\n"
+    expr = parse_ok(src).items[0]
+    for _ in range(depth):
+        assert isinstance(expr, ast.Dispatch)
+        expr = expr.arms[0].expr
+    assert isinstance(expr, ast.IntLit)
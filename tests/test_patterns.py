@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import pytest
+
+from suaylang import ast
+from suaylang.compiler import Compiler
+from suaylang.interpreter import run_source
+from suaylang.lexer import Lexer
+from suaylang.parser import ParseError, Parser
+from suaylang.patterns import binders, compile_pattern
+from suaylang.persistent import ListView, PVector, Rope
+from suaylang.runtime import UNIT, Variant
+from suaylang.vm import VM
+
+
+def parse(src: str):
+    tokens = Lexer(src, filename="<test>").tokenize()
+    return Parser(tokens, src, filename="<test>").parse_program()
+
+
+def run_vm(src: str, **opts) -> object:
+    code = Compiler(**opts).compile_program(parse(src), name="<test>")
+    return VM(source=src, filename="<test>").run(code)
+
+
+def arm_pattern(src: str) -> ast.Pattern:
+    (dispatch,) = parse(f"ø ▷ ⟪\n▷ {src} ⇒ ø\n⟫\n").items
+    return dispatch.arms[0].pattern
+
+
+@pytest.mark.parametrize("pat", ["(x, x)", "[a, b ⋯ a]", "(x, Some•x)"])
+def test_duplicate_binders_are_a_parse_error(pat: str) -> None:
+    src = f"ø ▷ ⟪\n▷ {pat} ⇒ ø\n⟫\n"
+    with pytest.raises(ParseError) as ei:
+        parse(src)
+    assert ei.value.message == "Duplicate name binder in pattern"
+
+
+@pytest.mark.parametrize(
+    "pat, value, expected",
+    [
+        ("_", 1, {}),
+        ("n", 5, {"n": 5}),
+        ("0", 0, {}),
+        ("0", 1, None),
+        ("1", True, {}),  # Int patterns accept an equal Bool, as before
+        ("⊤", 1, None),
+        ("ø", UNIT, {}),
+        ('"a"', "a", {}),
+        ('"ab"', Rope("a", "b"), {}),
+        ('"ab"', Rope("a", "c"), None),
+        ("(a, 2)", (1, 2), {"a": 1}),
+        ("(a, 2)", (1, 3), None),
+        ("(a, b)", [1, 2], None),
+        ("[h ⋯ t]", [1, 2, 3], {"h": 1, "t": [2, 3]}),
+        ("[h ⋯ t]", [], None),
+        ("[a, b]", [1, 2, 3], None),
+        ("Some•(x, _)", Variant("Some", (1, 2)), {"x": 1}),
+        ("Some•x", Variant("None", UNIT), None),
+    ],
+)
+def test_matcher_semantics(pat: str, value: object, expected: object) -> None:
+    m = compile_pattern(arm_pattern(pat))
+    assert m.match(value) == expected
+    assert m.irrefutable == (pat in ("_", "n"))
+
+
+def test_binders_order_matches_slots() -> None:
+    p = arm_pattern("(a, [b ⋯ c], T•d)")
+    m = compile_pattern(p)
+    assert binders(p) == ["a", "b", "c", "d"] == list(m.names)
+    slots: list[object] = [None] * 4
+    assert m.test is not None and m.test((1, [2, 3], Variant("T", 4)))
+    m.bind((1, [2, 3], Variant("T", 4)), slots)  # type: ignore[misc]
+    assert slots == [1, 2, [3], 4]
+
+
+def test_list_tail_is_a_view_of_the_list() -> None:
+    m = compile_pattern(arm_pattern("[h ⋯ t]"))
+    xs = list(range(10))
+    t = m.match(xs)["t"]  # type: ignore[index]
+    assert isinstance(t, ListView) and t == xs[1:] and t[-1] == 9
+    t2 = m.match(t)["t"]  # type: ignore[index]
+    assert isinstance(t2, ListView) and t2._base is xs and list(t2) == xs[2:]
+    assert m.match(PVector(xs))["t"] == xs[1:]  # type: ignore[index]
+
+
+def test_arms_compile_to_match_arm() -> None:
+    code = Compiler().compile_program(parse("3 ▷ ⟪\n▷ 0 ⇒ 0\n▷ n ⇒ n\n⟫\n"))
+    ops = [ins.op for ins in code.instrs]
+    assert ops.count("MATCH_ARM") == 2
+    assert "MATCH" not in ops and "PUSH_ENV_BIND" not in ops
+    for pc, op in enumerate(ops):
+        if op == "MATCH_ARM":
+            assert ops[pc + 1] == "JMP"
+
+
+@pytest.mark.parametrize(
+    "src",
+    [
+        "Pair•(1, 2) ▷ ⟪\n▷ Pair•(a, b) ⇒ a + b\n▷ _ ⇒ 0\n⟫\n",
+        "f ← ⌁((a, b)) ⌁([h ⋯ t]) a + b + h + (count · t)\nf · (1, 2) · [3, 4, 5]\n",
+        "⟲ [1, 2, 3] ▷ ⟪\n▷ [] ⇒ ↯ 0\n▷ [h ⋯ t] ⇒ ↩ t\n⟫\n",
+        "⟲ (0, 0) ▷ ⟪\n▷ (10, acc) ⇒ ↯ acc\n▷ (i, acc) ⇒ ↩ (i + 1, acc + i)\n⟫\n",
+        "f ← ⌁(0) 1\nf · 2\n",
+        "5 ▷ ⟪\n▷ 0 ⇒ 0\n⟫\n",
+    ],
+)
+def test_vm_matches_interpreter(src: str) -> None:
+    def outcome(fn):
+        try:
+            return ("ok", fn())
+        except Exception as e:  # noqa: BLE001 - compare error messages
+            return ("err", getattr(e, "message", str(e)))
+
+    expected = outcome(lambda: run_source(src, filename="<test>"))
+    assert outcome(lambda: run_vm(src)) == expected
+    assert outcome(lambda: run_vm(src, optimize=2)) == expected
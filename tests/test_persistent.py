@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import contextlib
+import io
+
+import pytest
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from suaylang.closure_compiler import ClosureInterpreter
+from suaylang.compiler import Compiler
+from suaylang.interpreter import Interpreter
+from suaylang.lexer import Lexer
+from suaylang.parser import Parser
+from suaylang.persistent import ROPE_MIN, ListView, PMap, PVector, Rope, concat_text, list_tail
+from suaylang.runtime import Closure
+from suaylang.vm import VM
+
+
+def outcomes(src: str) -> list[tuple[str, str, str]]:
+    """(termination, stdout, value repr or error) of `src` on each engine."""
+
+    program = Parser(Lexer(src, filename="<test>").tokenize(), src, filename="<test>").parse_program()
+    runs = [
+        lambda: Interpreter(source=src, filename="<test>").eval_program(program),
+        lambda: ClosureInterpreter(source=src, filename="<test>").eval_program(program),
+        lambda: VM(source=src, filename="<test>").run(Compiler().compile_program(program, name="<test>")),
+    ]
+    out = []
+    for run in runs:
+        buf = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(buf):
+                value = run()
+        except Exception as e:
+            out.append((type(e).__name__, buf.getvalue(), str(e)))
+        else:
+            out.append(("ok", buf.getvalue(), "<closure>" if isinstance(value, Closure) else repr(value)))
+    return out
+
+
+# Operations on a list, applied to a PVector and a plain list side by side.
+list_ops = st.lists(
+    st.one_of(
+        st.tuples(st.just("extend"), st.lists(st.integers(0, 9), max_size=70)),
+        st.tuples(st.just("drop"), st.integers(0, 80)),
+        st.tuples(st.just("take"), st.integers(0, 80)),
+    ),
+    max_size=25,
+)
+
+
+@settings(max_examples=200, deadline=None)
+@given(st.lists(st.integers(0, 9), max_size=1200), list_ops)
+def test_vector_matches_list(start: list[int], ops: list[tuple[str, object]]) -> None:
+    v, ref = PVector(start), list(start)
+    for op, arg in ops:
+        if op == "extend":
+            v, ref = v.extend(arg), ref + arg  # type: ignore[operator]
+        elif op == "drop":
+            v, ref = v[arg:], ref[arg:]  # type: ignore[misc]
+        else:
+            v, ref = v[:arg], ref[:arg]  # type: ignore[misc]
+        assert len(v) == len(ref) and list(v) == ref and v == ref
+        if ref:
+            assert v[-1] == ref[-1] and v[len(ref) // 2] == ref[len(ref) // 2]
+
+
+def test_vector_appends_share_structure() -> None:
+    v = PVector()
+    steps = [v]
+    for i in range(5000):
+        v = v.extend([i])
+        steps.append(v)
+    assert list(steps[1234]) == list(range(1234))
+    assert v[4096] == 4096 and list(v[4990:]) == list(range(4990, 5000))
+    with pytest.raises(IndexError):
+        v[5000]
+
+
+@settings(max_examples=200, deadline=None)
+@given(st.lists(st.integers(0, 9), max_size=60), st.integers(0, 70), st.integers(0, 70))
+def test_list_view_matches_list(xs: list[int], n: int, k: int) -> None:
+    v, ref = list_tail(xs, n), xs[n:]
+    assert isinstance(v, ListView) and len(v) == len(ref) and list(v) == ref and v == ref and ref == v
+    assert v[k:] == ref[k:] and v[:k] == ref[:k] and list_tail(v, k) == ref[k:]
+    assert PVector(xs)[n:] == v and v == PVector(xs)[n:]
+    if ref:
+        assert v[-1] == ref[-1] and v[k % len(ref)] == ref[k % len(ref)]
+
+
+class Collide:
+    """A key whose hash is the same as every other Collide's."""
+
+    def __init__(self, n: int) -> None:
+        self.n = n
+
+    def __hash__(self) -> int:
+        return 7
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Collide) and other.n == self.n
+
+    def __repr__(self) -> str:
+        return f"Collide({self.n})"
+
+
+keys = st.one_of(st.integers(-50, 300), st.text(max_size=3), st.booleans(), st.builds(Collide, st.integers(0, 4)))
+
+
+@settings(max_examples=200, deadline=None)
+@given(st.lists(st.tuples(keys, st.integers()), max_size=400))
+def test_map_matches_dict(pairs: list[tuple[object, int]]) -> None:
+    m, ref = PMap(), {}
+    for k, v in pairs:
+        m, ref[k] = m.set(k, v), v
+    assert len(m) == len(ref) and list(m.keys()) == list(ref.keys())
+    assert dict(m.items()) == ref and m == ref and ref == m
+    assert all(k in m and m[k] == v for k, v in ref.items())
+    assert m.update(pairs[:5]) == {**ref, **dict(pairs[:5])}
+
+
+def test_map_keeps_the_first_equal_key() -> None:
+    m = PMap({1: "a"}).set(True, "b").set(1.0, "c")
+    assert list(m.items()) == [(1, "c")] and repr(next(iter(m))) == "1"
+
+
+def test_persistent_values_pass_for_lists_and_maps() -> None:
+    assert PVector([1, 2]) == [1, 2] and [1, 2] == PVector([1, 2]) and PVector([1]) != (1,)
+    assert PMap({"a": 1}) == {"a": 1} and {"a": 1} != PMap({"a": 2})
+    assert repr(PVector([1, [2]])) == "[1, [2]]" and repr(PMap({"a": 1})) == "{'a': 1}"
+    with pytest.raises(TypeError, match="unhashable type: 'list'"):
+        hash(PVector())
+    with pytest.raises(TypeError, match="unhashable type: 'dict'"):
+        hash(PMap())
+
+
+def test_rope_passes_for_text() -> None:
+    r = Rope(Rope("ab", "c"), Rope("d", "ef"))
+    assert len(r) == 6 and str(r) == "abcdef" and repr(r) == "'abcdef'"
+    assert r == "abcdef" and "abcdef" == r and r != "abcdeg" and r == Rope("abc", "def")
+    assert hash(r) == hash("abcdef") and {"abcdef": 1}[r] == 1 and {r: 1}["abcdef"] == 1
+    assert isinstance(concat_text("a", "b"), str) and isinstance(concat_text("a" * ROPE_MIN, "b"), Rope)
+
+
+def test_deep_rope_joins_without_recursion() -> None:
+    r: str | Rope = "x" * ROPE_MIN
+    for i in range(100_000):
+        r = concat_text(r, str(i % 10))
+    assert len(r) == ROPE_MIN + 100_000 and str(r).endswith("789") and str(r).startswith("xx")
+
+
+LONG = "x" * ROPE_MIN
+
+
+@pytest.mark.parametrize(
+    "src",
+    [
+        "xs ← [1 2] ⊞ [3]\nsay · (text · xs)\nxs ▷ ⟪\n▷ [a b c] ⇒ a + b + c\n▷ _ ⇒ 0\n⟫\n",
+        "xs ← drop · [1 2 3 4] · 1\nxs ▷ ⟪\n▷ [a ⋯ t] ⇒ (a t (t = [3 4]) (count · t))\n▷ _ ⇒ ø\n⟫\n",
+        "xs ← drop · [1 2 3] · 1\n(at · xs · −1) ⊞ 0\n",
+        "m ← put · ⟦\"a\" ↦ 1⟧ · \"b\" · 2\nsay · (text · (m ⊞ ⟦\"a\" ↦ 3⟧))\n((keys · m) (has · m · \"b\") (m = ⟦\"b\" ↦ 2, \"a\" ↦ 1⟧))\n",
+        "[1 2 3] ▷ ⟪\n▷ [a ⋯ t] ⇒ (t (count · t) (at · t · −1) (take · t · 1) (drop · t · 1) (t ⊞ [4]) "
+        "(t = [2 3]) (map · (⌁(x) x) · t) (fold · (⌁(a x) a + x) · 0 · t) (text · t))\n⟫\n",
+        "[1 2 3] ▷ ⟪\n▷ [a ⋯ t] ⇒ t ▷ ⟪\n▷ [] ⇒ 0\n▷ [b c] ⇒ b + c\n⟫\n⟫\n",
+        "[1 2] ▷ ⟪\n▷ [a ⋯ t] ⇒ t + 1\n⟫\n",
+        "put · (put · ⟦⟧ · 1 · 2) · [1] · 2\n",
+        f'r ← "{LONG}" ⊞ "ab"\n((count · r) (at · r · −1) (take · (drop · r · {ROPE_MIN - 1}) · 2) (r = "{LONG}ab") '
+        f'(r ≠ "a") (r < "y") (r ▷ ⟪\n▷ "{LONG}" ⇒ 0\n▷ "{LONG}ab" ⇒ 1\n▷ _ ⇒ 2\n⟫) '
+        f'(has · (put · ⟦⟧ · r · 1) · "{LONG}ab") (count · (text · [r])) (r ⊞ r = "{LONG}ab{LONG}ab"))\n',
+        f'r ← "{LONG}" ⊞ "ab"\nsay · r\nr + 1\n',
+        f'r ← "{LONG}" ⊞ "ab"\nlink · r · "x"\n',
+        "⟦(drop · [1] · 0) ↦ 1⟧\n",
+        "(drop · [1 2] · 1) + 1\n",
+        "−(put · ⟦⟧ · 1 · 2)\n",
+        "f ← ⌁(xs acc) xs ▷ ⟪\n▷ [] ⇒ acc\n▷ [x ⋯ r] ⇒ f · r · (put · acc · x · x)\n⟫\nf · (fold · (⌁(a x) a ⊞ [x]) · [] · [1 2 3]) · ⟦⟧\n",
+    ],
+)
+def test_engines_agree_on_persistent_values(src: str) -> None:
+    first, *rest = outcomes(src)
+    assert all(o == first for o in rest), (first, rest)
+    assert not any(t in first[2] for t in ("PVector", "PMap", "ListView", "Rope"))
+
+
+def test_large_fold_builds_a_map() -> None:
+    src = (
+        "xs ← ⟲ (0 []) ▷ ⟪\n▷ (30000 acc) ⇒ ↯ acc\n▷ (i acc) ⇒ ↩ ((i + 1) (acc ⊞ [i]))\n⟫\n"
+        "m ← fold · (⌁(acc x) put · acc · (x % 20000) · x) · ⟦⟧ · xs\n"
+        "((count · m) (at · (keys · m) · −1))\n"
+    )
+    assert outcomes(src)[1] == ("ok", "", "(20000, 19999)")
+
+
+def test_accumulated_text_is_linear() -> None:
+    src = (
+        'out ← ⟲ (0 "") ▷ ⟪\n▷ (30000 acc) ⇒ ↯ acc\n'
+        '▷ (i acc) ⇒ ↩ ((i + 1) (acc ⊞ (text · (i % 10)) ⊞ ","))\n⟫\n'
+        "((count · out) (take · out · 6) (at · out · −2))\n"
+    )
+    assert outcomes(src)[1] == ("ok", "", "(60000, '0,1,2,', '9')")
@@ -53,3 +53,20 @@ def test_runtime_error_formats_location_and_stack() -> None:
     s2 = str(e2)
     assert "stack:" in s2
     assert "call f" in s2
+
+
+def test_env_copy_and_lazy_name_storage() -> None:
+    env = Env()
+    assert env.keys_local() == []
+    env.define("x", 1)
+    twin = env.copy()
+    twin.set_existing("x", 2)
+    assert (env.get("x"), twin.get("x")) == (1, 2)
+
+
+def test_hot_objects_have_no_instance_dict() -> None:
+    pos = Position(offset=0, line=1, column=1)
+    span = Span(start=pos, end=pos)
+    for obj in (Env(), pos, span, Builtin(name="f", arity=1, impl=abs), StackFrame("f", span)):
+        assert not hasattr(obj, "__dict__")
+    assert hash(span) == hash(Span(start=pos, end=pos))
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import pytest
+
+from suaylang.compiler import Compiler
+from suaylang.interpreter import run_source
+from suaylang.lexer import Lexer
+from suaylang.parser import Parser
+from suaylang.runtime import SuayRuntimeError
+from suaylang.vm import VM
+
+
+def compile_src(src: str):
+    tokens = Lexer(src, filename="<test>").tokenize()
+    program = Parser(tokens, src, filename="<test>").parse_program()
+    return Compiler().compile_program(program, name="<test>")
+
+
+def run_vm(src: str) -> object:
+    return VM(source=src, filename="<test>").run(compile_src(src))
+
+
+def all_ops(code) -> list[str]:
+    out: list[str] = []
+    for ins in code.instrs:
+        out.append(ins.op)
+        if ins.op == "MAKE_CLOSURE":
+            out.extend(all_ops(ins.arg[0]))
+    return out
+
+
+def test_locals_and_builtins_are_resolved_to_slots() -> None:
+    ops = all_ops(compile_src("f ← ⌁(x) ⟪ y ← x + 1\n say · y ⟫\nf · 1\n"))
+    assert "LOAD_LOCAL" in ops
+    assert "LOAD_GLOBAL" in ops
+    assert "LOAD_NAME" in ops  # `f` lives in the module scope
+    assert "LOAD" not in ops
+
+
+@pytest.mark.parametrize(
+    ("source", "expected"),
+    [
+        # Shadowing: the inner binding wins inside the block only.
+        ("x ← 1\n⟪ x ← 2\n x ⟫ + x\n", 3),
+        # A read before the local binding executes sees the outer name.
+        ("x ← 1\n⟪ y ← x\n x ← 5\n y + x ⟫\n", 6),
+        # Conditional binding inside a short-circuit.
+        ("x ← 1\n⟪ ⊥ ∧ (x ← 9)\n x ⟫\n", 1),
+        # Closures see mutations of captured slots.
+        ("c ← ⟪ n ← 0\n inc ← ⌁(u) n ⇐ n + 1\n inc · ø\n inc · ø\n n ⟫\nc\n", 2),
+        # Recursion through the module scope.
+        ("f ← ⌁(n) (n ≤ 0) ▷ ⟪\n▷ ⊤ ⇒ 0\n▷ ⊥ ⇒ n + (f · (n − 1))\n⟫\nf · 4\n", 10),
+        # Shadowed builtin.
+        ("⟪ text ← ⌁(v) 7\n text · 1 ⟫\n", 7),
+    ],
+)
+def test_resolved_scopes_match_interpreter(source: str, expected: object) -> None:
+    assert run_source(source, filename="<test>") == expected
+    assert run_vm(source) == expected
+
+
+def test_duplicate_binding_keeps_message_and_span() -> None:
+    src = "⟪ a ← 1\n a ← 2 ⟫\n"
+    with pytest.raises(SuayRuntimeError) as ei:
+        run_vm(src)
+    assert ei.value.message == "Name 'a' is already bound in this scope"
+    assert ei.value.span is not None
+    assert ei.value.span.start.line == 2
+
+
+def test_undefined_name_keeps_message() -> None:
+    with pytest.raises(SuayRuntimeError) as ei:
+        run_vm("⟪ y ← nope\n y ⟫\n")
+    assert ei.value.message == "Undefined name 'nope'"
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import io
+from pathlib import Path
+
+import pytest
+
+from suaylang.formatter import FormatOptions, format_source, format_to
+from suaylang.lexer import LexError, Lexer
+from suaylang.parser import ParseError, Parser
+from suaylang.tokens import TokenType
+
+ROOT = Path(__file__).resolve().parents[1]
+CORPORA = ["tests/corpus", "conformance/corpus", "examples"]
+
+
+def corpus_files() -> list[Path]:
+    out: list[Path] = []
+    for rel in CORPORA:
+        out.extend(sorted((ROOT / rel).rglob("*.suay")))
+    return out
+
+
+def outcome(fn) -> object:
+    try:
+        return ("ok", fn())
+    except (LexError, ParseError) as e:
+        return (type(e).__name__, e.message, e.line, e.column)
+
+
+@pytest.mark.parametrize("path", corpus_files(), ids=lambda p: p.relative_to(ROOT).as_posix())
+def test_streamed_parse_matches_list_parse(path: Path) -> None:
+    src = path.read_text(encoding="utf-8")
+    streamed = outcome(lambda: Parser(Lexer(src).iter_tokens(), src).parse_program())
+    listed = outcome(lambda: Parser(Lexer(src).tokenize(), src).parse_program())
+    assert streamed == listed
+
+
+@pytest.mark.parametrize("fast", [True, False])
+def test_iter_tokens_is_lazy(fast: bool) -> None:
+    src = "x ← 1\ny ← @\n"
+    it = Lexer(src, filename="<test>", fast=fast).iter_tokens()
+    assert [next(it).type for _ in range(4)] == [
+        TokenType.IDENT,
+        TokenType.ARROW_BIND,
+        TokenType.INT,
+        TokenType.NEWLINE,
+    ]
+    assert [next(it).type for _ in range(2)] == [TokenType.IDENT, TokenType.ARROW_BIND]
+    with pytest.raises(LexError) as ei:
+        next(it)
+    assert (ei.value.line, ei.value.column) == (2, 5)
+
+
+def test_iter_tokens_resumes_fast_path_after_scanner_token() -> None:
+    src = "aø ← x² + 1\n\"s\" ⊞ é\n"
+    assert list(Lexer(src).iter_tokens()) == Lexer(src, fast=False).tokenize()
+
+
+def test_parse_error_precedes_later_lex_error_when_streaming() -> None:
+    src = "x ← )\ny ← @\n"
+    with pytest.raises(ParseError):
+        Parser(Lexer(src).iter_tokens(), src).parse_program()
+    with pytest.raises(LexError):
+        Parser(Lexer(src).tokenize(), src).parse_program()
+
+
+def test_parser_reads_at_most_one_token_ahead() -> None:
+    src = "x ← )\n" + "y ← 1\n" * 1000
+    pulled = 0
+
+    def tokens():
+        nonlocal pulled
+        for tok in Lexer(src).iter_tokens():
+            pulled += 1
+            yield tok
+
+    with pytest.raises(ParseError) as ei:
+        Parser(tokens(), src).parse_program()
+    assert (ei.value.line, ei.value.column) == (1, 5)
+    assert pulled <= 4  # `x`, `←`, `)` and at most one lookahead
+
+
+@pytest.mark.parametrize("unicode", [False, True])
+@pytest.mark.parametrize("path", corpus_files()[:20], ids=lambda p: p.name)
+def test_format_to_matches_format_source(path: Path, unicode: bool) -> None:
+    src = path.read_text(encoding="utf-8")
+    opts = FormatOptions(unicode=unicode)
+    out = io.StringIO()
+    format_to(src, out, options=opts)
+    assert out.getvalue() == format_source(src, options=opts)
+
+
+def test_format_to_writes_pieces_before_lex_error() -> None:
+    out = io.StringIO()
+    with pytest.raises(LexError):
+        format_to("x ← 1 ⍝ c\ny ← @\n", out)
+    assert out.getvalue() == "x <- 1 // c\ny <-"
+
+
+def test_large_generated_source_streams() -> None:
+    lines = [f"v{i} ← ⌁(a b) ⟪ t ← a × b\n t + {i} ⟫" for i in range(5000)]
+    src = "\n".join(lines) + "\nv4999 · 2 · 3\n"
+    program = Parser(Lexer(src).iter_tokens(), src).parse_program()
+    assert len(program.items) == 5001
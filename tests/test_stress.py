@@ -1,5 +1,6 @@
 import os
 import subprocess
+import sys
 import tempfile
 import unittest
 
@@ -10,6 +11,12 @@ SUAY = os.path.join(REPO_ROOT, "suay")
 
 def _run_cli(
     cmd: str, src: str, *, timeout_s: float = 10.0
+) -> subprocess.CompletedProcess[str]:
+    return _run([SUAY, cmd], src, timeout_s=timeout_s)
+
+
+def _run(
+    argv: list[str], src: str, *, timeout_s: float = 10.0
 ) -> subprocess.CompletedProcess[str]:
     with tempfile.NamedTemporaryFile(
         "w", suffix=".suay", delete=False, encoding="utf-8"
@@ -18,7 +25,7 @@ def _run_cli(
         path = f.name
     try:
         return subprocess.run(
-            [SUAY, cmd, path],
+            [*argv, path],
             text=True,
             capture_output=True,
             cwd=REPO_ROOT,
@@ -60,13 +67,44 @@ class StressTests(unittest.TestCase):
     # --- Deeply nested expressions ---
 
     def test_deeply_nested_parentheses_do_not_crash(self) -> None:
-        # Goal: trigger parser recursion limit and ensure we still surface a clean ParseError.
+        # The parser has no nesting limit; evaluation hits one and must fail cleanly.
         depth = 1800
         src = ("(" * depth) + "1" + (")" * depth) + "\n"
         p = _run_cli("check", src, timeout_s=10.0)
+        self.assertEqual(p.returncode, 0)
+        self.assertNoTraceback(p)
+
+        src = ("[ " * depth) + "1" + (" ]" * depth) + "\n"
+        p = _run_cli("run", src, timeout_s=10.0)
         self.assertNotEqual(p.returncode, 0)
         self.assertNoTraceback(p)
-        self.assertIn("error", p.stderr)
+        self.assertNotIn("internal error", p.stderr)
+        self.assertRegex(p.stderr, r"\.suay:1:1: runtime error: Maximum recursion depth exceeded")
+
+    def test_deep_nesting_is_a_located_error_on_every_engine(self) -> None:
+        engines = {
+            "interpreter": [SUAY, "run", "--engine", "interpreter"],
+            "closures": [SUAY, "run", "--engine", "closures"],
+            "vm": [sys.executable, "-m", "suaylang.vm_cli", "--no-cache"],
+        }
+        shapes = {
+            "operators": ("(1 + " * 1500) + "1" + (")" * 1500) + "\n",
+            "lambdas": ("⌁(x) " * 1500) + "1\n",
+        }
+        for engine, argv in engines.items():
+            for shape, src in shapes.items():
+                with self.subTest(engine=engine, shape=shape):
+                    p = _run(argv, src, timeout_s=10.0)
+                    self.assertNoTraceback(p)
+                    self.assertNotIn("internal error", p.stderr)
+                    if engine == "interpreter" and shape == "lambdas":
+                        # Lambda bodies are only evaluated when called.
+                        self.assertEqual(p.returncode, 0, msg=p.stderr)
+                        continue
+                    self.assertNotEqual(p.returncode, 0)
+                    self.assertRegex(
+                        p.stderr, r"\.suay:1:\d+: runtime error: Maximum recursion depth exceeded"
+                    )
 
     # --- Large recursion depth (runtime) ---
 
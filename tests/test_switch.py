@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import pytest
+
+from suaylang.bytecode_cache import dumps, loads
+from suaylang.compiler import Compiler
+from suaylang.interpreter import run_source
+from suaylang.lexer import Lexer
+from suaylang.parser import Parser
+from suaylang.runtime import SuayRuntimeError
+from suaylang.vm import VM
+
+
+def parse(src: str):
+    tokens = Lexer(src, filename="<test>").tokenize()
+    return Parser(tokens, src, filename="<test>").parse_program()
+
+
+def outcome(fn) -> tuple[str, object]:
+    try:
+        return ("ok", fn())
+    except SuayRuntimeError as e:
+        return ("err", e.message)
+
+
+def run_vm(src: str, **opts) -> object:
+    code = Compiler(**opts).compile_program(parse(src), name="<test>")
+    return VM(source=src, filename="<test>").run(code)
+
+
+ARMS = """\
+f ← ⌁(s) s ▷ ⟪
+▷ A•n ⇒ n
+▷ B•0 ⇒ 100
+▷ 1 ⇒ 1
+▷ _ ⇒ ⟪ x ← 7
+ x ⟫
+▷ B•n ⇒ n + 200
+▷ (a, b) ⇒ a + b
+▷ [h ⋯ t] ⇒ h
+▷ "s" ⇒ 3
+⟫
+"""
+
+SCRUTINEES = [
+    "A•5",
+    "B•0",
+    "B•4",
+    "C•1",
+    "1",
+    "⊤",
+    "⊥",
+    "1.0",
+    "(1, 2)",
+    "(1, 2, 3)",
+    "[9, 8]",
+    "[]",
+    '"s"',
+    '"t"',
+    "ø",
+    "⟦ 1 ↦ 2 ⟧",
+    "f",
+]
+
+
+def test_many_keyed_arms_compile_to_switch() -> None:
+    code = Compiler().compile_program(parse(ARMS))
+    body = code.instrs[0].arg[0]
+    ops = [ins.op for ins in body.instrs]
+    assert ops.count("SWITCH") == 2  # entry, and after the `_` arm
+    assert ops.index("SWITCH") == 1
+
+
+def test_few_arms_stay_linear() -> None:
+    code = Compiler().compile_program(parse("⊤ ▷ ⟪\n▷ ⊤ ⇒ 1\n▷ ⊥ ⇒ 0\n⟫\n"))
+    assert "SWITCH" not in [ins.op for ins in code.instrs]
+
+
+@pytest.mark.parametrize("scrut", SCRUTINEES)
+@pytest.mark.parametrize("optimize", [0, 2])
+def test_switch_preserves_arm_order(scrut: str, optimize: int) -> None:
+    src = ARMS + f"f · ({scrut})\n"
+    expected = outcome(lambda: run_source(src, filename="<test>"))
+    assert outcome(lambda: run_vm(src, optimize=optimize)) == expected
+
+
+def test_state_machine_cycle() -> None:
+    src = (
+        "⟲ (Start•ø, 0) ▷ ⟪\n"
+        "▷ (Start•_, n) ⇒ ↩ (Run•3, n)\n"
+        "▷ (Run•0, n) ⇒ ↩ (Stop•ø, n)\n"
+        "▷ (Run•k, n) ⇒ ↩ (Run•(k − 1), n + k)\n"
+        "▷ (Stop•_, n) ⇒ ↯ n\n"
+        "⟫\n"
+    )
+    assert run_vm(src) == run_source(src, filename="<test>") == 6
+    code = Compiler().compile_program(parse(src))
+    (switch,) = [ins.arg for ins in code.instrs if ins.op == "SWITCH"]
+    assert switch.path == ((2, 0),)  # switches on the state tag, not the arity
+    assert set(switch.tags) == {"Start", "Run", "Stop"}
+
+    cyc = "⟲ A•0 ▷ ⟪\n▷ A•n ⇒ ↩ B•n\n▷ B•n ⇒ ↩ C•(n + 1)\n▷ C•3 ⇒ ↯ 3\n▷ C•n ⇒ ↩ A•n\n⟫\n"
+    code = Compiler().compile_program(parse(cyc))
+    assert "SWITCH" in [ins.op for ins in code.instrs]
+    assert VM(source=cyc, filename="<test>").run(code) == 3
+
+
+def test_switch_survives_cache_roundtrip() -> None:
+    code = Compiler(optimize=2).compile_program(parse(ARMS + "f · (A•4)\n"))
+    back = loads(dumps(code))
+    assert back == code
+    assert VM(source="", filename="<test>").run(back) == 4
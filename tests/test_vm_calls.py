@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import pytest
+
+from suaylang.compiler import Compiler
+from suaylang.lexer import Lexer
+from suaylang.parser import Parser
+from suaylang.runtime import SuayRuntimeError
+from suaylang.vm import VM
+
+
+def compile_src(src: str):
+    tokens = Lexer(src, filename="<test>").tokenize()
+    program = Parser(tokens, src, filename="<test>").parse_program()
+    return Compiler().compile_program(program, name="<test>")
+
+
+def run_vm(src: str, **kwargs) -> object:
+    vm = VM(source=src, filename="<test>")
+    for k, v in kwargs.items():
+        setattr(vm, k, v)
+    return vm.run(compile_src(src))
+
+
+def test_calls_in_tail_position_are_marked() -> None:
+    code = compile_src(
+        "f ← ⌁(n) n ▷ ⟪\n▷ 0 ⇒ 0\n▷ _ ⇒ f · (n − 1)\n⟫\nf · 3\n"
+    )
+    closure = next(ins.arg[0] for ins in code.instrs if ins.op == "MAKE_CLOSURE")
+    assert [ins.op for ins in closure.instrs].count("TAIL_CALL") == 1
+    # Top-level calls are not in a lambda body.
+    assert "TAIL_CALL" not in [ins.op for ins in code.instrs]
+
+
+def test_deep_tail_recursion_runs_in_constant_host_stack() -> None:
+    src = "loop ← ⌁(n) n ▷ ⟪\n▷ 0 ⇒ ⊤\n▷ _ ⇒ loop · (n − 1)\n⟫\nloop · 100000\n"
+    assert run_vm(src) is True
+
+
+def test_deep_non_tail_recursion_uses_vm_call_stack() -> None:
+    src = "sum ← ⌁(n) n ▷ ⟪\n▷ 0 ⇒ 0\n▷ _ ⇒ n + (sum · (n − 1))\n⟫\nsum · 5000\n"
+    assert run_vm(src) == 5000 * 5001 // 2
+
+
+def test_call_depth_limit_is_a_clean_runtime_error() -> None:
+    src = "sum ← ⌁(n) n ▷ ⟪\n▷ 0 ⇒ 0\n▷ _ ⇒ n + (sum · (n − 1))\n⟫\nsum · 500\n"
+    with pytest.raises(SuayRuntimeError) as ei:
+        run_vm(src, max_call_depth=100)
+    assert ei.value.message == "Maximum recursion depth exceeded"
+    frames = ei.value.frames
+    assert len(frames) == 100
+    assert (frames[0].span.start.line, frames[-1].span.start.line) == (5, 3)
+
+
+def test_errors_keep_call_frames() -> None:
+    src = "g ← ⌁(x) x + ⊤\nf ← ⌁(x) 1 + (g · x)\nf · 1\n"
+    with pytest.raises(SuayRuntimeError) as ei:
+        run_vm(src)
+    labels = [(fr.label, fr.span.start.line) for fr in ei.value.frames]
+    assert labels == [("call <lambda>", 3), ("call <lambda>", 2)]
+
+
+def test_vms_share_builtins_but_not_rebindings(capsys) -> None:
+    a = VM(source="", filename="<a>")
+    b = VM(source="", filename="<b>")
+    assert a._builtins_env.get("count") is b._builtins_env.get("count")
+    assert a._builtins_env.get("map") is not b._builtins_env.get("map")
+    assert run_vm("say ⇐ text\nsay · 1\n") == "1"
+    run_vm("say · 1\n")
+    assert capsys.readouterr().out == "1\n"
+
+
+def test_shared_builtin_errors_take_the_callers_location() -> None:
+    with pytest.raises(SuayRuntimeError) as ei:
+        run_vm("x ← 1\ncount · x\n")
+    assert str(ei.value).startswith("<test>:2:1: runtime error: count expects Text, List, Tuple, or Map; got int")
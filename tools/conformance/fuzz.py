@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
 from pathlib import Path
 import sys
 
@@ -42,6 +43,12 @@ def main() -> int:
         default=3,
         help="Max saved non-ok cases per kind",
     )
+    ap.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes (0: one per CPU); results do not depend on it",
+    )
     ap.add_argument(
         "--json",
         action="store_true",
@@ -56,6 +63,7 @@ def main() -> int:
         fail_fast=bool(args.fail_fast),
         save_non_ok=bool(args.save_non_ok),
         save_non_ok_limit=int(args.save_non_ok_limit),
+        jobs=int(args.jobs) or os.cpu_count() or 1,
     )
 
     if args.json:
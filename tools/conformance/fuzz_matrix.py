@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
 from dataclasses import asdict
 from pathlib import Path
 
@@ -33,6 +34,7 @@ def main() -> int:
         help="Directory for saved repro cases",
     )
     ap.add_argument("--fail-fast", action="store_true")
+    ap.add_argument("--jobs", type=int, default=1, help="Worker processes (0: one per CPU)")
     ap.add_argument("--json-out", type=str, default="", help="Write JSON summary")
     args = ap.parse_args()
 
@@ -51,6 +53,7 @@ def main() -> int:
             fail_fast=bool(args.fail_fast),
             save_non_ok=False,
             save_non_ok_limit=0,
+            jobs=int(args.jobs) or os.cpu_count() or 1,
         )
         all_stats.append(asdict(stats))
         all_saved.extend(str(p) for p in saved)
@@ -2,8 +2,12 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
 import random
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import asdict, dataclass
+from itertools import repeat
 from pathlib import Path
 
 from suaylang.conformance import compare_observations, observe_interpreter, observe_vm
@@ -181,6 +185,50 @@ def _program_template(rng: random.Random) -> str:
     return f"{name}\n"
 
 
+# Programs are drawn from one PRNG stream per seed, so they are generated up
+# front and only observed in parallel: with `jobs` > 1, chunks of `_CHUNK`
+# programs go to worker processes and come back in order, and the results are
+# the same as a serial run's.
+
+_CHUNK = 100
+
+
+@dataclass(frozen=True)
+class _Checked:
+    termination: str  # the interpreter's
+    ok: bool
+    reason: str | None
+    observations: dict[str, object]  # {"interp": ..., "vm": ...}; empty for plain ok runs
+
+
+def _check_chunk(seed: int, first: int, sources: list[str]) -> list[_Checked]:
+    out: list[_Checked] = []
+    for i, src in enumerate(sources, start=first):
+        filename = f"<fuzz:{seed}:{i}>"
+        interp = observe_interpreter(src, filename=filename)
+        vm = observe_vm(src, filename=filename)
+        res = compare_observations(interp, vm)
+        observations = {} if res.ok and interp.termination == "ok" else {"interp": asdict(interp), "vm": asdict(vm)}
+        out.append(_Checked(interp.termination, res.ok, res.reason, observations))
+    return out
+
+
+def _checked(seed: int, sources: list[str], jobs: int) -> Iterator[_Checked]:
+    starts = range(0, len(sources), _CHUNK)
+    if jobs <= 1 or len(starts) <= 1:
+        for a in starts:
+            yield from _check_chunk(seed, a + 1, sources[a : a + _CHUNK])
+        return
+    pool = ProcessPoolExecutor(max_workers=min(jobs, len(starts)))
+    try:
+        chunks = pool.map(_check_chunk, repeat(seed), [a + 1 for a in starts], [sources[a : a + _CHUNK] for a in starts])
+        for chunk in chunks:
+            yield from chunk
+    finally:
+        # Stopping early (fail-fast) drops the chunks not started yet.
+        pool.shutdown(cancel_futures=True)
+
+
 def run_fuzz(
     *,
     n: int,
@@ -189,6 +237,7 @@ def run_fuzz(
     fail_fast: bool,
     save_non_ok: bool,
     save_non_ok_limit: int,
+    jobs: int = 1,
 ) -> tuple[FuzzStats, list[Path]]:
     rng = random.Random(seed)
 
@@ -202,17 +251,13 @@ def run_fuzz(
     saved: list[Path] = []
     saved_non_ok: dict[str, int] = {"runtime": 0, "lex": 0, "parse": 0, "internal": 0}
 
-    for i in range(1, n + 1):
-        src = _program_template(rng)
-        filename = f"<fuzz:{seed}:{i}>"
-        interp = observe_interpreter(src, filename=filename)
-        vm = observe_vm(src, filename=filename)
-        res = compare_observations(interp, vm)
-
+    sources = [_program_template(rng) for _ in range(n)]
+    checked = _checked(seed, sources, jobs)
+    for i, (src, res) in enumerate(zip(sources, checked), start=1):
         if res.ok:
-            if interp.termination == "ok":
+            if res.termination == "ok":
                 ok += 1
-            elif interp.termination == "runtime":
+            elif res.termination == "runtime":
                 runtime_errors += 1
                 if save_non_ok and saved_non_ok["runtime"] < save_non_ok_limit:
                     case_dir = save_dir / f"seed_{seed}" / f"non_ok_{i:06d}_runtime"
@@ -223,8 +268,7 @@ def run_fuzz(
                             {
                                 "seed": seed,
                                 "i": i,
-                                "interp": asdict(interp),
-                                "vm": asdict(vm),
+                                **res.observations,
                             },
                             indent=2,
                             sort_keys=True,
@@ -233,7 +277,7 @@ def run_fuzz(
                     )
                     saved.append(case_dir / "program.suay")
                     saved_non_ok["runtime"] += 1
-            elif interp.termination == "lex":
+            elif res.termination == "lex":
                 lex_errors += 1
                 if save_non_ok and saved_non_ok["lex"] < save_non_ok_limit:
                     case_dir = save_dir / f"seed_{seed}" / f"non_ok_{i:06d}_lex"
@@ -244,8 +288,7 @@ def run_fuzz(
                             {
                                 "seed": seed,
                                 "i": i,
-                                "interp": asdict(interp),
-                                "vm": asdict(vm),
+                                **res.observations,
                             },
                             indent=2,
                             sort_keys=True,
@@ -254,7 +297,7 @@ def run_fuzz(
                     )
                     saved.append(case_dir / "program.suay")
                     saved_non_ok["lex"] += 1
-            elif interp.termination == "parse":
+            elif res.termination == "parse":
                 parse_errors += 1
                 if save_non_ok and saved_non_ok["parse"] < save_non_ok_limit:
                     case_dir = save_dir / f"seed_{seed}" / f"non_ok_{i:06d}_parse"
@@ -265,8 +308,7 @@ def run_fuzz(
                             {
                                 "seed": seed,
                                 "i": i,
-                                "interp": asdict(interp),
-                                "vm": asdict(vm),
+                                **res.observations,
                             },
                             indent=2,
                             sort_keys=True,
@@ -286,8 +328,7 @@ def run_fuzz(
                             {
                                 "seed": seed,
                                 "i": i,
-                                "interp": asdict(interp),
-                                "vm": asdict(vm),
+                                **res.observations,
                             },
                             indent=2,
                             sort_keys=True,
@@ -310,8 +351,7 @@ def run_fuzz(
                     "seed": seed,
                     "i": i,
                     "reason": res.reason,
-                    "interp": asdict(interp),
-                    "vm": asdict(vm),
+                    **res.observations,
                 },
                 indent=2,
                 sort_keys=True,
@@ -322,6 +362,7 @@ def run_fuzz(
 
         if fail_fast:
             break
+    checked.close()
 
     stats = FuzzStats(
         seed=seed,
@@ -365,6 +406,7 @@ def main() -> int:
         default=5,
         help="Max number of non-ok cases to save when --save-non-ok is set",
     )
+    ap.add_argument("--jobs", type=int, default=1, help="Worker processes (0: one per CPU)")
     args = ap.parse_args()
 
     stats, saved = run_fuzz(
@@ -374,6 +416,7 @@ def main() -> int:
         fail_fast=not args.no_fail_fast,
         save_non_ok=bool(args.save_non_ok),
         save_non_ok_limit=int(args.save_non_ok_limit),
+        jobs=int(args.jobs) or os.cpu_count() or 1,
     )
 
     print("differential fuzzing: interpreter vs vm")
@@ -8,7 +8,12 @@ _REPO_ROOT = Path(__file__).resolve().parents[2]
 if str(_REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(_REPO_ROOT))
 
-from suaylang.conformance import compare_observations, observe_interpreter, observe_vm
+from suaylang.conformance import (
+    compare_observations,
+    observe_closures,
+    observe_interpreter,
+    observe_vm,
+)
 
 
 def _read(path: Path) -> str:
@@ -45,31 +50,34 @@ def main() -> int:
         return 2
 
     failures = 0
+    failed: set[Path] = set()
     for p in files:
         src = _read(p)
         interp = observe_interpreter(src, filename=str(p))
-        vm = observe_vm(src, filename=str(p))
-        res = compare_observations(interp, vm)
-        if res.ok:
-            continue
-        failures += 1
-        print(f"FAIL {p}: {res.reason}")
-        print("--- interpreter ---")
-        print(
-            f"termination={interp.termination} stdout={interp.stdout!r} value={interp.value!r} err={interp.error_type} {interp.line}:{interp.column}"
-        )
-        print("--- vm ---")
-        print(
-            f"termination={vm.termination} stdout={vm.stdout!r} value={vm.value!r} err={vm.error_type} {vm.line}:{vm.column}"
-        )
+        for engine, observe in (("vm", observe_vm), ("closures", observe_closures)):
+            other = observe(src, filename=str(p))
+            res = compare_observations(interp, other, engine=engine)
+            if res.ok:
+                continue
+            failures += 1
+            failed.add(p)
+            print(f"FAIL {p}: {res.reason}")
+            print("--- interpreter ---")
+            print(
+                f"termination={interp.termination} stdout={interp.stdout!r} value={interp.value!r} err={interp.error_type} {interp.line}:{interp.column}"
+            )
+            print(f"--- {engine} ---")
+            print(
+                f"termination={other.termination} stdout={other.stdout!r} value={other.value!r} err={other.error_type} {other.line}:{other.column}"
+            )
 
     if failures:
         print(
             "conformance: FAIL files={n} divergences={d} pass={p} fail={f}".format(
                 n=len(files),
                 d=failures,
-                p=(len(files) - failures),
-                f=failures,
+                p=(len(files) - len(failed)),
+                f=len(failed),
             )
         )
         return 1
@@ -3,5 +3,5 @@
 Run via:
 
 - `python -m tools.diff_test.main --profile ci`
-- `python -m tools.diff_test.main --profile full`
+- `python -m tools.diff_test.main --profile full --jobs 0` (one worker per CPU)
 """
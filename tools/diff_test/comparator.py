@@ -20,9 +20,11 @@ def _norm_msg(s: str | None) -> str:
     return _WS_RE.sub(" ", s.strip())
 
 
-def equivalent(a: Observation, b: Observation) -> tuple[bool, str | None]:
+def equivalent(a: Observation, b: Observation, *, engine: str = "vm") -> tuple[bool, str | None]:
+    """Whether the interpreter (`a`) and another engine (`b`, named `engine` in reasons) agree."""
+
     if a.termination != b.termination:
-        return False, f"termination differs: interp={a.termination} vm={b.termination}"
+        return False, f"termination differs: interp={a.termination} {engine}={b.termination}"
 
     if _norm_out(a.stdout) != _norm_out(b.stdout):
         return False, "stdout differs"
@@ -50,17 +52,17 @@ def equivalent(a: Observation, b: Observation) -> tuple[bool, str | None]:
             if a_has_opaque and b_has_opaque:
                 return True, None
 
-            return False, f"value differs: interp={a.value_repr} vm={b.value_repr}"
+            return False, f"value differs: interp={a.value_repr} {engine}={b.value_repr}"
         return True, None
 
     # For errors/timeouts, compare coarse type and location.
     if (a.error_type or "") != (b.error_type or ""):
-        return False, f"error type differs: interp={a.error_type} vm={b.error_type}"
+        return False, f"error type differs: interp={a.error_type} {engine}={b.error_type}"
 
     if (a.line, a.column) != (b.line, b.column):
         return (
             False,
-            f"error location differs: interp={a.line}:{a.column} vm={b.line}:{b.column}",
+            f"error location differs: interp={a.line}:{a.column} {engine}={b.line}:{b.column}",
         )
 
     return True, None
@@ -73,6 +75,7 @@ def divergence_fingerprint(
     vm: Observation,
     category: str,
     size_bucket: str,
+    engine: str = "vm",
 ) -> str:
     payload = {
         "category": category,
@@ -81,5 +84,7 @@ def divergence_fingerprint(
         "interp": asdict(interp),
         "vm": asdict(vm),
     }
+    if engine != "vm":
+        payload["engine"] = engine  # VM divergence ids predate other engines
     raw = repr(payload).encode("utf-8")
     return hashlib.sha256(raw).hexdigest()[:16]
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
-from dataclasses import is_dataclass
-
+from suaylang.arena import parse_arena
 from suaylang.bytecode import Code
 from suaylang.compiler import Compiler
 from suaylang.lexer import Lexer
@@ -9,35 +8,7 @@ from suaylang.parser import Parser
 
 
 def ast_node_counts(source: str, *, filename: str) -> dict[str, int]:
-    tokens = Lexer(source, filename=filename).tokenize()
-    program = Parser(tokens, source, filename=filename).parse_program()
-
-    counts: dict[str, int] = {}
-
-    def walk(node: object) -> None:
-        if is_dataclass(node):
-            t = type(node).__name__
-            counts[t] = counts.get(t, 0) + 1
-            for name in getattr(node, "__dataclass_fields__").keys():
-                if name == "span":
-                    continue
-                walk(getattr(node, name))
-            return
-        if isinstance(node, list):
-            for x in node:
-                walk(x)
-            return
-        if isinstance(node, tuple):
-            for x in node:
-                walk(x)
-            return
-        if isinstance(node, dict):
-            for v in node.values():
-                walk(v)
-            return
-
-    walk(program)
-    return counts
+    return parse_arena(source, filename=filename).kind_counts()
 
 
 def opcode_counts(source: str, *, filename: str) -> dict[str, int]:
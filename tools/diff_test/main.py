@@ -8,11 +8,8 @@ import time
 from dataclasses import asdict
 from pathlib import Path
 
-from .comparator import divergence_fingerprint, equivalent
-from .coverage import ast_node_counts, opcode_counts
-from .minimizer import minimize_by_lines
-from .program_generator import generate_invalid_program, generate_valid_program
-from .runner import environment_metadata, observe_interpreter, observe_vm
+from .runner import environment_metadata
+from .shards import Tally, plan_cases, run_sharded
 
 _REPO_ROOT = Path(__file__).resolve().parents[2]
 
@@ -27,11 +24,6 @@ def _git_commit() -> str:
         return "unknown"
 
 
-def _merge_counts(dst: dict[str, int], src: dict[str, int]) -> None:
-    for k, v in src.items():
-        dst[k] = dst.get(k, 0) + int(v)
-
-
 def _write_json(path: Path, payload: object) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     path.write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n", encoding="utf-8")
@@ -66,10 +58,11 @@ def _split_across_buckets(n: int, buckets: list[str]) -> dict[str, int]:
 
 
 def main() -> int:
-    ap = argparse.ArgumentParser(prog="diff-test", description="Differential testing harness (interpreter vs VM).")
+    ap = argparse.ArgumentParser(prog="diff-test", description="Differential testing harness (interpreter vs VM and closure compiler).")
     ap.add_argument("--profile", choices=["ci", "full"], default="ci")
     ap.add_argument("--timeout-s", type=float, default=0.5)
     ap.add_argument("--out-dir", type=str, default=str(_REPO_ROOT / "results"))
+    ap.add_argument("--jobs", type=int, default=1, help="Worker processes (0: one per CPU). Reports do not depend on it.")
     ap.add_argument("--save-generated", action="store_true", help="Save a small sample of generated programs under tools/diff_test/corpus/generated/.")
     args = ap.parse_args()
 
@@ -82,167 +75,70 @@ def main() -> int:
 
     start = time.perf_counter()
 
-    total = 0
-    divergences: list[dict[str, object]] = []
-    divergence_ids: set[str] = set()
-
-    term_counts: dict[str, int] = {}
-    invalid_category_counts: dict[str, int] = {}
-    size_counts: dict[str, int] = {b: 0 for b in buckets}
-
-    per_seed: dict[str, dict[str, object]] = {}
-
-    ast_counts_total: dict[str, int] = {}
-    opcode_counts_total: dict[str, int] = {}
-
-    # VM executed-step counts are available for successful VM runs.
-    total_vm_steps_ok = 0
-
-    def _seed_key(seed: int | str | None) -> str:
-        if seed is None:
-            return "<none>"
-        return str(seed)
-
-    def record_termination(o: object, *, seed: int | str | None) -> None:
-        t = getattr(o, "termination")
-        term_counts[str(t)] = term_counts.get(str(t), 0) + 1
-
-        sk = _seed_key(seed)
-        entry = per_seed.get(sk)
-        if entry is None:
-            entry = {
-                "seed": sk,
-                "total_programs": 0,
-                "divergences": 0,
-                "termination_counts": {},
-            }
-            per_seed[sk] = entry
-
-        entry["total_programs"] = int(entry["total_programs"]) + 1
-        tc = dict(entry["termination_counts"])  # type: ignore[assignment]
-        tc[str(t)] = int(tc.get(str(t), 0)) + 1
-        entry["termination_counts"] = tc
-
-    # Run fixed corpus (including minimized regressions) first if present.
+    # Fixed corpus (including minimized regressions) first, then generated cases.
+    # Ensure exact per-seed totals across buckets (no rounding loss).
     fixed_dir = _REPO_ROOT / "tools" / "diff_test" / "corpus" / "fixed"
-    fixed_files = sorted(p for p in fixed_dir.rglob("*.suay") if p.is_file())
-    regression_files = sorted(p for p in regress_dir.rglob("*.suay") if p.is_file())
-
-    def run_case(
-        source: str, *, name: str, category: str, size_bucket: str, seed: int | str | None
-    ) -> None:
-        nonlocal total, total_vm_steps_ok
-        total += 1
-        size_counts[size_bucket] = size_counts.get(size_bucket, 0) + 1
-
-        i = observe_interpreter(source, filename=name, timeout_s=float(args.timeout_s))
-        v = observe_vm(source, filename=name, timeout_s=float(args.timeout_s))
-
-        record_termination(i, seed=seed)
-
-        ok, reason = equivalent(i, v)
-        if ok:
-            if v.termination == "ok" and v.vm_steps is not None:
-                total_vm_steps_ok += int(v.vm_steps)
-            # Coverage is best-effort: only if parsing/compiling succeeds.
-            try:
-                _merge_counts(ast_counts_total, ast_node_counts(source, filename=name))
-            except Exception:
-                pass
-            try:
-                _merge_counts(opcode_counts_total, opcode_counts(source, filename=name))
-            except Exception:
-                pass
-            return
-
-        # Divergence.
-        fp = divergence_fingerprint(
-            source=source,
-            interp=i,
-            vm=v,
-            category=category,
-            size_bucket=size_bucket,
-        )
-        if fp not in divergence_ids:
-            divergence_ids.add(fp)
-
-        sk = _seed_key(seed)
-        if sk in per_seed:
-            per_seed[sk]["divergences"] = int(per_seed[sk]["divergences"]) + 1
-
-        # Minimize and save regression.
-        minimized = minimize_by_lines(
-            source=source,
-            filename=name,
-            category=category,
-            size_bucket=size_bucket,
-            timeout_s=float(args.timeout_s),
-        )
+    cases = plan_cases(
+        fixed=sorted(p for p in fixed_dir.rglob("*.suay") if p.is_file()),
+        regressions=sorted(p for p in regress_dir.rglob("*.suay") if p.is_file()),
+        seeds=seeds,
+        valid_by_bucket=_split_across_buckets(int(n_valid), buckets),
+        invalid_by_bucket=_split_across_buckets(int(n_invalid), buckets),
+        save_budget=3 if args.save_generated else 0,
+    )
+
+    tally = Tally(size_counts={b: 0 for b in buckets})
+    jobs = int(args.jobs) or os.cpu_count() or 1
+    for shard in run_sharded(cases, timeout_s=float(args.timeout_s), jobs=jobs):
+        tally.merge(shard)
 
+    divergences: list[dict[str, object]] = []
+    for d in tally.divergences:
         regress_dir.mkdir(parents=True, exist_ok=True)
-        repro_path = regress_dir / f"{fp}.suay"
-        repro_path.write_text(minimized.minimized_source, encoding="utf-8")
+        repro_path = regress_dir / f"{d.id}.suay"
+        repro_path.write_text(d.minimized_source, encoding="utf-8")
 
-        meta_path = regress_dir / f"{fp}.json"
+        meta_path = regress_dir / f"{d.id}.json"
         _write_json(
             meta_path,
             {
-                "id": fp,
-                "reason": reason,
-                "category": category,
-                "size_bucket": size_bucket,
-                "removed_lines": minimized.removed_lines,
-                "interp": asdict(i),
-                "vm": asdict(v),
+                "id": d.id,
+                "reason": d.reason,
+                "category": d.category,
+                "size_bucket": d.size_bucket,
+                "removed_lines": d.removed_lines,
+                "engine": d.engine,
+                "interp": asdict(d.interp),
+                d.engine: asdict(d.other),
                 "repro": repro_path.as_posix(),
             },
         )
 
         divergences.append(
             {
-                "id": fp,
-                "reason": reason,
-                "category": category,
-                "size_bucket": size_bucket,
+                "id": d.id,
+                "reason": d.reason,
+                "engine": d.engine,
+                "category": d.category,
+                "size_bucket": d.size_bucket,
                 "repro": repro_path.as_posix(),
                 "meta": meta_path.as_posix(),
             }
         )
-
-    # Fixed cases (treated as valid).
-    for p in fixed_files:
-        src = p.read_text(encoding="utf-8")
-        run_case(src, name=p.as_posix(), category="fixed", size_bucket="small", seed="fixed")
-
-    for p in regression_files:
-        src = p.read_text(encoding="utf-8")
-        run_case(src, name=p.as_posix(), category="regression", size_bucket="small", seed="regression")
-
-    # Generated cases.
-    # Ensure exact per-seed totals across buckets (no rounding loss).
-    valid_by_bucket = _split_across_buckets(int(n_valid), buckets)
-    invalid_by_bucket = _split_across_buckets(int(n_invalid), buckets)
-
-    save_budget = 3 if args.save_generated else 0
-
-    for seed in seeds:
-        for bucket in buckets:
-            for idx in range(int(valid_by_bucket[bucket])):
-                src = generate_valid_program(seed=int(seed), index=int(idx), size_bucket=bucket)
-                name = f"<gen valid seed={seed} idx={idx} bucket={bucket}>"
-                run_case(src, name=name, category="valid", size_bucket=bucket, seed=int(seed))
-                if save_budget > 0 and idx < save_budget:
-                    gen_dir.mkdir(parents=True, exist_ok=True)
-                    (gen_dir / f"seed{seed}_{bucket}_valid_{idx}.suay").write_text(src, encoding="utf-8")
-
-            for idx in range(int(invalid_by_bucket[bucket])):
-                cat, src = generate_invalid_program(seed=int(seed), index=int(idx), size_bucket=bucket)
-                invalid_category_counts[cat] = invalid_category_counts.get(cat, 0) + 1
-                name = f"<gen invalid seed={seed} idx={idx} bucket={bucket} cat={cat}>"
-                run_case(src, name=name, category=f"invalid/{cat}", size_bucket=bucket, seed=int(seed))
-                if save_budget > 0 and idx < save_budget:
-                    gen_dir.mkdir(parents=True, exist_ok=True)
-                    (gen_dir / f"seed{seed}_{bucket}_invalid_{cat}_{idx}.suay").write_text(src, encoding="utf-8")
+    divergence_ids = {d.id for d in tally.divergences}
+
+    for file_name, src in tally.samples:
+        gen_dir.mkdir(parents=True, exist_ok=True)
+        (gen_dir / file_name).write_text(src, encoding="utf-8")
+
+    total = tally.total
+    total_vm_steps_ok = tally.total_vm_steps_ok
+    term_counts = tally.term_counts
+    invalid_category_counts = tally.invalid_category_counts
+    size_counts = tally.size_counts
+    per_seed = tally.per_seed
+    ast_counts_total = tally.ast_counts
+    opcode_counts_total = tally.opcode_counts
 
     elapsed_s = time.perf_counter() - start
 
@@ -1,55 +1,322 @@
 from __future__ import annotations
 
+import argparse
+import hashlib
+import sys
+from bisect import bisect_left
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+
+from suaylang import ast
+from suaylang.arena import parse_arena
+from suaylang.lexer import LexError, Lexer
+from suaylang.parser import ParseError, Parser
+from suaylang.tokens import TokenType
 
 from .comparator import equivalent
-from .runner import observe_interpreter, observe_vm
+from .runner import observe_closures, observe_interpreter, observe_vm
 
 
 @dataclass(frozen=True)
 class MinimizeResult:
     minimized_source: str
     removed_lines: int
+    tested: int = 0  # candidates run on both engines
+    cache_hits: int = 0  # candidates answered from the memo
 
 
-def minimize_by_lines(
-    *,
-    source: str,
-    filename: str,
-    category: str,
-    size_bucket: str,
-    timeout_s: float,
-) -> MinimizeResult:
-    """A simple delta-debugging minimizer.
+# ----------------------------
+# Oracle
+# ----------------------------
+#
+# A candidate is interesting when the interpreter and the engine under test
+# (the VM or the closure compiler) still disagree with the same pair of
+# terminations as the original program (so a reduction cannot drift to an
+# unrelated divergence). Outcomes are memoized by a digest of the candidate's
+# text; fresh candidates are run `jobs` at a time in worker processes, and the
+# first interesting one in candidate order wins, so the result does not depend
+# on `jobs`.
+
+
+def _terminations(
+    source: str, *, filename: str, timeout_s: float, engine: str = "vm"
+) -> tuple[str, str] | None:
+    """(interpreter, `engine`) terminations if the engines disagree on `source`, else None."""
+
+    try:
+        Parser(Lexer(source, filename=filename).tokenize(), source, filename=filename).parse_program()
+    except (LexError, ParseError):
+        return None  # both engines share the front end: they report the same error
+    except RecursionError:
+        pass
+    i = observe_interpreter(source, filename=filename, timeout_s=timeout_s)
+    observe = observe_closures if engine == "closures" else observe_vm
+    v = observe(source, filename=filename, timeout_s=timeout_s)
+    ok, _reason = equivalent(i, v, engine=engine)
+    return None if ok else (i.termination, v.termination)
+
+
+def _interesting(
+    source: str, *, filename: str, timeout_s: float, engine: str, target: tuple[str, str]
+) -> bool:
+    return _terminations(source, filename=filename, timeout_s=timeout_s, engine=engine) == target
+
+
+def _digest(source: str) -> bytes:
+    return hashlib.blake2b(source.encode("utf-8"), digest_size=16).digest()
+
+
+class _Oracle:
+    def __init__(self, test: Callable[[str], bool], jobs: int) -> None:
+        self.test = test
+        self.jobs = max(1, jobs)
+        self.memo: dict[bytes, bool] = {}
+        self.tested = 0
+        self.cache_hits = 0
+        self._pool = ProcessPoolExecutor(max_workers=self.jobs) if self.jobs > 1 else None
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+
+    def first(self, candidates: Iterable[str]) -> int | None:
+        """Index of the first interesting candidate, or None."""
+
+        batch: list[tuple[int, bytes, str | None]] = []  # src None: already in the memo
+        fresh: set[bytes] = set()
+        for idx, src in enumerate(candidates):
+            key = _digest(src)
+            known = self.memo.get(key)
+            if known is not None:
+                self.cache_hits += 1
+                if not known:
+                    continue
+                batch.append((idx, key, None))
+            elif key in fresh:
+                continue  # an earlier candidate in this batch has the same text
+            else:
+                batch.append((idx, key, src))
+                fresh.add(key)
+            if known or len(fresh) >= self.jobs:
+                hit = self._flush(batch)
+                if hit is not None:
+                    return hit
+                batch.clear()
+                fresh.clear()
+        return self._flush(batch)
+
+    def _flush(self, batch: list[tuple[int, bytes, str | None]]) -> int | None:
+        todo = [(key, src) for _, key, src in batch if src is not None]
+        if todo:
+            run = map if self._pool is None else self._pool.map
+            for (key, _), result in zip(todo, run(self.test, [src for _, src in todo])):
+                self.memo[key] = result
+            self.tested += len(todo)
+        for idx, key, _ in batch:
+            if self.memo[key]:
+                return idx
+        return None
+
+
+# ----------------------------
+# Reductions
+# ----------------------------
+
+
+def _ddmin(units: list[str], oracle: _Oracle) -> list[str]:
+    """Zeller's ddmin over `units` (lines or tokens, joined back into text)."""
+
+    n = 2
+    while len(units) >= 2:
+        size = -(-len(units) // n)
+        starts = range(0, len(units), size)
+
+        def candidates() -> Iterator[str]:
+            for a in starts:
+                yield "".join(units[a : a + size])
+            for a in starts:
+                yield "".join(units[:a]) + "".join(units[a + size :])
 
-    Strategy: repeatedly try removing each line; keep the removal if it preserves
-    the divergence.
+        hit = oracle.first(candidates())
+        if hit is not None and hit < len(starts):
+            a = starts[hit]
+            units = units[a : a + size]
+            n = 2
+        elif hit is not None:
+            a = starts[hit - len(starts)]
+            units = units[:a] + units[a + size :]
+            n = max(n - 1, 2)
+        elif n >= len(units):
+            break
+        else:
+            n = min(len(units), 2 * n)
+    return units
+
+
+def _token_units(source: str) -> list[str]:
+    """`source` cut before each token, so removing units keeps the rest lexable."""
+
+    try:
+        starts = [t.span.start.offset for t in Lexer(source).tokenize() if t.type is not TokenType.EOF]
+    except LexError:
+        return [source]
+    if not starts:
+        return [source]
+    starts[0] = 0
+    return [source[a:b] for a, b in zip(starts, [*starts[1:], len(source)])]
+
+
+_EXPRS = frozenset(
+    {
+        ast.Name,
+        ast.BoolLit,
+        ast.IntLit,
+        ast.DecLit,
+        ast.TextLit,
+        ast.TupleExpr,
+        ast.ListExpr,
+        ast.MapExpr,
+        ast.VariantExpr,
+        ast.Block,
+        ast.Lambda,
+        ast.Call,
+        ast.Unary,
+        ast.Binary,
+        ast.Dispatch,
+        ast.Cycle,
+    }
+)
+# Nodes that may be replaced by one of their expression children.
+_HOISTS = frozenset({ast.VariantExpr, ast.Block, ast.Call, ast.Unary, ast.Binary, ast.Dispatch, ast.Cycle})
+_SEQUENCES = frozenset({ast.Program, ast.Block, ast.TupleExpr, ast.ListExpr, ast.PTuple})
+
+
+def _ast_edits(source: str) -> list[tuple[int, int, str]]:
+    """(start, end, replacement) reductions of `source`, largest first.
+
+    Deletes items of sequences, map entries and dispatch/cycle arms, replaces
+    expressions by `ø`, and replaces expressions by one of their children.
     """
 
-    lines = source.splitlines(True)
+    try:
+        arena = parse_arena(source)
+        tokens = Lexer(source).tokenize()
+    except (LexError, ParseError, RecursionError):
+        return []
+    tok_starts = [t.span.start.offset for t in tokens]
+    start, end = arena.start, arena.end
+
+    def deletions(groups: list[tuple[int, int]]) -> Iterator[tuple[int, int, str]]:
+        # Take the separator after an item (or before the last one) along with it.
+        for j, (a, b) in enumerate(groups):
+            if j + 1 < len(groups):
+                yield a, groups[j + 1][0], ""
+            elif j > 0:
+                yield groups[j - 1][1], b, ""
+            else:
+                yield a, b, ""
+
+    edits: list[tuple[int, int, str]] = []
+    for i in range(len(arena)):
+        kind = arena.kind_of(i)
+        kids = arena.children(i)
+        if kind in _SEQUENCES or kind is ast.PList and not arena.constant(i):
+            edits.extend(deletions([(start[k], end[k]) for k in kids]))
+        elif kind is ast.MapExpr:
+            edits.extend(deletions([(start[k], end[v]) for k, v in zip(kids[::2], kids[1::2])]))
+        elif kind is ast.Dispatch or kind is ast.Cycle:
+            arms = []
+            for k in kids[1:]:
+                t = bisect_left(tok_starts, start[k]) - 1
+                lead = tokens[t].span.start.offset if t >= 0 and tokens[t].type is TokenType.DISPATCH else start[k]
+                arms.append((lead, end[k]))
+            edits.extend(deletions(arms))
+        if kind in _EXPRS:
+            edits.append((start[i], end[i], "ø"))
+        if kind in _HOISTS:
+            edits.extend((start[i], end[i], source[start[k] : end[k]]) for k in kids if arena.kind_of(k) in _EXPRS)
+    edits.sort(key=lambda e: (e[0] - e[1] + len(e[2]), e[0]))
+    return edits
+
 
-    def diverges(src: str) -> bool:
-        i = observe_interpreter(src, filename=filename, timeout_s=timeout_s)
-        v = observe_vm(src, filename=filename, timeout_s=timeout_s)
-        ok, _reason = equivalent(i, v)
-        return not ok
+def _reduce_ast(source: str, oracle: _Oracle) -> str:
+    while True:
+        edits = _ast_edits(source)
+        hit = oracle.first(source[:a] + r + source[b:] for a, b, r in edits)
+        if hit is None:
+            return source
+        a, b, r = edits[hit]
+        source = source[:a] + r + source[b:]
 
-    if not diverges(source):
+
+def minimize(
+    *, source: str, filename: str, timeout_s: float, jobs: int = 1, engine: str = "vm"
+) -> MinimizeResult:
+    """Shrink a program on which the interpreter and `engine` diverge, keeping the divergence.
+
+    Alternates ddmin over lines, AST reductions (see `_ast_edits`) and ddmin
+    over tokens until none of them makes progress.
+    """
+
+    target = _terminations(source, filename=filename, timeout_s=timeout_s, engine=engine)
+    if target is None:
         return MinimizeResult(minimized_source=source, removed_lines=0)
 
-    removed = 0
-    changed = True
-    while changed and len(lines) > 1:
-        changed = False
-        for idx in range(len(lines)):
-            trial = lines[:idx] + lines[idx + 1 :]
-            trial_src = "".join(trial)
-            if trial_src.strip() == "":
-                continue
-            if diverges(trial_src):
-                lines = trial
-                removed += 1
-                changed = True
+    test = partial(_interesting, filename=filename, timeout_s=timeout_s, engine=engine, target=target)
+    oracle = _Oracle(test, jobs)
+    oracle.memo[_digest(source)] = True
+    try:
+        current = source
+        while True:
+            before = current
+            current = "".join(_ddmin(current.splitlines(True), oracle))
+            current = _reduce_ast(current, oracle)
+            current = "".join(_ddmin(_token_units(current), oracle))
+            if current == before:
                 break
+    finally:
+        oracle.close()
+
+    removed = max(0, len(source.splitlines()) - len(current.splitlines()))
+    return MinimizeResult(
+        minimized_source=current,
+        removed_lines=removed,
+        tested=oracle.tested,
+        cache_hits=oracle.cache_hits,
+    )
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(prog="diff-test-minimize", description="Minimize a program on which the interpreter and another engine diverge.")
+    ap.add_argument("path", type=Path)
+    ap.add_argument("--out", type=Path, default=None, help="Write the result here (default: stdout)")
+    ap.add_argument("--timeout-s", type=float, default=0.5)
+    ap.add_argument("--jobs", type=int, default=1, help="Candidates run in parallel")
+    ap.add_argument("--engine", choices=["vm", "closures"], default="vm", help="Engine compared with the interpreter")
+    args = ap.parse_args()
+
+    source = args.path.read_text(encoding="utf-8")
+    res = minimize(
+        source=source,
+        filename=args.path.as_posix(),
+        timeout_s=float(args.timeout_s),
+        jobs=int(args.jobs),
+        engine=str(args.engine),
+    )
+    if args.out is None:
+        print(res.minimized_source, end="")
+    else:
+        args.out.write_text(res.minimized_source, encoding="utf-8")
+    print(
+        f"minimize: {len(source)} -> {len(res.minimized_source)} chars, "
+        f"tested={res.tested} cache_hits={res.cache_hits}",
+        file=sys.stderr,
+    )
+    return 0
+
 
-    return MinimizeResult(minimized_source="".join(lines), removed_lines=removed)
+if __name__ == "__main__":
+    raise SystemExit(main())
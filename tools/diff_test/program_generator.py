@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import random
+import zlib
 from dataclasses import dataclass
 
 
@@ -158,8 +159,14 @@ def _size_params(bucket: str) -> tuple[int, int]:
     raise ValueError(f"Unknown size bucket: {bucket}")
 
 
+def _bucket_salt(bucket: str) -> int:
+    # Not `hash()`: string hashes differ between processes, and programs must be
+    # the same in every worker of a sharded run.
+    return zlib.crc32(bucket.encode("utf-8"))
+
+
 def generate_valid_program(*, seed: int, index: int, size_bucket: str) -> str:
-    rng = random.Random((seed * 1_000_003) ^ (index * 97) ^ hash(size_bucket))
+    rng = random.Random((seed * 1_000_003) ^ (index * 97) ^ _bucket_salt(size_bucket))
     depth, nlines = _size_params(size_bucket)
 
     names: list[str] = []
@@ -210,7 +217,7 @@ _INVALID_MUTATIONS = [
 def generate_invalid_program(*, seed: int, index: int, size_bucket: str) -> tuple[str, str]:
     """Return (category, source)."""
 
-    rng = random.Random((seed * 999_983) ^ (index * 131) ^ hash(size_bucket))
+    rng = random.Random((seed * 999_983) ^ (index * 131) ^ _bucket_salt(size_bucket))
     base = generate_valid_program(seed=seed, index=index, size_bucket=size_bucket)
     mut = rng.choice(_INVALID_MUTATIONS)
 
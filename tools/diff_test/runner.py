@@ -1,16 +1,18 @@
 from __future__ import annotations
 
 import contextlib
+import ctypes
 import io
-import os
 import platform
 import re
 import signal
 import sys
+import threading
 import time
 from dataclasses import dataclass
 from typing import Literal
 
+from suaylang.closure_compiler import ClosureInterpreter
 from suaylang.compiler import Compiler
 from suaylang.errors import Diagnostic, SuayError
 from suaylang.interpreter import Interpreter
@@ -42,9 +44,9 @@ def _timeout(seconds: float):
         yield
         return
 
-    if os.name != "posix":
-        # Best-effort on non-POSIX.
-        yield
+    if threading.current_thread() is not threading.main_thread() or not hasattr(signal, "setitimer"):
+        with _thread_timeout(seconds):
+            yield
         return
 
     def handler(_signum, _frame):
@@ -59,6 +61,34 @@ def _timeout(seconds: float):
         signal.signal(signal.SIGALRM, old)
 
 
+@contextlib.contextmanager
+def _thread_timeout(seconds: float):
+    """`_timeout` where SIGALRM is not available: off the main thread, or not on POSIX.
+
+    A timer thread raises TimeoutError in this thread asynchronously; the
+    exception is delivered between bytecodes, which suffices for the engines.
+    """
+
+    target = threading.get_ident()
+    lock = threading.Lock()
+    done = False
+
+    def fire() -> None:
+        with lock:
+            if not done:
+                ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_ulong(target), ctypes.py_object(TimeoutError))
+
+    timer = threading.Timer(seconds, fire)
+    timer.daemon = True
+    timer.start()
+    try:
+        yield
+    finally:
+        with lock:
+            done = True
+        timer.cancel()
+
+
 _WS_RE = re.compile(r"\s+")
 
 
@@ -71,93 +101,17 @@ def _norm_msg(s: str) -> str:
 
 
 def observe_interpreter(source: str, *, filename: str, timeout_s: float) -> Observation:
-    out_buf = io.StringIO()
-    err_buf = io.StringIO()
-    t0 = time.perf_counter()
-
-    def run() -> object:
+    def run() -> tuple[object, int | None]:
         tokens = Lexer(source, filename=filename).tokenize()
         program = Parser(tokens, source, filename=filename).parse_program()
-        return Interpreter(source=source, filename=filename, trace=False).eval_program(
-            program
-        )
+        val = Interpreter(source=source, filename=filename, trace=False).eval_program(program)
+        return val, None
 
-    try:
-        with (
-            contextlib.redirect_stdout(out_buf),
-            contextlib.redirect_stderr(err_buf),
-            _timeout(timeout_s),
-        ):
-            val = run()
-        t1 = time.perf_counter()
-        return Observation(
-            termination="ok",
-            stdout=_norm_text(out_buf.getvalue()),
-            stderr=_norm_text(err_buf.getvalue()),
-            value_repr=repr(val),
-            elapsed_ms=(t1 - t0) * 1000.0,
-        )
-    except TimeoutError:
-        t1 = time.perf_counter()
-        return Observation(
-            termination="timeout",
-            stdout=_norm_text(out_buf.getvalue()),
-            stderr=_norm_text(err_buf.getvalue()),
-            message="timeout",
-            elapsed_ms=(t1 - t0) * 1000.0,
-        )
-    except BaseException as e:  # noqa: BLE001
-        t1 = time.perf_counter()
-        if isinstance(e, Diagnostic):
-            term: Termination = "lex" if e.error_type == "lexical" else "parse"
-            return Observation(
-                termination=term,
-                stdout=_norm_text(out_buf.getvalue()),
-                stderr=_norm_text(err_buf.getvalue()),
-                error_type=e.error_type,
-                line=e.line,
-                column=e.column,
-                message=_norm_msg(e.message),
-                elapsed_ms=(t1 - t0) * 1000.0,
-            )
-        if isinstance(e, SuayRuntimeError):
-            line = e.span.start.line if e.span else None
-            col = e.span.start.column if e.span else None
-            return Observation(
-                termination="runtime",
-                stdout=_norm_text(out_buf.getvalue()),
-                stderr=_norm_text(err_buf.getvalue()),
-                error_type="runtime",
-                line=line,
-                column=col,
-                message=_norm_msg(str(e)),
-                elapsed_ms=(t1 - t0) * 1000.0,
-            )
-        if isinstance(e, SuayError):
-            return Observation(
-                termination="internal",
-                stdout=_norm_text(out_buf.getvalue()),
-                stderr=_norm_text(err_buf.getvalue()),
-                error_type="suay",
-                message=_norm_msg(str(e)),
-                elapsed_ms=(t1 - t0) * 1000.0,
-            )
-        return Observation(
-            termination="internal",
-            stdout=_norm_text(out_buf.getvalue()),
-            stderr=_norm_text(err_buf.getvalue()),
-            error_type=type(e).__name__,
-            message=_norm_msg(str(e)),
-            elapsed_ms=(t1 - t0) * 1000.0,
-        )
+    return _observe(run, timeout_s=timeout_s)
 
 
 def observe_vm(source: str, *, filename: str, timeout_s: float) -> Observation:
-    out_buf = io.StringIO()
-    err_buf = io.StringIO()
-    t0 = time.perf_counter()
-
-    def run() -> object:
+    def run() -> tuple[object, int | None]:
         tokens = Lexer(source, filename=filename).tokenize()
         program = Parser(tokens, source, filename=filename).parse_program()
         code = Compiler().compile_program(program, name=filename)
@@ -165,6 +119,25 @@ def observe_vm(source: str, *, filename: str, timeout_s: float) -> Observation:
         val, steps = vm.run_with_stats(code)
         return val, int(steps)
 
+    return _observe(run, timeout_s=timeout_s)
+
+
+def observe_closures(source: str, *, filename: str, timeout_s: float) -> Observation:
+    def run() -> tuple[object, int | None]:
+        tokens = Lexer(source, filename=filename).tokenize()
+        program = Parser(tokens, source, filename=filename).parse_program()
+        return ClosureInterpreter(source=source, filename=filename).eval_program(program), None
+
+    return _observe(run, timeout_s=timeout_s)
+
+
+def _observe(run, *, timeout_s: float) -> Observation:
+    """Run `run` (returning the value and VM steps, if any) and record how it ends."""
+
+    out_buf = io.StringIO()
+    err_buf = io.StringIO()
+    t0 = time.perf_counter()
+
     try:
         with (
             contextlib.redirect_stdout(out_buf),
@@ -179,7 +152,7 @@ def observe_vm(source: str, *, filename: str, timeout_s: float) -> Observation:
             stderr=_norm_text(err_buf.getvalue()),
             value_repr=repr(val),
             elapsed_ms=(t1 - t0) * 1000.0,
-            vm_steps=int(steps),
+            vm_steps=steps,
         )
     except TimeoutError:
         t1 = time.perf_counter()
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+
+from .comparator import divergence_fingerprint, equivalent
+from .coverage import ast_node_counts, opcode_counts
+from .minimizer import minimize
+from .program_generator import generate_invalid_program, generate_valid_program
+from .runner import Observation, observe_closures, observe_interpreter, observe_vm
+
+# ----------------------------
+# Sharded runs
+# ----------------------------
+#
+# A run is a fixed list of cases cut into shards of `SHARD_SIZE`. Each case is
+# run on the interpreter, the VM and the closure compiler; the interpreter is
+# compared with each of the other two. Each shard is observed, compared and
+# minimized on its own, in a worker process when there
+# is more than one job (workers enforce their own timeouts), and yields a
+# `Tally`. Tallies are merged in shard order, so the report does not depend on
+# the number of jobs.
+
+SHARD_SIZE = 50
+
+
+@dataclass(frozen=True)
+class Case:
+    """One program to run: a corpus file (`path`) or a generated program."""
+
+    kind: str  # "fixed", "regression", "valid" or "invalid"
+    seed: int | str
+    size_bucket: str
+    index: int = 0
+    path: str | None = None
+    save: bool = False  # keep the generated source as a sample
+
+
+@dataclass(frozen=True)
+class Divergence:
+    id: str
+    reason: str | None
+    category: str
+    size_bucket: str
+    minimized_source: str
+    removed_lines: int
+    interp: Observation
+    other: Observation  # the engine the interpreter was compared with
+    engine: str = "vm"  # "vm" or "closures"
+
+
+@dataclass
+class Tally:
+    total: int = 0
+    total_vm_steps_ok: int = 0
+    term_counts: dict[str, int] = field(default_factory=dict)
+    invalid_category_counts: dict[str, int] = field(default_factory=dict)
+    size_counts: dict[str, int] = field(default_factory=dict)
+    per_seed: dict[str, dict[str, object]] = field(default_factory=dict)
+    ast_counts: dict[str, int] = field(default_factory=dict)
+    opcode_counts: dict[str, int] = field(default_factory=dict)
+    divergences: list[Divergence] = field(default_factory=list)
+    samples: list[tuple[str, str]] = field(default_factory=list)  # (file name, source)
+
+    def merge(self, other: Tally) -> None:
+        self.total += other.total
+        self.total_vm_steps_ok += other.total_vm_steps_ok
+        _merge_counts(self.term_counts, other.term_counts)
+        _merge_counts(self.invalid_category_counts, other.invalid_category_counts)
+        _merge_counts(self.size_counts, other.size_counts)
+        _merge_counts(self.ast_counts, other.ast_counts)
+        _merge_counts(self.opcode_counts, other.opcode_counts)
+        for sk, theirs in other.per_seed.items():
+            entry = self._seed_entry(sk)
+            entry["total_programs"] = int(entry["total_programs"]) + int(theirs["total_programs"])
+            entry["divergences"] = int(entry["divergences"]) + int(theirs["divergences"])
+            tc = dict(entry["termination_counts"])  # type: ignore[arg-type]
+            _merge_counts(tc, theirs["termination_counts"])  # type: ignore[arg-type]
+            entry["termination_counts"] = tc
+        self.divergences.extend(other.divergences)
+        self.samples.extend(other.samples)
+
+    def _seed_entry(self, sk: str) -> dict[str, object]:
+        entry = self.per_seed.get(sk)
+        if entry is None:
+            entry = self.per_seed[sk] = {
+                "seed": sk,
+                "total_programs": 0,
+                "divergences": 0,
+                "termination_counts": {},
+            }
+        return entry
+
+
+def _merge_counts(dst: dict[str, int], src: dict[str, int]) -> None:
+    for k, v in src.items():
+        dst[k] = dst.get(k, 0) + int(v)
+
+
+def plan_cases(
+    *,
+    fixed: Iterable[Path],
+    regressions: Iterable[Path],
+    seeds: list[int],
+    valid_by_bucket: dict[str, int],
+    invalid_by_bucket: dict[str, int],
+    save_budget: int,
+) -> list[Case]:
+    """Every case of a run, in report order: corpus files, then generated programs by seed."""
+
+    cases = [Case("fixed", "fixed", "small", path=p.as_posix()) for p in fixed]
+    cases += [Case("regression", "regression", "small", path=p.as_posix()) for p in regressions]
+    for seed in seeds:
+        for bucket, n_valid in valid_by_bucket.items():
+            cases += [Case("valid", seed, bucket, i, save=i < save_budget) for i in range(n_valid)]
+            n_invalid = invalid_by_bucket[bucket]
+            cases += [Case("invalid", seed, bucket, i, save=i < save_budget) for i in range(n_invalid)]
+    return cases
+
+
+def run_shard(cases: list[Case], *, timeout_s: float) -> Tally:
+    tally = Tally()
+    for case in cases:
+        _run_case(tally, case, timeout_s)
+    return tally
+
+
+def run_sharded(cases: list[Case], *, timeout_s: float, jobs: int) -> Iterator[Tally]:
+    """One `Tally` per shard of `cases`, in order, using up to `jobs` processes."""
+
+    shards = [cases[i : i + SHARD_SIZE] for i in range(0, len(cases), SHARD_SIZE)]
+    run = partial(run_shard, timeout_s=timeout_s)
+    if jobs <= 1 or len(shards) <= 1:
+        yield from map(run, shards)
+        return
+    pool = ProcessPoolExecutor(max_workers=min(jobs, len(shards)))
+    try:
+        yield from pool.map(run, shards)
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+def _run_case(tally: Tally, case: Case, timeout_s: float) -> None:
+    seed = case.seed
+    bucket = case.size_bucket
+    if case.path is not None:
+        source = Path(case.path).read_text(encoding="utf-8")
+        name = case.path
+        category = case.kind
+    elif case.kind == "valid":
+        source = generate_valid_program(seed=int(seed), index=case.index, size_bucket=bucket)
+        name = f"<gen valid seed={seed} idx={case.index} bucket={bucket}>"
+        category = "valid"
+        if case.save:
+            tally.samples.append((f"seed{seed}_{bucket}_valid_{case.index}.suay", source))
+    else:
+        cat, source = generate_invalid_program(seed=int(seed), index=case.index, size_bucket=bucket)
+        tally.invalid_category_counts[cat] = tally.invalid_category_counts.get(cat, 0) + 1
+        name = f"<gen invalid seed={seed} idx={case.index} bucket={bucket} cat={cat}>"
+        category = f"invalid/{cat}"
+        if case.save:
+            tally.samples.append((f"seed{seed}_{bucket}_invalid_{cat}_{case.index}.suay", source))
+
+    tally.total += 1
+    tally.size_counts[bucket] = tally.size_counts.get(bucket, 0) + 1
+
+    i = observe_interpreter(source, filename=name, timeout_s=timeout_s)
+    v = observe_vm(source, filename=name, timeout_s=timeout_s)
+    c = observe_closures(source, filename=name, timeout_s=timeout_s)
+
+    t = str(i.termination)
+    tally.term_counts[t] = tally.term_counts.get(t, 0) + 1
+    entry = tally._seed_entry(str(seed))
+    entry["total_programs"] = int(entry["total_programs"]) + 1
+    tc = entry["termination_counts"]
+    tc[t] = int(tc.get(t, 0)) + 1  # type: ignore[index,union-attr]
+
+    for engine, other in (("vm", v), ("closures", c)):
+        ok, reason = equivalent(i, other, engine=engine)
+        if not ok:
+            entry["divergences"] = int(entry["divergences"]) + 1
+            minimized = minimize(source=source, filename=name, timeout_s=timeout_s, engine=engine)
+            tally.divergences.append(
+                Divergence(
+                    id=divergence_fingerprint(
+                        source=source, interp=i, vm=other, category=category, size_bucket=bucket, engine=engine
+                    ),
+                    reason=reason,
+                    category=category,
+                    size_bucket=bucket,
+                    minimized_source=minimized.minimized_source,
+                    removed_lines=minimized.removed_lines,
+                    interp=i,
+                    other=other,
+                    engine=engine,
+                )
+            )
+        elif engine == "vm":
+            if v.termination == "ok" and v.vm_steps is not None:
+                tally.total_vm_steps_ok += int(v.vm_steps)
+            # Coverage is best-effort: only if parsing/compiling succeeds.
+            try:
+                _merge_counts(tally.ast_counts, ast_node_counts(source, filename=name))
+            except Exception:
+                pass
+            try:
+                _merge_counts(tally.opcode_counts, opcode_counts(source, filename=name))
+            except Exception:
+                pass
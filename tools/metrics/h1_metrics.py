@@ -5,7 +5,7 @@ import ast as pyast
 import io
 import sys
 import tokenize
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from pathlib import Path
 
 _REPO_ROOT = Path(__file__).resolve().parents[2]
@@ -46,8 +46,8 @@ def _max_depth_obj(obj: object) -> int:
         if isinstance(x, Node):
             seen.add(xid)
             child_depths: list[int] = []
-            for v in vars(x).values():
-                child_depths.append(walk(v))
+            for f in fields(x):
+                child_depths.append(walk(getattr(x, f.name)))
             return 1 + (max(child_depths) if child_depths else 0)
         if isinstance(x, list):
             return max((walk(i) for i in x), default=0)
@@ -80,7 +80,7 @@ def _suay_metrics(path: Path) -> Metrics:
                 branch_walk(a.pattern) + branch_walk(a.expr) for a in node.arms
             )
         if isinstance(node, suayast.Node):
-            return sum(branch_walk(v) for v in vars(node).values())
+            return sum(branch_walk(getattr(node, f.name)) for f in fields(node))
         if isinstance(node, list):
             return sum(branch_walk(v) for v in node)
         if isinstance(node, tuple):